@@ -0,0 +1,245 @@
+import sqlite3
+import threading
+import logging
+from utils.error_handler import DatabaseException, QueryCancelledException, QueryTimeoutException
+
+# Thời gian chờ (giây) khi cơ sở dữ liệu đang bị khóa ghi; dùng chung cho kết nối
+# chính của DatabaseManager và các kết nối của pool
+BUSY_TIMEOUT = 5.0
+
+
+class ConnectionPool:
+    """
+    Quản lý các kết nối SQLite riêng cho từng luồng.
+
+    Kết nối chính của DatabaseManager chỉ dùng được trên luồng giao diện,
+    nên các truy vấn chạy nền (tìm kiếm, tải dữ liệu) lấy kết nối của luồng
+    hiện tại từ pool này. Mỗi luồng giữ một kết nối và dùng lại cho các lần sau.
+    """
+
+    # Số lệnh VM giữa hai lần SQLite gọi progress handler để kiểm tra cờ hủy
+    PROGRESS_INTERVAL = 1000
+
+    def __init__(self, db_path, timeout=BUSY_TIMEOUT):
+        """
+        Khởi tạo pool kết nối
+
+        Args:
+            db_path (str): Đường dẫn đến file cơ sở dữ liệu
+            timeout (float): Thời gian chờ khi cơ sở dữ liệu đang bị khóa (giây)
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._closed = False
+
+    def get_connection(self):
+        """
+        Lấy kết nối của luồng hiện tại, tạo mới nếu chưa có.
+
+        Returns:
+            sqlite3.Connection: Kết nối dành riêng cho luồng hiện tại
+
+        Raises:
+            DatabaseException: Khi pool đã đóng hoặc không mở được kết nối
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        with self._lock:
+            if self._closed:
+                raise DatabaseException("Pool kết nối đã đóng")
+            try:
+                # check_same_thread=False chỉ để close_all() đóng được từ luồng chính;
+                # mỗi kết nối vẫn chỉ được dùng bởi luồng đã tạo ra nó
+                connection = sqlite3.connect(self.db_path, timeout=self.timeout,
+                                             check_same_thread=False)
+            except sqlite3.Error as e:
+                raise DatabaseException(f"Không thể mở kết nối: {e}", cause=e) from e
+            connection.row_factory = sqlite3.Row
+            self._connections.append(connection)
+
+        self._local.connection = connection
+        logging.debug("Mở kết nối mới cho luồng %s", threading.current_thread().name)
+        return connection
+
+    def execute_read(self, query, parameters=(), cancel_token=None):
+        """
+        Thực thi truy vấn đọc trên kết nối của luồng hiện tại.
+
+        Nếu có cancel_token, truy vấn được gắn progress handler để dừng ngay
+        khi token bị hủy hoặc quá thời hạn thay vì chạy hết; khi người dùng hủy,
+        truy vấn đang chạy còn bị ngắt ngay bằng Connection.interrupt().
+
+        Args:
+            query (str): Câu truy vấn SQL
+            parameters (tuple): Các tham số cho truy vấn
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Danh sách sqlite3.Row
+
+        Raises:
+            QueryTimeoutException: Khi truy vấn chạy quá thời hạn của token
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        connection = self.get_connection()
+        self._attach_cancel(connection, cancel_token)
+        try:
+            return connection.execute(query, parameters).fetchall()
+        except sqlite3.Error as e:
+            raise self._read_error(e, query, cancel_token) from e
+        finally:
+            self._detach_cancel(connection, cancel_token)
+
+    def iter_read(self, query, parameters=(), cancel_token=None, batch_size=1000):
+        """
+        Thực thi truy vấn đọc và trả kết quả theo từng lô (fetchmany) thay vì
+        đọc hết vào bộ nhớ; dùng khi xuất dữ liệu lớn. Cơ chế hủy giống execute_read.
+
+        Con trỏ (cùng giao dịch đọc ngầm định của nó) mở suốt thời gian bên gọi
+        duyệt các lô. Cơ sở dữ liệu chạy ở chế độ WAL (DatabaseManager._enable_wal)
+        nên việc đó không chặn các lệnh ghi từ luồng khác.
+
+        Args:
+            query (str): Câu truy vấn SQL
+            parameters (tuple): Các tham số cho truy vấn
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số dòng mỗi lô
+
+        Yields:
+            list: Lô các sqlite3.Row
+
+        Raises:
+            QueryTimeoutException: Khi truy vấn chạy quá thời hạn của token
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        connection = self.get_connection()
+        self._attach_cancel(connection, cancel_token)
+        cursor = None
+        try:
+            cursor = connection.execute(query, parameters)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        except sqlite3.Error as e:
+            raise self._read_error(e, query, cancel_token) from e
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self._detach_cancel(connection, cancel_token)
+
+    def _attach_cancel(self, connection, cancel_token):
+        """
+        Gắn cờ hủy vào kết nối: progress handler dừng truy vấn khi token bị hủy
+        hoặc quá hạn, và Connection.interrupt() ngắt ngay khi người dùng hủy.
+
+        Raises:
+            QueryCancelledException: Khi token đã bị hủy từ trước
+        """
+        if cancel_token is None:
+            return
+        cancel_token.raise_if_cancelled()
+        connection.set_progress_handler(
+            lambda: 1 if cancel_token.is_cancelled else 0,
+            self.PROGRESS_INTERVAL
+        )
+        # interrupt() an toàn khi gọi từ luồng khác (luồng giao diện bấm Hủy)
+        cancel_token.add_callback(connection.interrupt)
+
+    def _detach_cancel(self, connection, cancel_token):
+        """Gỡ cờ hủy đã gắn bởi _attach_cancel."""
+        if cancel_token is None:
+            return
+        cancel_token.remove_callback(connection.interrupt)
+        connection.set_progress_handler(None, 0)
+
+    def _read_error(self, error, query, cancel_token):
+        """
+        Chuyển lỗi sqlite3 của một truy vấn đọc thành ngoại lệ của ứng dụng.
+
+        Args:
+            error (sqlite3.Error): Lỗi gốc
+            query (str): Câu truy vấn (để ghi log khi quá hạn)
+            cancel_token (CancellationToken, optional): Cờ hủy của truy vấn
+
+        Returns:
+            Exception: QueryTimeoutException, QueryCancelledException hoặc DatabaseException
+        """
+        if (isinstance(error, sqlite3.OperationalError)
+                and cancel_token is not None and cancel_token.is_cancelled):
+            if cancel_token.timed_out:
+                logging.warning("Truy vấn bị dừng vì quá %s giây: %s",
+                                cancel_token.timeout, " ".join(query.split())[:200])
+                return QueryTimeoutException(cancel_token.timeout, cause=error)
+            return QueryCancelledException(cause=error)
+        return DatabaseException(f"Lỗi khi thực thi truy vấn: {error}", cause=error)
+
+    def execute_write(self, query, parameters=()):
+        """
+        Thực thi câu lệnh ghi (INSERT/UPDATE/DELETE) trên kết nối của luồng
+        hiện tại và lưu thay đổi ngay.
+
+        Args:
+            query (str): Câu lệnh SQL
+            parameters (tuple): Các tham số cho câu lệnh
+
+        Returns:
+            sqlite3.Cursor: Con trỏ đã thực thi (dùng lastrowid, rowcount)
+
+        Raises:
+            DatabaseException: Khi câu lệnh lỗi (thay đổi đã được hoàn tác)
+        """
+        connection = self.get_connection()
+        try:
+            cursor = connection.execute(query, parameters)
+            connection.commit()
+            return cursor
+        except sqlite3.Error as e:
+            connection.rollback()
+            raise DatabaseException(f"Lỗi khi ghi dữ liệu: {e}", cause=e) from e
+
+    def execute_many(self, query, seq_of_parameters):
+        """
+        Thực thi một câu lệnh ghi cho nhiều bộ tham số trong cùng một giao dịch
+        trên kết nối của luồng hiện tại.
+
+        Args:
+            query (str): Câu lệnh SQL
+            seq_of_parameters (iterable): Các bộ tham số
+
+        Returns:
+            int: Tổng số bản ghi bị ảnh hưởng
+
+        Raises:
+            DatabaseException: Khi câu lệnh lỗi (cả giao dịch được hoàn tác)
+        """
+        connection = self.get_connection()
+        try:
+            cursor = connection.executemany(query, seq_of_parameters)
+            connection.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            connection.rollback()
+            raise DatabaseException(f"Lỗi khi ghi dữ liệu: {e}", cause=e) from e
+
+    def close_all(self):
+        """Đóng tất cả các kết nối đã mở bởi pool."""
+        with self._lock:
+            self._closed = True
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except sqlite3.Error as e:
+                    logging.error("Lỗi khi đóng kết nối trong pool: %s", e)
+            count = len(self._connections)
+            self._connections.clear()
+        self._local = threading.local()
+        logging.info("Đã đóng %d kết nối trong pool", count)
@@ -4,28 +4,39 @@ import logging
 import secrets
 import hashlib
 import shutil
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from utils.config_manager import ConfigManager
+from DB.connection_pool import BUSY_TIMEOUT, ConnectionPool
+from utils.error_handler import DatabaseException, QueryCancelledException
+from utils.change_bus import ENTITY_ACTIVITY_LOG, ChangeOperation, publish_change
 
 class DatabaseManager:
     """
     Lớp quản lý kết nối và thao tác với cơ sở dữ liệu SQLite.
     """
+    # Các bảng có bộ đếm số lần ghi (bảng dem_thay_doi, cập nhật bằng trigger)
+    TRACKED_TABLES = ("sinh_vien", "khoa_hoc", "ghi_danh", "nhat_ky_hoat_dong")
     
-    def __init__(self, db_path: str | None):
+    def __init__(self, db_path: str | None, config_manager=None):
         """
         Khởi tạo kết nối cơ sở dữ liệu
         
         Args:
             db_path (str, optional): Đường dẫn đến file cơ sở dữ liệu
+            config_manager (ConfigManager, optional): Cấu hình dùng chung để lấy đường dẫn
+                mặc định; chỉ tạo ConfigManager mới khi cần và không được truyền vào
         """
         # Ensure self.cursor is always defined
         self.connection = None
         self.cursor = None
+        self._reader_pool = None
+        # Kết nối chính chỉ dùng được trên luồng đã tạo ra nó (luồng giao diện)
+        self._owner_thread_id = threading.get_ident()
         try:
-            config_manager = ConfigManager()
-            
             if db_path is None:
+                config_manager = config_manager or ConfigManager()
                 db_path = config_manager.get_db_path()
             
             # Ensure the directory exists
@@ -35,6 +46,9 @@ class DatabaseManager:
             # self.connection and self.cursor are already set to None above
             self.connect()
 
+            # Pool kết nối cho các luồng chạy nền (chưa mở kết nối nào cho tới khi dùng)
+            self._reader_pool = ConnectionPool(db_path)
+
             # Thêm thuộc tính photos_dir
             self.photos_dir = os.path.join(os.path.dirname(db_path), "photos")
             os.makedirs(self.photos_dir, exist_ok=True)
@@ -52,6 +66,15 @@ class DatabaseManager:
         """Alias for connection attribute to maintain compatibility with other code."""
         return self.connection
 
+    @property
+    def reader_pool(self):
+        """Pool kết nối riêng cho từng luồng, dùng cho các truy vấn chạy nền."""
+        return self._reader_pool
+
+    def _on_owner_thread(self):
+        """Kiểm tra luồng hiện tại có phải luồng sở hữu kết nối chính không."""
+        return threading.get_ident() == self._owner_thread_id
+
     def _create_connection(self, db_path: str | None):
         """
         Create a database connection to the SQLite database specified by db_path.
@@ -65,8 +88,9 @@ class DatabaseManager:
         try:
             if db_path is None:
                 raise ValueError("Database path cannot be None.")
-            connection = sqlite3.connect(db_path)
+            connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
             connection.row_factory = sqlite3.Row
+            self._enable_wal(connection)
             logging.info("Connected to database at %s", db_path)
             return connection
         except sqlite3.Error as e:
@@ -77,6 +101,28 @@ class DatabaseManager:
             logging.error("General error in _create_connection: %s", e)
             return None
 
+    @staticmethod
+    def _enable_wal(connection):
+        """
+        Chuyển cơ sở dữ liệu sang chế độ WAL (lưu trong file, chỉ cần đặt một lần).
+
+        Ở chế độ nhật ký mặc định, giao dịch đọc dài (xuất dữ liệu, read_snapshot)
+        giữ khóa SHARED và chặn mọi lệnh ghi từ giao diện cho tới khi đọc xong;
+        với WAL, luồng đọc thấy một trạng thái nhất quán mà không chặn luồng ghi.
+
+        Args:
+            connection (sqlite3.Connection): Kết nối vừa mở
+        """
+        try:
+            mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        except sqlite3.Error as e:
+            logging.warning(f"Không thể bật chế độ WAL: {e}")
+            return
+        if mode.lower() != "wal":
+            # Ví dụ cơ sở dữ liệu trong bộ nhớ hoặc hệ thống file không hỗ trợ bộ nhớ chia sẻ
+            logging.warning(f"Cơ sở dữ liệu vẫn ở chế độ nhật ký {mode}, "
+                            "giao dịch đọc dài sẽ chặn việc ghi")
+
     def connect(self):
         """Thiết lập kết nối đến cơ sở dữ liệu."""
         if self.connection is None:
@@ -86,6 +132,8 @@ class DatabaseManager:
 
     def close(self):
         """Close database connection."""
+        if self._reader_pool is not None:
+            self._reader_pool.close_all()
         try:
             if hasattr(self, 'cursor') and self.cursor:
                 self.cursor.close()
@@ -173,22 +221,191 @@ class DatabaseManager:
                 FOREIGN KEY (ma_nguoi_dung) REFERENCES nguoi_dung(ma_nguoi_dung)
             )
             ''')
+            self._create_change_counters()
+            self._create_enrollment_rollups()
             self.commit()
             logging.info("Đã tạo các bảng tiếng Việt trong cơ sở dữ liệu")
         except sqlite3.Error as e:
             logging.error(f"Lỗi khi tạo bảng: {e}")
 
-    def execute_query(self, query, parameters=()):
+    def _create_change_counters(self):
+        """
+        Tạo bảng đếm số lần ghi của từng bảng và các trigger cập nhật nó.
+        Mọi kết nối (kể cả của ứng dụng khác dùng chung file) đều làm tăng bộ đếm,
+        nên so sánh bộ đếm là cách rẻ để biết bảng nào đã thay đổi.
+        """
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dem_thay_doi (
+            ten_bang TEXT PRIMARY KEY,
+            so_lan INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        for table in self.TRACKED_TABLES:
+            self.cursor.execute(
+                "INSERT OR IGNORE INTO dem_thay_doi (ten_bang, so_lan) VALUES (?, 0)", (table,)
+            )
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                self.cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS dem_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE dem_thay_doi SET so_lan = so_lan + 1 WHERE ten_bang = '{table}';
+                END
+                ''')
+
+    # Số ghi danh, số ghi danh có điểm và tổng điểm theo ngày ghi danh (khóa là
+    # 10 ký tự đầu của ngay_ghi_danh, '' nếu không có ngày)
+    _DAILY_ROLLUP_SELECT = '''
+        SELECT COALESCE(substr(ngay_ghi_danh, 1, 10), ''), COUNT(*), COUNT(diem),
+               COALESCE(SUM(diem), 0)
+        FROM ghi_danh
+        GROUP BY 1
+    '''
+
+    def _create_enrollment_rollups(self):
+        """
+        Tạo chỉ mục theo ngày ghi danh và các bảng tổng hợp ghi danh theo thời gian.
+
+        - thong_ke_ngay: số ghi danh, số có điểm và tổng điểm theo ngày ghi danh,
+          luôn khớp với ghi_danh (trigger cộng/trừ khi thêm, sửa, xóa).
+        - thong_ke_gio: số ghi danh được thêm và số lần nhập điểm theo giờ thực
+          hiện (theo dõi đợt đăng ký); chỉ cộng dồn, không trừ khi xóa.
+
+        Bảng theo ngày được tính từ dữ liệu hiện có khi tạo lần đầu.
+        """
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ghi_danh_ngay ON ghi_danh (ngay_ghi_danh, diem)
+        ''')
+        daily_exists = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'thong_ke_ngay'"
+        ).fetchone()
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS thong_ke_ngay (
+            ngay TEXT PRIMARY KEY,
+            so_ghi_danh INTEGER NOT NULL DEFAULT 0,
+            so_co_diem INTEGER NOT NULL DEFAULT 0,
+            tong_diem REAL NOT NULL DEFAULT 0
+        )
+        ''')
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS thong_ke_gio (
+            gio TEXT PRIMARY KEY,
+            so_ghi_danh INTEGER NOT NULL DEFAULT 0,
+            so_nhap_diem INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        if not daily_exists:
+            self.cursor.execute(f"INSERT INTO thong_ke_ngay {self._DAILY_ROLLUP_SELECT}")
+
+        add_new = '''
+            INSERT INTO thong_ke_ngay (ngay, so_ghi_danh, so_co_diem, tong_diem)
+            VALUES (COALESCE(substr(NEW.ngay_ghi_danh, 1, 10), ''), 1,
+                    NEW.diem IS NOT NULL, COALESCE(NEW.diem, 0))
+            ON CONFLICT (ngay) DO UPDATE SET
+                so_ghi_danh = so_ghi_danh + 1,
+                so_co_diem = so_co_diem + excluded.so_co_diem,
+                tong_diem = tong_diem + excluded.tong_diem;
+        '''
+        remove_old = '''
+            UPDATE thong_ke_ngay SET
+                so_ghi_danh = so_ghi_danh - 1,
+                so_co_diem = so_co_diem - (OLD.diem IS NOT NULL),
+                tong_diem = tong_diem - COALESCE(OLD.diem, 0)
+            WHERE ngay = COALESCE(substr(OLD.ngay_ghi_danh, 1, 10), '');
+        '''
+        hourly = '''
+            INSERT INTO thong_ke_gio (gio, so_ghi_danh, so_nhap_diem)
+            VALUES (strftime('%Y-%m-%d %H:00', 'now', 'localtime'), {enrolled}, {graded})
+            ON CONFLICT (gio) DO UPDATE SET
+                so_ghi_danh = so_ghi_danh + excluded.so_ghi_danh,
+                so_nhap_diem = so_nhap_diem + excluded.so_nhap_diem;
+        '''
+        triggers = {
+            "thong_ke_ghi_danh_insert": ("AFTER INSERT ON ghi_danh", add_new + hourly.format(
+                enrolled=1, graded="NEW.diem IS NOT NULL")),
+            "thong_ke_ghi_danh_delete": ("AFTER DELETE ON ghi_danh", remove_old),
+            "thong_ke_ghi_danh_update": ("AFTER UPDATE OF ngay_ghi_danh, diem ON ghi_danh",
+                                         remove_old + add_new),
+            "thong_ke_nhap_diem": (
+                "AFTER UPDATE OF diem ON ghi_danh "
+                "WHEN NEW.diem IS NOT NULL AND (OLD.diem IS NULL OR OLD.diem <> NEW.diem)",
+                hourly.format(enrolled=0, graded=1)),
+        }
+        for name, (event, body) in triggers.items():
+            self.cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+    def rebuild_enrollment_rollups(self):
+        """
+        Tính lại bảng thong_ke_ngay từ ghi_danh (ví dụ sau khi file bị sửa bằng
+        công cụ khác khi chưa có trigger).
+
+        Returns:
+            bool: True nếu thành công
+        """
+        self._ensure_connection()
+        try:
+            with self.connection:
+                self.connection.execute("DELETE FROM thong_ke_ngay")
+                self.connection.execute(f"INSERT INTO thong_ke_ngay {self._DAILY_ROLLUP_SELECT}")
+            logging.info("Đã tính lại bảng tổng hợp ghi danh theo ngày")
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Lỗi khi tính lại bảng tổng hợp ghi danh: {e}")
+            return False
+
+    def get_data_version(self):
+        """
+        Lấy PRAGMA data_version của kết nối chính.
+        Giá trị chỉ thay đổi khi một kết nối khác ghi vào file, và chỉ so sánh được
+        giữa các lần gọi trên cùng kết nối (phải gọi trên luồng giao diện).
+
+        Returns:
+            int: data_version hoặc None nếu có lỗi
+        """
+        self._ensure_connection()
+        try:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Lỗi khi đọc data_version: {e}")
+            return None
+
+    def get_table_versions(self):
+        """
+        Lấy bộ đếm số lần ghi của các bảng được theo dõi.
+
+        Returns:
+            dict: Tên bảng -> số lần ghi (rỗng nếu chưa có bảng dem_thay_doi)
+        """
+        result = self.execute_query("SELECT ten_bang, so_lan FROM dem_thay_doi")
+        return {row['ten_bang']: row['so_lan'] for row in result}
+
+    def execute_query(self, query, parameters=(), cancel_token=None):
         """
         Thực thi truy vấn SQL và trả về kết quả.
+        Khi gọi từ luồng nền, truy vấn chạy trên kết nối riêng của luồng đó.
         
         Args:
             query (str): Câu truy vấn SQL
             parameters (tuple): Các tham số cho truy vấn
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn (khi chạy nền)
             
         Returns:
             list: Danh sách các kết quả từ truy vấn
+            
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy hoặc quá thời hạn
         """
+        if not self._on_owner_thread():
+            # Được gọi từ luồng nền (BackgroundLoader): dùng kết nối riêng của luồng đó
+            try:
+                return self.read_query(query, parameters, cancel_token)
+            except QueryCancelledException:
+                raise
+            except DatabaseException as e:
+                logging.error(e.message)
+                logging.error(f"Query: {query}")
+                return []
+        
         self._ensure_connection()
         try:
             self.cursor.execute(query, parameters)
@@ -200,9 +417,73 @@ class DatabaseManager:
             logging.error(f"Parameters: {parameters}")
             return []
 
+    def read_query(self, query, parameters=(), cancel_token=None):
+        """
+        Thực thi truy vấn chỉ đọc trên kết nối riêng của luồng hiện tại.
+        An toàn khi gọi từ luồng chạy nền; truy vấn có thể bị hủy qua cancel_token.
+        
+        Args:
+            query (str): Câu truy vấn SQL
+            parameters (tuple): Các tham số cho truy vấn
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            
+        Returns:
+            list: Danh sách các kết quả từ truy vấn
+            
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        return self.reader_pool.execute_read(query, parameters, cancel_token)
+
+    def iter_query(self, query, parameters=(), cancel_token=None, batch_size=1000):
+        """
+        Thực thi truy vấn chỉ đọc và trả kết quả theo từng lô trên kết nối riêng
+        của luồng hiện tại (xuất dữ liệu lớn mà không đọc hết vào bộ nhớ).
+        
+        Args:
+            query (str): Câu truy vấn SQL
+            parameters (tuple): Các tham số cho truy vấn
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số dòng mỗi lô
+            
+        Yields:
+            list: Lô các kết quả
+            
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        return self.reader_pool.iter_read(query, parameters, cancel_token, batch_size)
+
+    @contextmanager
+    def read_snapshot(self):
+        """
+        Mở một giao dịch đọc trên kết nối riêng của luồng hiện tại: mọi truy vấn
+        trong khối with thấy cùng một trạng thái dữ liệu (dùng khi xuất nhiều bảng).
+        Giao dịch được giữ suốt khối with; nhờ chế độ WAL (_enable_wal) nó không
+        chặn các lệnh ghi từ luồng khác, các thay đổi đó chỉ không hiện trong snapshot.
+
+        Yields:
+            sqlite3.Connection: Kết nối đang ở trong giao dịch đọc
+
+        Raises:
+            DatabaseException: Khi không mở được giao dịch
+        """
+        connection = self.reader_pool.get_connection()
+        try:
+            connection.execute("BEGIN")
+        except sqlite3.Error as e:
+            raise DatabaseException(f"Không thể mở giao dịch đọc: {e}", cause=e) from e
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+
     def execute_insert(self, query, parameters=()):
         """
         Thực thi truy vấn INSERT và trả về ID của bản ghi mới.
+        Khi gọi từ luồng nền, câu lệnh chạy trên kết nối riêng của luồng đó.
         
         Args:
             query (str): Câu truy vấn INSERT
@@ -211,6 +492,14 @@ class DatabaseManager:
         Returns:
             int: ID của bản ghi vừa được thêm vào
         """
+        if not self._on_owner_thread():
+            # Gọi từ luồng nền (ví dụ API bất đồng bộ): ghi qua kết nối riêng của luồng
+            try:
+                return self.reader_pool.execute_write(query, parameters).lastrowid
+            except DatabaseException as e:
+                logging.error(f"Lỗi khi thêm dữ liệu: {e.cause}")
+                return None
+
         try:
             self.cursor.execute(query, parameters)
             self.commit()
@@ -219,9 +508,40 @@ class DatabaseManager:
             logging.error(f"Lỗi khi thêm dữ liệu: {e}")
             return None
 
+    def execute_many(self, query, seq_of_parameters):
+        """
+        Thực thi một câu lệnh ghi cho nhiều bộ tham số trong một giao dịch
+        (nhập dữ liệu hàng loạt). Khi gọi từ luồng nền, câu lệnh chạy trên
+        kết nối riêng của luồng đó.
+        
+        Args:
+            query (str): Câu lệnh INSERT/UPDATE
+            seq_of_parameters (iterable): Các bộ tham số
+            
+        Returns:
+            int: Tổng số bản ghi bị ảnh hưởng, None nếu lỗi (không bản ghi nào được ghi)
+        """
+        if not self._on_owner_thread():
+            try:
+                return self.reader_pool.execute_many(query, seq_of_parameters)
+            except DatabaseException as e:
+                logging.error(f"Lỗi khi ghi dữ liệu hàng loạt: {e.cause}")
+                return None
+
+        self._ensure_connection()
+        try:
+            self.cursor.executemany(query, seq_of_parameters)
+            self.commit()
+            return self.cursor.rowcount
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            logging.error(f"Lỗi khi ghi dữ liệu hàng loạt: {e}")
+            return None
+
     def execute_update(self, query, parameters=()):
         """
         Thực thi truy vấn UPDATE và trả về số bản ghi bị ảnh hưởng.
+        Khi gọi từ luồng nền, câu lệnh chạy trên kết nối riêng của luồng đó.
         
         Args:
             query (str): Câu truy vấn UPDATE
@@ -230,6 +550,14 @@ class DatabaseManager:
         Returns:
             int: Số bản ghi bị ảnh hưởng
         """
+        if not self._on_owner_thread():
+            # Gọi từ luồng nền (ví dụ API bất đồng bộ): ghi qua kết nối riêng của luồng
+            try:
+                return self.reader_pool.execute_write(query, parameters).rowcount
+            except DatabaseException as e:
+                logging.error(f"Lỗi khi cập nhật dữ liệu: {e.cause}")
+                return 0
+
         try:
             self.cursor.execute(query, parameters)
             self.commit()
@@ -241,6 +569,7 @@ class DatabaseManager:
     def execute_delete(self, query, parameters=()):
         """
         Thực thi truy vấn DELETE và trả về số bản ghi bị xóa.
+        Khi gọi từ luồng nền, câu lệnh chạy trên kết nối riêng của luồng đó.
         
         Args:
             query (str): Câu truy vấn DELETE
@@ -249,6 +578,14 @@ class DatabaseManager:
         Returns:
             int: Số bản ghi bị xóa
         """
+        if not self._on_owner_thread():
+            # Gọi từ luồng nền (ví dụ API bất đồng bộ): ghi qua kết nối riêng của luồng
+            try:
+                return self.reader_pool.execute_write(query, parameters).rowcount
+            except DatabaseException as e:
+                logging.error(f"Lỗi khi xóa dữ liệu: {e.cause}")
+                return 0
+
         try:
             self.cursor.execute(query, parameters)
             self.commit()
@@ -416,22 +753,58 @@ class DatabaseManager:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
             query = """
-            INSERT INTO activity_log 
-            (user_id, action_type, action_description, entity_type, entity_id, timestamp) 
+            INSERT INTO nhat_ky_hoat_dong
+            (ma_nguoi_dung, loai_hoat_dong, mo_ta_hoat_dong, loai_doi_tuong, ma_doi_tuong, thoi_gian)
             VALUES (?, ?, ?, ?, ?, ?)
             """
             
             params = (user_id, action_type, action_description, entity_type, entity_id, current_time)
-            
-            self.cursor.execute(query, params)
-            self.commit()
-            
-            return self.cursor.lastrowid
+
+            if not self._on_owner_thread():
+                log_id = self.execute_insert(query, params)
+            else:
+                self.cursor.execute(query, params)
+                self.commit()
+                log_id = self.cursor.lastrowid
+
+            if log_id is not None:
+                publish_change(ENTITY_ACTIVITY_LOG, log_id, ChangeOperation.INSERT)
+            return log_id
         except sqlite3.Error as e:
             logging.error(f"Lỗi khi ghi nhật ký hoạt động: {e}")
             return None
             
-    def get_activities(self, conditions=None, params=None, limit=100):
+    def log_activities(self, user_id, action_type, entries, entity_type=None):
+        """
+        Ghi nhiều dòng nhật ký hoạt động cùng loại trong một giao dịch
+        (ví dụ mỗi sinh viên được cập nhật khi nhập file)
+
+        Args:
+            user_id (int): ID của người dùng thực hiện hành động
+            action_type (str): Loại hành động (ADD, UPDATE, DELETE, ...)
+            entries (iterable): Các cặp (mô tả hành động, ID đối tượng)
+            entity_type (str): Loại đối tượng tác động (Student, Course, etc.)
+
+        Returns:
+            int: Số dòng nhật ký đã ghi, None nếu có lỗi
+        """
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        query = """
+        INSERT INTO nhat_ky_hoat_dong
+        (ma_nguoi_dung, loai_hoat_dong, mo_ta_hoat_dong, loai_doi_tuong, ma_doi_tuong, thoi_gian)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        params = [(user_id, action_type, description, entity_type, entity_id, current_time)
+                  for description, entity_id in entries]
+        if not params:
+            return 0
+
+        count = self.execute_many(query, params)
+        if count:
+            publish_change(ENTITY_ACTIVITY_LOG, None, ChangeOperation.INSERT)
+        return count
+
+    def get_activities(self, conditions=None, params=None, limit=100, cancel_token=None):
         """
         Lấy danh sách các hoạt động theo điều kiện
         
@@ -439,23 +812,30 @@ class DatabaseManager:
             conditions (list): Danh sách các điều kiện WHERE
             params (list/tuple): Các tham số cho điều kiện
             limit (int): Giới hạn số lượng kết quả
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn (khi chạy nền)
             
         Returns:
             list: Danh sách các hoạt động
+            
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
         """
-        self._ensure_connection()
         try:
+            # Đặt tên cột theo bí danh để các điều kiện lọc (timestamp, username, ...)
+            # dùng được trực tiếp trên bảng nhat_ky_hoat_dong
             query = """
-            SELECT 
-                a.log_id as log_id, -- Changed from 'id' to 'log_id'
-                a.timestamp, 
-                u.username, 
-                a.action_type, 
-                a.action_description, 
-                a.entity_type, 
-                a.entity_id
-            FROM activity_log a
-            LEFT JOIN users u ON a.user_id = u.user_id
+            SELECT * FROM (
+                SELECT 
+                    a.ma_nhat_ky AS log_id,
+                    a.thoi_gian AS timestamp, 
+                    u.ten_dang_nhap AS username, 
+                    a.loai_hoat_dong AS action_type, 
+                    a.mo_ta_hoat_dong AS action_description, 
+                    a.loai_doi_tuong AS entity_type, 
+                    a.ma_doi_tuong AS entity_id
+                FROM nhat_ky_hoat_dong a
+                LEFT JOIN nguoi_dung u ON a.ma_nguoi_dung = u.ma_nguoi_dung
+            )
             """
             
             # Xử lý điều kiện
@@ -463,10 +843,10 @@ class DatabaseManager:
                 query += " WHERE " + " AND ".join(conditions)
                 
             # Sắp xếp và giới hạn
-            query += " ORDER BY a.timestamp DESC"
+            query += " ORDER BY timestamp DESC"
             
             if limit > 0:
-                query += f" LIMIT {limit}"
+                query += f" LIMIT {int(limit)}"
                 
             # Xử lý tham số
             if params is None:
@@ -474,9 +854,11 @@ class DatabaseManager:
             elif isinstance(params, list):
                 params = tuple(params)
                 
-            return self.execute_query(query, params)
+            return self.read_query(query, params, cancel_token)
             
-        except sqlite3.Error as e:
+        except QueryCancelledException:
+            raise
+        except DatabaseException as e:
             logging.error(f"Lỗi khi lấy danh sách hoạt động: {e}")
             return []
     
@@ -509,6 +891,37 @@ class DatabaseManager:
         """
         return self.execute_query(query, (limit,))
 
+    @staticmethod
+    def quick_check_file(db_path):
+        """
+        Kiểm tra nhanh file cơ sở dữ liệu (PRAGMA quick_check) trên kết nối riêng,
+        có thể chạy trên luồng nền song song với việc mở kết nối chính.
+        
+        Args:
+            db_path (str): Đường dẫn đến file cơ sở dữ liệu
+            
+        Returns:
+            bool: True nếu không phát hiện lỗi (hoặc file chưa tồn tại), False nếu có lỗi
+        """
+        if not os.path.exists(db_path):
+            # File sẽ được tạo mới khi mở kết nối
+            return True
+        connection = None
+        try:
+            connection = sqlite3.connect(db_path)
+            result = connection.execute("PRAGMA quick_check").fetchone()[0]
+            if result == "ok":
+                logging.info("Kiểm tra nhanh cơ sở dữ liệu: OK")
+                return True
+            logging.error(f"Lỗi toàn vẹn cơ sở dữ liệu: {result}")
+            return False
+        except sqlite3.Error as e:
+            logging.error(f"Lỗi khi kiểm tra nhanh cơ sở dữ liệu: {e}")
+            return False
+        finally:
+            if connection is not None:
+                connection.close()
+
     def check_database_integrity(self):
         """
         Kiểm tra tính toàn vẹn của cơ sở dữ liệu
@@ -576,17 +989,14 @@ class DatabaseManager:
                 backup_name = f"{os.path.splitext(db_name)[0]}_{timestamp}.db"
                 backup_path = os.path.join(backups_dir, backup_name)
             
-            # Đóng kết nối hiện tại nếu có
-            if self.connection:
-                self.connection.close()
-                self.connection = None
-                self.cursor = None
-                
-            # Sao chép tệp
-            shutil.copy2(self.db_path, backup_path)
-            
-            # Tái kết nối
-            self.connect()
+            # Dùng backup API thay vì sao chép file: ở chế độ WAL các thay đổi đã
+            # lưu có thể vẫn nằm trong file -wal chứ chưa ghi vào file chính
+            self._ensure_connection()
+            target = sqlite3.connect(backup_path)
+            try:
+                self.connection.backup(target)
+            finally:
+                target.close()
             
             logging.info(f"Đã tạo bản sao lưu cơ sở dữ liệu tại: {backup_path}")
             return True
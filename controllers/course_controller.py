@@ -1,7 +1,9 @@
 from models.course import Course
+from utils.async_bridge import AsyncControllerMixin
+from utils.change_bus import ENTITY_COURSE, ChangeOperation, publish_change, diff_fields
 import logging
 
-class CourseController:
+class CourseController(AsyncControllerMixin):
     """
     Controller quản lý các thao tác liên quan đến khóa học.
     """
@@ -22,7 +24,7 @@ class CourseController:
         Returns:
             list: Danh sách các đối tượng Course
         """
-        query = "SELECT * FROM courses ORDER BY course_id"
+        query = "SELECT * FROM khoa_hoc ORDER BY ma_khoa_hoc"
         result = self.db_manager.execute_query(query)
         
         courses = []
@@ -43,7 +45,7 @@ class CourseController:
         Returns:
             Course: Đối tượng khóa học nếu tìm thấy, None nếu không tồn tại
         """
-        query = "SELECT * FROM courses WHERE course_id = ?"
+        query = "SELECT * FROM khoa_hoc WHERE ma_khoa_hoc = ?"
         result = self.db_manager.execute_query(query, (course_id,))
         
         if result:
@@ -81,6 +83,92 @@ class CourseController:
         logging.info(f"Tìm kiếm khóa học với từ khóa '{keyword}': {len(courses)} kết quả")
         return courses
     
+    def find_courses(self, filters=None, cancel_token=None):
+        """
+        Tìm khóa học theo từ khóa và bộ lọc nhanh bằng một truy vấn duy nhất.
+        Chạy trên kết nối riêng của luồng hiện tại nên có thể gọi từ luồng nền.
+
+        Args:
+            filters (dict, optional): Bộ lọc gồm các khóa "search_text", "credits"
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Danh sách các đối tượng Course phù hợp
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        filters = filters or {}
+        conditions = []
+        params = []
+
+        search_text = filters.get("search_text")
+        if search_text:
+            keyword = f"%{search_text}%"
+            conditions.append("(ma_khoa_hoc LIKE ? OR ten_khoa_hoc LIKE ? OR giang_vien LIKE ?)")
+            params.extend([keyword, keyword, keyword])
+        if filters.get("credits"):
+            conditions.append("so_tin_chi = ?")
+            params.append(int(filters["credits"]))
+
+        query = "SELECT * FROM khoa_hoc"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY ma_khoa_hoc"
+
+        result = self.db_manager.read_query(query, tuple(params), cancel_token)
+        courses = [Course.from_dict(dict(row)) for row in result]
+
+        logging.info(f"Tìm khóa học với bộ lọc {filters}: {len(courses)} kết quả")
+        return courses
+
+    def get_courses_by_ids(self, course_ids, cancel_token=None):
+        """
+        Lấy nhiều khóa học theo mã bằng một truy vấn (dùng để cập nhật các dòng vừa thay đổi).
+
+        Args:
+            course_ids (iterable): Các mã khóa học
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: Mã khóa học -> Course; mã không còn tồn tại sẽ không có trong kết quả
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        course_ids = list(course_ids)
+        if not course_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in course_ids)
+        query = f"SELECT * FROM khoa_hoc WHERE ma_khoa_hoc IN ({placeholders})"
+        result = self.db_manager.read_query(query, tuple(course_ids), cancel_token)
+        return {row['ma_khoa_hoc']: Course.from_dict(dict(row)) for row in result}
+
+    @staticmethod
+    def matches_filters(course, filters):
+        """
+        Kiểm tra khóa học có khớp bộ lọc của find_courses không (không truy vấn cơ sở dữ liệu).
+
+        Args:
+            course (Course): Khóa học cần kiểm tra
+            filters (dict, optional): Bộ lọc gồm các khóa "search_text", "credits"
+
+        Returns:
+            bool: True nếu khớp
+        """
+        filters = filters or {}
+        search_text = filters.get("search_text")
+        if search_text:
+            keyword = search_text.lower()
+            fields = (course.ma_khoa_hoc, course.ten_khoa_hoc, course.giang_vien)
+            if not any(keyword in (value or "").lower() for value in fields):
+                return False
+        if filters.get("credits") and course.so_tin_chi != int(filters["credits"]):
+            return False
+        return True
+
     def add_course(self, course):
         """
         Thêm khóa học mới vào cơ sở dữ liệu.
@@ -92,24 +180,24 @@ class CourseController:
             bool: True nếu thành công, False nếu thất bại
         """
         # Kiểm tra xem khóa học đã tồn tại chưa
-        existing_course = self.get_course_by_id(course.course_id)
+        existing_course = self.get_course_by_id(course.ma_khoa_hoc)
         if existing_course:
-            logging.warning(f"Khóa học với ID {course.course_id} đã tồn tại")
+            logging.warning(f"Khóa học với ID {course.ma_khoa_hoc} đã tồn tại")
             return False
         
         query = """
-        INSERT INTO courses 
-        (course_id, course_name, credits, instructor, description, max_students)
+        INSERT INTO khoa_hoc 
+        (ma_khoa_hoc, ten_khoa_hoc, so_tin_chi, giang_vien, mo_ta, so_luong_toi_da)
         VALUES (?, ?, ?, ?, ?, ?)
         """
         
         params = (
-            course.course_id,
-            course.course_name,
-            course.credits,
-            course.instructor,
-            course.description,
-            course.max_students
+            course.ma_khoa_hoc,
+            course.ten_khoa_hoc,
+            course.so_tin_chi,
+            course.giang_vien,
+            course.mo_ta,
+            course.so_luong_toi_da
         )
         
         result = self.db_manager.execute_insert(query, params)
@@ -117,6 +205,7 @@ class CourseController:
         
         if success:
             logging.info(f"Đã thêm khóa học: {course}")
+            publish_change(ENTITY_COURSE, course.ma_khoa_hoc, ChangeOperation.INSERT)
         else:
             logging.error(f"Không thể thêm khóa học: {course}")
             
@@ -132,23 +221,28 @@ class CourseController:
         Returns:
             bool: True nếu thành công, False nếu thất bại
         """
+        existing_course = self.get_course_by_id(course.ma_khoa_hoc)
+        if not existing_course:
+            logging.warning(f"Không tìm thấy khóa học với ID {course.ma_khoa_hoc} để cập nhật")
+            return False
+        
         query = """
-        UPDATE courses SET 
-            course_name = ?, 
-            credits = ?, 
-            instructor = ?, 
-            description = ?, 
-            max_students = ?
-        WHERE course_id = ?
+        UPDATE khoa_hoc SET 
+            ten_khoa_hoc = ?, 
+            so_tin_chi = ?, 
+            giang_vien = ?, 
+            mo_ta = ?, 
+            so_luong_toi_da = ?
+        WHERE ma_khoa_hoc = ?
         """
         
         params = (
-            course.course_name,
-            course.credits,
-            course.instructor,
-            course.description,
-            course.max_students,
-            course.course_id
+            course.ten_khoa_hoc,
+            course.so_tin_chi,
+            course.giang_vien,
+            course.mo_ta,
+            course.so_luong_toi_da,
+            course.ma_khoa_hoc
         )
         
         rows_affected = self.db_manager.execute_update(query, params)
@@ -156,6 +250,10 @@ class CourseController:
         
         if success:
             logging.info(f"Đã cập nhật khóa học: {course}")
+            changed_fields = diff_fields(existing_course.to_dict(), course.to_dict())
+            if changed_fields:
+                publish_change(ENTITY_COURSE, course.ma_khoa_hoc,
+                               ChangeOperation.UPDATE, changed_fields)
         else:
             logging.warning(f"Không thể cập nhật khóa học: {course}")
             
@@ -171,12 +269,13 @@ class CourseController:
         Returns:
             bool: True nếu thành công, False nếu thất bại
         """
-        query = "DELETE FROM courses WHERE course_id = ?"
+        query = "DELETE FROM khoa_hoc WHERE ma_khoa_hoc = ?"
         rows_affected = self.db_manager.execute_delete(query, (course_id,))
         success = rows_affected > 0
         
         if success:
             logging.info(f"Đã xóa khóa học với ID: {course_id}")
+            publish_change(ENTITY_COURSE, course_id, ChangeOperation.DELETE)
         else:
             logging.warning(f"Không thể xóa khóa học với ID: {course_id}")
             
@@ -189,7 +288,7 @@ class CourseController:
         Returns:
             int: Số lượng khóa học
         """
-        query = "SELECT COUNT(*) as count FROM courses"
+        query = "SELECT COUNT(*) as count FROM khoa_hoc"
         result = self.db_manager.execute_query(query)
         
         if result:
@@ -206,9 +305,43 @@ class CourseController:
         Returns:
             int: Số lượng sinh viên đã đăng ký
         """
-        query = "SELECT COUNT(*) as count FROM enrollments WHERE course_id = ?"
+        query = "SELECT COUNT(*) as count FROM ghi_danh WHERE ma_khoa_hoc = ?"
         result = self.db_manager.execute_query(query, (course_id,))
         
         if result:
             return result[0]['count']
-        return 0
\ No newline at end of file
+        return 0
+
+    # ----- API bất đồng bộ (chạy trên executor dùng chung, xem utils.async_bridge) -----
+
+    async def aget_all_courses(self):
+        """Phiên bản bất đồng bộ của get_all_courses."""
+        return await self._run_async(self.get_all_courses)
+
+    async def aget_course_by_id(self, course_id):
+        """Phiên bản bất đồng bộ của get_course_by_id."""
+        return await self._run_async(self.get_course_by_id, course_id)
+
+    async def aget_course_count(self):
+        """Phiên bản bất đồng bộ của get_course_count."""
+        return await self._run_async(self.get_course_count)
+
+    async def aget_enrollment_count(self, course_id):
+        """Phiên bản bất đồng bộ của get_enrollment_count."""
+        return await self._run_async(self.get_enrollment_count, course_id)
+
+    async def afind_courses(self, filters=None, cancel_token=None):
+        """Phiên bản bất đồng bộ của find_courses."""
+        return await self._run_async(self.find_courses, filters, cancel_token)
+
+    async def aadd_course(self, course):
+        """Phiên bản bất đồng bộ của add_course."""
+        return await self._run_async(self.add_course, course)
+
+    async def aupdate_course(self, course):
+        """Phiên bản bất đồng bộ của update_course."""
+        return await self._run_async(self.update_course, course)
+
+    async def adelete_course(self, course_id):
+        """Phiên bản bất đồng bộ của delete_course."""
+        return await self._run_async(self.delete_course, course_id)
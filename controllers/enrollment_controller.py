@@ -0,0 +1,267 @@
+from datetime import datetime
+from utils.async_bridge import AsyncControllerMixin
+from utils.change_bus import ENTITY_ENROLLMENT, ChangeOperation, publish_change
+import logging
+
+class EnrollmentController(AsyncControllerMixin):
+    """
+    Controller quản lý các thao tác ghi danh sinh viên vào khóa học.
+    """
+    # Các cột trả về cho mỗi bản ghi đăng ký (kèm tên sinh viên và tên khóa học)
+    ENROLLMENT_COLUMNS = """
+        SELECT e.ma_ghi_danh, e.ma_sinh_vien, s.ho_ten, e.ma_khoa_hoc, c.ten_khoa_hoc,
+               e.ngay_ghi_danh, e.diem
+        FROM ghi_danh e
+        JOIN sinh_vien s ON e.ma_sinh_vien = s.ma_sinh_vien
+        JOIN khoa_hoc c ON e.ma_khoa_hoc = c.ma_khoa_hoc
+    """
+
+    def __init__(self, db_manager):
+        """
+        Khởi tạo controller với tham chiếu đến database manager.
+
+        Args:
+            db_manager: Đối tượng quản lý cơ sở dữ liệu
+        """
+        self.db_manager = db_manager
+        logging.info("Đã khởi tạo EnrollmentController")
+
+    def get_enrollment_by_id(self, enrollment_id):
+        """
+        Lấy một bản ghi đăng ký theo mã.
+
+        Args:
+            enrollment_id (int): Mã ghi danh
+
+        Returns:
+            dict: Bản ghi đăng ký (kèm ho_ten, ten_khoa_hoc) hoặc None nếu không tồn tại
+        """
+        query = self.ENROLLMENT_COLUMNS + " WHERE e.ma_ghi_danh = ?"
+        result = self.db_manager.execute_query(query, (enrollment_id,))
+        return dict(result[0]) if result else None
+
+    def get_enrollments_by_ids(self, enrollment_ids, cancel_token=None):
+        """
+        Lấy nhiều bản ghi đăng ký theo mã bằng một truy vấn (dùng để cập nhật các dòng vừa thay đổi).
+
+        Args:
+            enrollment_ids (iterable): Các mã ghi danh
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: Mã ghi danh -> bản ghi đăng ký; mã không còn tồn tại sẽ không có trong kết quả
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        enrollment_ids = list(enrollment_ids)
+        if not enrollment_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in enrollment_ids)
+        query = self.ENROLLMENT_COLUMNS + f" WHERE e.ma_ghi_danh IN ({placeholders})"
+        result = self.db_manager.read_query(query, tuple(enrollment_ids), cancel_token)
+        return {row['ma_ghi_danh']: dict(row) for row in result}
+
+    @staticmethod
+    def matches_keyword(enrollment, keyword):
+        """
+        Kiểm tra bản ghi đăng ký có khớp từ khóa của find_enrollments không (không truy vấn cơ sở dữ liệu).
+
+        Args:
+            enrollment (dict): Bản ghi đăng ký
+            keyword (str): Từ khóa, rỗng nghĩa là khớp tất cả
+
+        Returns:
+            bool: True nếu khớp
+        """
+        if not keyword:
+            return True
+        keyword = keyword.lower()
+        fields = ('ma_sinh_vien', 'ho_ten', 'ma_khoa_hoc', 'ten_khoa_hoc')
+        return any(keyword in (enrollment.get(field) or "").lower() for field in fields)
+
+    def find_enrollments(self, keyword=None, cancel_token=None):
+        """
+        Tìm các bản ghi đăng ký theo từ khóa (mã/tên sinh viên, mã/tên khóa học).
+        Chạy trên kết nối riêng của luồng hiện tại nên có thể gọi từ luồng nền.
+
+        Args:
+            keyword (str, optional): Từ khóa tìm kiếm, rỗng để lấy tất cả
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Danh sách các bản ghi đăng ký
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_keyword_filter(keyword)
+        query = self.ENROLLMENT_COLUMNS + where_clause + " ORDER BY e.ma_sinh_vien, e.ma_khoa_hoc"
+        return self.db_manager.read_query(query, params, cancel_token)
+
+    @staticmethod
+    def _build_keyword_filter(keyword):
+        """
+        Tạo mệnh đề WHERE tìm theo từ khóa trên mã/tên sinh viên và mã/tên khóa học.
+
+        Args:
+            keyword (str, optional): Từ khóa, rỗng để lấy tất cả
+
+        Returns:
+            tuple: (mệnh đề WHERE hoặc chuỗi rỗng, tuple tham số)
+        """
+        if not keyword:
+            return "", ()
+        pattern = f"%{keyword}%"
+        where_clause = """
+        WHERE e.ma_sinh_vien LIKE ? OR s.ho_ten LIKE ? OR e.ma_khoa_hoc LIKE ? OR c.ten_khoa_hoc LIKE ?
+        """
+        return where_clause, (pattern, pattern, pattern, pattern)
+
+    def count_enrollments(self, keyword=None, cancel_token=None):
+        """
+        Đếm số bản ghi đăng ký khớp từ khóa.
+
+        Args:
+            keyword (str, optional): Từ khóa như find_enrollments
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            int: Số bản ghi đăng ký
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_keyword_filter(keyword)
+        query = """
+        SELECT COUNT(*) AS count
+        FROM ghi_danh e
+        JOIN sinh_vien s ON e.ma_sinh_vien = s.ma_sinh_vien
+        JOIN khoa_hoc c ON e.ma_khoa_hoc = c.ma_khoa_hoc
+        """ + where_clause
+        return self.db_manager.read_query(query, params, cancel_token)[0]['count']
+
+    def iter_enrollments(self, keyword=None, cancel_token=None, batch_size=1000):
+        """
+        Đọc toàn bộ bản ghi đăng ký khớp từ khóa theo từng lô (dùng khi xuất dữ liệu).
+
+        Args:
+            keyword (str, optional): Từ khóa như find_enrollments
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số dòng mỗi lô
+
+        Yields:
+            list: Lô các bản ghi (ma_ghi_danh, ma_sinh_vien, ho_ten, ma_khoa_hoc,
+                  ten_khoa_hoc, ngay_ghi_danh, diem)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_keyword_filter(keyword)
+        query = self.ENROLLMENT_COLUMNS + where_clause + " ORDER BY e.ma_sinh_vien, e.ma_khoa_hoc"
+        return self.db_manager.iter_query(query, params, cancel_token, batch_size)
+
+    def is_enrolled(self, student_id, course_id):
+        """
+        Kiểm tra sinh viên đã đăng ký khóa học chưa.
+
+        Args:
+            student_id (str): Mã sinh viên
+            course_id (str): Mã khóa học
+
+        Returns:
+            bool: True nếu đã đăng ký
+        """
+        query = "SELECT 1 FROM ghi_danh WHERE ma_sinh_vien = ? AND ma_khoa_hoc = ?"
+        return bool(self.db_manager.execute_query(query, (student_id, course_id)))
+
+    def enroll_student(self, student_id, course_id, enrollment_date=None):
+        """
+        Ghi danh sinh viên vào khóa học.
+
+        Args:
+            student_id (str): Mã sinh viên
+            course_id (str): Mã khóa học
+            enrollment_date (str, optional): Ngày đăng ký (YYYY-MM-DD), mặc định hôm nay
+
+        Returns:
+            int: Mã ghi danh mới hoặc None nếu thất bại
+        """
+        if enrollment_date is None:
+            enrollment_date = datetime.now().strftime("%Y-%m-%d")
+        query = """
+        INSERT INTO ghi_danh (ma_sinh_vien, ma_khoa_hoc, ngay_ghi_danh)
+        VALUES (?, ?, ?)
+        """
+        enrollment_id = self.db_manager.execute_insert(query, (student_id, course_id, enrollment_date))
+        if enrollment_id is not None:
+            logging.info(f"Đã ghi danh sinh viên {student_id} vào khóa học {course_id}")
+            publish_change(ENTITY_ENROLLMENT, enrollment_id, ChangeOperation.INSERT)
+        else:
+            logging.warning(f"Không thể ghi danh sinh viên {student_id} vào khóa học {course_id}")
+        return enrollment_id
+
+    def update_grade(self, enrollment_id, grade):
+        """
+        Cập nhật điểm của một bản ghi đăng ký.
+
+        Args:
+            enrollment_id (int): Mã ghi danh
+            grade (float): Điểm mới, None để xóa điểm
+
+        Returns:
+            bool: True nếu thành công, False nếu thất bại
+        """
+        query = "UPDATE ghi_danh SET diem = ? WHERE ma_ghi_danh = ?"
+        success = self.db_manager.execute_update(query, (grade, enrollment_id)) > 0
+        if success:
+            logging.info(f"Đã cập nhật điểm cho ghi danh {enrollment_id}: {grade}")
+            publish_change(ENTITY_ENROLLMENT, enrollment_id, ChangeOperation.UPDATE, ("diem",))
+        else:
+            logging.warning(f"Không thể cập nhật điểm cho ghi danh {enrollment_id}")
+        return success
+
+    def unenroll(self, enrollment_id):
+        """
+        Hủy một bản ghi đăng ký.
+
+        Args:
+            enrollment_id (int): Mã ghi danh
+
+        Returns:
+            bool: True nếu thành công, False nếu thất bại
+        """
+        query = "DELETE FROM ghi_danh WHERE ma_ghi_danh = ?"
+        success = self.db_manager.execute_delete(query, (enrollment_id,)) > 0
+        if success:
+            logging.info(f"Đã hủy ghi danh {enrollment_id}")
+            publish_change(ENTITY_ENROLLMENT, enrollment_id, ChangeOperation.DELETE)
+        else:
+            logging.warning(f"Không thể hủy ghi danh {enrollment_id}")
+        return success
+
+    # ----- API bất đồng bộ (chạy trên executor dùng chung, xem utils.async_bridge) -----
+
+    async def aget_enrollment_by_id(self, enrollment_id):
+        """Phiên bản bất đồng bộ của get_enrollment_by_id."""
+        return await self._run_async(self.get_enrollment_by_id, enrollment_id)
+
+    async def afind_enrollments(self, keyword=None, cancel_token=None):
+        """Phiên bản bất đồng bộ của find_enrollments."""
+        return await self._run_async(self.find_enrollments, keyword, cancel_token)
+
+    async def aenroll_student(self, student_id, course_id, enrollment_date=None):
+        """Phiên bản bất đồng bộ của enroll_student."""
+        return await self._run_async(self.enroll_student, student_id, course_id, enrollment_date)
+
+    async def aupdate_grade(self, enrollment_id, grade):
+        """Phiên bản bất đồng bộ của update_grade."""
+        return await self._run_async(self.update_grade, enrollment_id, grade)
+
+    async def aunenroll(self, enrollment_id):
+        """Phiên bản bất đồng bộ của unenroll."""
+        return await self._run_async(self.unenroll, enrollment_id)
@@ -1,8 +1,11 @@
+import asyncio
+import json
 import logging
 from models.course import Course
-import sqlite3
+from utils.async_bridge import AsyncControllerMixin
+from utils.error_handler import DatabaseException, QueryCancelledException
 
-class ReportController:
+class ReportController(AsyncControllerMixin):
     """
     Controller quản lý các thao tác liên quan đến báo cáo thống kê
     """
@@ -15,44 +18,51 @@ class ReportController:
             db_manager: Đối tượng quản lý cơ sở dữ liệu
         """
         self.db_manager = db_manager
+        self._grade_analytics = None
         logging.info("Đã khởi tạo ReportController")
     
-    def get_student_course_statistics(self):
+    def get_student_course_statistics(self, cancel_token=None):
         """
         Lấy thống kê tổng quan về sinh viên và khóa học
         
+        Args:
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn (khi chạy nền)
+        
         Returns:
             dict: Thông tin thống kê cơ bản
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy hoặc quá thời hạn
         """
         stats = {}
         
         # Tổng số sinh viên
-        query = "SELECT COUNT(*) AS count FROM students"
-        result = self.db_manager.execute_query(query)
+        query = "SELECT COUNT(*) AS count FROM sinh_vien"
+        result = self.db_manager.execute_query(query, cancel_token=cancel_token)
         if result:
             stats['total_students'] = result[0]['count']
         else:
             stats['total_students'] = 0
         
         # Tổng số khóa học
-        query = "SELECT COUNT(*) AS count FROM courses"
-        result = self.db_manager.execute_query(query)
+        query = "SELECT COUNT(*) AS count FROM khoa_hoc"
+        result = self.db_manager.execute_query(query, cancel_token=cancel_token)
         if result:
             stats['total_courses'] = result[0]['count']
         else:
             stats['total_courses'] = 0
         
         # Tổng số đăng ký
-        query = "SELECT COUNT(*) AS count FROM enrollments"
-        result = self.db_manager.execute_query(query)
+        query = "SELECT COUNT(*) AS count FROM ghi_danh"
+        result = self.db_manager.execute_query(query, cancel_token=cancel_token)
         if result:
             stats['total_enrollments'] = result[0]['count']
         else:
             stats['total_enrollments'] = 0
         
         # Điểm trung bình
-        query = "SELECT AVG(grade) AS avg_grade FROM enrollments WHERE grade IS NOT NULL"
-        result = self.db_manager.execute_query(query)
+        query = "SELECT AVG(diem) AS avg_grade FROM ghi_danh WHERE diem IS NOT NULL"
+        result = self.db_manager.execute_query(query, cancel_token=cancel_token)
         if result and result[0]['avg_grade'] is not None:
             stats['average_grade'] = result[0]['avg_grade']
         else:
@@ -68,9 +78,9 @@ class ReportController:
             dict: Dictionary chứa số lượng sinh viên theo từng trạng thái
         """
         query = """
-        SELECT status, COUNT(*) AS count 
-        FROM students
-        GROUP BY status
+        SELECT trang_thai, COUNT(*) AS count 
+        FROM sinh_vien
+        GROUP BY trang_thai
         ORDER BY count DESC
         """
         result = self.db_manager.execute_query(query)
@@ -78,7 +88,7 @@ class ReportController:
         stats = {}
         if result:
             for row in result:
-                stats[row['status']] = row['count']
+                stats[row['trang_thai']] = row['count']
         
         return stats
     
@@ -90,9 +100,9 @@ class ReportController:
             dict: Dictionary chứa số lượng sinh viên theo giới tính
         """
         query = """
-        SELECT gender, COUNT(*) AS count 
-        FROM students
-        GROUP BY gender
+        SELECT gioi_tinh, COUNT(*) AS count 
+        FROM sinh_vien
+        GROUP BY gioi_tinh
         ORDER BY count DESC
         """
         result = self.db_manager.execute_query(query)
@@ -100,30 +110,35 @@ class ReportController:
         stats = {}
         if result:
             for row in result:
-                gender = row['gender'] if row['gender'] else "Chưa xác định"
+                gender = row['gioi_tinh'] if row['gioi_tinh'] else "Chưa xác định"
                 stats[gender] = row['count']
         
         return stats
     
-    def get_top_courses_by_enrollment(self, limit=5):
+    def get_top_courses_by_enrollment(self, limit=5, cancel_token=None):
         """
         Lấy danh sách khóa học có nhiều sinh viên đăng ký nhất
         
         Args:
             limit (int): Số lượng khóa học tối đa cần lấy
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn (khi chạy nền)
             
         Returns:
             list: Danh sách các dictionary chứa thông tin khóa học và số lượng sinh viên
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy hoặc quá thời hạn
         """
         query = """
-        SELECT c.course_id, c.course_name, COUNT(e.student_id) AS student_count
-        FROM courses c
-        LEFT JOIN enrollments e ON c.course_id = e.course_id
-        GROUP BY c.course_id, c.course_name
+        SELECT k.ma_khoa_hoc AS course_id, k.ten_khoa_hoc AS course_name,
+               COUNT(g.ma_sinh_vien) AS student_count
+        FROM khoa_hoc k
+        LEFT JOIN ghi_danh g ON g.ma_khoa_hoc = k.ma_khoa_hoc
+        GROUP BY k.ma_khoa_hoc, k.ten_khoa_hoc
         ORDER BY student_count DESC
         LIMIT ?
         """
-        result = self.db_manager.execute_query(query, (limit,))
+        result = self.db_manager.execute_query(query, (limit,), cancel_token)
         
         return result if result else []
     
@@ -135,17 +150,17 @@ class ReportController:
             dict: Dictionary chứa số lượng khóa học theo số tín chỉ
         """
         query = """
-        SELECT credits, COUNT(*) AS count 
-        FROM courses
-        GROUP BY credits
-        ORDER BY credits ASC
+        SELECT so_tin_chi, COUNT(*) AS count 
+        FROM khoa_hoc
+        GROUP BY so_tin_chi
+        ORDER BY so_tin_chi ASC
         """
         result = self.db_manager.execute_query(query)
         
         stats = {}
         if result:
             for row in result:
-                stats[row['credits']] = row['count']
+                stats[row['so_tin_chi']] = row['count']
         
         return stats
     
@@ -155,37 +170,14 @@ class ReportController:
         
         Returns:
             dict: Dictionary chứa số lượng sinh viên theo từng phân loại điểm
+                  (từ Xuất sắc tới Yếu, cuối cùng là Chưa có điểm)
         """
-        query = """
-        SELECT 
-            CASE
-                WHEN grade >= 9.0 THEN 'Xuất sắc (9.0 - 10.0)'
-                WHEN grade >= 8.0 THEN 'Giỏi (8.0 - 8.9)'
-                WHEN grade >= 7.0 THEN 'Khá (7.0 - 7.9)'
-                WHEN grade >= 5.0 THEN 'Trung bình (5.0 - 6.9)'
-                WHEN grade >= 0.0 THEN 'Yếu (0.0 - 4.9)'
-                ELSE 'Chưa có điểm'
-            END AS grade_category,
-            COUNT(*) AS count
-        FROM enrollments
-        GROUP BY grade_category
-        ORDER BY 
-            CASE grade_category
-                WHEN 'Xuất sắc (9.0 - 10.0)' THEN 1
-                WHEN 'Giỏi (8.0 - 8.9)' THEN 2
-                WHEN 'Khá (7.0 - 7.9)' THEN 3
-                WHEN 'Trung bình (5.0 - 6.9)' THEN 4
-                WHEN 'Yếu (0.0 - 4.9)' THEN 5
-                ELSE 6
-            END
-        """
-        result = self.db_manager.execute_query(query)
-        
-        stats = {}
-        if result:
-            for row in result:
-                stats[row['grade_category']] = row['count']
-        
+        summary = self._grade_summary("classification")
+        if not summary:
+            return {}
+        stats = {label: count for label, count in reversed(summary['distribution'].items()) if count}
+        if summary['ungraded']:
+            stats['Chưa có điểm'] = summary['ungraded']
         return stats
     
     def get_student_by_id(self, student_id):
@@ -199,7 +191,7 @@ class ReportController:
             Student: Đối tượng sinh viên
         """
         from models.student import Student
-        query = "SELECT * FROM students WHERE student_id = ?"
+        query = "SELECT * FROM sinh_vien WHERE ma_sinh_vien = ?"
         result = self.db_manager.execute_query(query, (student_id,))
         
         if result:
@@ -218,7 +210,7 @@ class ReportController:
         Returns:
             Course: Đối tượng khóa học
         """
-        query = "SELECT * FROM courses WHERE course_id = ?"
+        query = "SELECT * FROM khoa_hoc WHERE ma_khoa_hoc = ?"
         result = self.db_manager.execute_query(query, (course_id,))
         
         if result:
@@ -227,52 +219,57 @@ class ReportController:
         
         return None
     
-    def get_student_performance(self, student_id):
+    def get_student_performance(self, student_id, cancel_token=None):
         """
         Lấy thông tin kết quả học tập của sinh viên
         
         Args:
             student_id (str): Mã sinh viên
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn (khi chạy nền)
             
         Returns:
             dict: Thông tin kết quả học tập
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy hoặc quá thời hạn
         """
         # Tổng số khóa học đăng ký
         query = """
         SELECT COUNT(*) AS count 
-        FROM enrollments 
-        WHERE student_id = ?
+        FROM ghi_danh 
+        WHERE ma_sinh_vien = ?
         """
-        result = self.db_manager.execute_query(query, (student_id,))
+        result = self.db_manager.execute_query(query, (student_id,), cancel_token)
         courses_enrolled = result[0]['count'] if result else 0
         
         # Số khóa học đã hoàn thành (có điểm)
         query = """
         SELECT COUNT(*) AS count 
-        FROM enrollments 
-        WHERE student_id = ? AND grade IS NOT NULL
+        FROM ghi_danh 
+        WHERE ma_sinh_vien = ? AND diem IS NOT NULL
         """
-        result = self.db_manager.execute_query(query, (student_id,))
+        result = self.db_manager.execute_query(query, (student_id,), cancel_token)
         courses_completed = result[0]['count'] if result else 0
         
         # Điểm trung bình
         query = """
-        SELECT AVG(grade) AS avg_grade 
-        FROM enrollments 
-        WHERE student_id = ? AND grade IS NOT NULL
+        SELECT AVG(diem) AS avg_grade 
+        FROM ghi_danh 
+        WHERE ma_sinh_vien = ? AND diem IS NOT NULL
         """
-        result = self.db_manager.execute_query(query, (student_id,))
+        result = self.db_manager.execute_query(query, (student_id,), cancel_token)
         average_grade = result[0]['avg_grade'] if result and result[0]['avg_grade'] is not None else 0
         
         # Chi tiết từng khóa học
         query = """
-        SELECT c.course_id, c.course_name, c.credits, c.instructor, e.grade
-        FROM enrollments e
-        JOIN courses c ON e.course_id = c.course_id
-        WHERE e.student_id = ?
-        ORDER BY c.course_id
+        SELECT k.ma_khoa_hoc AS course_id, k.ten_khoa_hoc AS course_name,
+               k.so_tin_chi AS credits, k.giang_vien AS instructor, g.diem AS grade
+        FROM ghi_danh g
+        JOIN khoa_hoc k ON g.ma_khoa_hoc = k.ma_khoa_hoc
+        WHERE g.ma_sinh_vien = ?
+        ORDER BY k.ma_khoa_hoc
         """
-        course_details = self.db_manager.execute_query(query, (student_id,))
+        course_details = self.db_manager.execute_query(query, (student_id,), cancel_token)
         
         return {
             'courses_enrolled': courses_enrolled,
@@ -281,6 +278,67 @@ class ReportController:
             'course_details': course_details if course_details else []
         }
     
+    def iter_student_performance(self, student_ids, cancel_token=None, batch_size=100):
+        """
+        Lấy kết quả học tập của nhiều sinh viên bằng một truy vấn (thay vì gọi
+        get_student_performance cho từng sinh viên), trả về theo từng lô.
+
+        Args:
+            student_ids (list): Các mã sinh viên
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số sinh viên mỗi lô
+
+        Yields:
+            list: Lô các dict {'student' (thông tin sinh viên), 'courses_enrolled',
+                  'courses_completed', 'average_grade', 'course_details'} theo thứ tự
+                  mã sinh viên; course_details cùng dạng với get_student_performance.
+                  Mã không tồn tại bị bỏ qua.
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        # Danh sách mã truyền dưới dạng một tham số JSON: không giới hạn số lượng mã
+        query = """
+        SELECT s.ma_sinh_vien, s.ho_ten, s.ngay_sinh, s.gioi_tinh, s.ngay_nhap_hoc, s.trang_thai,
+               g.ma_khoa_hoc AS course_id, k.ten_khoa_hoc AS course_name, k.so_tin_chi AS credits,
+               k.giang_vien AS instructor, g.diem AS grade
+        FROM sinh_vien s
+        LEFT JOIN ghi_danh g ON g.ma_sinh_vien = s.ma_sinh_vien
+        LEFT JOIN khoa_hoc k ON k.ma_khoa_hoc = g.ma_khoa_hoc
+        WHERE s.ma_sinh_vien IN (SELECT value FROM json_each(?))
+        ORDER BY s.ma_sinh_vien, g.ma_khoa_hoc
+        """
+        batch = []
+        current = None
+        for rows in self.db_manager.iter_query(query, (json.dumps(list(student_ids)),), cancel_token):
+            for row in rows:
+                if current is None or current['student']['ma_sinh_vien'] != row['ma_sinh_vien']:
+                    if current is not None:
+                        batch.append(self._finish_performance(current))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+                    current = {'student': {key: row[key] for key in (
+                        'ma_sinh_vien', 'ho_ten', 'ngay_sinh', 'gioi_tinh', 'ngay_nhap_hoc', 'trang_thai')},
+                        'course_details': []}
+                if row['course_id'] is not None:
+                    current['course_details'].append({key: row[key] for key in (
+                        'course_id', 'course_name', 'credits', 'instructor', 'grade')})
+        if current is not None:
+            batch.append(self._finish_performance(current))
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _finish_performance(performance):
+        """Tính các số liệu tổng hợp (như get_student_performance) từ danh sách khóa học."""
+        grades = [course['grade'] for course in performance['course_details'] if course['grade'] is not None]
+        performance['courses_enrolled'] = len(performance['course_details'])
+        performance['courses_completed'] = len(grades)
+        performance['average_grade'] = sum(grades) / len(grades) if grades else 0
+        return performance
+    
     def get_recent_activities(self, limit=5):
         """
         Lấy các hoạt động gần đây
@@ -302,69 +360,16 @@ class ReportController:
         
         return result if result else []
 
-    def get_grade_distribution(self):
-        """
-        Lấy phân phối điểm số của sinh viên theo thang điểm
-        
-        Returns:
-            dict: Dictionary chứa số lượng sinh viên theo từng thang điểm
-        """
-        query = """
-        SELECT 
-            CASE
-                WHEN grade >= 9.0 AND grade <= 10.0 THEN 'A (9.0 - 10.0)'
-                WHEN grade >= 8.0 AND grade < 9.0 THEN 'B+ (8.0 - 8.9)'
-                WHEN grade >= 7.0 AND grade < 8.0 THEN 'B (7.0 - 7.9)'
-                WHEN grade >= 6.5 AND grade < 7.0 THEN 'C+ (6.5 - 6.9)'
-                WHEN grade >= 5.5 AND grade < 6.5 THEN 'C (5.5 - 6.4)'
-                WHEN grade >= 5.0 AND grade < 5.5 THEN 'D+ (5.0 - 5.4)'
-                WHEN grade >= 4.0 AND grade < 5.0 THEN 'D (4.0 - 4.9)'
-                WHEN grade >= 0.0 AND grade < 4.0 THEN 'F (0.0 - 3.9)'
-                ELSE 'Chưa có điểm'
-            END AS grade_range,
-            COUNT(*) AS count
-        FROM enrollments
-        GROUP BY grade_range
-        ORDER BY 
-            CASE grade_range
-                WHEN 'A (9.0 - 10.0)' THEN 1
-                WHEN 'B+ (8.0 - 8.9)' THEN 2
-                WHEN 'B (7.0 - 7.9)' THEN 3
-                WHEN 'C+ (6.5 - 6.9)' THEN 4
-                WHEN 'C (5.5 - 6.4)' THEN 5
-                WHEN 'D+ (5.0 - 5.4)' THEN 6
-                WHEN 'D (4.0 - 4.9)' THEN 7
-                WHEN 'F (0.0 - 3.9)' THEN 8
-                ELSE 9
-            END
-        """
-        result = self.db_manager.execute_query(query)
-        
-        distribution = {}
-        if result:
-            for row in result:
-                distribution[row['grade_range']] = row['count']
-        
-        return distribution
-
-    def get_pass_fail_rate(self):
+    def get_pass_fail_rate(self, pass_mark=None):
         """
         Lấy tỷ lệ đậu/rớt của sinh viên (điểm >= 5.0 là đậu)
         
+        Args:
+            pass_mark (float, optional): Điểm tối thiểu để đậu, mặc định 5.0
+        
         Returns:
             dict: Dict chứa số lượng và tỷ lệ đậu/rớt
         """
-        query = """
-        SELECT 
-            SUM(CASE WHEN grade >= 5.0 THEN 1 ELSE 0 END) AS passed,
-            SUM(CASE WHEN grade < 5.0 AND grade IS NOT NULL THEN 1 ELSE 0 END) AS failed,
-            COUNT(*) AS total
-        FROM enrollments
-        WHERE grade IS NOT NULL
-        """
-        
-        result = self.db_manager.execute_query(query)
-        
         stats = {
             'passed': 0,
             'failed': 0,
@@ -372,35 +377,34 @@ class ReportController:
             'pass_rate': 0,
             'fail_rate': 0
         }
-        
-        if result and result[0]['total'] > 0:
-            stats['passed'] = result[0]['passed']
-            stats['failed'] = result[0]['failed']
-            stats['total'] = result[0]['total']
-            stats['pass_rate'] = (stats['passed'] / stats['total']) * 100
-            stats['fail_rate'] = (stats['failed'] / stats['total']) * 100
+        summary = self._grade_summary(pass_mark=pass_mark)
+        if summary and summary['graded'] > 0:
+            stats['passed'] = summary['passed']
+            stats['failed'] = summary['failed']
+            stats['total'] = summary['graded']
+            stats['pass_rate'] = summary['pass_rate']
+            stats['fail_rate'] = summary['fail_rate']
         
         return stats
     
     def get_enrollment_statistics_by_term(self):
         """
-        Lấy thống kê số lượng sinh viên theo học kỳ
+        Lấy thống kê số lượng sinh viên theo học kỳ (học kỳ tính từ ngày ghi danh)
         
         Returns:
-            list: Danh sách thống kê theo học kỳ
+            list: Danh sách thống kê theo học kỳ (term, student_count, course_count,
+                  avg_grade), học kỳ mới nhất trước
         """
-        # Giả sử chúng ta có trường học kỳ trong bảng khóa học
-        query = """
+        from utils.enrollment_trends import term_sql
+        query = f"""
         SELECT 
-            c.term AS term,
-            COUNT(DISTINCT e.student_id) AS student_count,
-            COUNT(DISTINCT c.course_id) AS course_count,
-            AVG(e.grade) AS avg_grade
-        FROM courses c
-        JOIN enrollments e ON c.course_id = e.course_id
-        WHERE c.term IS NOT NULL
-        GROUP BY c.term
-        ORDER BY c.term DESC
+            {term_sql("ngay_ghi_danh")} AS term,
+            COUNT(DISTINCT ma_sinh_vien) AS student_count,
+            COUNT(DISTINCT ma_khoa_hoc) AS course_count,
+            AVG(diem) AS avg_grade
+        FROM ghi_danh
+        GROUP BY term
+        ORDER BY term DESC
         """
         
         result = self.db_manager.execute_query(query)
@@ -410,53 +414,174 @@ class ReportController:
         
         return result
 
-    def get_grade_distribution(self):
+    def get_enrollment_trend(self, bucket="month", periods=None, start=None, end=None,
+                             cancel_token=None):
+        """
+        Lấy chuỗi thời gian số ghi danh và số điểm đã nhập từ các bảng tổng hợp
+        (không quét bảng ghi_danh).
+        
+        Args:
+            bucket (str): "hour", "day", "week", "month" hoặc "term"
+            periods (int, optional): Số khoảng gần nhất (khi không chỉ định start/end)
+            start (str, optional): Từ ngày (YYYY-MM-DD), không dùng với "hour"
+            end (str, optional): Tới trước ngày (YYYY-MM-DD), không dùng với "hour"
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+        
+        Returns:
+            list: Mỗi khoảng một dict (xem EnrollmentTrends.series và hourly)
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+        """
+        from utils.enrollment_trends import EnrollmentTrends
+        trends = EnrollmentTrends(self.db_manager)
+        try:
+            if start or end:
+                return trends.series(bucket, start, end, cancel_token)
+            return trends.recent(bucket, periods, cancel_token)
+        except QueryCancelledException:
+            raise
+        except (DatabaseException, ValueError) as e:
+            logging.error(f"Lỗi khi lấy xu hướng ghi danh theo {bucket}: {e}")
+            return []
+
+    def get_grade_distribution(self, scheme="letter", cancel_token=None):
         """
         Lấy phân phối điểm số của sinh viên theo khoảng điểm
         
+        Args:
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm ("letter",
+                "detailed", "classification" hoặc cách chia tự định nghĩa)
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+        
         Returns:
-            dict: Dictionary với key là khoảng điểm, value là số lượng sinh viên
+            dict: Dictionary với key là khoảng điểm (theo thứ tự tăng dần), value là số lượng sinh viên
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy hoặc quá thời hạn
+        """
+        summary = self._grade_summary(scheme, cancel_token=cancel_token)
+        return summary['distribution'] if summary else {}
+    
+    def get_grade_report(self, group="course", scheme="letter", percentiles=None, pass_mark=None,
+                         cancel_token=None):
+        """
+        Lấy thống kê điểm của từng khóa học / học kỳ / khóa tuyển sinh trong một lần
+        đọc dữ liệu (không truy vấn theo từng nhóm).
+        
+        Args:
+            group (str): "course", "term" hoặc "cohort" (khóa học, học kỳ, khóa tuyển sinh)
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm
+            percentiles (iterable, optional): Các phân vị cần tính (0-100), mặc định 25, 75, 90
+            pass_mark (float, optional): Điểm tối thiểu để đạt, mặc định 5.0
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+        
+        Returns:
+            list: Mỗi nhóm một dict (xem GradeDataset.grouped_summary); nhóm khóa học
+                  có thêm ten_khoa_hoc
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
         """
+        from utils.grade_analytics import DEFAULT_PERCENTILES, GROUP_COURSE, PASS_MARK
+        if percentiles is None:
+            percentiles = DEFAULT_PERCENTILES
         try:
-            query = """
-                SELECT
-                    CASE
-                        WHEN grade < 4.0 THEN 'F (0-3.9)'
-                        WHEN grade >= 4.0 AND grade < 5.5 THEN 'D (4.0-5.4)'
-                        WHEN grade >= 5.5 AND grade < 7.0 THEN 'C (5.5-6.9)'
-                        WHEN grade >= 7.0 AND grade < 8.5 THEN 'B (7.0-8.4)'
-                        WHEN grade >= 8.5 THEN 'A (8.5-10)'
-                    END AS grade_range,
-                    COUNT(*) as count
-                FROM enrollment
-                WHERE grade IS NOT NULL
-                GROUP BY grade_range
-                ORDER BY MIN(grade)
-            """
-            
-            cursor = self.db_manager.connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            
-            grade_distribution = {}
-            for row in results:
-                grade_range, count = row
-                grade_distribution[grade_range] = count
-                
-            # Đảm bảo có đủ các khoảng điểm
-            all_ranges = ['F (0-3.9)', 'D (4.0-5.4)', 'C (5.5-6.9)', 'B (7.0-8.4)', 'A (8.5-10)']
-            for grade_range in all_ranges:
-                if grade_range not in grade_distribution:
-                    grade_distribution[grade_range] = 0
-            
-            # Sắp xếp theo thứ tự từ F đến A
-            sorted_distribution = {k: grade_distribution[k] for k in all_ranges}
-            
-            return sorted_distribution
-            
+            dataset = self.grade_analytics.dataset(cancel_token)
+            report = dataset.grouped_summary(group, scheme, percentiles,
+                                             PASS_MARK if pass_mark is None else pass_mark)
+            if group == GROUP_COURSE:
+                for item in report:
+                    item['ten_khoa_hoc'] = dataset.course_names.get(item['key'], "")
+            return report
+        except QueryCancelledException:
+            raise
+        except (DatabaseException, ValueError) as e:
+            logging.error(f"Lỗi khi lấy thống kê điểm theo nhóm {group}: {e}")
+            return []
+    
+    def get_grade_pivot(self, group="course", columns="bucket", value="count", scheme="letter",
+                        pass_mark=None, include_ungraded=False, sort_by="key", descending=False,
+                        cancel_token=None):
+        """
+        Lấy bảng chéo điểm (khóa học / giảng viên / số tín chỉ / học kỳ / khóa tuyển sinh
+        × khoảng điểm hoặc đạt/không đạt) từ một lần đọc dữ liệu.
+
+        Args:
+            group (str): Nhóm theo dòng: "course", "instructor", "credits", "term" hoặc "cohort"
+            columns (str): "bucket" (khoảng điểm) hoặc "pass_fail" (đạt/không đạt)
+            value (str): "count", "percent" (tỷ lệ % trong dòng) hoặc "mean" (điểm trung bình)
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm
+            pass_mark (float, optional): Điểm tối thiểu để đạt, mặc định 5.0
+            include_ungraded (bool): Thêm cột "Chưa có điểm" khi đếm số lượng
+            sort_by (str | int): Sắp xếp dòng (xem PivotTable.sorted)
+            descending (bool): Sắp giảm dần
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            PivotTable: Bảng chéo, hoặc None nếu lỗi
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+        """
+        from utils.grade_analytics import PASS_MARK
+        try:
+            dataset = self.grade_analytics.dataset(cancel_token)
+            pivot = dataset.pivot(group, columns, value, scheme,
+                                  PASS_MARK if pass_mark is None else pass_mark, include_ungraded)
+            return pivot.sorted(sort_by, descending)
+        except QueryCancelledException:
+            raise
+        except (DatabaseException, ValueError) as e:
+            logging.error(f"Lỗi khi lập bảng chéo điểm theo nhóm {group}: {e}")
+            return None
+
+    @property
+    def grade_analytics(self):
+        """Nguồn dữ liệu phân tích điểm (giữ ảnh chụp điểm giữa các lần gọi)."""
+        if self._grade_analytics is None:
+            # NumPy chỉ được import khi cần phân tích điểm
+            from utils.grade_analytics import GradeAnalytics
+            self._grade_analytics = GradeAnalytics(self.db_manager)
+        return self._grade_analytics
+    
+    def load_grade_snapshot(self, directory):
+        """
+        Chạy các phân tích điểm trên ảnh chụp dạng cột thay vì cơ sở dữ liệu
+        (cho tới khi gọi grade_analytics.invalidate()).
+
+        Args:
+            directory (str): Thư mục ảnh chụp (utils.snapshot_export)
+
+        Returns:
+            bool: True nếu nạp thành công, False nếu lỗi
+        """
+        try:
+            self.grade_analytics.load_snapshot(directory)
+            return True
         except Exception as e:
-            logging.error(f"Lỗi khi lấy phân phối điểm: {e}")
-            return {}
+            logging.error(f"Lỗi khi nạp ảnh chụp điểm từ {directory}: {e}")
+            return False
+    
+    def _grade_summary(self, scheme="letter", pass_mark=None, cancel_token=None):
+        """
+        Thống kê điểm toàn trường từ ảnh chụp điểm.
+        
+        Returns:
+            dict: Kết quả GradeDataset.summary hoặc None nếu lỗi
+        
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy (chỉ khi có cancel_token)
+        """
+        from utils.grade_analytics import PASS_MARK
+        try:
+            return self.grade_analytics.dataset(cancel_token).summary(
+                scheme, (), PASS_MARK if pass_mark is None else pass_mark)
+        except QueryCancelledException:
+            raise
+        except (DatabaseException, ValueError) as e:
+            logging.error(f"Lỗi khi phân tích điểm số: {e}")
+            return None
     
     def get_gender_statistics(self):
         """
@@ -467,19 +592,16 @@ class ReportController:
         """
         try:
             query = """
-                SELECT gender, COUNT(*) as count 
-                FROM student 
-                GROUP BY gender
+                SELECT gioi_tinh, COUNT(*) as count 
+                FROM sinh_vien 
+                GROUP BY gioi_tinh
             """
             
-            cursor = self.db_manager.connection.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
+            results = self.db_manager.execute_query(query)
             
             gender_stats = {}
             for row in results:
-                gender, count = row
-                gender_stats[gender or "Không xác định"] = count
+                gender_stats[row['gioi_tinh'] or "Không xác định"] = row['count']
             
             # Đảm bảo có đủ các loại giới tính
             for gender in ["Nam", "Nữ", "Khác"]:
@@ -490,4 +612,103 @@ class ReportController:
             
         except Exception as e:
             logging.error(f"Lỗi khi lấy thống kê giới tính: {e}")
-            return {"Nam": 0, "Nữ": 0, "Khác": 0}
\ No newline at end of file
+            return {"Nam": 0, "Nữ": 0, "Khác": 0}
+
+    # ----- API bất đồng bộ (chạy trên executor dùng chung, xem utils.async_bridge) -----
+
+    async def aget_student_course_statistics(self, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_student_course_statistics."""
+        return await self._run_async(self.get_student_course_statistics, cancel_token)
+
+    async def aget_student_status_statistics(self):
+        """Phiên bản bất đồng bộ của get_student_status_statistics."""
+        return await self._run_async(self.get_student_status_statistics)
+
+    async def aget_student_gender_statistics(self):
+        """Phiên bản bất đồng bộ của get_student_gender_statistics."""
+        return await self._run_async(self.get_student_gender_statistics)
+
+    async def aget_top_courses_by_enrollment(self, limit=5, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_top_courses_by_enrollment."""
+        return await self._run_async(self.get_top_courses_by_enrollment, limit, cancel_token)
+
+    async def aget_course_credits_statistics(self):
+        """Phiên bản bất đồng bộ của get_course_credits_statistics."""
+        return await self._run_async(self.get_course_credits_statistics)
+
+    async def aget_grade_statistics(self):
+        """Phiên bản bất đồng bộ của get_grade_statistics."""
+        return await self._run_async(self.get_grade_statistics)
+
+    async def aget_student_performance(self, student_id, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_student_performance."""
+        return await self._run_async(self.get_student_performance, student_id, cancel_token)
+
+    async def aget_recent_activities(self, limit=5):
+        """Phiên bản bất đồng bộ của get_recent_activities."""
+        return await self._run_async(self.get_recent_activities, limit)
+
+    async def aget_grade_distribution(self, scheme="letter", cancel_token=None):
+        """Phiên bản bất đồng bộ của get_grade_distribution."""
+        return await self._run_async(self.get_grade_distribution, scheme, cancel_token)
+
+    async def aget_grade_report(self, group="course", scheme="letter", percentiles=None,
+                                pass_mark=None, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_grade_report."""
+        return await self._run_async(self.get_grade_report, group, scheme, percentiles,
+                                     pass_mark, cancel_token)
+
+    async def aget_grade_pivot(self, group="course", columns="bucket", value="count",
+                               scheme="letter", pass_mark=None, include_ungraded=False,
+                               sort_by="key", descending=False, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_grade_pivot."""
+        return await self._run_async(self.get_grade_pivot, group, columns, value, scheme,
+                                     pass_mark, include_ungraded, sort_by, descending,
+                                     cancel_token)
+
+    async def aget_pass_fail_rate(self, pass_mark=None):
+        """Phiên bản bất đồng bộ của get_pass_fail_rate."""
+        return await self._run_async(self.get_pass_fail_rate, pass_mark)
+
+    async def aget_enrollment_trend(self, bucket="month", periods=None, start=None, end=None,
+                                    cancel_token=None):
+        """Phiên bản bất đồng bộ của get_enrollment_trend."""
+        return await self._run_async(self.get_enrollment_trend, bucket, periods, start, end,
+                                     cancel_token)
+
+    async def aget_enrollment_statistics_by_term(self):
+        """Phiên bản bất đồng bộ của get_enrollment_statistics_by_term."""
+        return await self._run_async(self.get_enrollment_statistics_by_term)
+
+    async def aget_gender_statistics(self):
+        """Phiên bản bất đồng bộ của get_gender_statistics."""
+        return await self._run_async(self.get_gender_statistics)
+
+    async def aget_dashboard_data(self, top_limit=5, activity_limit=1, sections=None,
+                                  trend_bucket="month"):
+        """
+        Chạy song song các truy vấn thống kê độc lập của dashboard.
+
+        Args:
+            top_limit (int): Số khóa học đông sinh viên nhất cần lấy
+            activity_limit (int): Số hoạt động gần đây cần lấy
+            trend_bucket (str): Khoảng thời gian của biểu đồ xu hướng ghi danh
+            sections (iterable, optional): Chỉ tính các phần này (ví dụ khi chỉ một
+                số bảng thay đổi); mặc định tính tất cả
+
+        Returns:
+            dict: Dữ liệu cho từng phần của dashboard đã tính
+        """
+        queries = {
+            'stats': self.aget_student_course_statistics,
+            'top_courses': lambda: self.aget_top_courses_by_enrollment(top_limit),
+            'recent_activities': lambda: self.aget_recent_activities(activity_limit),
+            'status_stats': self.aget_student_status_statistics,
+            'credits_stats': self.aget_course_credits_statistics,
+            'grade_distribution': self.aget_grade_distribution,
+            'gender_stats': self.aget_gender_statistics,
+            'enrollment_trend': lambda: self.aget_enrollment_trend(trend_bucket),
+        }
+        keys = [key for key in queries if sections is None or key in sections]
+        results = await asyncio.gather(*(queries[key]() for key in keys))
+        return dict(zip(keys, results))
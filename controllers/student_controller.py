@@ -1,11 +1,25 @@
 from models.student import Student
+from utils.async_bridge import AsyncControllerMixin
+from utils.change_bus import (ENTITY_STUDENT, ChangeOperation, publish_change,
+                               publish_changes, diff_fields)
+import json
 import logging
 import os
 
-class StudentController:
+class StudentController(AsyncControllerMixin):
     """
     Controller quản lý các thao tác liên quan đến sinh viên.
     """
+    # Các cột của bảng sinh_vien theo thứ tự tham số khi nhập hàng loạt
+    STUDENT_COLUMNS = ("ma_sinh_vien", "ho_ten", "ngay_sinh", "gioi_tinh", "email",
+                       "so_dien_thoai", "dia_chi", "ngay_nhap_hoc", "trang_thai", "duong_dan_anh")
+    # Các cột được cập nhật khi gộp dữ liệu nhập (ảnh không có trong file nhập)
+    MERGE_COLUMNS = STUDENT_COLUMNS[:-1]
+    # Các cột được xuất ra file (theo thứ tự cột của bảng trên giao diện, không gồm ảnh)
+    EXPORT_COLUMNS = STUDENT_COLUMNS[:-1]
+    # Số mã tối đa trong một câu IN (...) khi tra cứu hàng loạt
+    ID_LOOKUP_BATCH = 500
+
     def __init__(self, db_manager):
         """
         Khởi tạo controller với tham chiếu đến database manager.
@@ -23,7 +37,7 @@ class StudentController:
         Returns:
             list: Danh sách các đối tượng Student
         """
-        query = "SELECT * FROM students ORDER BY student_id"
+        query = "SELECT * FROM sinh_vien ORDER BY ma_sinh_vien"
         result = self.db_manager.execute_query(query)
         
         students = []
@@ -45,7 +59,7 @@ class StudentController:
         Returns:
             Student: Đối tượng sinh viên nếu tìm thấy, None nếu không tồn tại
         """
-        query = "SELECT * FROM students WHERE student_id = ?"
+        query = "SELECT * FROM sinh_vien WHERE ma_sinh_vien = ?"
         result = self.db_manager.execute_query(query, (student_id,))
         
         if result:
@@ -83,6 +97,210 @@ class StudentController:
         logging.info(f"Tìm kiếm sinh viên với từ khóa '{keyword}': {len(students)} kết quả")
         return students
     
+    def find_students(self, filters=None, cancel_token=None):
+        """
+        Tìm sinh viên theo từ khóa và bộ lọc nhanh bằng một truy vấn duy nhất.
+        Chạy trên kết nối riêng của luồng hiện tại nên có thể gọi từ luồng nền.
+
+        Args:
+            filters (dict, optional): Bộ lọc gồm các khóa "search_text", "status", "gender"
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Danh sách các đối tượng Student phù hợp
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_student_filters(filters)
+        query = "SELECT * FROM sinh_vien" + where_clause + " ORDER BY ma_sinh_vien"
+
+        result = self.db_manager.read_query(query, params, cancel_token)
+        students = [Student.from_dict(dict(row)) for row in result]
+
+        logging.info(f"Tìm sinh viên với bộ lọc {filters}: {len(students)} kết quả")
+        return students
+
+    def _build_student_filters(self, filters):
+        """
+        Tạo mệnh đề WHERE trên bảng sinh_vien từ bộ lọc.
+
+        Args:
+            filters (dict, optional): Bộ lọc gồm các khóa "search_text", "status", "gender"
+
+        Returns:
+            tuple: (mệnh đề WHERE hoặc chuỗi rỗng, tuple tham số)
+        """
+        filters = filters or {}
+        conditions = []
+        params = []
+
+        search_text = filters.get("search_text")
+        if search_text:
+            keyword = f"%{search_text}%"
+            conditions.append(
+                "(ma_sinh_vien LIKE ? OR ho_ten LIKE ? OR email LIKE ? OR so_dien_thoai LIKE ?)"
+            )
+            params.extend([keyword, keyword, keyword, keyword])
+        if filters.get("status"):
+            conditions.append("trang_thai = ?")
+            params.append(filters["status"])
+        if filters.get("gender"):
+            conditions.append("gioi_tinh = ?")
+            params.append(filters["gender"])
+
+        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where_clause, tuple(params)
+
+    def count_students(self, filters=None, cancel_token=None):
+        """
+        Đếm số sinh viên khớp bộ lọc.
+
+        Args:
+            filters (dict, optional): Bộ lọc như find_students
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            int: Số sinh viên
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_student_filters(filters)
+        query = "SELECT COUNT(*) AS count FROM sinh_vien" + where_clause
+        return self.db_manager.read_query(query, params, cancel_token)[0]['count']
+
+    def iter_students(self, filters=None, cancel_token=None, batch_size=1000):
+        """
+        Đọc toàn bộ sinh viên khớp bộ lọc theo từng lô (dùng khi xuất dữ liệu),
+        chỉ các cột EXPORT_COLUMNS.
+
+        Args:
+            filters (dict, optional): Bộ lọc như find_students
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số dòng mỗi lô
+
+        Yields:
+            list: Lô các dòng (giá trị theo thứ tự EXPORT_COLUMNS)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        where_clause, params = self._build_student_filters(filters)
+        query = (f"SELECT {', '.join(self.EXPORT_COLUMNS)} FROM sinh_vien" + where_clause +
+                 " ORDER BY ma_sinh_vien")
+        return self.db_manager.iter_query(query, params, cancel_token, batch_size)
+
+    def iter_card_students(self, student_ids=None, filters=None, cancel_token=None, batch_size=200):
+        """
+        Đọc thông tin in thẻ sinh viên theo từng lô, theo thứ tự mã sinh viên.
+
+        Args:
+            student_ids (iterable, optional): Các mã sinh viên; nếu có thì bỏ qua filters
+            filters (dict, optional): Bộ lọc như find_students
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+            batch_size (int): Số dòng mỗi lô
+
+        Yields:
+            list: Lô các dòng (ma_sinh_vien, ho_ten, ngay_sinh, ngay_nhap_hoc, duong_dan_anh)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        query = "SELECT ma_sinh_vien, ho_ten, ngay_sinh, ngay_nhap_hoc, duong_dan_anh FROM sinh_vien"
+        if student_ids is not None:
+            # Danh sách mã truyền dưới dạng một tham số JSON: không giới hạn số lượng mã
+            query += " WHERE ma_sinh_vien IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(student_ids)),)
+        else:
+            where_clause, params = self._build_student_filters(filters)
+            query += where_clause
+        return self.db_manager.iter_query(query + " ORDER BY ma_sinh_vien", params, cancel_token,
+                                          batch_size)
+
+    def get_students_page(self, page=1, page_size=50, filters=None, cancel_token=None):
+        """
+        Lấy một trang sinh viên cùng tổng số sinh viên khớp bộ lọc.
+
+        Args:
+            page (int): Số trang, bắt đầu từ 1
+            page_size (int): Số sinh viên mỗi trang
+            filters (dict, optional): Bộ lọc như find_students
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            tuple: (danh sách Student của trang, tổng số sinh viên khớp bộ lọc)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        page = max(1, page)
+        where_clause, params = self._build_student_filters(filters)
+
+        count_query = "SELECT COUNT(*) AS count FROM sinh_vien" + where_clause
+        total = self.db_manager.read_query(count_query, params, cancel_token)[0]['count']
+
+        query = ("SELECT * FROM sinh_vien" + where_clause +
+                 " ORDER BY ma_sinh_vien LIMIT ? OFFSET ?")
+        result = self.db_manager.read_query(
+            query, params + (page_size, (page - 1) * page_size), cancel_token
+        )
+        students = [Student.from_dict(dict(row)) for row in result]
+        return students, total
+
+    def get_students_by_ids(self, student_ids, cancel_token=None):
+        """
+        Lấy nhiều sinh viên theo mã bằng một truy vấn (dùng để cập nhật các dòng vừa thay đổi).
+
+        Args:
+            student_ids (iterable): Các mã sinh viên
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: Mã sinh viên -> Student; mã không còn tồn tại sẽ không có trong kết quả
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        student_ids = list(student_ids)
+        if not student_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in student_ids)
+        query = f"SELECT * FROM sinh_vien WHERE ma_sinh_vien IN ({placeholders})"
+        result = self.db_manager.read_query(query, tuple(student_ids), cancel_token)
+        return {row['ma_sinh_vien']: Student.from_dict(dict(row)) for row in result}
+
+    @staticmethod
+    def matches_filters(student, filters):
+        """
+        Kiểm tra sinh viên có khớp bộ lọc của find_students không (không truy vấn cơ sở dữ liệu).
+
+        Args:
+            student (Student): Sinh viên cần kiểm tra
+            filters (dict, optional): Bộ lọc gồm các khóa "search_text", "status", "gender"
+
+        Returns:
+            bool: True nếu khớp
+        """
+        filters = filters or {}
+        search_text = filters.get("search_text")
+        if search_text:
+            keyword = search_text.lower()
+            fields = (student.ma_sinh_vien, student.ho_ten, student.email, student.so_dien_thoai)
+            if not any(keyword in (value or "").lower() for value in fields):
+                return False
+        if filters.get("status") and student.trang_thai != filters["status"]:
+            return False
+        if filters.get("gender") and student.gioi_tinh != filters["gender"]:
+            return False
+        return True
+
     def add_student(self, student, photo_file_path=None, current_user_id=None):
         """
         Thêm sinh viên vào cơ sở dữ liệu.
@@ -96,8 +314,8 @@ class StudentController:
             bool: True nếu thành công, False nếu thất bại
         """
         # Kiểm tra sinh viên đã tồn tại chưa
-        if self.get_student_by_id(student.student_id):
-            logging.warning(f"Sinh viên đã tồn tại với ID: {student.student_id}")
+        if self.get_student_by_id(student.ma_sinh_vien):
+            logging.warning(f"Sinh viên đã tồn tại với ID: {student.ma_sinh_vien}")
             return False
         
         # Xử lý ảnh đại diện nếu có
@@ -108,22 +326,23 @@ class StudentController:
                 saved_photo_path = ""
             else:
                 try:
-                    saved_photo_path = self.db_manager.save_student_photo(student.student_id, photo_file_path)
+                    saved_photo_path = self.db_manager.save_student_photo(student.ma_sinh_vien, photo_file_path)
                 except Exception as e:
                     logging.error("Lỗi khi lưu ảnh sinh viên: %s", e)
+        student.duong_dan_anh = saved_photo_path
 
         # Tạo truy vấn
         query = """
-        INSERT INTO students (
-            student_id, full_name, date_of_birth, gender, email, 
-            phone, address, enrolled_date, status, photo_path
+        INSERT INTO sinh_vien (
+            ma_sinh_vien, ho_ten, ngay_sinh, gioi_tinh, email,
+            so_dien_thoai, dia_chi, ngay_nhap_hoc, trang_thai, duong_dan_anh
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
         params = (
-            student.student_id, student.full_name, student.date_of_birth,
-            student.gender, student.email, student.phone, student.address,
-            student.enrolled_date, student.status, saved_photo_path
+            student.ma_sinh_vien, student.ho_ten, student.ngay_sinh,
+            student.gioi_tinh, student.email, student.so_dien_thoai, student.dia_chi,
+            student.ngay_nhap_hoc, student.trang_thai, saved_photo_path
         )
         
         try:
@@ -131,25 +350,164 @@ class StudentController:
             success = inserted_id is not None
             
             if success:
-                logging.info(f"Đã thêm sinh viên: {student.student_id} - {student.full_name}")
+                logging.info(f"Đã thêm sinh viên: {student.ma_sinh_vien} - {student.ho_ten}")
+                publish_change(ENTITY_STUDENT, student.ma_sinh_vien, ChangeOperation.INSERT)
 
                 # Ghi nhật ký hoạt động
                 if current_user_id:
                     self.db_manager.log_activity(
                         current_user_id,
                         "ADD",
-                        f"Thêm sinh viên: {student.full_name}",
+                        f"Thêm sinh viên: {student.ho_ten}",
                         "Student",
-                        student.student_id
+                        student.ma_sinh_vien
                     )
             else:
-                logging.warning(f"Không thể thêm sinh viên: {student.student_id}")
+                logging.warning(f"Không thể thêm sinh viên: {student.ma_sinh_vien}")
                 
             return success
         except Exception as e:
             logging.error("Lỗi khi thêm sinh viên: %s", e)
             return False
     
+    def get_existing_student_ids(self, student_ids, cancel_token=None):
+        """
+        Tìm các mã sinh viên đã có trong cơ sở dữ liệu (tra cứu theo lô).
+
+        Args:
+            student_ids (iterable): Các mã sinh viên cần kiểm tra
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            set: Các mã đã tồn tại
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        student_ids = list(student_ids)
+        existing = set()
+        for start in range(0, len(student_ids), self.ID_LOOKUP_BATCH):
+            batch = student_ids[start:start + self.ID_LOOKUP_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            query = f"SELECT ma_sinh_vien FROM sinh_vien WHERE ma_sinh_vien IN ({placeholders})"
+            existing.update(row['ma_sinh_vien']
+                            for row in self.db_manager.read_query(query, tuple(batch), cancel_token))
+        return existing
+
+    def add_students_bulk(self, rows, cancel_token=None):
+        """
+        Thêm nhiều sinh viên trong một giao dịch; mã đã tồn tại được bỏ qua
+        (giống add_student). Dùng khi nhập dữ liệu từ file.
+
+        Args:
+            rows (list): Các tuple giá trị theo thứ tự STUDENT_COLUMNS
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: {'inserted': số sinh viên đã thêm, 'skipped': số mã đã tồn tại},
+                  None nếu ghi lỗi (cả lô không được ghi)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi tra cứu mã đã tồn tại lỗi
+        """
+        existing = self.get_existing_student_ids((row[0] for row in rows), cancel_token)
+        new_rows = [row for row in rows if row[0] not in existing]
+        inserted = 0
+        if new_rows:
+            columns = ", ".join(self.STUDENT_COLUMNS)
+            placeholders = ", ".join("?" for _ in self.STUDENT_COLUMNS)
+            # ON CONFLICT giữ an toàn nếu kết nối khác vừa thêm cùng mã
+            query = (f"INSERT INTO sinh_vien ({columns}) VALUES ({placeholders}) "
+                     "ON CONFLICT(ma_sinh_vien) DO NOTHING")
+            inserted = self.db_manager.execute_many(query, new_rows)
+            if inserted is None:
+                return None
+            publish_changes(ENTITY_STUDENT, [row[0] for row in new_rows], ChangeOperation.INSERT)
+        return {'inserted': inserted, 'skipped': len(rows) - inserted}
+
+    def get_existing_students(self, student_ids, cancel_token=None):
+        """
+        Đọc các sinh viên đã có trong cơ sở dữ liệu (tra cứu theo lô), chỉ các cột MERGE_COLUMNS.
+
+        Args:
+            student_ids (iterable): Các mã sinh viên cần đọc
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: Mã sinh viên -> dict giá trị các cột
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        student_ids = list(student_ids)
+        columns = ", ".join(self.MERGE_COLUMNS)
+        existing = {}
+        for start in range(0, len(student_ids), self.ID_LOOKUP_BATCH):
+            batch = student_ids[start:start + self.ID_LOOKUP_BATCH]
+            placeholders = ", ".join("?" for _ in batch)
+            query = f"SELECT {columns} FROM sinh_vien WHERE ma_sinh_vien IN ({placeholders})"
+            for row in self.db_manager.read_query(query, tuple(batch), cancel_token):
+                existing[row['ma_sinh_vien']] = dict(row)
+        return existing
+
+    def merge_students_bulk(self, rows, defaults=None, cancel_token=None):
+        """
+        Thêm mới hoặc cập nhật nhiều sinh viên trong một giao dịch
+        (INSERT ... ON CONFLICT DO UPDATE). Chỉ ghi các dòng thực sự thay đổi:
+        sinh viên đã tồn tại được so sánh từng cột, dòng không đổi được bỏ qua.
+
+        Args:
+            rows (list): Các tuple giá trị theo thứ tự STUDENT_COLUMNS; ô trống ("")
+                nghĩa là giữ nguyên giá trị hiện có
+            defaults (dict, optional): Giá trị cho các ô trống của sinh viên mới
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            dict: {'inserted', 'updated', 'unchanged',
+                   'changes': danh sách (mã sinh viên, tập cột đã đổi) của các dòng cập nhật},
+                  None nếu ghi lỗi (cả lô không được ghi)
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi tra cứu sinh viên đã tồn tại lỗi
+        """
+        defaults = defaults or {}
+        existing = self.get_existing_students((row[0] for row in rows), cancel_token)
+        writes, inserted_ids, changes = [], [], []
+        for row in rows:
+            values = dict(zip(self.STUDENT_COLUMNS, row))
+            current = existing.get(row[0])
+            if current is None:
+                for column, value in defaults.items():
+                    if not values.get(column):
+                        values[column] = value
+                writes.append(tuple(values[column] for column in self.STUDENT_COLUMNS))
+                inserted_ids.append(row[0])
+                continue
+            incoming = {column: values[column] for column in self.MERGE_COLUMNS if values[column] != ""}
+            changed_fields = diff_fields(current, incoming)
+            if changed_fields:
+                merged = {**current, **incoming}
+                writes.append(tuple(merged.get(column, "") for column in self.STUDENT_COLUMNS))
+                changes.append((row[0], changed_fields))
+
+        if writes:
+            columns = ", ".join(self.STUDENT_COLUMNS)
+            placeholders = ", ".join("?" for _ in self.STUDENT_COLUMNS)
+            assignments = ", ".join(f"{column} = excluded.{column}" for column in self.MERGE_COLUMNS[1:])
+            query = (f"INSERT INTO sinh_vien ({columns}) VALUES ({placeholders}) "
+                     f"ON CONFLICT(ma_sinh_vien) DO UPDATE SET {assignments}")
+            if self.db_manager.execute_many(query, writes) is None:
+                return None
+            publish_changes(ENTITY_STUDENT, inserted_ids, ChangeOperation.INSERT)
+            publish_changes(ENTITY_STUDENT, [student_id for student_id, _ in changes],
+                            ChangeOperation.UPDATE)
+        return {'inserted': len(inserted_ids), 'updated': len(changes),
+                'unchanged': len(rows) - len(writes), 'changes': changes}
+
     def update_student(self, student, photo_file_path=None, current_user_id=None):
         """
         Cập nhật thông tin sinh viên.
@@ -163,51 +521,51 @@ class StudentController:
             bool: True nếu thành công, False nếu thất bại
         """
         # Lấy thông tin sinh viên hiện tại
-        existing_student = self.get_student_by_id(student.student_id)
+        existing_student = self.get_student_by_id(student.ma_sinh_vien)
         if not existing_student:
-            logging.warning(f"Không tìm thấy sinh viên với ID {student.student_id} để cập nhật")
+            logging.warning(f"Không tìm thấy sinh viên với ID {student.ma_sinh_vien} để cập nhật")
             return False
         
         # Xử lý ảnh đại diện nếu có thay đổi
         if photo_file_path:
             # Nếu là ảnh mặc định thì xóa ảnh cũ và không lưu mới
             if photo_file_path.endswith("default_avatar.png"):
-                if existing_student.photo_path:
-                    self.db_manager.delete_student_photo(existing_student.photo_path)
-                student.photo_path = ""
+                if existing_student.duong_dan_anh:
+                    self.db_manager.delete_student_photo(existing_student.duong_dan_anh)
+                student.duong_dan_anh = ""
             else:
-                if existing_student.photo_path:
-                    self.db_manager.delete_student_photo(existing_student.photo_path)
-                photo_path = self.db_manager.save_student_photo(student.student_id, photo_file_path)
-                student.photo_path = photo_path
+                if existing_student.duong_dan_anh:
+                    self.db_manager.delete_student_photo(existing_student.duong_dan_anh)
+                photo_path = self.db_manager.save_student_photo(student.ma_sinh_vien, photo_file_path)
+                student.duong_dan_anh = photo_path
         else:
-            student.photo_path = existing_student.photo_path
+            student.duong_dan_anh = existing_student.duong_dan_anh
         
         query = """
-        UPDATE students SET 
-            full_name = ?, 
-            date_of_birth = ?, 
-            gender = ?, 
+        UPDATE sinh_vien SET 
+            ho_ten = ?, 
+            ngay_sinh = ?, 
+            gioi_tinh = ?, 
             email = ?, 
-            phone = ?, 
-            address = ?, 
-            enrolled_date = ?, 
-            status = ?,
-            photo_path = ?
-        WHERE student_id = ?
+            so_dien_thoai = ?, 
+            dia_chi = ?, 
+            ngay_nhap_hoc = ?, 
+            trang_thai = ?,
+            duong_dan_anh = ?
+        WHERE ma_sinh_vien = ?
         """
         
         params = (
-            student.full_name,
-            student.date_of_birth,
-            student.gender,
+            student.ho_ten,
+            student.ngay_sinh,
+            student.gioi_tinh,
             student.email,
-            student.phone,
-            student.address,
-            student.enrolled_date,
-            student.status,
-            student.photo_path,
-            student.student_id
+            student.so_dien_thoai,
+            student.dia_chi,
+            student.ngay_nhap_hoc,
+            student.trang_thai,
+            student.duong_dan_anh,
+            student.ma_sinh_vien
         )
         
         rows_affected = self.db_manager.execute_update(query, params)
@@ -215,15 +573,19 @@ class StudentController:
         
         if success:
             logging.info("Đã cập nhật sinh viên: %s", student)
+            changed_fields = diff_fields(existing_student.to_dict(), student.to_dict())
+            if changed_fields:
+                publish_change(ENTITY_STUDENT, student.ma_sinh_vien,
+                               ChangeOperation.UPDATE, changed_fields)
             
             # Ghi nhật ký hoạt động
             if current_user_id:
                 self.db_manager.log_activity(
                     user_id=current_user_id,
                     action_type="UPDATE",
-                    action_description=f"Cập nhật thông tin sinh viên: {student.full_name}",
+                    action_description=f"Cập nhật thông tin sinh viên: {student.ho_ten}",
                     entity_type="Student",
-                    entity_id=student.student_id
+                    entity_id=student.ma_sinh_vien
                 )
         else:
             logging.warning("Không thể cập nhật sinh viên: %s", student)
@@ -249,22 +611,23 @@ class StudentController:
                 return False
             
             # Lưu thông tin để ghi nhật ký
-            student_name = student.full_name
+            student_name = student.ho_ten
             
             # Xóa ảnh nếu có
-            if student.photo_path and os.path.exists(student.photo_path):
+            if student.duong_dan_anh and os.path.exists(student.duong_dan_anh):
                 try:
-                    self.db_manager.delete_student_photo(student.photo_path)
+                    self.db_manager.delete_student_photo(student.duong_dan_anh)
                 except Exception as e:
                     logging.error(f"Lỗi khi xóa ảnh sinh viên: {e}")
             
             # Xóa sinh viên
-            query = "DELETE FROM students WHERE student_id = ?"
+            query = "DELETE FROM sinh_vien WHERE ma_sinh_vien = ?"
             rows_affected = self.db_manager.execute_delete(query, (student_id,))
             success = rows_affected > 0
             
             if success:
                 logging.info(f"Đã xóa sinh viên với ID: {student_id}")
+                publish_change(ENTITY_STUDENT, student_id, ChangeOperation.DELETE)
                 
                 # Ghi nhật ký hoạt động
                 if current_user_id:
@@ -290,7 +653,7 @@ class StudentController:
         Returns:
             int: Số lượng sinh viên
         """
-        query = "SELECT COUNT(*) as count FROM students"
+        query = "SELECT COUNT(*) as count FROM sinh_vien"
         result = self.db_manager.execute_query(query)
         
         if result:
@@ -345,4 +708,38 @@ class StudentController:
             students.append(Student.from_dict(student_data))
             
         logging.info(f"Tìm kiếm nâng cao: {len(students)} kết quả")
-        return students
\ No newline at end of file
+        return students
+
+    # ----- API bất đồng bộ (chạy trên executor dùng chung, xem utils.async_bridge) -----
+
+    async def aget_all_students(self):
+        """Phiên bản bất đồng bộ của get_all_students."""
+        return await self._run_async(self.get_all_students)
+
+    async def aget_student_by_id(self, student_id):
+        """Phiên bản bất đồng bộ của get_student_by_id."""
+        return await self._run_async(self.get_student_by_id, student_id)
+
+    async def aget_student_count(self):
+        """Phiên bản bất đồng bộ của get_student_count."""
+        return await self._run_async(self.get_student_count)
+
+    async def aget_students_page(self, page=1, page_size=50, filters=None, cancel_token=None):
+        """Phiên bản bất đồng bộ của get_students_page."""
+        return await self._run_async(self.get_students_page, page, page_size, filters, cancel_token)
+
+    async def afind_students(self, filters=None, cancel_token=None):
+        """Phiên bản bất đồng bộ của find_students."""
+        return await self._run_async(self.find_students, filters, cancel_token)
+
+    async def aadd_student(self, student, photo_file_path=None, current_user_id=None):
+        """Phiên bản bất đồng bộ của add_student."""
+        return await self._run_async(self.add_student, student, photo_file_path, current_user_id)
+
+    async def aupdate_student(self, student, photo_file_path=None, current_user_id=None):
+        """Phiên bản bất đồng bộ của update_student."""
+        return await self._run_async(self.update_student, student, photo_file_path, current_user_id)
+
+    async def adelete_student(self, student_id, current_user_id=None):
+        """Phiên bản bất đồng bộ của delete_student."""
+        return await self._run_async(self.delete_student, student_id, current_user_id)
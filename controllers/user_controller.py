@@ -1,8 +1,9 @@
 import logging
 from datetime import datetime
 from models.user import User
+from utils.async_bridge import AsyncControllerMixin
 
-class UserController:
+class UserController(AsyncControllerMixin):
     """
     Controller quản lý các thao tác liên quan đến người dùng
     """
@@ -328,3 +329,21 @@ class UserController:
         else:
             logging.error(f"Không thể đổi mật khẩu cho người dùng: {username}")
             return False
+
+    # ----- API bất đồng bộ (chạy trên executor dùng chung, xem utils.async_bridge) -----
+
+    async def aauthenticate(self, username, password):
+        """Phiên bản bất đồng bộ của authenticate."""
+        return await self._run_async(self.authenticate, username, password)
+
+    async def aget_all_users(self):
+        """Phiên bản bất đồng bộ của get_all_users."""
+        return await self._run_async(self.get_all_users)
+
+    async def aget_user_by_id(self, user_id):
+        """Phiên bản bất đồng bộ của get_user_by_id."""
+        return await self._run_async(self.get_user_by_id, user_id)
+
+    async def aget_user_by_username(self, username):
+        """Phiên bản bất đồng bộ của get_user_by_username."""
+        return await self._run_async(self.get_user_by_username, username)
@@ -1,30 +1,136 @@
 import sys
 import logging
+# Profiler được import đầu tiên để mốc thời gian 0 nằm trước các import khác
+from utils.startup_profiler import startup_profiler
 from PyQt6.QtWidgets import QApplication, QDialog  # pylint: disable=no-name-in-module
+from PyQt6.QtCore import QTimer
 from utils.logger import Logger
 from utils.config_manager import ConfigManager
 from utils.cleanup import cleanup_temp_files
 from utils.error_handler import ErrorHandler, DatabaseException, ConfigException, ErrorSeverity
 from utils.initialize_data import initialize_all_data
 from utils.theme_manager import ThemeManager
+from utils.app_context import AppContext
+from utils.startup_orchestrator import StartupOrchestrator
+from widgets.splash_screen import SplashScreen
 
 # Other application imports
 from views.main_window import MainWindow
 from views.login_dialog import LoginDialog
-from controllers.user_controller import UserController
 
-def close_database(db_manager):
+startup_profiler.mark("imports")
+
+def close_database(app_context):
     """Đóng kết nối cơ sở dữ liệu an toàn"""
+    if app_context is not None:
+        app_context.close()
+
+def check_dependencies(config_manager):
+    """
+    Kiểm tra các thư viện bắt buộc (chỉ tìm module, không import)
+    
+    Raises:
+        ConfigException: Khi thiếu thư viện
+    """
+    if config_manager.check_all_required_dependencies():
+        return
+    # Lấy danh sách các gói bị thiếu
+    missing_packages = []
+    for module_name, pip_package in config_manager.required_packages.items():
+        if not config_manager.check_dependency(module_name):
+            missing_packages.append(pip_package)
+            
+    # Tạo và hiển thị thông báo lỗi
+    error_msg = "Thiếu các thư viện bắt buộc: " + ", ".join(missing_packages)
+    install_cmd = f"pip install {' '.join(missing_packages)}"
+    raise ConfigException(
+        f"{error_msg}\n\nVui lòng cài đặt các thư viện trên bằng lệnh:\n{install_cmd}",
+        ErrorSeverity.CRITICAL
+    )
+
+def check_database_file(db_path):
+    """
+    Kiểm tra nhanh file cơ sở dữ liệu trên kết nối riêng (chạy nền)
+    
+    Raises:
+        DatabaseException: Khi cơ sở dữ liệu bị lỗi
+    """
+    from DB.db_manager import DatabaseManager
+    if not DatabaseManager.quick_check_file(db_path):
+        raise DatabaseException(
+            "Kiểm tra tính toàn vẹn cơ sở dữ liệu thất bại", 
+            ErrorSeverity.CRITICAL
+        )
+
+def open_database(app_context):
+    """
+    Mở cơ sở dữ liệu dùng chung
+    
+    Returns:
+        DatabaseManager: Đối tượng quản lý cơ sở dữ liệu
+        
+    Raises:
+        ConfigException: Khi không import được DB.db_manager
+        DatabaseException: Khi không kết nối được cơ sở dữ liệu
+    """
     try:
-        if db_manager and hasattr(db_manager, 'close'):
-            db_manager.close()
-            logging.info("Đã đóng kết nối cơ sở dữ liệu")
-    except (AttributeError, RuntimeError, OSError) as e:
-        logging.error("Lỗi khi đóng kết nối cơ sở dữ liệu: %s", str(e))
+        return app_context.open()
+    except ImportError as e:
+        raise ConfigException(
+            f'Không thể import module DB.db_manager: {str(e)}',  
+            ErrorSeverity.CRITICAL, 
+            cause=e
+        ) from e
+    except Exception as e:
+        raise DatabaseException(
+            f'Không thể kết nối đến cơ sở dữ liệu: {str(e)}', 
+            ErrorSeverity.CRITICAL, 
+            cause=e
+        ) from e
+
+# Các bước cần hoàn thành trước khi hiển thị hộp thoại đăng nhập
+LOGIN_DEPENDENCIES = ("dependencies", "theme_apply", "user_controller")
+
+def build_startup_tasks(orchestrator, config_manager, db_path, app_context, theme_manager):
+    """
+    Khai báo các bước khởi động và phụ thuộc giữa chúng.
+    Bước luồng nền không được chạm vào widget hay kết nối chính của DatabaseManager.
+    
+    Args:
+        orchestrator (StartupOrchestrator): Bộ điều phối khởi động
+        config_manager (ConfigManager): Cấu hình
+        db_path (str): Đường dẫn cơ sở dữ liệu
+        app_context (AppContext): Dịch vụ dùng chung
+        theme_manager (ThemeManager): Quản lý theme
+    """
+    # Luồng nền
+    orchestrator.add_task("dependencies", lambda: check_dependencies(config_manager),
+                          description="Kiểm tra thư viện")
+    orchestrator.add_task("cleanup_temp", cleanup_temp_files,
+                          description="Dọn dẹp file tạm")
+    orchestrator.add_task("theme_load", theme_manager.load_stylesheet,
+                          description="Đọc giao diện")
+    orchestrator.add_task("db_check", lambda: check_database_file(db_path),
+                          description="Kiểm tra cơ sở dữ liệu")
+    # Luồng giao diện
+    orchestrator.add_task("db_open", lambda: open_database(app_context),
+                          main_thread=True, description="Mở cơ sở dữ liệu")
+    orchestrator.add_task("theme_apply",
+                          lambda: theme_manager.apply_theme(
+                              stylesheet=orchestrator.result("theme_load")),
+                          depends_on=("theme_load",), main_thread=True,
+                          description="Áp dụng giao diện")
+    orchestrator.add_task("initialize_data",
+                          lambda: initialize_all_data(app_context.db_manager),
+                          depends_on=("db_open", "db_check"), main_thread=True,
+                          description="Khởi tạo dữ liệu")
+    orchestrator.add_task("user_controller", lambda: app_context.user_controller,
+                          depends_on=("initialize_data",), main_thread=True,
+                          description="Chuẩn bị đăng nhập")
 
 def main():
     """Hàm chính khởi động ứng dụng với giao diện mới."""
-    db_manager = None
+    app_context = None
     app = None
     
     try:
@@ -35,13 +141,14 @@ def main():
         Logger.setup()
         logging.info("Đang khởi động ứng dụng...")
         
-        # Tạo ConfigManager để quản lý cấu hình và kiểm tra phụ thuộc
-        config_manager = ConfigManager()
-        logging.info("ConfigManager đã khởi tạo")
-        
-        # Kiểm tra đường dẫn cơ sở dữ liệu
-        db_path = config_manager.get_db_path()
-        logging.info("Đường dẫn cơ sở dữ liệu: %s", db_path)
+        with startup_profiler.phase("config"):
+            # Tạo ConfigManager để quản lý cấu hình và kiểm tra phụ thuộc
+            config_manager = ConfigManager()
+            logging.info("ConfigManager đã khởi tạo")
+            
+            # Kiểm tra đường dẫn cơ sở dữ liệu
+            db_path = config_manager.get_db_path()
+            logging.info("Đường dẫn cơ sở dữ liệu: %s", db_path)
         
         if not db_path:
             raise ConfigException(
@@ -49,73 +156,37 @@ def main():
                 ErrorSeverity.CRITICAL
             )
         
-        # Kiểm tra các thư viện phụ thuộc
-        if not config_manager.check_all_required_dependencies():
-            # Lấy danh sách các gói bị thiếu
-            missing_packages = []
-            for module_name, pip_package in config_manager.required_packages.items():
-                if not config_manager.check_dependency(module_name):
-                    missing_packages.append(pip_package)
-                    
-            # Tạo và hiển thị thông báo lỗi
-            error_msg = "Thiếu các thư viện bắt buộc: " + ", ".join(missing_packages)
-            install_cmd = f"pip install {' '.join(missing_packages)}"
-            raise ConfigException(
-                f"{error_msg}\n\nVui lòng cài đặt các thư viện trên bằng lệnh:\n{install_cmd}",
-                ErrorSeverity.CRITICAL
-            )
-            
         # Tạo ứng dụng
-        app = QApplication(sys.argv)
-        app.setStyle('Fusion')  # Thiết lập kiểu giao diện
+        with startup_profiler.phase("qapplication"):
+            app = QApplication(sys.argv)
+            app.setStyle('Fusion')  # Thiết lập kiểu giao diện
         
-        # Dọn dẹp file tạm từ phiên trước (nếu có)
-        cleanup_temp_files()
+        splash = SplashScreen()
+        splash.show()
         
-        # Initialize theme manager early
         theme_manager = ThemeManager(config_manager)
+        app_context = AppContext(config_manager, db_path)
         
-        # Khởi tạo quản lý cơ sở dữ liệu
+        # Các bước độc lập chạy song song; hộp thoại đăng nhập chỉ chờ các bước nó cần
+        orchestrator = StartupOrchestrator()
+        splash.attach(orchestrator)
+        build_startup_tasks(orchestrator, config_manager, db_path, app_context, theme_manager)
         try:
-            from DB.db_manager import DatabaseManager
-            db_path = config_manager.get_db_path()
-            if not db_path:
-                raise ConfigException(
-                    "Không thể xác định đường dẫn đến cơ sở dữ liệu", 
-                    ErrorSeverity.CRITICAL
-                )
-                
-            db_manager = DatabaseManager(db_path)
-            # Kiểm tra kết nối đến cơ sở dữ liệu
-            if not db_manager.check_database_integrity():
-                raise DatabaseException(
-                    "Kiểm tra tính toàn vẹn cơ sở dữ liệu thất bại", 
-                    ErrorSeverity.CRITICAL
-                )
-            
-            # Initialize application data
-            initialize_all_data(db_path)
-                
-            user_controller = UserController(db_manager)
-        except ImportError as e:
-            raise ConfigException(
-                f'Không thể import module DB.db_manager: {str(e)}',  
-                ErrorSeverity.CRITICAL, 
-                cause=e
-            ) from e
-        except Exception as e:
-            raise DatabaseException(
-                f'Không thể kết nối đến cơ sở dữ liệu: {str(e)}', 
-                ErrorSeverity.CRITICAL, 
-                cause=e
-            ) from e
-        
-        # Apply theme before creating the login dialog
-        theme_manager.apply_theme()
+            orchestrator.run_until(LOGIN_DEPENDENCIES)
+        except Exception:
+            # Đóng màn hình chờ để hộp thoại lỗi không bị che
+            splash.close()
+            raise
+        user_controller = app_context.user_controller
         
         # Hiển thị dialog đăng nhập
-        login_dialog = LoginDialog(user_controller, theme_manager)
-        login_result = login_dialog.exec()
+        with startup_profiler.phase("login_dialog"):
+            login_dialog = LoginDialog(user_controller, theme_manager)
+        login_dialog.show()
+        splash.finish(login_dialog)
+        # Thời gian người dùng nhập thông tin, tách riêng khỏi thời gian khởi động
+        with startup_profiler.phase("login_wait"):
+            login_result = login_dialog.exec()
         
         if login_result == QDialog.DialogCode.Accepted:
             # Người dùng đã đăng nhập thành công
@@ -127,43 +198,50 @@ def main():
                 )
             
             # Khởi tạo và hiển thị cửa sổ chính
-            window = MainWindow(current_user)
+            with startup_profiler.phase("main_window"):
+                window = MainWindow(current_user, app_context)
             
             # Kết nối sự kiện đóng ứng dụng với việc đóng cơ sở dữ liệu
-            app.aboutToQuit.connect(lambda: close_database(db_manager))
+            app.aboutToQuit.connect(lambda: close_database(app_context))
             
             window.show()
             
+            # Ghi báo cáo khi vòng lặp sự kiện đã vẽ xong cửa sổ lần đầu
+            def report_first_paint():
+                startup_profiler.mark("first_paint")
+                startup_profiler.write_report()
+            QTimer.singleShot(0, report_first_paint)
+            
             # Chạy vòng lặp sự kiện
             return app.exec()
         else:
             # Người dùng hủy đăng nhập
             logging.info("Người dùng đã hủy đăng nhập")
-            close_database(db_manager)
+            close_database(app_context)
             return 0
             
     except (ConfigException, DatabaseException) as e:
         # These are already properly handled custom exceptions
         ErrorHandler.handle_exception(e, True)
-        close_database(db_manager)
+        close_database(app_context)
         return 1
     except (ImportError, ModuleNotFoundError) as e:
         # Handle missing modules specifically
         error = ConfigException(f"Missing required module: {str(e)}", ErrorSeverity.CRITICAL, cause=e)
         ErrorHandler.handle_exception(error, True)
-        close_database(db_manager)
+        close_database(app_context)
         return 1
     except (OSError, IOError) as e:
         # Handle file system and I/O errors
         error = ConfigException(f"File system error: {str(e)}", ErrorSeverity.CRITICAL, cause=e)
         ErrorHandler.handle_exception(error, True)
-        close_database(db_manager)
+        close_database(app_context)
         return 1
     except Exception as e:  # pylint: disable=broad-exception-caught
 
         logging.critical("Unexpected error occurred - this should be investigated: %s", str(e), exc_info=True)
         ErrorHandler.handle_exception(e, True)
-        close_database(db_manager)
+        close_database(app_context)
         return 1
     finally:
         # Đảm bảo dọn dẹp tài nguyên ngay cả khi có lỗi
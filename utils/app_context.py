@@ -0,0 +1,125 @@
+"""
+Module chứa bộ chứa dịch vụ (service container) của ứng dụng
+"""
+import logging
+from utils.config_manager import ConfigManager
+from utils.async_bridge import shutdown_executor
+from utils.change_bus import get_change_bus
+
+
+class AppContext:
+    """
+    Bộ chứa dịch vụ dùng chung cho toàn ứng dụng.
+
+    Sở hữu một ConfigManager, một DatabaseManager (kèm pool kết nối cho các
+    luồng nền) và một bộ controller. main.py tạo một AppContext duy nhất và
+    truyền cho hộp thoại đăng nhập và MainWindow, thay vì mỗi nơi tự mở cơ sở
+    dữ liệu và tự tạo controller.
+
+    Vòng đời: open() -> dùng các thuộc tính -> close().
+    """
+
+    def __init__(self, config_manager=None, db_path=None):
+        """
+        Khởi tạo bộ chứa dịch vụ (chưa mở cơ sở dữ liệu)
+
+        Args:
+            config_manager (ConfigManager, optional): Cấu hình, mặc định tạo mới
+            db_path (str, optional): Đường dẫn cơ sở dữ liệu, mặc định lấy từ cấu hình
+        """
+        self.config_manager = config_manager or ConfigManager()
+        self.db_path = db_path
+        self._db_manager = None
+        self._controllers = {}
+
+    @property
+    def is_open(self):
+        """True nếu cơ sở dữ liệu đang mở."""
+        return self._db_manager is not None
+
+    def open(self):
+        """
+        Mở cơ sở dữ liệu (chỉ một lần).
+
+        Returns:
+            DatabaseManager: Đối tượng quản lý cơ sở dữ liệu dùng chung
+        """
+        if self._db_manager is None:
+            from DB.db_manager import DatabaseManager
+            if self.db_path is None:
+                self.db_path = self.config_manager.get_db_path()
+            self._db_manager = DatabaseManager(self.db_path, config_manager=self.config_manager)
+            # Tạo kênh sự kiện thay đổi trên luồng giao diện trước khi controller dùng tới
+            get_change_bus()
+            logging.info("AppContext đã mở cơ sở dữ liệu: %s", self.db_path)
+        return self._db_manager
+
+    def close(self):
+        """Dừng các truy vấn nền và đóng cơ sở dữ liệu. Gọi nhiều lần không gây lỗi."""
+        # Dừng các truy vấn bất đồng bộ trước khi đóng các kết nối của chúng
+        shutdown_executor()
+        if self._db_manager is not None:
+            try:
+                self._db_manager.close()
+                logging.info("Đã đóng kết nối cơ sở dữ liệu")
+            except (AttributeError, RuntimeError, OSError) as e:
+                logging.error("Lỗi khi đóng kết nối cơ sở dữ liệu: %s", str(e))
+            self._db_manager = None
+            self._controllers.clear()
+
+    @property
+    def db_manager(self):
+        """DatabaseManager dùng chung (mở nếu chưa mở)."""
+        return self.open()
+
+    def _get_controller(self, name, controller_class):
+        """
+        Lấy controller dùng chung, tạo khi được dùng lần đầu.
+
+        Args:
+            name (str): Khóa của controller
+            controller_class (type): Lớp controller, khởi tạo với db_manager
+
+        Returns:
+            object: Thể hiện controller dùng chung
+        """
+        controller = self._controllers.get(name)
+        if controller is None:
+            controller = controller_class(self.db_manager)
+            self._controllers[name] = controller
+        return controller
+
+    @property
+    def user_controller(self):
+        """UserController dùng chung."""
+        from controllers.user_controller import UserController
+        return self._get_controller("user", UserController)
+
+    @property
+    def student_controller(self):
+        """StudentController dùng chung."""
+        from controllers.student_controller import StudentController
+        return self._get_controller("student", StudentController)
+
+    @property
+    def course_controller(self):
+        """CourseController dùng chung."""
+        from controllers.course_controller import CourseController
+        return self._get_controller("course", CourseController)
+
+    @property
+    def enrollment_controller(self):
+        """EnrollmentController dùng chung."""
+        from controllers.enrollment_controller import EnrollmentController
+        return self._get_controller("enrollment", EnrollmentController)
+
+    @property
+    def change_bus(self):
+        """Kênh sự kiện thay đổi dữ liệu dùng chung."""
+        return get_change_bus()
+
+    @property
+    def report_controller(self):
+        """ReportController dùng chung."""
+        from controllers.report_controller import ReportController
+        return self._get_controller("report", ReportController)
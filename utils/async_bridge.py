@@ -0,0 +1,168 @@
+"""
+Cầu nối asyncio cho các controller.
+
+Các controller vẫn đồng bộ; phần bất đồng bộ chỉ là lớp mỏng chạy các hàm đó
+trên một ThreadPoolExecutor có giới hạn số luồng. Mỗi luồng của executor giữ
+kết nối SQLite riêng (xem DatabaseManager / ConnectionPool), nên có thể chạy
+song song nhiều truy vấn độc lập, ví dụ:
+
+    stats, top = await asyncio.gather(
+        report_controller.aget_student_course_statistics(),
+        report_controller.aget_top_courses_by_enrollment(5),
+    )
+
+Script không có giao diện chỉ cần asyncio.run(...). Trong ứng dụng Qt, dùng
+AsyncBridge để chạy coroutine trên vòng lặp asyncio ở luồng riêng và nhận kết
+quả trên luồng giao diện.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Số luồng tối đa cho các truy vấn chạy bất đồng bộ
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Lấy executor dùng chung cho các truy vấn cơ sở dữ liệu, tạo mới nếu chưa có.
+
+    Args:
+        max_workers (int): Số luồng tối đa (chỉ có tác dụng khi tạo mới)
+
+    Returns:
+        ThreadPoolExecutor: Executor dùng chung
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-async")
+            logging.info("Khởi tạo executor bất đồng bộ với %d luồng", max_workers)
+        return _executor
+
+
+def shutdown_executor(wait=True):
+    """
+    Dừng executor dùng chung (gọi khi đóng ứng dụng).
+
+    Các công việc chưa bắt đầu bị hủy; công việc đang chạy được chờ nếu wait=True.
+
+    Args:
+        wait (bool): Chờ các công việc đang chạy hoàn thành
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Chạy hàm đồng bộ trên executor dùng chung và chờ kết quả.
+
+    Args:
+        func (callable): Hàm đồng bộ cần chạy
+        *args, **kwargs: Tham số cho hàm
+
+    Returns:
+        Kết quả của func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+class AsyncControllerMixin:
+    """
+    Mixin cung cấp các phương thức aget_* cho controller.
+
+    Mỗi phương thức aget_x(...) là phiên bản awaitable của get_x(...), chạy trên
+    executor dùng chung thay vì luồng hiện tại.
+    """
+
+    async def _run_async(self, func, *args, **kwargs):
+        """
+        Chạy một phương thức đồng bộ của controller trên executor.
+
+        Args:
+            func (callable): Phương thức đồng bộ
+            *args, **kwargs: Tham số cho phương thức
+
+        Returns:
+            Kết quả của phương thức
+        """
+        return await run_blocking(func, *args, **kwargs)
+
+
+class AsyncBridge(QObject):
+    """
+    Chạy coroutine trên một vòng lặp asyncio ở luồng riêng và trả kết quả
+    về luồng giao diện qua tín hiệu Qt (giống cách qasync nối hai vòng lặp,
+    nhưng không thay thế vòng lặp sự kiện của Qt).
+    """
+    # (future, on_result, on_error) - dùng nội bộ để chuyển về luồng giao diện
+    _futureDone = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None):
+        """
+        Khởi tạo cầu nối và khởi động vòng lặp asyncio
+
+        Args:
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="asyncio-bridge", daemon=True)
+        self._futureDone.connect(self._deliver)
+        self._thread.start()
+
+    @property
+    def loop(self):
+        """Vòng lặp asyncio chạy trên luồng riêng."""
+        return self._loop
+
+    def _run_loop(self):
+        """Chạy vòng lặp asyncio cho tới khi bị dừng."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        self._loop.close()
+
+    def submit(self, coro, on_result=None, on_error=None):
+        """
+        Chạy coroutine trên vòng lặp asyncio.
+
+        Args:
+            coro (coroutine): Coroutine cần chạy
+            on_result (callable, optional): Gọi trên luồng giao diện với kết quả
+            on_error (callable, optional): Gọi trên luồng giao diện với ngoại lệ
+
+        Returns:
+            concurrent.futures.Future: Future của coroutine (có thể cancel())
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        future.add_done_callback(lambda f: self._futureDone.emit(f, on_result, on_error))
+        return future
+
+    def _deliver(self, future, on_result, on_error):
+        """Gọi callback tương ứng trên luồng giao diện."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error("Lỗi trong tác vụ bất đồng bộ: %s", error)
+            if on_error is not None:
+                on_error(error)
+        elif on_result is not None:
+            on_result(future.result())
+
+    def stop(self):
+        """Dừng vòng lặp asyncio và chờ luồng kết thúc."""
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
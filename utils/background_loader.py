@@ -0,0 +1,152 @@
+import logging
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+from utils.background_task import BackgroundTask
+from utils.cancellation import CancellationToken
+from utils.error_handler import QueryCancelledException, QueryTimeoutException
+
+
+class BackgroundLoader(QObject):
+    """
+    Bộ tải dữ liệu nền cho các view.
+
+    Mỗi lần tải gắn với một khóa (ví dụ "students", "grades"). Khi cùng một khóa
+    được tải lại, lần tải cũ bị hủy và kết quả của nó (nếu vẫn về) sẽ bị bỏ qua,
+    nên giao diện chỉ nhận kết quả của lần tải mới nhất. Hàm tải chạy trên
+    QThreadPool; các truy vấn trong đó đi qua kết nối riêng của luồng
+    (DatabaseManager.read_query / execute_query khi gọi ngoài luồng giao diện).
+    """
+    # (khóa)
+    loadStarted = pyqtSignal(str)
+    # (khóa, kết quả)
+    loadFinished = pyqtSignal(str, object)
+    # (khóa, ngoại lệ)
+    loadFailed = pyqtSignal(str, object)
+    # (khóa) khi lần tải bị hủy qua cancel() (không phát khi bị lần tải mới thay thế)
+    loadCancelled = pyqtSignal(str)
+
+    def __init__(self, parent=None, thread_pool=None):
+        """
+        Khởi tạo bộ tải dữ liệu nền
+
+        Args:
+            parent (QObject): Đối tượng cha
+            thread_pool (QThreadPool, optional): Pool luồng, mặc định dùng pool toàn cục
+        """
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._generation = 0
+        # khóa -> task mới nhất của khóa đó
+        self._active = {}
+        # thế hệ -> (khóa, task, on_result, on_error); giữ task sống tới khi xong
+        self._requests = {}
+
+    def load(self, key, func, *args, on_result=None, on_error=None, cancellable=False,
+             timeout=None, **kwargs):
+        """
+        Chạy func trên luồng nền, thay thế lần tải đang chạy của cùng khóa.
+
+        Args:
+            key (str): Khóa nhận diện loại dữ liệu
+            func (callable): Hàm tải dữ liệu (không được chạm vào widget)
+            *args: Tham số vị trí cho func
+            on_result (callable, optional): Gọi trên luồng giao diện với kết quả
+            on_error (callable, optional): Gọi trên luồng giao diện với ngoại lệ
+            cancellable (bool): Truyền cancel_token cho func để có thể hủy giữa chừng
+            timeout (float, optional): Thời hạn (giây) của cancel_token; quá hạn thì
+                truy vấn bị dừng và on_error nhận QueryTimeoutException
+            **kwargs: Tham số từ khóa cho func
+
+        Returns:
+            int: Mã thế hệ của lần tải
+        """
+        self._cancel_key(key)
+
+        self._generation += 1
+        cancel_token = CancellationToken(timeout if cancellable else None)
+        if cancellable:
+            kwargs["cancel_token"] = cancel_token
+
+        task = BackgroundTask(func, args, kwargs, generation=self._generation,
+                              cancel_token=cancel_token)
+        task.setAutoDelete(False)
+        task.signals.finished.connect(self._on_task_finished)
+        task.signals.failed.connect(self._on_task_failed)
+
+        self._active[key] = task
+        self._requests[task.generation] = (key, task, on_result, on_error)
+        self.loadStarted.emit(key)
+        self.thread_pool.start(task)
+        return task.generation
+
+    def is_loading(self, key):
+        """
+        Kiểm tra khóa có đang được tải không
+
+        Args:
+            key (str): Khóa cần kiểm tra
+
+        Returns:
+            bool: True nếu đang tải
+        """
+        return key in self._active
+
+    def cancel(self, key=None):
+        """
+        Hủy lần tải đang chạy.
+
+        Args:
+            key (str, optional): Khóa cần hủy, None để hủy tất cả
+        """
+        keys = [key] if key is not None else list(self._active)
+        for k in keys:
+            if self._cancel_key(k):
+                self.loadCancelled.emit(k)
+
+    def _cancel_key(self, key):
+        """
+        Hủy task hiện tại của khóa; kết quả của nó sẽ bị bỏ qua.
+
+        Returns:
+            bool: True nếu khóa đang được tải
+        """
+        task = self._active.pop(key, None)
+        if task is not None:
+            task.cancel()
+        return task is not None
+
+    def _take_request(self, generation):
+        """
+        Lấy thông tin yêu cầu đã xong và kiểm tra nó còn hiệu lực không.
+
+        Returns:
+            tuple: (khóa, on_result, on_error) hoặc None nếu kết quả đã lỗi thời
+        """
+        key, task, on_result, on_error = self._requests.pop(generation, (None, None, None, None))
+        if key is None or self._active.get(key) is not task:
+            logging.debug("Bỏ qua kết quả tải cũ (thế hệ %d)", generation)
+            return None
+        del self._active[key]
+        return key, on_result, on_error
+
+    def _on_task_finished(self, generation, result):
+        """Nhận kết quả từ luồng nền."""
+        request = self._take_request(generation)
+        if request is None:
+            return
+        key, on_result, _ = request
+        if on_result is not None:
+            on_result(result)
+        self.loadFinished.emit(key, result)
+
+    def _on_task_failed(self, generation, error):
+        """Nhận lỗi từ luồng nền."""
+        request = self._take_request(generation)
+        # Truy vấn bị hủy thì bỏ qua, riêng truy vấn quá thời hạn vẫn báo lỗi
+        if request is None or (isinstance(error, QueryCancelledException)
+                               and not isinstance(error, QueryTimeoutException)):
+            return
+        key, _, on_error = request
+        logging.error("Lỗi khi tải dữ liệu '%s': %s", key, error)
+        if on_error is not None:
+            on_error(error)
+        self.loadFailed.emit(key, error)
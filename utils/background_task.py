@@ -0,0 +1,63 @@
+import logging
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class TaskSignals(QObject):
+    """
+    Các tín hiệu của một công việc chạy nền.
+    Đối tượng được tạo trên luồng giao diện nên các slot kết nối vào
+    sẽ được gọi trên luồng giao diện.
+    """
+    # (mã thế hệ, kết quả)
+    finished = pyqtSignal(int, object)
+    # (mã thế hệ, ngoại lệ)
+    failed = pyqtSignal(int, object)
+
+
+class BackgroundTask(QRunnable):
+    """
+    Công việc chạy trên QThreadPool, trả kết quả về qua TaskSignals.
+    Mã thế hệ (generation) đi kèm kết quả để bên nhận bỏ qua kết quả cũ.
+    """
+
+    def __init__(self, func, args=(), kwargs=None, generation=0, cancel_token=None):
+        """
+        Khởi tạo công việc chạy nền
+
+        Args:
+            func (callable): Hàm cần chạy trên luồng nền
+            args (tuple): Tham số vị trí cho func
+            kwargs (dict, optional): Tham số từ khóa cho func
+            generation (int): Mã thế hệ của yêu cầu
+            cancel_token (CancellationToken, optional): Cờ hủy gắn với công việc
+        """
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.generation = generation
+        self.cancel_token = cancel_token
+        self.signals = TaskSignals()
+
+    def cancel(self):
+        """Yêu cầu hủy công việc (nếu có cancel_token)."""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+
+    def run(self):
+        """Chạy hàm trên luồng nền và phát tín hiệu kết quả."""
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._emit("failed", e)
+        else:
+            self._emit("finished", result)
+        logging.debug("Hoàn thành công việc nền thế hệ %d", self.generation)
+
+    def _emit(self, signal_name, value):
+        """Phát tín hiệu kết quả, bỏ qua nếu đối tượng tín hiệu đã bị hủy (ví dụ khi đóng ứng dụng)."""
+        try:
+            getattr(self.signals, signal_name).emit(self.generation, value)
+        except RuntimeError:
+            logging.debug("Bỏ qua kết quả của công việc nền thế hệ %d: đối tượng nhận đã bị hủy",
+                          self.generation)
@@ -0,0 +1,107 @@
+import threading
+import time
+from utils.error_handler import QueryCancelledException, QueryTimeoutException
+
+
+class CancellationToken:
+    """
+    Cờ hủy dùng chung giữa luồng giao diện và luồng chạy nền.
+    Luồng giao diện gọi cancel(), công việc chạy nền kiểm tra is_cancelled
+    (hoặc gọi raise_if_cancelled) để dừng sớm.
+
+    Token có thể kèm thời hạn (timeout): quá thời hạn, token được coi như đã
+    bị hủy và raise_if_cancelled ném QueryTimeoutException.
+    """
+
+    def __init__(self, timeout=None):
+        """
+        Khởi tạo cờ hủy
+
+        Args:
+            timeout (float, optional): Thời gian tối đa (giây) tính từ lúc tạo, None nếu không giới hạn
+        """
+        self._event = threading.Event()
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self._deadline = time.monotonic() + self.timeout if self.timeout else None
+        self._lock = threading.Lock()
+        # Hàm được gọi ngay khi hủy (ví dụ Connection.interrupt của truy vấn đang chạy)
+        self._callbacks = []
+
+    def cancel(self):
+        """Yêu cầu hủy công việc đang chạy."""
+        with self._lock:
+            self._event.set()
+            callbacks = list(self._callbacks)
+            # Gọi trong khóa để remove_callback() trả về thì callback không còn bị gọi nữa
+            for callback in callbacks:
+                callback()
+
+    def add_callback(self, callback):
+        """
+        Đăng ký hàm được gọi ngay khi token bị hủy (gọi luôn nếu đã hủy).
+
+        Args:
+            callback (callable): Hàm không tham số, phải an toàn khi gọi từ luồng khác
+        """
+        with self._lock:
+            if self._event.is_set():
+                callback()
+            else:
+                self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """
+        Bỏ đăng ký hàm đã thêm bằng add_callback.
+
+        Args:
+            callback (callable): Hàm đã đăng ký
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def is_cancelled(self):
+        """
+        Kiểm tra công việc đã bị yêu cầu hủy hoặc đã quá thời hạn chưa
+
+        Returns:
+            bool: True nếu đã bị hủy hoặc quá thời hạn
+        """
+        return self._event.is_set() or self.timed_out
+
+    @property
+    def timed_out(self):
+        """
+        Kiểm tra token đã quá thời hạn chưa (người dùng chưa hủy)
+
+        Returns:
+            bool: True nếu đã quá thời hạn
+        """
+        return (self._deadline is not None and not self._event.is_set()
+                and time.monotonic() >= self._deadline)
+
+    @property
+    def remaining(self):
+        """
+        Thời gian còn lại trước thời hạn
+
+        Returns:
+            float: Số giây còn lại (không âm), None nếu không giới hạn
+        """
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def raise_if_cancelled(self):
+        """
+        Ném ngoại lệ nếu công việc đã bị hủy hoặc đã quá thời hạn.
+
+        Raises:
+            QueryTimeoutException: Khi token đã quá thời hạn
+            QueryCancelledException: Khi token đã bị hủy
+        """
+        if self.timed_out:
+            raise QueryTimeoutException(self.timeout)
+        if self.is_cancelled:
+            raise QueryCancelledException()
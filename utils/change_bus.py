@@ -0,0 +1,228 @@
+"""
+Module phát thông báo thay đổi dữ liệu giữa controller và các view.
+
+Controller phát một ChangeEvent sau mỗi lần thêm/sửa/xóa thành công; các view
+nhận sự kiện và chỉ cập nhật dòng bị ảnh hưởng thay vì tải lại toàn bộ dữ liệu,
+còn dashboard và báo cáo chỉ đánh dấu phần phụ thuộc vào dữ liệu đó là cũ.
+"""
+import logging
+import threading
+from enum import Enum, auto
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Tên đối tượng dữ liệu trùng với tên bảng
+ENTITY_STUDENT = "sinh_vien"
+ENTITY_COURSE = "khoa_hoc"
+ENTITY_ENROLLMENT = "ghi_danh"
+ENTITY_ACTIVITY_LOG = "nhat_ky_hoat_dong"
+
+
+class ChangeOperation(Enum):
+    """Loại thay đổi"""
+    INSERT = auto()
+    UPDATE = auto()
+    DELETE = auto()
+
+
+class ChangeEvent:
+    """Mô tả một thay đổi: đối tượng, khóa, loại thay đổi và các trường đã đổi."""
+
+    __slots__ = ("entity", "key", "operation", "changed_fields")
+
+    def __init__(self, entity, key, operation, changed_fields=None):
+        """
+        Khởi tạo sự kiện thay đổi
+
+        Args:
+            entity (str): Đối tượng dữ liệu (ENTITY_STUDENT, ENTITY_COURSE, ENTITY_ENROLLMENT)
+            key: Khóa chính của bản ghi bị thay đổi, None nếu là thay đổi hàng loạt
+                (nhiều bản ghi, ví dụ nhập dữ liệu từ file)
+            operation (ChangeOperation): Loại thay đổi
+            changed_fields (iterable, optional): Các cột đã đổi (chỉ với UPDATE);
+                None nghĩa là không rõ, coi như mọi cột đều có thể đã đổi
+        """
+        self.entity = entity
+        self.key = key
+        self.operation = operation
+        self.changed_fields = frozenset(changed_fields) if changed_fields is not None else None
+
+    def touches(self, fields):
+        """
+        Kiểm tra thay đổi có ảnh hưởng tới các cột cho trước không.
+        Thêm và xóa luôn ảnh hưởng (số lượng bản ghi thay đổi).
+
+        Args:
+            fields (iterable): Các cột cần kiểm tra
+
+        Returns:
+            bool: True nếu có ảnh hưởng
+        """
+        if self.operation is not ChangeOperation.UPDATE or self.changed_fields is None:
+            return True
+        return not self.changed_fields.isdisjoint(fields)
+
+    def merge(self, later):
+        """
+        Gộp sự kiện này với một sự kiện sau đó của cùng bản ghi.
+
+        Args:
+            later (ChangeEvent): Sự kiện xảy ra sau
+
+        Returns:
+            ChangeEvent: Sự kiện tương đương với cả hai thay đổi
+        """
+        if later.operation is ChangeOperation.DELETE:
+            return later
+        if self.operation is ChangeOperation.INSERT:
+            return self
+        if self.operation is ChangeOperation.DELETE:
+            # Xóa rồi thêm lại: coi như mọi cột đều đã đổi
+            return ChangeEvent(self.entity, self.key, ChangeOperation.UPDATE)
+        if self.changed_fields is None or later.changed_fields is None:
+            return ChangeEvent(self.entity, self.key, ChangeOperation.UPDATE)
+        return ChangeEvent(self.entity, self.key, ChangeOperation.UPDATE,
+                           self.changed_fields | later.changed_fields)
+
+    def __repr__(self):
+        fields = sorted(self.changed_fields) if self.changed_fields is not None else None
+        return f"ChangeEvent({self.entity}, {self.key!r}, {self.operation.name}, {fields})"
+
+
+class ChangeBus(QObject):
+    """
+    Kênh phát sự kiện thay đổi dùng chung.
+
+    publish() có thể gọi từ bất kỳ luồng nào (ví dụ API bất đồng bộ của
+    controller); Qt tự chuyển tín hiệu về luồng của đối tượng nhận.
+    """
+    # ChangeEvent
+    changed = pyqtSignal(object)
+
+    def publish(self, event):
+        """
+        Phát một sự kiện thay đổi
+
+        Args:
+            event (ChangeEvent): Sự kiện cần phát
+        """
+        logging.debug("Phát sự kiện thay đổi: %s", event)
+        self.changed.emit(event)
+
+
+class ChangeCollector(QObject):
+    """
+    Gom các sự kiện của những đối tượng quan tâm và phát thành một lô sau một
+    khoảng trễ ngắn, để nhiều thay đổi liên tiếp (ví dụ nhập dữ liệu) chỉ làm
+    giao diện cập nhật một lần. Các sự kiện của cùng một bản ghi được gộp lại.
+    """
+    # list[ChangeEvent]
+    changesReady = pyqtSignal(object)
+
+    DEFAULT_DELAY_MS = 50
+
+    def __init__(self, entities, delay_ms=DEFAULT_DELAY_MS, bus=None, parent=None):
+        """
+        Khởi tạo bộ gom sự kiện
+
+        Args:
+            entities (iterable): Các đối tượng dữ liệu cần theo dõi
+            delay_ms (int): Thời gian chờ gom sự kiện (ms)
+            bus (ChangeBus, optional): Kênh sự kiện, mặc định dùng kênh chung
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self.entities = frozenset(entities)
+        # (đối tượng, khóa) -> sự kiện đã gộp
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+        (bus or get_change_bus()).changed.connect(self._on_changed)
+
+    def _on_changed(self, event):
+        """Nhận một sự kiện từ kênh chung."""
+        if event.entity not in self.entities:
+            return
+        pending_key = (event.entity, event.key)
+        previous = self._pending.get(pending_key)
+        self._pending[pending_key] = previous.merge(event) if previous else event
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Phát ngay các sự kiện đang chờ."""
+        self._timer.stop()
+        if not self._pending:
+            return
+        events = list(self._pending.values())
+        self._pending.clear()
+        self.changesReady.emit(events)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_change_bus():
+    """
+    Lấy kênh sự kiện dùng chung, tạo mới nếu chưa có.
+    Nên gọi lần đầu trên luồng giao diện (AppContext.open() làm việc này).
+
+    Returns:
+        ChangeBus: Kênh sự kiện dùng chung
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = ChangeBus()
+        return _bus
+
+
+def publish_change(entity, key, operation, changed_fields=None):
+    """
+    Tạo và phát một sự kiện thay đổi trên kênh dùng chung.
+
+    Args:
+        entity (str): Đối tượng dữ liệu
+        key: Khóa chính của bản ghi
+        operation (ChangeOperation): Loại thay đổi
+        changed_fields (iterable, optional): Các cột đã đổi
+    """
+    get_change_bus().publish(ChangeEvent(entity, key, operation, changed_fields))
+
+
+# Số bản ghi tối đa được phát thành từng sự kiện; nhiều hơn thì phát một sự kiện hàng loạt
+BULK_EVENT_LIMIT = 200
+
+
+def publish_changes(entity, keys, operation):
+    """
+    Phát sự kiện cho nhiều bản ghi cùng loại thay đổi (ví dụ sau khi nhập dữ liệu).
+    Quá BULK_EVENT_LIMIT bản ghi thì chỉ phát một sự kiện với key None, bên nhận
+    tải lại toàn bộ thay vì cập nhật từng dòng.
+
+    Args:
+        entity (str): Đối tượng dữ liệu
+        keys (list): Khóa chính của các bản ghi
+        operation (ChangeOperation): Loại thay đổi
+    """
+    if len(keys) > BULK_EVENT_LIMIT:
+        publish_change(entity, None, operation)
+        return
+    for key in keys:
+        publish_change(entity, key, operation)
+
+
+def diff_fields(old_data, new_data):
+    """
+    Tìm các cột có giá trị khác nhau giữa hai bản ghi.
+
+    Args:
+        old_data (dict): Bản ghi cũ
+        new_data (dict): Bản ghi mới
+
+    Returns:
+        set: Tên các cột đã đổi
+    """
+    return {field for field, value in new_data.items() if old_data.get(field) != value}
@@ -0,0 +1,380 @@
+"""
+Module mô tả biểu đồ bằng dữ liệu (ChartSpec) dùng chung cho các bộ vẽ biểu đồ,
+kèm phần vẽ bằng matplotlib cho ChartWidget: vẽ lên Figure, cập nhật dữ liệu
+cho các đối tượng đã vẽ và vẽ trước ra ảnh (không cần widget) trên luồng nền.
+
+matplotlib chỉ được import khi thực sự vẽ bằng matplotlib.
+"""
+import hashlib
+import importlib.util
+import logging
+import threading
+from collections import OrderedDict
+from PyQt6.QtGui import QImage
+
+HAS_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
+
+CHART_BAR = "bar"
+CHART_PIE = "pie"
+CHART_LINE = "line"
+CHART_HISTOGRAM = "histogram"
+
+# Biểu đồ đường có nhiều điểm hơn số này chỉ hiện một phần nhãn trục x, không ghi giá trị
+MAX_ANNOTATED_POINTS = 16
+# Số nhãn trục x tối đa của biểu đồ đường nhiều điểm khi vẽ bằng matplotlib
+MAX_LINE_TICKS = 6
+
+# Bộ vẽ biểu đồ (chọn cho từng biểu đồ trong mục "charts" của cấu hình)
+ENGINE_NATIVE = "native"
+ENGINE_MATPLOTLIB = "matplotlib"
+DEFAULT_ENGINE = ENGINE_NATIVE
+
+DEFAULT_COLORS = ['#2979ff', '#00c853', '#ff6d00', '#d50000', '#6200ea', '#2962ff', '#00bfa5']
+
+
+class ChartSpec:
+    """
+    Mô tả đầy đủ một biểu đồ (loại + dữ liệu + nhãn). Hai ChartSpec có cùng
+    fingerprint sẽ cho ra cùng một hình.
+    """
+
+    __slots__ = ("kind", "labels", "values", "title", "xlabel", "ylabel", "colors",
+                 "empty_message", "value_offset", "grid_axis", "_fingerprint")
+
+    def __init__(self, kind, labels, values, title, xlabel="", ylabel="", colors=None,
+                 empty_message="Không có dữ liệu", value_offset=0, grid_axis="both"):
+        """
+        Khởi tạo mô tả biểu đồ
+
+        Args:
+            kind (str): CHART_BAR, CHART_PIE, CHART_LINE hoặc CHART_HISTOGRAM
+            labels (iterable): Nhãn (trục x hoặc các phần của biểu đồ tròn)
+            values (iterable): Giá trị tương ứng
+            title (str): Tiêu đề biểu đồ
+            xlabel (str): Nhãn trục x
+            ylabel (str): Nhãn trục y
+            colors (str | iterable, optional): Một màu hoặc danh sách màu
+            empty_message (str): Thông báo khi không có dữ liệu
+            value_offset (float): Khoảng cách nhãn giá trị phía trên cột
+            grid_axis (str): Trục hiển thị lưới ('both', 'x', 'y')
+        """
+        self.kind = kind
+        self.labels = tuple(labels or ())
+        self.values = tuple(values or ())
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.colors = tuple(colors) if isinstance(colors, (list, tuple)) else colors
+        self.empty_message = empty_message
+        self.value_offset = value_offset
+        self.grid_axis = grid_axis
+        self._fingerprint = None
+
+    @property
+    def is_empty(self):
+        """True nếu không có dữ liệu để vẽ."""
+        if not self.labels or not self.values:
+            return True
+        return self.kind == CHART_PIE and sum(self.values) == 0
+
+    def layout_key(self):
+        """
+        Phần của mô tả quyết định bố cục biểu đồ (mọi thứ trừ giá trị).
+        Hai biểu đồ cùng layout_key có thể cập nhật cho nhau mà không vẽ lại trục.
+        """
+        return (self.kind, self.labels, self.title, self.xlabel, self.ylabel, self.colors,
+                self.empty_message, self.value_offset, self.grid_axis, self.is_empty)
+
+    @property
+    def fingerprint(self):
+        """Mã băm của toàn bộ dữ liệu biểu đồ (tính một lần)."""
+        if self._fingerprint is None:
+            content = repr((self.layout_key(), self.values)).encode("utf-8")
+            self._fingerprint = hashlib.sha1(content).hexdigest()
+        return self._fingerprint
+
+
+def histogram_spec(samples, bins=10, value_range=None, title="", xlabel="", ylabel="",
+                   color=None):
+    """
+    Tạo mô tả biểu đồ tần suất từ các giá trị rời rạc.
+
+    Args:
+        samples (iterable): Các giá trị (None bị bỏ qua)
+        bins (int): Số khoảng chia
+        value_range (tuple, optional): (nhỏ nhất, lớn nhất), mặc định theo dữ liệu
+        title (str): Tiêu đề biểu đồ
+        xlabel (str): Nhãn trục x
+        ylabel (str): Nhãn trục y
+        color (str, optional): Màu các cột
+
+    Returns:
+        ChartSpec: Mô tả biểu đồ với nhãn "a-b" và số lượng của mỗi khoảng
+    """
+    samples = [value for value in samples if value is not None]
+    if value_range is None:
+        value_range = (min(samples), max(samples)) if samples else (0, 1)
+    low, high = value_range
+    width = (high - low) / bins if high > low else 1
+    counts = [0] * bins
+    for value in samples:
+        if low <= value <= high:
+            # Giá trị bằng cận trên thuộc khoảng cuối
+            counts[min(int((value - low) / width), bins - 1)] += 1
+    labels = [f"{low + i * width:g}-{low + (i + 1) * width:g}" for i in range(bins)]
+    return ChartSpec(CHART_HISTOGRAM, labels, counts, title, xlabel, ylabel, color,
+                     grid_axis='y')
+
+
+def grade_distribution_spec(grade_data, title="Phân phối điểm số"):
+    """Mô tả biểu đồ phân phối điểm số (màu từ đỏ đến xanh theo khoảng điểm)."""
+    grade_data = grade_data or {}
+    return ChartSpec(CHART_BAR, grade_data.keys(), grade_data.values(), title,
+                     "Khoảng điểm", "Số lượng sinh viên",
+                     ['#d50000', '#ff6d00', '#ffeb3b', '#8bc34a', '#00c853'],
+                     empty_message="Không có dữ liệu điểm số", value_offset=0.1, grid_axis='y')
+
+
+def gender_distribution_spec(gender_data, title="Tỷ lệ giới tính"):
+    """Mô tả biểu đồ tỷ lệ giới tính (Nam, Nữ, Khác)."""
+    gender_data = gender_data or {}
+    return ChartSpec(CHART_PIE, gender_data.keys(), gender_data.values(), title,
+                     colors=['#2979ff', '#f06292', '#9c27b0'],
+                     empty_message="Không có dữ liệu về giới tính")
+
+
+def draw_chart(figure, spec):
+    """
+    Xóa figure và vẽ biểu đồ theo mô tả.
+
+    Args:
+        figure (Figure): Figure cần vẽ
+        spec (ChartSpec): Mô tả biểu đồ
+
+    Returns:
+        dict: Các đối tượng đã vẽ để cập nhật tại chỗ (update_chart), None nếu
+              biểu đồ không hỗ trợ cập nhật tại chỗ
+    """
+    figure.clear()
+    ax = figure.add_subplot(111)
+    if spec.is_empty:
+        ax.text(0.5, 0.5, spec.empty_message,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=12, color='gray')
+        ax.axis('off')
+        return None
+    if spec.kind == CHART_PIE:
+        _draw_pie(ax, spec)
+        return None
+    if spec.kind == CHART_LINE:
+        return _draw_line(ax, spec)
+    return _draw_bar(ax, spec)
+
+
+def _draw_bar(ax, spec):
+    """Vẽ biểu đồ cột kèm nhãn giá trị trên mỗi cột."""
+    colors = spec.colors or DEFAULT_COLORS[0]
+    if spec.kind == CHART_HISTOGRAM:
+        # Các cột liền nhau
+        bars = ax.bar(spec.labels, spec.values, width=1.0, color=colors, alpha=0.8,
+                      edgecolor='white')
+    else:
+        bars = ax.bar(spec.labels, spec.values, color=colors, alpha=0.8)
+    texts = [ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + spec.value_offset,
+                     f'{bar.get_height()}', ha='center', va='bottom')
+             for bar in bars]
+    _decorate_axes(ax, spec)
+    return {"ax": ax, "bars": list(bars), "texts": texts}
+
+
+def _draw_line(ax, spec):
+    """Vẽ biểu đồ đường kèm giá trị tại mỗi điểm (chuỗi dài chỉ hiện một phần nhãn trục x)."""
+    line, = ax.plot(spec.labels, spec.values, marker='o', linestyle='-',
+                    color=spec.colors or DEFAULT_COLORS[0])
+    texts = []
+    if len(spec.labels) <= MAX_ANNOTATED_POINTS:
+        texts = [ax.annotate(f"{y}", (x, y), textcoords="offset points", xytext=(0, 10), ha='center')
+                 for x, y in zip(spec.labels, spec.values)]
+    else:
+        step = -(-len(spec.labels) // MAX_LINE_TICKS)
+        ax.set_xticks(range(0, len(spec.labels), step), spec.labels[::step])
+    _decorate_axes(ax, spec)
+    return {"ax": ax, "line": line, "texts": texts}
+
+
+def _draw_pie(ax, spec):
+    """Vẽ biểu đồ tròn với phần trăm trên mỗi phần."""
+    pie_result = ax.pie(
+        spec.values, labels=spec.labels, autopct='%1.1f%%',
+        shadow=False, startangle=90, colors=spec.colors or DEFAULT_COLORS
+    )
+    if hasattr(pie_result, "texts"):
+        # matplotlib >= 3.11 trả về PieContainer: texts = [nhãn, phần trăm]
+        texts, autotexts = (list(pie_result.texts) + [[], []])[:2]
+    else:
+        texts = pie_result[1]
+        autotexts = pie_result[2] if len(pie_result) == 3 else []
+    for text in texts:
+        text.set_fontsize(10)
+    for autotext in autotexts:
+        autotext.set_fontsize(8)
+        autotext.set_color('white')
+    ax.set_title(spec.title)
+    # Đảm bảo biểu đồ là hình tròn
+    ax.axis('equal')
+
+
+def _decorate_axes(ax, spec):
+    """Tiêu đề, nhãn trục và lưới."""
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+    ax.grid(True, linestyle='--', alpha=0.7, axis=spec.grid_axis)
+
+
+def update_chart(artists, old_spec, new_spec):
+    """
+    Cập nhật giá trị cho các đối tượng đã vẽ thay vì vẽ lại trục
+    (chỉ khi bố cục không đổi: cùng loại, cùng nhãn, cùng tiêu đề...).
+
+    Args:
+        artists (dict): Kết quả của draw_chart cho old_spec
+        old_spec (ChartSpec): Mô tả đang hiển thị
+        new_spec (ChartSpec): Mô tả mới
+
+    Returns:
+        bool: True nếu đã cập nhật, False nếu cần vẽ lại toàn bộ
+    """
+    if not artists or old_spec is None or old_spec.layout_key() != new_spec.layout_key():
+        return False
+    ax = artists["ax"]
+    if new_spec.kind in (CHART_BAR, CHART_HISTOGRAM):
+        for bar, text, value in zip(artists["bars"], artists["texts"], new_spec.values):
+            bar.set_height(value)
+            text.set_y(value + new_spec.value_offset)
+            text.set_text(f'{value}')
+    elif new_spec.kind == CHART_LINE:
+        artists["line"].set_ydata(new_spec.values)
+        for text, x, y in zip(artists["texts"], new_spec.labels, new_spec.values):
+            text.xy = (x, y)
+            text.set_text(f"{y}")
+    else:
+        return False
+    ax.relim()
+    ax.autoscale_view()
+    return True
+
+
+def render_chart_image(spec, width, height, dpi=100, device_pixel_ratio=1.0):
+    """
+    Vẽ biểu đồ ra ảnh mà không cần widget. Dùng Figure riêng với canvas Agg
+    (không qua pyplot) nên có thể gọi từ luồng nền.
+
+    Args:
+        spec (ChartSpec): Mô tả biểu đồ
+        width (int): Chiều rộng (điểm logic)
+        height (int): Chiều cao (điểm logic)
+        dpi (int): Độ phân giải của figure
+        device_pixel_ratio (float): Tỷ lệ điểm ảnh của màn hình
+
+    Returns:
+        QImage: Ảnh biểu đồ hoặc None nếu không vẽ được
+    """
+    if not HAS_MATPLOTLIB or width <= 0 or height <= 0:
+        return None
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        scale = dpi * device_pixel_ratio
+        figure = Figure(figsize=(width / dpi, height / dpi), dpi=scale)
+        canvas = FigureCanvasAgg(figure)
+        draw_chart(figure, spec)
+        canvas.draw()
+        buffer = canvas.buffer_rgba()
+        image = QImage(bytes(buffer), buffer.shape[1], buffer.shape[0],
+                       QImage.Format.Format_RGBA8888).copy()
+        image.setDevicePixelRatio(device_pixel_ratio)
+        return image
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logging.error(f"Lỗi khi vẽ trước biểu đồ '{spec.title}': {str(e)}")
+        return None
+
+
+class ChartImageCache:
+    """
+    Bộ nhớ đệm LRU các ảnh biểu đồ đã vẽ trước, khóa theo fingerprint và kích
+    thước. An toàn khi dùng từ nhiều luồng.
+    """
+
+    def __init__(self, max_items=16):
+        """
+        Khởi tạo bộ nhớ đệm
+
+        Args:
+            max_items (int): Số ảnh tối đa được giữ
+        """
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint, size):
+        """
+        Lấy ảnh đã vẽ trước
+
+        Args:
+            fingerprint (str): ChartSpec.fingerprint
+            size (tuple): (rộng, cao, tỷ lệ điểm ảnh)
+
+        Returns:
+            QImage: Ảnh hoặc None nếu chưa có
+        """
+        with self._lock:
+            image = self._images.get((fingerprint, size))
+            if image is not None:
+                self._images.move_to_end((fingerprint, size))
+            return image
+
+    def put(self, fingerprint, size, image):
+        """
+        Lưu ảnh đã vẽ trước
+
+        Args:
+            fingerprint (str): ChartSpec.fingerprint
+            size (tuple): (rộng, cao, tỷ lệ điểm ảnh)
+            image (QImage): Ảnh biểu đồ
+        """
+        if image is None:
+            return
+        with self._lock:
+            self._images[(fingerprint, size)] = image
+            self._images.move_to_end((fingerprint, size))
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+
+    def prerender(self, spec, size):
+        """
+        Vẽ trước biểu đồ (nếu chưa có trong bộ nhớ đệm).
+
+        Args:
+            spec (ChartSpec): Mô tả biểu đồ
+            size (tuple): (rộng, cao, tỷ lệ điểm ảnh)
+
+        Returns:
+            bool: True nếu ảnh có sẵn trong bộ nhớ đệm sau khi gọi
+        """
+        if self.get(spec.fingerprint, size) is not None:
+            return True
+        width, height, ratio = size
+        image = render_chart_image(spec, width, height, device_pixel_ratio=ratio)
+        self.put(spec.fingerprint, size, image)
+        return image is not None
+
+    def clear(self):
+        """Xóa toàn bộ ảnh đã lưu."""
+        with self._lock:
+            self._images.clear()
+
+
+# Bộ nhớ đệm dùng chung cho các biểu đồ của ứng dụng
+chart_image_cache = ChartImageCache()
@@ -7,7 +7,10 @@ import configparser
 from pathlib import Path
 from dotenv import load_dotenv
 from utils.path_helper import PathHelper
-import importlib
+import importlib.util
+
+# Thời hạn mặc định (giây) của truy vấn báo cáo khi cấu hình không chỉ định
+DEFAULT_QUERY_TIMEOUT = 30
 
 class ConfigManager:
     """Quản lý cấu hình ứng dụng"""
@@ -99,6 +102,18 @@ class ConfigManager:
         if 'DEFAULT' not in self._config:
             self._config['DEFAULT'] = {}
             
+        # Cấu hình đã lưu bằng save_config (ui, charts...)
+        json_path = os.path.join(self.root_dir, 'config', 'app_config.json')
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    import json
+                    for section, values in json.load(f).items():
+                        if isinstance(values, dict):
+                            self._config.setdefault(section, {}).update(values)
+            except Exception as e:
+                logging.warning(f"Không thể đọc cấu hình {json_path}: {str(e)}")
+            
         # Add DEFAULT section to configparser
         self.config['DEFAULT'] = {}
         
@@ -133,12 +148,35 @@ class ConfigManager:
                 logging.warning(f"Could not save default database configuration: {str(e)}")
             return default_path
     
+    def get_query_timeout(self, name):
+        """
+        Lấy thời hạn của một loại truy vấn báo cáo theo mục "query_timeouts":
+        query_timeouts.<name>, nếu không có thì query_timeouts.default.
+
+        Args:
+            name (str): Loại truy vấn (ví dụ "grade_pivot", "activity_log")
+
+        Returns:
+            float: Số giây tối đa, None nếu không giới hạn (giá trị 0)
+        """
+        timeout = self.get('query_timeouts', 'default', DEFAULT_QUERY_TIMEOUT)
+        timeout = self.get('query_timeouts', name, timeout)
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            logging.warning(f"Thời hạn truy vấn '{name}' không hợp lệ: {timeout!r}, dùng mặc định")
+            timeout = DEFAULT_QUERY_TIMEOUT
+        return timeout if timeout > 0 else None
+
     def check_dependency(self, module_name):
-        """Kiểm tra xem một thư viện đã được cài đặt chưa"""
+        """
+        Kiểm tra xem một thư viện đã được cài đặt chưa.
+        Chỉ tìm module (find_spec) chứ không import, để không tốn thời gian khởi động.
+        """
         try:
-            importlib.import_module(module_name)
-            return True
-        except ImportError:
+            return importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            # Module cha không tồn tại hoặc tên module không hợp lệ
             return False
 
     def check_all_required_dependencies(self):
@@ -0,0 +1,79 @@
+"""
+Module phát hiện thay đổi dữ liệu do các kết nối khác ghi vào file cơ sở dữ liệu
+"""
+import logging
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class DataChangeWatcher(QObject):
+    """
+    Định kỳ kiểm tra xem file cơ sở dữ liệu có bị kết nối khác ghi vào không
+    (máy khác dùng chung file, luồng nền của chính ứng dụng...).
+
+    Mỗi lần kiểm tra chỉ đọc PRAGMA data_version của kết nối chính (không đọc
+    bảng nào). Chỉ khi giá trị này đổi mới đọc bảng dem_thay_doi (vài dòng) để
+    biết bảng nào đã thay đổi. Các thay đổi do chính kết nối chính ghi không làm
+    đổi data_version; chúng được báo qua ChangeBus.
+    """
+    # set[str]: tên các bảng đã thay đổi
+    tablesChanged = pyqtSignal(object)
+
+    DEFAULT_INTERVAL_MS = 10000
+
+    def __init__(self, db_manager, interval_ms=DEFAULT_INTERVAL_MS, parent=None):
+        """
+        Khởi tạo bộ theo dõi (chưa chạy cho tới khi gọi start())
+
+        Args:
+            db_manager (DatabaseManager): Quản lý cơ sở dữ liệu (dùng kết nối chính)
+            interval_ms (int): Chu kỳ kiểm tra (ms)
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self._data_version = None
+        self._table_versions = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.check_now)
+
+    @property
+    def is_active(self):
+        """True nếu đang kiểm tra định kỳ."""
+        return self._timer.isActive()
+
+    def start(self):
+        """Bắt đầu kiểm tra định kỳ; kiểm tra ngay một lần để bắt kịp thay đổi khi đang dừng."""
+        if not self._timer.isActive():
+            self._timer.start()
+            self.check_now()
+
+    def stop(self):
+        """Tạm dừng kiểm tra (ví dụ khi view bị ẩn)."""
+        self._timer.stop()
+
+    def check_now(self):
+        """
+        Kiểm tra thay đổi ngay và phát tablesChanged nếu có bảng thay đổi.
+
+        Returns:
+            set: Tên các bảng đã thay đổi kể từ lần kiểm tra trước
+        """
+        data_version = self.db_manager.get_data_version()
+        if data_version is not None and data_version == self._data_version:
+            return set()
+        self._data_version = data_version
+
+        table_versions = self.db_manager.get_table_versions()
+        if self._table_versions is None:
+            # Lần đầu: chỉ ghi nhận mốc so sánh
+            self._table_versions = table_versions
+            return set()
+
+        changed = {table for table, version in table_versions.items()
+                   if self._table_versions.get(table) != version}
+        self._table_versions = table_versions
+        if changed:
+            logging.info("Phát hiện thay đổi từ kết nối khác: %s", ", ".join(sorted(changed)))
+            self.tablesChanged.emit(changed)
+        return changed
@@ -0,0 +1,331 @@
+"""
+Module thống kê ghi danh theo thời gian.
+
+Số ghi danh, số ghi danh có điểm và tổng điểm theo từng ngày ghi danh được các
+trigger trên ghi_danh cộng/trừ dần vào bảng thong_ke_ngay; số ghi danh mới và số
+lần nhập điểm theo từng giờ được cộng vào bảng thong_ke_gio (xem
+DatabaseManager._create_enrollment_rollups). Chuỗi theo ngày/tuần/tháng/học kỳ
+được gộp từ thong_ke_ngay bằng truy vấn theo khoảng khóa chính, không quét bảng
+ghi_danh, nên có thể làm mới liên tục khi đang có nhiều ghi danh mới.
+"""
+from datetime import date, datetime, timedelta
+
+BUCKET_HOUR = "hour"
+BUCKET_DAY = "day"
+BUCKET_WEEK = "week"
+BUCKET_MONTH = "month"
+BUCKET_TERM = "term"
+
+# Số khoảng thời gian mặc định của recent()
+DEFAULT_PERIODS = {
+    BUCKET_HOUR: 48,
+    BUCKET_DAY: 30,
+    BUCKET_WEEK: 12,
+    BUCKET_MONTH: 12,
+    BUCKET_TERM: 6,
+}
+UNKNOWN_PERIOD = "Không xác định"
+
+
+def term_of(date_text):
+    """
+    Học kỳ của một ngày (YYYY-MM-DD): HK1 từ tháng 8 tới tháng 1, HK2 từ tháng 2
+    tới tháng 6, HK3 (hè) tháng 7.
+
+    Args:
+        date_text (str): Ngày
+
+    Returns:
+        str: Ví dụ "2024-2025 HK1", hoặc UNKNOWN_PERIOD nếu ngày không hợp lệ
+    """
+    if (not isinstance(date_text, str) or len(date_text) < 7 or date_text[4] != "-"
+            or not (date_text[:4] + date_text[5:7]).isdigit()):
+        return UNKNOWN_PERIOD
+    year, month = int(date_text[:4]), int(date_text[5:7])
+    if month >= 8:
+        return f"{year}-{year + 1} HK1"
+    if month == 1:
+        return f"{year - 1}-{year} HK1"
+    return f"{year - 1}-{year} HK{2 if month <= 6 else 3}"
+
+
+def term_range(term):
+    """
+    Khoảng ngày của một học kỳ (ngược với term_of).
+
+    Args:
+        term (str): Học kỳ dạng "2024-2025 HK1"
+
+    Returns:
+        tuple: (ngày đầu, ngày sau ngày cuối) dạng YYYY-MM-DD, dùng cho điều kiện
+               cột >= đầu AND cột < cuối
+
+    Raises:
+        ValueError: Khi tên học kỳ không hợp lệ
+    """
+    try:
+        years, semester = term.split(" ")
+        first_year, second_year = (int(year) for year in years.split("-"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Học kỳ không hợp lệ: {term}") from None
+    ranges = {
+        "HK1": (date(first_year, 8, 1), date(second_year, 2, 1)),
+        "HK2": (date(second_year, 2, 1), date(second_year, 7, 1)),
+        "HK3": (date(second_year, 7, 1), date(second_year, 8, 1)),
+    }
+    if second_year != first_year + 1 or semester not in ranges:
+        raise ValueError(f"Học kỳ không hợp lệ: {term}")
+    start, end = ranges[semester]
+    return start.isoformat(), end.isoformat()
+
+
+def term_sql(column):
+    """
+    Biểu thức SQL tính học kỳ của một cột ngày, cho cùng kết quả với term_of.
+
+    Args:
+        column (str): Tên cột ngày (YYYY-MM-DD)
+
+    Returns:
+        str: Biểu thức SQL
+    """
+    year = f"CAST(substr({column}, 1, 4) AS INTEGER)"
+    month = f"CAST(substr({column}, 6, 2) AS INTEGER)"
+    return f"""
+        CASE
+            WHEN {column} IS NULL OR {column} NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*'
+                THEN '{UNKNOWN_PERIOD}'
+            WHEN {month} >= 8 THEN {year} || '-' || ({year} + 1) || ' HK1'
+            WHEN {month} = 1 THEN ({year} - 1) || '-' || {year} || ' HK1'
+            WHEN {month} <= 6 THEN ({year} - 1) || '-' || {year} || ' HK2'
+            ELSE ({year} - 1) || '-' || {year} || ' HK3'
+        END
+    """
+
+
+def period_of(day, bucket):
+    """
+    Nhãn khoảng thời gian chứa một ngày.
+
+    Args:
+        day (date): Ngày
+        bucket (str): BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH hoặc BUCKET_TERM
+
+    Returns:
+        str: Ví dụ "2024-09-15", "2024-W37", "2024-09", "2024-2025 HK1"
+    """
+    if bucket == BUCKET_DAY:
+        return day.isoformat()
+    if bucket == BUCKET_WEEK:
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == BUCKET_MONTH:
+        return day.strftime("%Y-%m")
+    return term_of(day.isoformat())
+
+
+def period_start(day, bucket):
+    """
+    Ngày đầu tiên của khoảng thời gian chứa một ngày.
+
+    Args:
+        day (date): Ngày
+        bucket (str): BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH hoặc BUCKET_TERM
+
+    Returns:
+        date: Ngày bắt đầu khoảng
+    """
+    if bucket == BUCKET_DAY:
+        return day
+    if bucket == BUCKET_WEEK:
+        return day - timedelta(days=day.weekday())
+    if bucket == BUCKET_MONTH:
+        return day.replace(day=1)
+    if day.month >= 8:
+        return date(day.year, 8, 1)
+    if day.month == 1:
+        return date(day.year - 1, 8, 1)
+    return date(day.year, 2 if day.month <= 6 else 7, 1)
+
+
+class EnrollmentTrends:
+    """
+    Chuỗi thời gian ghi danh đọc từ các bảng tổng hợp. An toàn khi gọi từ luồng nền.
+    """
+
+    def __init__(self, db_manager):
+        """
+        Khởi tạo nguồn dữ liệu chuỗi thời gian
+
+        Args:
+            db_manager (DatabaseManager): Quản lý cơ sở dữ liệu
+        """
+        self.db_manager = db_manager
+
+    def series(self, bucket=BUCKET_MONTH, start=None, end=None, cancel_token=None):
+        """
+        Số ghi danh, số có điểm và điểm trung bình theo từng khoảng thời gian
+        (các khoảng không có ghi danh nào vẫn có mặt với giá trị 0).
+
+        Args:
+            bucket (str): BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH hoặc BUCKET_TERM
+            start (str, optional): Từ ngày (YYYY-MM-DD, tính cả ngày này)
+            end (str, optional): Tới trước ngày (YYYY-MM-DD, không tính ngày này)
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Mỗi khoảng một dict gồm period, enrollments, graded, average_grade
+                  (None nếu chưa có điểm), theo thứ tự thời gian; ghi danh không có
+                  ngày hợp lệ được gộp vào khoảng UNKNOWN_PERIOD ở cuối (chỉ khi
+                  không giới hạn khoảng thời gian)
+
+        Raises:
+            ValueError: Khi kiểu khoảng thời gian không hợp lệ
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        if bucket not in (BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH, BUCKET_TERM):
+            raise ValueError(f"Không có kiểu khoảng thời gian '{bucket}'")
+        conditions = []
+        params = []
+        if start:
+            conditions.append("ngay >= ?")
+            params.append(start)
+        if end:
+            conditions.append("ngay < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.db_manager.read_query(f"""
+            SELECT ngay, so_ghi_danh, so_co_diem, tong_diem
+            FROM thong_ke_ngay
+            {where}
+            ORDER BY ngay
+        """, tuple(params), cancel_token)
+
+        totals = {}
+        unknown = [0, 0, 0.0]
+        first = last = None
+        for row in rows:
+            if not row['so_ghi_danh']:
+                continue
+            try:
+                day = date.fromisoformat(row['ngay'])
+            except ValueError:
+                target = unknown
+            else:
+                first = first or day
+                last = day
+                target = totals.setdefault(period_of(day, bucket), [0, 0, 0.0])
+            target[0] += row['so_ghi_danh']
+            target[1] += row['so_co_diem']
+            target[2] += row['tong_diem']
+
+        # Duyệt từng ngày trong khoảng để giữ cả các khoảng không có ghi danh
+        if start:
+            first = date.fromisoformat(start)
+        if end:
+            last = date.fromisoformat(end) - timedelta(days=1)
+        series = []
+        if first is not None and last is not None:
+            day = period_start(first, bucket)
+            while day <= last:
+                period = period_of(day, bucket)
+                series.append(self._point(period, totals.get(period, (0, 0, 0.0))))
+                day = self._next_period(day, bucket)
+        if unknown[0] and not (start or end):
+            series.append(self._point(UNKNOWN_PERIOD, unknown))
+        return series
+
+    def recent(self, bucket=BUCKET_MONTH, periods=None, cancel_token=None):
+        """
+        Chuỗi của các khoảng thời gian gần nhất: theo giờ thì tính tới giờ hiện tại,
+        các kiểu khác tính tới ngày ghi danh mới nhất.
+
+        Args:
+            bucket (str): BUCKET_HOUR, BUCKET_DAY, BUCKET_WEEK, BUCKET_MONTH hoặc BUCKET_TERM
+            periods (int, optional): Số khoảng, mặc định theo DEFAULT_PERIODS
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Kết quả của hourly() hoặc series(); rỗng nếu chưa có ghi danh
+
+        Raises:
+            ValueError: Khi kiểu khoảng thời gian không hợp lệ
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        if bucket not in DEFAULT_PERIODS:
+            raise ValueError(f"Không có kiểu khoảng thời gian '{bucket}'")
+        periods = periods or DEFAULT_PERIODS[bucket]
+        if bucket == BUCKET_HOUR:
+            return self.hourly(periods, cancel_token=cancel_token)
+        rows = self.db_manager.read_query("""
+            SELECT MAX(ngay) AS ngay FROM thong_ke_ngay
+            WHERE so_ghi_danh > 0 AND ngay GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+        """, (), cancel_token)
+        if not rows or not rows[0]['ngay']:
+            return []
+        latest = date.fromisoformat(rows[0]['ngay'])
+        start = period_start(latest, bucket)
+        for _ in range(periods - 1):
+            start = period_start(start - timedelta(days=1), bucket)
+        return self.series(bucket, start.isoformat(), (latest + timedelta(days=1)).isoformat(),
+                           cancel_token)
+
+    def hourly(self, hours=DEFAULT_PERIODS[BUCKET_HOUR], now=None, cancel_token=None):
+        """
+        Số ghi danh mới và số lần nhập điểm trong từng giờ của các giờ gần nhất
+        (theo thời điểm thực hiện, dùng để theo dõi đợt đăng ký).
+
+        Args:
+            hours (int): Số giờ, tính cả giờ hiện tại
+            now (datetime, optional): Thời điểm hiện tại
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Mỗi giờ một dict gồm period ("YYYY-MM-DD HH:00"), enrollments,
+                  grade_entries, theo thứ tự thời gian
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        current = (now or datetime.now()).replace(minute=0, second=0, microsecond=0)
+        labels = [(current - timedelta(hours=offset)).strftime("%Y-%m-%d %H:00")
+                  for offset in range(hours - 1, -1, -1)]
+        rows = self.db_manager.read_query("""
+            SELECT gio, so_ghi_danh, so_nhap_diem FROM thong_ke_gio
+            WHERE gio >= ? AND gio <= ?
+        """, (labels[0], labels[-1]), cancel_token)
+        counts = {row['gio']: (row['so_ghi_danh'], row['so_nhap_diem']) for row in rows}
+        return [{
+            'period': label,
+            'enrollments': counts.get(label, (0, 0))[0],
+            'grade_entries': counts.get(label, (0, 0))[1],
+        } for label in labels]
+
+    @staticmethod
+    def _point(period, total):
+        """Một điểm của chuỗi từ (số ghi danh, số có điểm, tổng điểm)."""
+        enrollments, graded, grade_sum = total
+        return {
+            'period': period,
+            'enrollments': enrollments,
+            'graded': graded,
+            'average_grade': round(grade_sum / graded, 2) if graded else None,
+        }
+
+    @staticmethod
+    def _next_period(day, bucket):
+        """Ngày đầu tiên của khoảng thời gian kế tiếp."""
+        if bucket == BUCKET_DAY:
+            return day + timedelta(days=1)
+        if bucket == BUCKET_WEEK:
+            return day + timedelta(days=7)
+        if bucket == BUCKET_MONTH:
+            return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        # Học kỳ: sang tháng sau ngày đầu của học kỳ cho tới khi đổi học kỳ
+        current = term_of(day.isoformat())
+        while term_of(day.isoformat()) == current:
+            day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return day
@@ -38,6 +38,22 @@ class DatabaseException(AppException):
     pass
 
 
+class QueryCancelledException(DatabaseException):
+    """Ngoại lệ khi truy vấn bị hủy giữa chừng (người dùng hủy hoặc có yêu cầu mới hơn)"""
+    def __init__(self, message="Truy vấn đã bị hủy", severity=ErrorSeverity.INFO, cause=None):
+        super().__init__(message, severity, cause)
+
+
+class QueryTimeoutException(QueryCancelledException):
+    """Ngoại lệ khi truy vấn bị dừng vì chạy quá thời gian cho phép"""
+    def __init__(self, timeout=None, message=None, severity=ErrorSeverity.WARNING, cause=None):
+        self.timeout = timeout
+        if message is None:
+            message = ("Truy vấn chạy quá thời gian cho phép" if timeout is None
+                       else f"Truy vấn chạy quá {timeout:g} giây và đã bị dừng")
+        super().__init__(message, severity, cause)
+
+
 class ConfigException(AppException):
     """Ngoại lệ liên quan đến cấu hình"""
     pass
@@ -1,13 +1,9 @@
 import os
 import pandas as pd
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
 import logging
 from datetime import datetime
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
+from utils.pdf_export import PdfPageRenderer, rows_per_page
 
 class ExportManager:
     """
@@ -170,58 +166,12 @@ class ExportManager:
             if not filename.endswith('.pdf'):
                 filename += '.pdf'
             
-            # Tạo PDF
-            doc = SimpleDocTemplate(filename, pagesize=A4)
-            styles = getSampleStyleSheet()
-            
-            # Tạo nội dung
-            elements = []
-            
-            # Tiêu đề
-            title_style = ParagraphStyle(
-                'Title',
-                parent=styles['Heading1'],
-                alignment=1,  # Center alignment
-                spaceAfter=12
-            )
-            elements.append(Paragraph(title, title_style))
-            elements.append(Spacer(1, 0.25*inch))
-            
-            # Thêm ngày tháng
-            date_text = f"Ngày xuất: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-            elements.append(Paragraph(date_text, styles["Normal"]))
-            elements.append(Spacer(1, 0.25*inch))
-            
-            # Chuẩn bị dữ liệu cho bảng
-            table_data = [column_headers] + data
-            
-            # Tạo bảng
-            table = Table(table_data, repeatRows=1)
-            
-            # Tạo style cho bảng
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ])
-            
-            # Thêm xen kẽ màu nền cho các dòng để dễ đọc
-            for row in range(1, len(table_data)):
-                if row % 2 == 0:
-                    table_style.add('BACKGROUND', (0, row), (-1, row), colors.lightgrey)
-            
-            table.setStyle(table_style)
-            elements.append(table)
-            
-            # Xuất PDF
-            doc.build(elements)
+            # Mỗi trang là một bảng riêng (lặp lại tiêu đề cột) thay vì một bảng chứa mọi dòng
+            renderer = PdfPageRenderer(filename, column_headers, title)
+            page_rows = rows_per_page(column_headers)
+            for start in range(0, len(data), page_rows):
+                renderer.draw_page(data[start:start + page_rows])
+            renderer.save()
             
             logging.info(f"Đã xuất dữ liệu ra file PDF: {filename}")
             
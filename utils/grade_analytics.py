@@ -0,0 +1,751 @@
+"""
+Module phân tích điểm số bằng NumPy.
+
+Cột diem của toàn bộ ghi_danh được đọc một lần (kèm khóa học, giảng viên, số
+tín chỉ, học kỳ và khóa tuyển sinh của sinh viên) vào mảng NumPy. Phân phối theo
+khoảng điểm, trung bình, trung vị, phân vị, độ lệch chuẩn, tỷ lệ đạt và bảng chéo
+(nhóm × khoảng điểm) của mọi nhóm (ví dụ 2.000 khóa học) được tính trong một lượt
+vectơ hóa, không truy vấn theo từng nhóm. Dữ liệu được giữ lại cho tới khi bộ đếm
+ghi của ghi_danh/sinh_vien/khoa_hoc thay đổi.
+"""
+import logging
+import threading
+import numpy as np
+from utils.enrollment_trends import term_of
+
+# Điểm tối thiểu để đạt
+PASS_MARK = 5.0
+DEFAULT_PERCENTILES = (25, 75, 90)
+UNKNOWN_GROUP = "Không xác định"
+
+GROUP_COURSE = "course"
+GROUP_TERM = "term"
+GROUP_COHORT = "cohort"
+GROUP_INSTRUCTOR = "instructor"
+GROUP_CREDITS = "credits"
+
+# Cột của bảng chéo
+PIVOT_BUCKETS = "bucket"
+PIVOT_PASS_FAIL = "pass_fail"
+PASS_FAIL_LABELS = ("Đạt", "Không đạt")
+UNGRADED_LABEL = "Chưa có điểm"
+# Giá trị ô của bảng chéo
+VALUE_COUNT = "count"
+VALUE_PERCENT = "percent"
+VALUE_MEAN = "mean"
+# Sắp xếp bảng chéo theo khóa dòng, tên dòng hoặc cột tổng
+SORT_KEY = "key"
+SORT_TITLE = "title"
+SORT_TOTAL = "total"
+
+
+class GradeBucketScheme:
+    """Cách chia khoảng điểm: các mốc chia tăng dần và nhãn của từng khoảng."""
+
+    def __init__(self, name, edges, labels):
+        """
+        Khởi tạo cách chia khoảng điểm
+
+        Args:
+            name (str): Tên cách chia
+            edges (iterable): Các mốc chia tăng dần; khoảng i gồm các điểm
+                trong [edges[i-1], edges[i])
+            labels (iterable): Nhãn các khoảng, nhiều hơn số mốc một phần tử
+
+        Raises:
+            ValueError: Khi số nhãn không khớp số mốc
+        """
+        self.name = name
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.labels = tuple(labels)
+        if len(self.labels) != len(self.edges) + 1:
+            raise ValueError(f"Cách chia '{name}' cần {len(self.edges) + 1} nhãn")
+
+    def bucket_indices(self, grades):
+        """
+        Chỉ số khoảng của từng điểm.
+
+        Args:
+            grades (np.ndarray): Các điểm (không có NaN)
+
+        Returns:
+            np.ndarray: Chỉ số khoảng (0 .. len(labels) - 1)
+        """
+        return np.searchsorted(self.edges, grades, side='right')
+
+
+# Thang điểm chữ dùng trên dashboard
+SCHEME_LETTER = GradeBucketScheme(
+    "letter", (4.0, 5.5, 7.0, 8.5),
+    ('F (0-3.9)', 'D (4.0-5.4)', 'C (5.5-6.9)', 'B (7.0-8.4)', 'A (8.5-10)'))
+# Thang điểm chữ chi tiết có + / -
+SCHEME_DETAILED = GradeBucketScheme(
+    "detailed", (4.0, 5.0, 5.5, 6.5, 7.0, 8.0, 9.0),
+    ('F (0.0 - 3.9)', 'D (4.0 - 4.9)', 'D+ (5.0 - 5.4)', 'C (5.5 - 6.4)',
+     'C+ (6.5 - 6.9)', 'B (7.0 - 7.9)', 'B+ (8.0 - 8.9)', 'A (9.0 - 10.0)'))
+# Xếp loại học lực
+SCHEME_CLASSIFICATION = GradeBucketScheme(
+    "classification", (5.0, 7.0, 8.0, 9.0),
+    ('Yếu (0.0 - 4.9)', 'Trung bình (5.0 - 6.9)', 'Khá (7.0 - 7.9)',
+     'Giỏi (8.0 - 8.9)', 'Xuất sắc (9.0 - 10.0)'))
+
+BUCKET_SCHEMES = {scheme.name: scheme
+                  for scheme in (SCHEME_LETTER, SCHEME_DETAILED, SCHEME_CLASSIFICATION)}
+
+
+def get_bucket_scheme(scheme):
+    """
+    Lấy cách chia khoảng điểm theo tên hoặc đối tượng.
+
+    Args:
+        scheme (str | GradeBucketScheme): Tên trong BUCKET_SCHEMES hoặc cách chia tự định nghĩa
+
+    Returns:
+        GradeBucketScheme: Cách chia khoảng điểm
+
+    Raises:
+        ValueError: Khi tên không tồn tại
+    """
+    if isinstance(scheme, GradeBucketScheme):
+        return scheme
+    if scheme not in BUCKET_SCHEMES:
+        raise ValueError(f"Không có cách chia khoảng điểm '{scheme}'")
+    return BUCKET_SCHEMES[scheme]
+
+
+def cohort_of(date_text):
+    """
+    Khóa tuyển sinh theo năm nhập học.
+
+    Args:
+        date_text (str): Ngày nhập học (YYYY-MM-DD)
+
+    Returns:
+        str: Năm nhập học hoặc UNKNOWN_GROUP
+    """
+    year = (date_text or "")[:4]
+    return year if year.isdigit() else UNKNOWN_GROUP
+
+
+def _grade_array(grades):
+    """
+    Chuyển điểm thành mảng float. Cột diem vẫn có thể chứa chuỗi (ví dụ '8,5') dù có
+    kiểu REAL; các giá trị không đọc được thành số được coi như chưa có điểm.
+
+    Args:
+        grades (iterable): Điểm của từng ghi danh, None/NaN nếu chưa có điểm
+
+    Returns:
+        numpy.ndarray: Mảng float64, NaN là chưa có điểm
+    """
+    values = [np.nan if g is None else g for g in grades]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    converted, dropped = [], 0
+    for value in values:
+        try:
+            converted.append(float(value))
+        except (TypeError, ValueError):
+            converted.append(np.nan)
+            dropped += 1
+    logging.warning(f"Bỏ qua {dropped} điểm không phải số (coi như chưa có điểm)")
+    return np.array(converted, dtype=np.float64)
+
+
+def _credit_key(value):
+    """Khóa nhóm theo số tín chỉ: số nguyên, hoặc UNKNOWN_GROUP nếu thiếu hay không phải số."""
+    try:
+        return int(value) if value is not None and value == value else UNKNOWN_GROUP
+    except (TypeError, ValueError):
+        return UNKNOWN_GROUP
+
+
+def _group_sort_key(key):
+    """Khóa sắp xếp nhóm: số (ví dụ số tín chỉ) trước theo giá trị, sau đó tới chuỗi."""
+    if isinstance(key, (int, float)):
+        return (0, key, "")
+    return (1, 0, str(key))
+
+
+class GradeDataset:
+    """
+    Ảnh chụp điểm của toàn bộ ghi danh: một mảng điểm (NaN = chưa có điểm) và
+    các mảng khóa nhóm tương ứng (khóa học, học kỳ, khóa tuyển sinh, giảng viên,
+    số tín chỉ).
+    """
+
+    def __init__(self, grades, group_keys, course_names=None):
+        """
+        Khởi tạo ảnh chụp
+
+        Args:
+            grades (iterable): Điểm của từng ghi danh, None/NaN nếu chưa có điểm
+            group_keys (dict): Tên nhóm -> khóa nhóm của từng ghi danh
+            course_names (dict, optional): Mã khóa học -> tên khóa học
+        """
+        self.grades = _grade_array(grades)
+        self._group_keys = dict(group_keys)
+        self.course_names = dict(course_names or {})
+        # Tên nhóm -> (các khóa, chỉ số nhóm của từng ghi danh)
+        self._group_index = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Tạo ảnh chụp từ kết quả truy vấn của GradeAnalytics.
+
+        Args:
+            rows (list): Các dòng (ma_khoa_hoc, ngay_ghi_danh, diem, ngay_nhap_hoc,
+                ten_khoa_hoc, giang_vien, so_tin_chi)
+
+        Returns:
+            GradeDataset: Ảnh chụp điểm
+        """
+        return cls.from_columns(
+            [row['ma_khoa_hoc'] for row in rows], [row['ngay_ghi_danh'] for row in rows],
+            [row['diem'] for row in rows], [row['ngay_nhap_hoc'] for row in rows],
+            [row['ten_khoa_hoc'] for row in rows], [row['giang_vien'] for row in rows],
+            [row['so_tin_chi'] for row in rows])
+
+    @classmethod
+    def from_columns(cls, course_ids, enrolled_dates, grades, admission_dates, course_titles,
+                     instructors, credits):
+        """
+        Tạo ảnh chụp từ các cột song song (mỗi phần tử là một ghi danh).
+
+        Args:
+            course_ids (list): Mã khóa học
+            enrolled_dates (list): Ngày ghi danh (chuỗi, tối thiểu YYYY-MM)
+            grades (list): Điểm, None/NaN nếu chưa có
+            admission_dates (list): Ngày nhập học của sinh viên (chuỗi, tối thiểu YYYY)
+            course_titles (list): Tên khóa học
+            instructors (list): Giảng viên
+            credits (list): Số tín chỉ, None/NaN nếu không rõ
+
+        Returns:
+            GradeDataset: Ảnh chụp điểm
+        """
+        # Học kỳ và khóa tuyển sinh được tính một lần cho mỗi giá trị ngày khác nhau
+        terms = {date: term_of(date) for date in set(enrolled_dates)}
+        cohorts = {date: cohort_of(date) for date in set(admission_dates)}
+        course_names = {course: title or "" for course, title in zip(course_ids, course_titles)
+                        if course}
+        return cls(grades, {
+            GROUP_COURSE: [course or UNKNOWN_GROUP for course in course_ids],
+            GROUP_TERM: [terms[date] for date in enrolled_dates],
+            GROUP_COHORT: [cohorts[date] for date in admission_dates],
+            GROUP_INSTRUCTOR: [instructor or UNKNOWN_GROUP for instructor in instructors],
+            # Số tín chỉ đọc từ ảnh chụp dạng cột có thể là float (NaN khi thiếu)
+            GROUP_CREDITS: [_credit_key(value) for value in credits],
+        }, course_names)
+
+    @classmethod
+    def from_snapshot(cls, directory):
+        """
+        Tạo ảnh chụp điểm từ ảnh chụp dạng cột (utils.snapshot_export), không truy vấn
+        cơ sở dữ liệu.
+
+        Args:
+            directory (str): Thư mục ảnh chụp
+
+        Returns:
+            GradeDataset: Ảnh chụp điểm
+
+        Raises:
+            ConfigException: Khi chưa cài pyarrow
+        """
+        from utils.snapshot_export import load_snapshot
+        frames = load_snapshot(directory, ("ghi_danh", "sinh_vien", "khoa_hoc"), {
+            "ghi_danh": ["ma_sinh_vien", "ma_khoa_hoc", "ngay_ghi_danh", "diem"],
+            "sinh_vien": ["ma_sinh_vien", "ngay_nhap_hoc"],
+            "khoa_hoc": ["ma_khoa_hoc", "ten_khoa_hoc", "giang_vien", "so_tin_chi"],
+        })
+        frame = (frames["ghi_danh"]
+                 .merge(frames["sinh_vien"], how="left", on="ma_sinh_vien")
+                 .merge(frames["khoa_hoc"], how="left", on="ma_khoa_hoc"))
+
+        def texts(column, date_format):
+            # Ngày (datetime64) -> chuỗi như cột của GradeAnalytics.QUERY; thiếu -> None.
+            # strftime trên từng dòng rất chậm nên chỉ định dạng các ngày khác nhau
+            codes, dates = frame[column].factorize()
+            labels = np.array([None] + [date.strftime(date_format) for date in dates], dtype=object)
+            return labels[codes + 1].tolist()
+
+        def objects(column):
+            return frame[column].astype(object).where(frame[column].notna(), None).tolist()
+
+        return cls.from_columns(
+            objects("ma_khoa_hoc"), texts("ngay_ghi_danh", "%Y-%m"), frame["diem"].to_numpy(),
+            texts("ngay_nhap_hoc", "%Y"), objects("ten_khoa_hoc"), objects("giang_vien"),
+            objects("so_tin_chi"))
+
+    def __len__(self):
+        return len(self.grades)
+
+    def group_index(self, group):
+        """
+        Các khóa của nhóm và chỉ số nhóm của từng ghi danh (tính một lần).
+
+        Args:
+            group (str): GROUP_COURSE, GROUP_TERM, GROUP_COHORT, GROUP_INSTRUCTOR
+                hoặc GROUP_CREDITS
+
+        Returns:
+            tuple: (danh sách khóa đã sắp xếp, mảng chỉ số nhóm)
+
+        Raises:
+            ValueError: Khi nhóm không tồn tại
+        """
+        if group not in self._group_keys:
+            raise ValueError(f"Không có nhóm '{group}'")
+        with self._lock:
+            if group not in self._group_index:
+                # Mã hóa khóa nhóm thành số bằng dict (nhanh hơn np.unique trên chuỗi)
+                keys = self._group_keys[group]
+                labels = sorted(set(keys), key=_group_sort_key)
+                positions = {label: index for index, label in enumerate(labels)}
+                group_ids = np.fromiter((positions[key] for key in keys), dtype=np.intp, count=len(keys))
+                self._group_index[group] = (labels, group_ids)
+            return self._group_index[group]
+
+    def summary(self, scheme=SCHEME_LETTER, percentiles=DEFAULT_PERCENTILES, pass_mark=PASS_MARK):
+        """
+        Thống kê điểm của toàn bộ ghi danh.
+
+        Args:
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm
+            percentiles (iterable): Các phân vị cần tính (0-100)
+            pass_mark (float): Điểm tối thiểu để đạt
+
+        Returns:
+            dict: Thống kê (xem grouped_summary)
+        """
+        group_ids = np.zeros(len(self.grades), dtype=np.intp)
+        return _grouped_statistics(self.grades, group_ids, ["all"], scheme,
+                                   percentiles, pass_mark)[0]
+
+    def grouped_summary(self, group, scheme=SCHEME_LETTER, percentiles=DEFAULT_PERCENTILES,
+                        pass_mark=PASS_MARK):
+        """
+        Thống kê điểm của từng nhóm trong một lượt tính.
+
+        Args:
+            group (str): Tên nhóm (xem group_index)
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm
+            percentiles (iterable): Các phân vị cần tính (0-100)
+            pass_mark (float): Điểm tối thiểu để đạt
+
+        Returns:
+            list: Mỗi nhóm một dict gồm key, enrollments, graded, ungraded, mean,
+                  median, std, min, max, percentiles, passed, failed, pass_rate,
+                  fail_rate và distribution (nhãn khoảng -> số lượng); các giá trị
+                  không xác định (nhóm chưa có điểm) là None
+        """
+        keys, group_ids = self.group_index(group)
+        return _grouped_statistics(self.grades, group_ids, keys, scheme, percentiles, pass_mark)
+
+    def pivot(self, group, columns=PIVOT_BUCKETS, value=VALUE_COUNT, scheme=SCHEME_LETTER,
+              pass_mark=PASS_MARK, include_ungraded=False):
+        """
+        Bảng chéo nhóm × khoảng điểm (hoặc đạt/không đạt) trong một lượt bincount.
+
+        Args:
+            group (str): Nhóm theo dòng (xem group_index)
+            columns (str): PIVOT_BUCKETS (theo khoảng điểm) hoặc PIVOT_PASS_FAIL
+            value (str): VALUE_COUNT, VALUE_PERCENT (tỷ lệ % trong dòng) hoặc VALUE_MEAN
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm khi cột là khoảng điểm
+            pass_mark (float): Điểm tối thiểu để đạt
+            include_ungraded (bool): Thêm cột "Chưa có điểm" (chỉ khi đếm số lượng)
+
+        Returns:
+            PivotTable: Bảng chéo
+
+        Raises:
+            ValueError: Khi nhóm, kiểu cột hoặc kiểu giá trị không hợp lệ
+        """
+        keys, group_ids = self.group_index(group)
+        graded_mask = ~np.isnan(self.grades)
+        values = self.grades[graded_mask]
+        ids = group_ids[graded_mask]
+
+        if columns == PIVOT_BUCKETS:
+            scheme = get_bucket_scheme(scheme)
+            labels = scheme.labels
+            column_ids = scheme.bucket_indices(values)
+        elif columns == PIVOT_PASS_FAIL:
+            labels = PASS_FAIL_LABELS
+            column_ids = (values < pass_mark).astype(np.intp)
+        else:
+            raise ValueError(f"Không có kiểu cột '{columns}'")
+
+        group_count = len(keys)
+        column_count = len(labels)
+        cells = ids * column_count + column_ids
+        counts = np.bincount(cells, minlength=group_count * column_count)
+        sums = np.bincount(cells, weights=values, minlength=group_count * column_count)
+        counts = counts.reshape(group_count, column_count)
+        sums = sums.reshape(group_count, column_count)
+
+        if include_ungraded and value == VALUE_COUNT:
+            ungraded = np.bincount(group_ids[~graded_mask], minlength=group_count)
+            counts = np.column_stack((counts, ungraded))
+            sums = np.column_stack((sums, np.zeros(group_count)))
+            labels = tuple(labels) + (UNGRADED_LABEL,)
+
+        titles = self.course_names if group == GROUP_COURSE else None
+        return PivotTable(group, keys, labels, counts, sums, value, titles)
+
+
+def _grouped_statistics(grades, group_ids, keys, scheme, percentiles, pass_mark):
+    """Tính thống kê của mọi nhóm bằng các phép toán vectơ (không lặp theo ghi danh)."""
+    scheme = get_bucket_scheme(scheme)
+    group_count = len(keys)
+    bucket_count = len(scheme.labels)
+    percentiles = tuple(percentiles)
+
+    enrollments = np.bincount(group_ids, minlength=group_count)
+    graded_mask = ~np.isnan(grades)
+    values = grades[graded_mask]
+    ids = group_ids[graded_mask]
+
+    graded = np.bincount(ids, minlength=group_count)
+    sums = np.bincount(ids, weights=values, minlength=group_count)
+    squares = np.bincount(ids, weights=values * values, minlength=group_count)
+    passed = np.bincount(ids, weights=values >= pass_mark, minlength=group_count).astype(np.int64)
+    histogram = np.bincount(ids * bucket_count + scheme.bucket_indices(values),
+                            minlength=group_count * bucket_count).reshape(group_count, bucket_count)
+
+    # Sắp xếp theo (nhóm, điểm) một lần cho trung vị, phân vị, nhỏ nhất, lớn nhất:
+    # sắp theo điểm rồi sắp ổn định theo nhóm (radix sort với số nguyên nhỏ),
+    # nhanh hơn lexsort khoảng 3 lần
+    by_value = np.argsort(values)
+    group_dtype = np.uint16 if group_count <= np.iinfo(np.uint16).max else np.int64
+    by_group = np.argsort(ids[by_value].astype(group_dtype), kind="stable")
+    ordered = values[by_value][by_group]
+    starts = np.concatenate(([0], np.cumsum(graded)[:-1])).astype(np.intp)
+    has_grades = graded > 0
+
+    def percentile(q):
+        result = np.full(group_count, np.nan)
+        if not len(ordered):
+            return result
+        position = starts + (graded - 1) * (q / 100.0)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.ceil(position).astype(np.intp)
+        lower_values = ordered[np.clip(lower, 0, len(ordered) - 1)]
+        upper_values = ordered[np.clip(upper, 0, len(ordered) - 1)]
+        interpolated = lower_values + (upper_values - lower_values) * (position - lower)
+        result[has_grades] = interpolated[has_grades]
+        return result
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / graded
+        stds = np.sqrt(np.maximum(squares / graded - means * means, 0.0))
+        pass_rates = np.where(has_grades, passed / graded * 100, 0.0)
+
+    # Chuyển sang kiểu Python theo cột (nhanh hơn lấy từng phần tử NumPy); NaN -> None
+    def column(array):
+        return [None if value != value else value for value in array.tolist()]
+
+    columns = zip(keys, enrollments.tolist(), graded.tolist(), column(means),
+                  column(percentile(50)), column(stds), column(percentile(0)),
+                  column(percentile(100)), passed.tolist(), pass_rates.tolist(),
+                  histogram.tolist())
+    quantiles = [column(percentile(q)) for q in percentiles]
+
+    statistics = []
+    for index, (key, total, count, mean, median, std, minimum, maximum,
+                pass_count, pass_rate, buckets) in enumerate(columns):
+        statistics.append({
+            'key': str(key),
+            'enrollments': total,
+            'graded': count,
+            'ungraded': total - count,
+            'mean': mean,
+            'median': median,
+            'std': std,
+            'min': minimum,
+            'max': maximum,
+            'percentiles': {q: values[index] for q, values in zip(percentiles, quantiles)},
+            'passed': pass_count,
+            'failed': count - pass_count,
+            'pass_rate': pass_rate,
+            'fail_rate': 100.0 - pass_rate if count else 0.0,
+            'distribution': dict(zip(scheme.labels, buckets)),
+        })
+    return statistics
+
+
+class PivotTable:
+    """
+    Bảng chéo điểm: mỗi dòng một nhóm, mỗi cột một khoảng điểm (hoặc đạt/không
+    đạt). Giữ số lượng và tổng điểm của từng ô nên giá trị ô, cột tổng và dòng
+    tổng (số lượng, tỷ lệ hoặc điểm trung bình) đều tính lại được mà không cần
+    đọc lại dữ liệu.
+    """
+    VALUE_TITLES = {VALUE_COUNT: "Số lượng", VALUE_PERCENT: "Tỷ lệ (%)", VALUE_MEAN: "Điểm TB"}
+    GROUP_TITLES = {
+        GROUP_COURSE: "Mã khóa học",
+        GROUP_TERM: "Học kỳ",
+        GROUP_COHORT: "Khóa tuyển sinh",
+        GROUP_INSTRUCTOR: "Giảng viên",
+        GROUP_CREDITS: "Số tín chỉ",
+    }
+    TOTAL_LABEL = "Tổng"
+
+    def __init__(self, group, row_keys, column_labels, counts, sums, value=VALUE_COUNT, titles=None):
+        """
+        Khởi tạo bảng chéo
+
+        Args:
+            group (str): Nhóm theo dòng
+            row_keys (list): Khóa của từng dòng
+            column_labels (iterable): Nhãn của từng cột
+            counts (np.ndarray): Số lượng của từng ô (dòng × cột)
+            sums (np.ndarray): Tổng điểm của từng ô (dòng × cột)
+            value (str): VALUE_COUNT, VALUE_PERCENT hoặc VALUE_MEAN
+            titles (dict, optional): Khóa dòng -> tên hiển thị (ví dụ tên khóa học)
+
+        Raises:
+            ValueError: Khi kiểu giá trị không hợp lệ
+        """
+        if value not in self.VALUE_TITLES:
+            raise ValueError(f"Không có kiểu giá trị '{value}'")
+        self.group = group
+        self.row_keys = list(row_keys)
+        self.column_labels = tuple(column_labels)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.sums = np.asarray(sums, dtype=np.float64)
+        self.value = value
+        self.titles = titles
+
+    def __len__(self):
+        return len(self.row_keys)
+
+    def _values(self, counts, sums, totals):
+        """Giá trị theo kiểu của bảng từ số lượng, tổng điểm và số lượng của cả dòng."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.value == VALUE_PERCENT:
+                return np.where(totals > 0, counts / totals * 100, np.nan)
+            if self.value == VALUE_MEAN:
+                return np.where(counts > 0, sums / counts, np.nan)
+        return counts.astype(np.float64)
+
+    def cells(self):
+        """
+        Giá trị của các ô.
+
+        Returns:
+            np.ndarray: Ma trận dòng × cột; NaN khi không xác định (ví dụ ô không có điểm)
+        """
+        return self._values(self.counts, self.sums, self.counts.sum(axis=1, keepdims=True))
+
+    def row_totals(self):
+        """Giá trị cột tổng của từng dòng."""
+        row_counts = self.counts.sum(axis=1)
+        return self._values(row_counts, self.sums.sum(axis=1), row_counts)
+
+    def column_totals(self):
+        """Giá trị dòng tổng của từng cột."""
+        return self._values(self.counts.sum(axis=0), self.sums.sum(axis=0), self.counts.sum())
+
+    def grand_total(self):
+        """Giá trị ô tổng của cả bảng (NaN nếu bảng trống)."""
+        total = self.counts.sum()
+        return float(self._values(np.array(total), np.array(self.sums.sum()), np.array(total)))
+
+    def row_title(self, key):
+        """Tên hiển thị của một dòng (chuỗi rỗng nếu không có)."""
+        return self.titles.get(key, "") if self.titles is not None else ""
+
+    def sorted(self, by=SORT_KEY, descending=False):
+        """
+        Sắp xếp các dòng.
+
+        Args:
+            by (str | int): SORT_KEY, SORT_TITLE, SORT_TOTAL, chỉ số cột hoặc nhãn cột
+            descending (bool): Sắp giảm dần; dòng không có giá trị luôn nằm cuối
+
+        Returns:
+            PivotTable: Bảng chéo mới đã sắp xếp
+
+        Raises:
+            ValueError: Khi cột sắp xếp không tồn tại
+        """
+        if by == SORT_KEY:
+            order = np.arange(len(self.row_keys))
+            if descending:
+                order = order[::-1]
+        elif by == SORT_TITLE:
+            order = np.array(sorted(range(len(self.row_keys)),
+                                    key=lambda index: self.row_title(self.row_keys[index]).lower(),
+                                    reverse=descending), dtype=np.intp)
+        else:
+            if by == SORT_TOTAL:
+                sort_values = self.row_totals()
+            else:
+                if by in self.column_labels:
+                    by = self.column_labels.index(by)
+                if not isinstance(by, (int, np.integer)) or not 0 <= by < len(self.column_labels):
+                    raise ValueError(f"Không có cột '{by}' để sắp xếp")
+                sort_values = self.cells()[:, by]
+            # argsort luôn đưa NaN về cuối; sắp ổn định để dòng bằng nhau giữ thứ tự khóa
+            order = np.argsort(-sort_values if descending else sort_values, kind="stable")
+        order = order.astype(np.intp)
+        return PivotTable(self.group, [self.row_keys[index] for index in order],
+                          self.column_labels, self.counts[order], self.sums[order],
+                          self.value, self.titles)
+
+    def headers(self):
+        """
+        Tiêu đề cột khi hiển thị hoặc xuất.
+
+        Returns:
+            list: Khóa dòng, (tên khóa học), các cột giá trị và cột tổng
+        """
+        headers = [self.GROUP_TITLES.get(self.group, self.group)]
+        if self.titles is not None:
+            headers.append("Tên khóa học")
+        return headers + list(self.column_labels) + [self.TOTAL_LABEL]
+
+    def format_value(self, value, decimals=2):
+        """
+        Định dạng giá trị của một ô để hiển thị hoặc xuất.
+
+        Args:
+            value (float): Giá trị ô
+            decimals (int): Số chữ số thập phân với tỷ lệ và điểm trung bình
+
+        Returns:
+            int | float | str: Số nguyên khi đếm, số đã làm tròn, hoặc "" nếu không xác định
+        """
+        if value != value:
+            return ""
+        if self.value == VALUE_COUNT:
+            return int(value)
+        return round(value, decimals)
+
+    def to_rows(self, include_totals=True, decimals=2):
+        """
+        Chuyển bảng chéo thành các dòng (cùng thứ tự với headers()) để hiển thị hoặc xuất.
+
+        Args:
+            include_totals (bool): Thêm dòng tổng ở cuối
+            decimals (int): Số chữ số thập phân với tỷ lệ và điểm trung bình
+
+        Returns:
+            list: Các dòng, mỗi dòng là một list giá trị
+        """
+        rows = []
+        for key, cells, total in zip(self.row_keys, self.cells().tolist(), self.row_totals().tolist()):
+            row = [str(key)]
+            if self.titles is not None:
+                row.append(self.row_title(key))
+            row.extend(self.format_value(cell, decimals) for cell in cells)
+            row.append(self.format_value(total, decimals))
+            rows.append(row)
+        if include_totals:
+            row = [self.TOTAL_LABEL]
+            if self.titles is not None:
+                row.append("")
+            row.extend(self.format_value(cell, decimals) for cell in self.column_totals().tolist())
+            row.append(self.format_value(self.grand_total(), decimals))
+            rows.append(row)
+        return rows
+
+
+class GradeAnalytics:
+    """
+    Nguồn dữ liệu cho phân tích điểm: đọc toàn bộ điểm bằng một truy vấn và
+    giữ ảnh chụp cho tới khi dữ liệu thay đổi (theo bộ đếm ghi dem_thay_doi).
+    An toàn khi gọi từ luồng nền.
+    """
+    # Chỉ lấy phần ngày cần cho học kỳ (YYYY-MM) và khóa tuyển sinh (YYYY)
+    QUERY = """
+        SELECT e.ma_khoa_hoc, substr(e.ngay_ghi_danh, 1, 7) AS ngay_ghi_danh, e.diem,
+               substr(s.ngay_nhap_hoc, 1, 4) AS ngay_nhap_hoc,
+               k.ten_khoa_hoc, k.giang_vien, k.so_tin_chi
+        FROM ghi_danh e
+        LEFT JOIN sinh_vien s ON s.ma_sinh_vien = e.ma_sinh_vien
+        LEFT JOIN khoa_hoc k ON k.ma_khoa_hoc = e.ma_khoa_hoc
+    """
+    # Các bảng mà ảnh chụp phụ thuộc
+    SOURCE_TABLES = ("ghi_danh", "sinh_vien", "khoa_hoc")
+    # Phiên bản của ảnh chụp nạp từ file: không đọc lại dù cơ sở dữ liệu thay đổi
+    PINNED = "snapshot"
+
+    def __init__(self, db_manager):
+        """
+        Khởi tạo nguồn dữ liệu phân tích
+
+        Args:
+            db_manager (DatabaseManager): Quản lý cơ sở dữ liệu
+        """
+        self.db_manager = db_manager
+        self._dataset = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _data_version(self):
+        """Phiên bản dữ liệu nguồn, None nếu không có bộ đếm ghi (khi đó không giữ ảnh chụp)."""
+        versions = self.db_manager.get_table_versions()
+        if not all(table in versions for table in self.SOURCE_TABLES):
+            return None
+        return tuple(versions[table] for table in self.SOURCE_TABLES)
+
+    def dataset(self, cancel_token=None):
+        """
+        Lấy ảnh chụp điểm, đọc lại nếu dữ liệu đã thay đổi.
+
+        Args:
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            GradeDataset: Ảnh chụp điểm
+
+        Raises:
+            QueryCancelledException: Khi truy vấn bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        version = self._data_version()
+        with self._lock:
+            if self._dataset is not None and (self._version == self.PINNED
+                                              or (version is not None and version == self._version)):
+                return self._dataset
+        rows = self.db_manager.read_query(self.QUERY, (), cancel_token)
+        dataset = GradeDataset.from_rows(rows)
+        logging.info(f"Đã đọc {len(dataset)} điểm cho phân tích điểm số")
+        with self._lock:
+            self._dataset = dataset
+            self._version = version
+        return dataset
+
+    def load_snapshot(self, directory):
+        """
+        Dùng ảnh chụp dạng cột thay cho cơ sở dữ liệu: các phân tích sau đó chạy trên
+        dữ liệu của ảnh chụp cho tới khi gọi invalidate().
+
+        Args:
+            directory (str): Thư mục ảnh chụp (utils.snapshot_export)
+
+        Returns:
+            GradeDataset: Ảnh chụp điểm đã nạp
+
+        Raises:
+            ConfigException: Khi chưa cài pyarrow
+        """
+        dataset = GradeDataset.from_snapshot(directory)
+        logging.info(f"Đã nạp {len(dataset)} điểm từ ảnh chụp {directory}")
+        with self._lock:
+            self._dataset = dataset
+            self._version = self.PINNED
+        return dataset
+
+    def invalidate(self):
+        """Bỏ ảnh chụp hiện tại (lần gọi sau sẽ đọc lại từ cơ sở dữ liệu)."""
+        with self._lock:
+            self._dataset = None
+            self._version = None
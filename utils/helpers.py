@@ -2,6 +2,12 @@ import re
 from datetime import datetime
 from PyQt6.QtCore import QDate
 
+# Biểu thức kiểm tra dùng chung cho Validator và kiểm tra dữ liệu nhập theo cột
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+PHONE_PATTERN = re.compile(r'^[0-9+\-\(\) ]{8,15}$')
+STUDENT_ID_PATTERN = re.compile(r'^[a-zA-Z0-9]{5,10}$')
+COURSE_ID_PATTERN = re.compile(r'^[a-zA-Z0-9]{2,10}$')
+
 class Validator:
     """
     Lớp chứa các hàm kiểm tra tính hợp lệ của dữ liệu.
@@ -22,8 +28,7 @@ class Validator:
             return True  # Email trống là hợp lệ (vì không bắt buộc)
         
         # Sử dụng regex để kiểm tra định dạng email
-        pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-        return bool(re.match(pattern, email))
+        return bool(EMAIL_PATTERN.match(email))
     
     @staticmethod
     def is_valid_phone(phone):
@@ -40,8 +45,7 @@ class Validator:
             return True  # Số điện thoại trống là hợp lệ (vì không bắt buộc)
         
         # Chỉ chấp nhận số và một số ký tự đặc biệt
-        pattern = r'^[0-9+\-\(\) ]{8,15}$'
-        return bool(re.match(pattern, phone))
+        return bool(PHONE_PATTERN.match(phone))
     
     @staticmethod
     def is_valid_student_id(student_id):
@@ -58,8 +62,7 @@ class Validator:
             return False  # Mã sinh viên không được trống
         
         # Mã sinh viên hợp lệ (ví dụ: chữ và số, độ dài từ 5-10)
-        pattern = r'^[a-zA-Z0-9]{5,10}$'
-        return bool(re.match(pattern, student_id))
+        return bool(STUDENT_ID_PATTERN.match(student_id))
     
     @staticmethod
     def is_valid_course_id(course_id):
@@ -76,8 +79,7 @@ class Validator:
             return False  # Mã khóa học không được trống
         
         # Mã khóa học hợp lệ (ví dụ: chữ và số, độ dài từ 2-10)
-        pattern = r'^[a-zA-Z0-9]{2,10}$'
-        return bool(re.match(pattern, course_id))
+        return bool(COURSE_ID_PATTERN.match(course_id))
 
 
 class DateUtils:
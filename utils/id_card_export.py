@@ -0,0 +1,269 @@
+"""
+Module in thẻ sinh viên hàng loạt (ví dụ cả khóa mới nhập học).
+
+Sinh viên được đọc theo từng lô theo thứ tự mã. Ảnh của mỗi lô được giải mã và thu
+nhỏ trên một pool tiến trình (utils.id_card_pdf.make_thumbnails) vào thư mục cache
+cạnh thư mục ảnh; trong khi đó các lô đã có ảnh được gửi sang tiến trình vẽ
+(IdCardStreamWriter) để xếp thẻ vào file PDF. Ảnh thu nhỏ được giữ lại (khóa theo
+đường dẫn, thời điểm sửa và kích thước file gốc) nên các lần in sau, hoặc in lại
+sau khi bị dừng, gần như chỉ còn việc dàn trang.
+
+Không có Pillow thì ảnh được thu nhỏ bằng QImage ngay trên luồng hiện tại.
+"""
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from utils.error_handler import FileException
+from utils.id_card_pdf import (DEFAULT_TITLE, HAS_PIL, THUMBNAIL_QUALITY, THUMBNAIL_SIZE,
+                               IdCardStreamWriter, card_grid, make_thumbnails)
+
+# Số sinh viên mỗi lô (cũng là số ảnh mỗi tác vụ gửi cho tiến trình con)
+CARD_BATCH = 50
+# Dưới số thẻ này thì thu nhỏ ảnh ngay trên luồng hiện tại (không đáng khởi động pool)
+PARALLEL_THRESHOLD = 200
+# Số tiến trình thu nhỏ ảnh tối đa
+MAX_WORKERS = 4
+# Tên thư mục cache ảnh thu nhỏ (trong thư mục ảnh sinh viên)
+THUMBNAIL_DIR = "thumbnails"
+
+
+def thumbnail_path(cache_dir, source, size=THUMBNAIL_SIZE):
+    """
+    File ảnh thu nhỏ trong cache của một ảnh gốc.
+
+    Args:
+        cache_dir (str): Thư mục cache
+        source (str): Ảnh gốc (phải tồn tại)
+        size (tuple): (rộng, cao) theo pixel
+
+    Returns:
+        str: Đường dẫn file; đổi ảnh gốc (nội dung hoặc thời điểm sửa) sẽ đổi tên file
+    """
+    stat = os.stat(source)
+    key = f"{os.path.abspath(source)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+
+def qt_thumbnails(jobs, size=THUMBNAIL_SIZE):
+    """
+    Tạo ảnh thu nhỏ bằng QImage (khi không có Pillow); cùng kết quả với make_thumbnails.
+
+    Args:
+        jobs (list): Các cặp (ảnh gốc, file ảnh thu nhỏ)
+        size (tuple): (rộng, cao) theo pixel
+
+    Returns:
+        list: Các ảnh gốc không xử lý được: [(ảnh gốc, thông báo lỗi)]
+    """
+    from PyQt6.QtGui import QImage
+
+    failed = []
+    for source, target in jobs:
+        image = QImage(source)
+        if image.isNull():
+            failed.append((source, "Không đọc được ảnh"))
+            continue
+        scaled = image.scaled(*size, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                              Qt.TransformationMode.SmoothTransformation)
+        cropped = scaled.copy((scaled.width() - size[0]) // 2, (scaled.height() - size[1]) // 2, *size)
+        temp_path = target + ".part"
+        if not cropped.save(temp_path, "JPEG", THUMBNAIL_QUALITY):
+            failed.append((source, "Không ghi được ảnh thu nhỏ"))
+            continue
+        os.replace(temp_path, target)
+    return failed
+
+
+class IdCardExporter(QObject):
+    """
+    In thẻ sinh viên ra PDF. run() chạy trên luồng nền (BackgroundLoader với
+    cancellable=True); tiến trình được báo qua progressChanged.
+    """
+    # (số thẻ đã xếp, tổng số thẻ)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, student_controller, cache_dir=None):
+        """
+        Khởi tạo bộ in thẻ
+
+        Args:
+            student_controller (StudentController): Nguồn thông tin sinh viên
+            cache_dir (str, optional): Thư mục cache ảnh thu nhỏ, mặc định
+                <thư mục ảnh>/thumbnails
+        """
+        super().__init__()
+        self.student_controller = student_controller
+        self.cache_dir = cache_dir or os.path.join(student_controller.db_manager.photos_dir,
+                                                   THUMBNAIL_DIR)
+
+    def run(self, file_path, student_ids=None, filters=None, title=DEFAULT_TITLE, workers=None,
+            cancel_token=None):
+        """
+        In thẻ cho các sinh viên, theo thứ tự mã sinh viên.
+
+        Args:
+            file_path (str): File PDF đích
+            student_ids (iterable, optional): Các mã sinh viên; không có thì dùng filters
+            filters (dict, optional): Bộ lọc như StudentController.find_students
+            title (str): Dòng tiêu đề trên mỗi thẻ
+            workers (int, optional): Số tiến trình thu nhỏ ảnh, mặc định theo số thẻ và số nhân
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: {'cards', 'pages', 'thumbnails' (số ảnh thu nhỏ mới tạo được), 'cached'
+                   (số thẻ dùng ảnh có sẵn trong cache hoặc ảnh đã thu nhỏ cho thẻ trước),
+                   'no_photo' (số thẻ không có ảnh), 'failed' (số thẻ in khung ảnh trống vì
+                   không đọc được ảnh gốc), 'output'}; thumbnails + cached + no_photo + failed
+                   bằng cards
+
+        Raises:
+            QueryCancelledException: Khi bị hủy (ảnh đã thu nhỏ được giữ trong cache)
+            DatabaseException: Khi truy vấn lỗi
+            FileException: Khi ghi file lỗi
+        """
+        if student_ids is not None:
+            student_ids = sorted(set(student_ids))
+            total = len(student_ids)
+        else:
+            total = self.student_controller.count_students(filters, cancel_token)
+        if workers is None:
+            workers = (max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+                       if total >= PARALLEL_THRESHOLD else 1)
+        if not HAS_PIL:
+            logging.warning("Không có Pillow, ảnh thẻ được thu nhỏ bằng Qt trên một luồng")
+
+        stats = {'cards': 0, 'thumbnails': 0, 'cached': 0, 'no_photo': 0, 'failed': 0}
+        with_photo = 0
+        temp_path = file_path + ".part"
+        self.progressChanged.emit(0, total)
+        writer = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            writer = IdCardStreamWriter(temp_path, title)
+            batches = self._batches(
+                self.student_controller.iter_card_students(student_ids, filters, cancel_token,
+                                                           CARD_BATCH), stats)
+            for rows, photos, made in self._map_batches(batches, workers, cancel_token):
+                stats['thumbnails'] += made
+                cards = []
+                for row in rows:
+                    photo = photos.get(row['ma_sinh_vien'])
+                    if photo and os.path.exists(photo):
+                        with_photo += 1
+                    elif photo:
+                        # Ảnh gốc không thu nhỏ được (đã ghi log trong _map_batches)
+                        stats['failed'] += 1
+                        photo = None
+                    cards.append((dict(row), photo))
+                writer.write_cards(cards)
+                stats['cards'] += len(rows)
+                self.progressChanged.emit(stats['cards'], max(total, stats['cards']))
+            if stats['cards']:
+                writer.close()
+                os.replace(temp_path, file_path)
+            else:
+                writer.abort()
+        except OSError as e:
+            if writer is not None:
+                writer.abort()
+            raise FileException(f"Không thể ghi file thẻ sinh viên: {e}", cause=e) from e
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            raise
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        stats['cached'] = with_photo - stats['thumbnails']
+        columns, rows = card_grid()
+        logging.info(f"Đã in {stats['cards']} thẻ sinh viên ra {file_path} "
+                     f"({stats['thumbnails']} ảnh mới thu nhỏ, {stats['cached']} ảnh có sẵn, "
+                     f"{stats['failed']} thẻ không đọc được ảnh)")
+        return dict(stats, pages=math.ceil(stats['cards'] / (columns * rows)), output=file_path)
+
+    def _batches(self, rows_batches, stats):
+        """
+        Gắn ảnh thu nhỏ cho từng lô sinh viên; mỗi ảnh chưa có trong cache chỉ được
+        xếp thu nhỏ một lần dù nhiều sinh viên dùng chung.
+
+        Yields:
+            tuple: (các dòng, dict mã sinh viên -> ảnh thu nhỏ, các cặp (ảnh gốc, ảnh thu
+                   nhỏ) cần tạo)
+        """
+        queued = set()
+        for rows in rows_batches:
+            photos, jobs = {}, []
+            for row in rows:
+                source = row['duong_dan_anh']
+                if not source or not os.path.exists(source):
+                    stats['no_photo'] += 1
+                    continue
+                target = thumbnail_path(self.cache_dir, source)
+                photos[row['ma_sinh_vien']] = target
+                if target not in queued and not os.path.exists(target):
+                    queued.add(target)
+                    jobs.append((source, target))
+            yield rows, photos, jobs
+
+    @staticmethod
+    def _map_batches(batches, workers, cancel_token):
+        """
+        Tạo ảnh thu nhỏ của các lô trên pool tiến trình (tối đa 2 * workers lô chờ cùng
+        lúc) và trả lại các lô theo đúng thứ tự.
+
+        Yields:
+            tuple: (các dòng, dict mã sinh viên -> ảnh thu nhỏ, số ảnh thu nhỏ tạo được)
+                khi ảnh của lô đã sẵn sàng
+        """
+        if workers <= 1 or not HAS_PIL:
+            for rows, photos, jobs in batches:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                failed = (make_thumbnails(jobs) if HAS_PIL else qt_thumbnails(jobs)) if jobs else []
+                yield rows, photos, len(jobs) - IdCardExporter._log_failed(failed)
+            return
+
+        # spawn thay vì fork: tiến trình giao diện có nhiều luồng Qt đang chạy
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        logging.info(f"Thu nhỏ ảnh thẻ sinh viên trên {workers} tiến trình")
+        try:
+            pending = deque()
+            for rows, photos, jobs in batches:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                pending.append((rows, photos, len(jobs),
+                                pool.submit(make_thumbnails, jobs) if jobs else None))
+                if len(pending) >= 2 * workers:
+                    yield IdCardExporter._finished_batch(*pending.popleft())
+            while pending:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield IdCardExporter._finished_batch(*pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _finished_batch(rows, photos, job_count, future):
+        """Chờ tác vụ thu nhỏ ảnh của một lô; trả về (các dòng, ảnh, số ảnh tạo được)."""
+        if future is None:
+            return rows, photos, 0
+        return rows, photos, job_count - IdCardExporter._log_failed(future.result())
+
+    @staticmethod
+    def _log_failed(failed):
+        """
+        Ghi log các ảnh không thu nhỏ được (thẻ của các sinh viên đó in khung ảnh trống).
+
+        Returns:
+            int: Số ảnh không thu nhỏ được
+        """
+        for source, reason in failed:
+            logging.warning(f"Không thể thu nhỏ ảnh {source}: {reason}")
+        return len(failed)
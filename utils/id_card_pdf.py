@@ -0,0 +1,262 @@
+"""
+Module dựng thẻ sinh viên ra PDF bằng reportlab.
+
+Gồm hai phần dùng chung cho tiến trình giao diện và các tiến trình của
+IdCardExporter (utils.id_card_export):
+
+- make_thumbnails: giải mã và thu nhỏ ảnh sinh viên bằng Pillow thành ảnh JPEG nhỏ
+  (chạy trong tiến trình con, kết quả lưu vào thư mục cache).
+- IdCardRenderer: xếp các thẻ (ảnh, họ tên, mã sinh viên, mã vạch) theo lưới trên
+  khổ A4 và ghi ra file. IdCardStreamWriter chạy nó trên một tiến trình riêng, nhận
+  thẻ qua hàng đợi như PdfStreamWriter.
+
+Module không import Qt để tiến trình con khởi động nhẹ.
+"""
+import os
+from importlib.util import find_spec
+
+from utils.pdf_export import FONT_NAME, HEADER_FONT_NAME, PdfStreamWriter
+
+HAS_PIL = find_spec("PIL") is not None
+
+# Kích thước thẻ theo chuẩn ID-1 (85.6 x 54 mm), tính theo point
+CARD_WIDTH = 85.6 * 72 / 25.4
+CARD_HEIGHT = 54 * 72 / 25.4
+# Lề trang và khoảng cách giữa các thẻ (point): A4 chứa 2 x 5 thẻ
+PAGE_MARGIN = 22
+CARD_GAP = 6
+# Khung ảnh 3x4 trên thẻ (point) và kích thước ảnh thu nhỏ (pixel, khoảng 250 dpi)
+PHOTO_WIDTH = 66
+PHOTO_HEIGHT = 88
+THUMBNAIL_SIZE = (230, 306)
+THUMBNAIL_QUALITY = 85
+HEADER_HEIGHT = 18
+BARCODE_HEIGHT = 20
+DEFAULT_TITLE = "THẺ SINH VIÊN"
+
+
+def card_grid():
+    """
+    Số cột và số hàng thẻ trên một trang A4.
+
+    Returns:
+        tuple: (số cột, số hàng)
+    """
+    from reportlab.lib.pagesizes import A4
+
+    width, height = A4
+    return (max(1, int((width - 2 * PAGE_MARGIN + CARD_GAP) // (CARD_WIDTH + CARD_GAP))),
+            max(1, int((height - 2 * PAGE_MARGIN + CARD_GAP) // (CARD_HEIGHT + CARD_GAP))))
+
+
+def make_thumbnail(source, target, size=THUMBNAIL_SIZE):
+    """
+    Thu nhỏ và cắt ảnh về đúng tỉ lệ khung ảnh, lưu thành JPEG. File đích được ghi ra
+    file tạm rồi đổi tên nên chỉ tồn tại khi đã ghi xong.
+
+    Args:
+        source (str): Ảnh gốc
+        target (str): File ảnh thu nhỏ
+        size (tuple): (rộng, cao) theo pixel
+
+    Raises:
+        OSError: Khi không đọc được ảnh gốc hoặc không ghi được file
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # Với JPEG, draft giải mã thẳng ở mức thu nhỏ lớn nhất mà ảnh vẫn không nhỏ hơn
+        # size (nhanh hơn nhiều lần so với giải mã đủ độ phân giải rồi mới thu nhỏ)
+        image.draft("RGB", size)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        thumbnail = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    temp_path = target + ".part"
+    thumbnail.save(temp_path, "JPEG", quality=THUMBNAIL_QUALITY)
+    os.replace(temp_path, target)
+
+
+def make_thumbnails(jobs, size=THUMBNAIL_SIZE):
+    """
+    Hàm chạy trong tiến trình con: tạo một lô ảnh thu nhỏ.
+
+    Args:
+        jobs (list): Các cặp (ảnh gốc, file ảnh thu nhỏ)
+        size (tuple): (rộng, cao) theo pixel
+
+    Returns:
+        list: Các ảnh gốc không xử lý được, kèm lý do: [(ảnh gốc, thông báo lỗi)]
+    """
+    failed = []
+    for source, target in jobs:
+        try:
+            make_thumbnail(source, target, size)
+        except Exception as e:
+            failed.append((source, str(e)))
+    return failed
+
+
+class IdCardRenderer:
+    """Xếp thẻ sinh viên theo lưới trên các trang A4, lần lượt từng thẻ."""
+
+    def __init__(self, file_path, title=DEFAULT_TITLE):
+        """
+        Mở file PDF đích
+
+        Args:
+            file_path (str): File đích
+            title (str): Dòng tiêu đề trên mỗi thẻ
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen.canvas import Canvas
+
+        self.title = title
+        self.page_width, self.page_height = A4
+        self.canvas = Canvas(file_path, pagesize=A4)
+        self.canvas.setTitle("Thẻ sinh viên")
+        self.columns, self.rows = card_grid()
+        # Căn giữa lưới thẻ trên trang
+        self.left = (self.page_width - self.columns * CARD_WIDTH - (self.columns - 1) * CARD_GAP) / 2
+        self.top = self.page_height - (self.page_height - self.rows * CARD_HEIGHT
+                                       - (self.rows - 1) * CARD_GAP) / 2
+        self.slot = 0
+        self.pages = 0
+
+    @property
+    def cards_per_page(self):
+        """Số thẻ trên một trang."""
+        return self.columns * self.rows
+
+    def add(self, student, photo=None):
+        """
+        Vẽ thẻ của một sinh viên vào ô tiếp theo (sang trang mới khi trang đầy).
+
+        Args:
+            student (dict): Thông tin sinh viên (ma_sinh_vien, ho_ten, ngay_sinh, ngay_nhap_hoc)
+            photo (str, optional): Ảnh thu nhỏ (JPEG); không có thì vẽ khung trống
+        """
+        if self.slot == self.cards_per_page:
+            self.canvas.showPage()
+            self.slot = 0
+        if self.slot == 0:
+            self.pages += 1
+        row, column = divmod(self.slot, self.columns)
+        x = self.left + column * (CARD_WIDTH + CARD_GAP)
+        y = self.top - (row + 1) * CARD_HEIGHT - row * CARD_GAP
+        self._draw_card(student, photo, x, y)
+        self.slot += 1
+
+    def _draw_card(self, student, photo, x, y):
+        """Vẽ một thẻ có góc dưới trái tại (x, y)."""
+        from reportlab.graphics.barcode.code128 import Code128
+        from reportlab.lib import colors
+
+        canvas = self.canvas
+        canvas.setStrokeColor(colors.grey)
+        canvas.setLineWidth(0.5)
+        canvas.roundRect(x, y, CARD_WIDTH, CARD_HEIGHT, 6)
+        canvas.setFillColor(colors.HexColor("#1f4e79"))
+        canvas.rect(x, y + CARD_HEIGHT - HEADER_HEIGHT, CARD_WIDTH, HEADER_HEIGHT, stroke=0, fill=1)
+        canvas.setFillColor(colors.white)
+        canvas.setFont(HEADER_FONT_NAME, 9)
+        canvas.drawCentredString(x + CARD_WIDTH / 2, y + CARD_HEIGHT - HEADER_HEIGHT + 5, self.title)
+
+        photo_x = x + 8
+        photo_y = y + CARD_HEIGHT - HEADER_HEIGHT - 6 - PHOTO_HEIGHT
+        if photo:
+            canvas.drawImage(photo, photo_x, photo_y, PHOTO_WIDTH, PHOTO_HEIGHT)
+        else:
+            canvas.setFillColor(colors.whitesmoke)
+            canvas.rect(photo_x, photo_y, PHOTO_WIDTH, PHOTO_HEIGHT, stroke=1, fill=1)
+            canvas.setFillColor(colors.grey)
+            canvas.setFont(FONT_NAME, 7)
+            canvas.drawCentredString(photo_x + PHOTO_WIDTH / 2, photo_y + PHOTO_HEIGHT / 2, "3 x 4")
+
+        text_x = photo_x + PHOTO_WIDTH + 8
+        text_width = x + CARD_WIDTH - 8 - text_x
+        line_y = y + CARD_HEIGHT - HEADER_HEIGHT - 18
+        canvas.setFillColor(colors.black)
+        name = student['ho_ten'] or ""
+        font_size = 10
+        while font_size > 6 and canvas.stringWidth(name, HEADER_FONT_NAME, font_size) > text_width:
+            font_size -= 1
+        canvas.setFont(HEADER_FONT_NAME, font_size)
+        canvas.drawString(text_x, line_y, name)
+        canvas.setFont(FONT_NAME, 8)
+        enrolled = student['ngay_nhap_hoc'] or ""
+        lines = (
+            f"MSSV: {student['ma_sinh_vien']}",
+            f"Ngày sinh: {student['ngay_sinh'] or ''}",
+            f"Khóa: {enrolled[:4]}" if enrolled else "",
+        )
+        for line in lines:
+            line_y -= 12
+            canvas.drawString(text_x, line_y, line)
+
+        barcode = Code128(student['ma_sinh_vien'], barHeight=BARCODE_HEIGHT, barWidth=0.8,
+                          quiet=False)
+        bar_x = x + CARD_WIDTH - 8 - barcode.width
+        barcode.drawOn(canvas, max(text_x, bar_x), y + 8)
+
+    def save(self):
+        """Ghi và đóng file PDF."""
+        if self.slot:
+            self.canvas.showPage()
+        self.canvas.save()
+
+
+def _render_cards(file_path, title, batches, results):
+    """
+    Hàm chạy trong tiến trình vẽ: nhận từng lô thẻ từ hàng đợi cho tới khi gặp None.
+
+    Args:
+        file_path (str): File đích
+        title (str): Dòng tiêu đề trên mỗi thẻ
+        batches (multiprocessing.Queue): Hàng đợi các lô [(thông tin sinh viên, ảnh thu nhỏ)]
+        results (multiprocessing.Queue): Nhận None khi xong hoặc thông báo lỗi
+    """
+    from reportlab import rl_config
+
+    try:
+        # Nhúng ảnh JPEG nguyên dạng nhị phân: mã hóa ASCII85 bằng Python chiếm phần lớn
+        # thời gian vẽ. Tiến trình riêng nên không ảnh hưởng các file PDF khác.
+        rl_config.useA85 = 0
+        renderer = IdCardRenderer(file_path, title)
+        while True:
+            cards = batches.get()
+            if cards is None:
+                break
+            for student, photo in cards:
+                renderer.add(student, photo)
+        renderer.save()
+        results.put(None)
+    except Exception as e:
+        results.put(str(e))
+
+
+class IdCardStreamWriter(PdfStreamWriter):
+    """
+    Xếp thẻ sinh viên ra PDF trên tiến trình riêng (dùng chung việc khởi động tiến
+    trình, hàng đợi, close và abort với PdfStreamWriter).
+    """
+
+    def __init__(self, file_path, title=DEFAULT_TITLE):
+        """
+        Khởi động tiến trình vẽ
+
+        Args:
+            file_path (str): File đích
+            title (str): Dòng tiêu đề trên mỗi thẻ
+        """
+        self._start(_render_cards, file_path, title)
+
+    def write_cards(self, cards):
+        """
+        Gửi một lô thẻ sang tiến trình vẽ (chờ khi hàng đợi đầy).
+
+        Args:
+            cards (list): Các cặp (dict thông tin sinh viên, ảnh thu nhỏ hoặc None)
+
+        Raises:
+            FileException: Khi tiến trình vẽ đã dừng vì lỗi
+        """
+        self._send(cards)
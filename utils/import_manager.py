@@ -1,32 +1,437 @@
+"""
+Module nhập dữ liệu sinh viên từ file CSV/Excel.
+
+File được đọc theo từng khối (chunk) nên bộ nhớ dùng không phụ thuộc kích thước
+file: CSV đọc qua pandas với chunksize, xlsx đọc bằng openpyxl ở chế độ
+read-only. Mỗi khối được chuẩn hóa và kiểm tra theo cả cột (utils.import_validation,
+song song trên nhiều tiến trình khi file lớn) rồi ghi vào cơ sở dữ liệu trong
+một giao dịch.
+"""
+import logging
+import os
+from datetime import date, datetime
+
+import numpy as np
 import pandas as pd
+from PyQt6.QtCore import QObject, pyqtSignal
 from models.student import Student
+from utils.import_validation import (RULE_DUPLICATE_ID, add_to_summary, check_students,
+                                     default_workers, empty_summary, error_reasons, map_chunks)
+
+# Số dòng đọc và ghi trong mỗi khối
+DEFAULT_CHUNK_SIZE = 5000
+
+# Các cột sinh viên được nhập từ file (theo thứ tự tham số của Student)
+IMPORT_COLUMNS = ("ma_sinh_vien", "ho_ten", "ngay_sinh", "gioi_tinh", "email",
+                  "so_dien_thoai", "dia_chi", "ngay_nhap_hoc", "trang_thai")
+
+# Tên cột trong file (chữ thường, bỏ khoảng trắng thừa) -> cột của bảng sinh_vien;
+# nhận cả tên tiếng Anh cũ và tiêu đề của file xuất từ danh sách sinh viên
+COLUMN_ALIASES = {
+    "student_id": "ma_sinh_vien", "mã sv": "ma_sinh_vien", "mã sinh viên": "ma_sinh_vien",
+    "full_name": "ho_ten", "họ tên": "ho_ten", "họ và tên": "ho_ten",
+    "date_of_birth": "ngay_sinh", "ngày sinh": "ngay_sinh",
+    "gender": "gioi_tinh", "giới tính": "gioi_tinh",
+    "phone": "so_dien_thoai", "sđt": "so_dien_thoai", "số điện thoại": "so_dien_thoai",
+    "address": "dia_chi", "địa chỉ": "dia_chi",
+    "enrolled_date": "ngay_nhap_hoc", "ngày nhập học": "ngay_nhap_hoc",
+    "status": "trang_thai", "trạng thái": "trang_thai",
+}
+
+WRITE_ERROR_MESSAGE = "Lỗi ghi cơ sở dữ liệu"
+DEFAULT_STATUS = "Đang học"
+
+# Cột lý do từ chối và số dòng trong file của khối đã chuẩn hóa
+ERROR_COLUMN = "loi"
+LINE_COLUMN = "dong"
+
 
 class ImportManager:
     @staticmethod
     def import_students(file_path):
         """
-        Đọc file Excel/CSV và trả về danh sách đối tượng Student.
+        Đọc file Excel/CSV và trả về danh sách đối tượng Student hợp lệ.
+        Chỉ dùng cho file nhỏ; file lớn nên nhập qua StudentImporter.
         """
-        if file_path.endswith(".csv"):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-        # Chuẩn hóa tên cột
-        df.columns = [c.strip().lower() for c in df.columns]
         students = []
-        for _, row in df.iterrows():
-            student = Student(
-                ma_sinh_vien=str(row.get("student_id", "")).strip(),
-                ho_ten=str(row.get("full_name", "")).strip(),
-                ngay_sinh=str(row.get("date_of_birth", "")).strip(),
-                gioi_tinh=str(row.get("gender", "")).strip(),
-                email=str(row.get("email", "")).strip(),
-                so_dien_thoai=str(row.get("phone", "")).strip(),
-                dia_chi=str(row.get("address", "")).strip(),
-                ngay_nhap_hoc=str(row.get("enrolled_date", "")).strip(),
-                trang_thai=str(row.get("status", "")).strip(),
-                duong_dan_anh=""
-            )
-            if student.ma_sinh_vien and student.ho_ten:
-                students.append(student)
+        for chunk in ImportManager.read_chunks(file_path):
+            normalized, matrix = ImportManager.validate_chunk(chunk)
+            valid = ImportManager.fill_defaults(normalized[~matrix.to_numpy().any(axis=1)].copy())
+            students.extend(Student(*values) for values in
+                            valid[list(IMPORT_COLUMNS)].itertuples(index=False, name=None))
         return students
+
+    @staticmethod
+    def read_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Đọc file theo từng khối dòng.
+
+        Args:
+            file_path (str): Đường dẫn file .csv, .xlsx/.xlsm hoặc .xls
+            chunk_size (int): Số dòng mỗi khối
+
+        Yields:
+            pandas.DataFrame: Khối dữ liệu, mọi giá trị là chuỗi (ô trống là ""), kèm cột
+                LINE_COLUMN là số dòng trong file; các dòng trống bị bỏ qua
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".csv":
+            # dtype=object giữ chuỗi Python thuần, nhanh hơn kiểu str của pandas khi chuẩn hóa.
+            # Giữ dòng trống để index khớp với dòng trong file, bỏ sau khi đã đánh số
+            reader = pd.read_csv(file_path, dtype=object, keep_default_na=False,
+                                 skip_blank_lines=False, encoding="utf-8-sig",
+                                 chunksize=chunk_size)
+            with reader:
+                for chunk in reader:
+                    chunk = ImportManager._number_rows(chunk)
+                    if len(chunk):
+                        yield chunk
+        elif extension in (".xlsx", ".xlsm"):
+            yield from ImportManager._read_xlsx_chunks(file_path, chunk_size)
+        else:
+            # .xls cũ không đọc được theo luồng, đọc cả file rồi chia khối
+            df = ImportManager._number_rows(pd.read_excel(file_path, dtype=object,
+                                                          keep_default_na=False))
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+
+    @staticmethod
+    def _number_rows(df):
+        """
+        Thêm cột LINE_COLUMN (dòng 1 là tiêu đề nên dòng dữ liệu thứ i là i + 2) rồi bỏ
+        các dòng trống.
+
+        Args:
+            df (pandas.DataFrame): Dữ liệu đọc bởi pandas, index là thứ tự dòng từ 0
+
+        Returns:
+            pandas.DataFrame: Các dòng không trống, có thêm cột LINE_COLUMN
+        """
+        blank = (df == "").all(axis=1)
+        df[LINE_COLUMN] = df.index + 2
+        return df[~blank]
+
+    @staticmethod
+    def _read_xlsx_chunks(file_path, chunk_size):
+        """Đọc sheet đầu tiên của file xlsx bằng openpyxl read-only theo từng khối."""
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [ImportManager._cell_text(value) or f"cot_{i + 1}"
+                       for i, value in enumerate(header)]
+            columns.append(LINE_COLUMN)
+            batch = []
+            # Dòng 1 là tiêu đề; số dòng được lấy trước khi bỏ dòng trống
+            for line, row in enumerate(rows, start=2):
+                if not any(value is not None for value in row):
+                    continue
+                values = [ImportManager._cell_text(value) for value in row[:len(columns) - 1]]
+                values.extend([""] * (len(columns) - 1 - len(values)))
+                values.append(line)
+                batch.append(values)
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _cell_text(value):
+        """Chuyển giá trị ô Excel thành chuỗi (ngày dạng YYYY-MM-DD, số nguyên không có .0)."""
+        if value is None:
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @staticmethod
+    def count_rows(file_path):
+        """
+        Ước lượng số dòng dữ liệu của file (không tính dòng tiêu đề) để hiển thị tiến trình.
+
+        Args:
+            file_path (str): Đường dẫn file
+
+        Returns:
+            int: Số dòng ước lượng, 0 nếu không xác định được
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        try:
+            if extension == ".csv":
+                lines = 0
+                with open(file_path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        lines += block.count(b"\n")
+                return max(lines - 1, 0)
+            if extension in (".xlsx", ".xlsm"):
+                from openpyxl import load_workbook
+                workbook = load_workbook(file_path, read_only=True)
+                try:
+                    return max((workbook.active.max_row or 1) - 1, 0)
+                finally:
+                    workbook.close()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Không thể đếm số dòng của {file_path}: {e}")
+        return 0
+
+    @staticmethod
+    def normalize_students(df):
+        """
+        Chuẩn hóa một khối dữ liệu sinh viên theo cột: đổi tên cột, bỏ khoảng trắng.
+        Ô trống được giữ nguyên (xem fill_defaults).
+
+        Args:
+            df (pandas.DataFrame): Khối dữ liệu đọc từ file
+
+        Returns:
+            pandas.DataFrame: Các cột IMPORT_COLUMNS (chuỗi), giữ nguyên index
+        """
+        columns = {}
+        for column in df.columns:
+            key = str(column).strip().lower()
+            target = COLUMN_ALIASES.get(key, key)
+            if target in IMPORT_COLUMNS and target not in columns:
+                columns[target] = column
+
+        normalized = pd.DataFrame(index=df.index)
+        for target in IMPORT_COLUMNS:
+            if target in columns:
+                normalized[target] = df[columns[target]].astype(str).astype(object).str.strip()
+            else:
+                normalized[target] = ""
+        return normalized
+
+    @staticmethod
+    def default_values():
+        """
+        Giá trị mặc định cho các ô trống của sinh viên mới.
+
+        Returns:
+            dict: Tên cột -> giá trị (trạng thái mặc định, ngày nhập học là hôm nay)
+        """
+        return {"trang_thai": DEFAULT_STATUS, "ngay_nhap_hoc": datetime.now().strftime("%Y-%m-%d")}
+
+    @staticmethod
+    def fill_defaults(frame):
+        """
+        Điền giá trị mặc định vào các ô trống (chỉ dùng cho sinh viên thêm mới;
+        khi cập nhật, ô trống nghĩa là giữ nguyên giá trị hiện có).
+
+        Args:
+            frame (pandas.DataFrame): Khối đã chuẩn hóa
+
+        Returns:
+            pandas.DataFrame: Chính frame, đã được điền
+        """
+        for column, value in ImportManager.default_values().items():
+            frame.loc[frame[column] == "", column] = value
+        return frame
+
+    @staticmethod
+    def validate_chunk(df):
+        """
+        Chuẩn hóa và kiểm tra một khối (chạy được trong tiến trình kiểm tra song song).
+
+        Args:
+            df (pandas.DataFrame): Khối dữ liệu đọc từ file
+
+        Returns:
+            tuple: (khối đã chuẩn hóa, kèm cột LINE_COLUMN nếu df có, ma trận lỗi từ
+                    check_students)
+        """
+        normalized = ImportManager.normalize_students(df)
+        matrix = check_students(normalized)
+        if LINE_COLUMN in df:
+            normalized[LINE_COLUMN] = df[LINE_COLUMN]
+        return normalized, matrix
+
+
+class StudentImporter(QObject):
+    """
+    Nhập sinh viên từ file theo luồng: đọc từng khối, chuẩn hóa và kiểm tra theo cột,
+    ghi mỗi khối trong một giao dịch và ghi các dòng bị từ chối ra file báo lỗi.
+    dry_run() chỉ kiểm tra và tổng hợp lỗi, không ghi gì vào cơ sở dữ liệu.
+
+    run() và dry_run() chạy trên luồng nền (BackgroundLoader với cancellable=True);
+    tiến trình được báo qua progressChanged, Qt tự chuyển tín hiệu về luồng giao diện.
+    """
+    # (số dòng đã xử lý, tổng số dòng ước lượng; 0 nếu không rõ)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, student_controller, chunk_size=DEFAULT_CHUNK_SIZE, parent=None):
+        """
+        Khởi tạo bộ nhập sinh viên
+
+        Args:
+            student_controller (StudentController): Controller dùng để ghi sinh viên
+            chunk_size (int): Số dòng mỗi khối
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self.student_controller = student_controller
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def default_error_report_path(file_path):
+        """Đường dẫn file báo lỗi mặc định: cạnh file nguồn, thêm hậu tố _loi_nhap.csv."""
+        return f"{os.path.splitext(file_path)[0]}_loi_nhap.csv"
+
+    def validated_chunks(self, file_path, workers=None, cancel_token=None):
+        """
+        Đọc, chuẩn hóa và kiểm tra file theo từng khối (song song khi file lớn).
+
+        Args:
+            file_path (str): Đường dẫn file CSV/Excel
+            workers (int, optional): Số tiến trình kiểm tra, mặc định theo kích thước file
+            cancel_token (CancellationToken, optional): Cờ hủy, kiểm tra giữa các khối
+
+        Yields:
+            tuple: (khối đã chuẩn hóa có thêm cột "dong" và "loi", ma trận lỗi, số dòng
+                    ước lượng của file); mã trùng với dòng hợp lệ trước đó bị đánh dấu trùng
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+        """
+        total = ImportManager.count_rows(file_path)
+        if workers is None:
+            workers = default_workers(total)
+        seen_ids = set()
+        processed = 0
+        chunks = map_chunks(ImportManager.validate_chunk,
+                            ImportManager.read_chunks(file_path, self.chunk_size), workers)
+        try:
+            for normalized, matrix in chunks:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                processed += len(normalized)
+
+                # Mã trùng: chỉ so với các dòng hợp lệ (trong khối và các khối trước)
+                otherwise_valid = ~matrix.to_numpy().any(axis=1)
+                ids = normalized["ma_sinh_vien"]
+                in_earlier_chunks = np.fromiter((i in seen_ids for i in ids.tolist()), bool, len(ids))
+                duplicated = otherwise_valid & (in_earlier_chunks
+                                                | (ids.where(otherwise_valid).duplicated()
+                                                   & otherwise_valid))
+                matrix[RULE_DUPLICATE_ID] = duplicated
+                seen_ids.update(ids[otherwise_valid & ~duplicated])
+
+                normalized[ERROR_COLUMN] = error_reasons(matrix)
+                yield normalized, matrix, max(total, processed)
+        finally:
+            chunks.close()
+
+    def dry_run(self, file_path, workers=None, cancel_token=None):
+        """
+        Kiểm tra toàn bộ file mà không ghi vào cơ sở dữ liệu.
+
+        Args:
+            file_path (str): Đường dẫn file CSV/Excel
+            workers (int, optional): Số tiến trình kiểm tra, mặc định theo kích thước file
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: Bản tổng hợp (xem import_validation.empty_summary): tổng số dòng,
+                  số dòng hợp lệ/lỗi, số dòng vi phạm từng quy tắc và một số dòng lỗi ví dụ
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+        """
+        summary = empty_summary()
+        for normalized, matrix, total in self.validated_chunks(file_path, workers, cancel_token):
+            add_to_summary(summary, matrix, normalized[LINE_COLUMN].to_numpy(),
+                           normalized[ERROR_COLUMN].to_numpy())
+            self.progressChanged.emit(summary['total'], total)
+        logging.info(f"Kiểm tra {file_path}: {summary['valid']} dòng hợp lệ, "
+                     f"{summary['invalid']} dòng lỗi")
+        return summary
+
+    def run(self, file_path, error_report_path=None, current_user_id=None, workers=None,
+            merge=False, cancel_token=None):
+        """
+        Nhập toàn bộ file. Các khối đã ghi được giữ lại nếu bị hủy giữa chừng.
+
+        Args:
+            file_path (str): Đường dẫn file CSV/Excel
+            error_report_path (str, optional): File CSV ghi các dòng bị từ chối,
+                mặc định xem default_error_report_path
+            current_user_id (int, optional): ID người dùng để ghi nhật ký hoạt động
+            workers (int, optional): Số tiến trình kiểm tra, mặc định theo kích thước file
+            merge (bool): True để cập nhật sinh viên đã tồn tại (ô trống giữ nguyên giá trị cũ),
+                False để bỏ qua các mã đã tồn tại
+            cancel_token (CancellationToken, optional): Cờ hủy, kiểm tra giữa các khối
+
+        Returns:
+            dict: {'total', 'inserted', 'updated', 'unchanged', 'skipped' (mã đã tồn tại,
+                   khi không gộp), 'rejected', 'error_report' (đường dẫn hoặc None nếu
+                   không có dòng lỗi)}
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+        """
+        error_report_path = error_report_path or self.default_error_report_path(file_path)
+        file_name = os.path.basename(file_path)
+        result = {'total': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0,
+                  'rejected': 0, 'error_report': None}
+        columns = self.student_controller.STUDENT_COLUMNS
+        report = None
+        try:
+            for normalized, _, total in self.validated_chunks(file_path, workers, cancel_token):
+                result['total'] += len(normalized)
+                valid_mask = normalized[ERROR_COLUMN] == ""
+                valid = normalized[valid_mask]
+                if len(valid):
+                    if not merge:
+                        valid = ImportManager.fill_defaults(valid.copy())
+                    rows = list(zip(*(valid[column].tolist() if column in valid else [""] * len(valid)
+                                      for column in columns)))
+                    if merge:
+                        written = self.student_controller.merge_students_bulk(
+                            rows, ImportManager.default_values(), cancel_token)
+                    else:
+                        written = self.student_controller.add_students_bulk(rows, cancel_token)
+                    if written is None:
+                        normalized.loc[valid_mask, ERROR_COLUMN] = WRITE_ERROR_MESSAGE
+                    else:
+                        for key in ('inserted', 'updated', 'unchanged', 'skipped'):
+                            result[key] += written.get(key, 0)
+                        if current_user_id and written.get('changes'):
+                            # Mỗi sinh viên được cập nhật một dòng nhật ký, ghi cả khối một lần
+                            self.student_controller.db_manager.log_activities(
+                                current_user_id, "UPDATE",
+                                [(f"Cập nhật sinh viên {student_id} từ file {file_name}: "
+                                  f"{', '.join(sorted(fields))}", student_id)
+                                 for student_id, fields in written['changes']],
+                                "Student")
+
+                rejected = normalized[normalized[ERROR_COLUMN] != ""]
+                if len(rejected):
+                    if report is None:
+                        report = open(error_report_path, "w", encoding="utf-8-sig", newline="")
+                        result['error_report'] = error_report_path
+                    rejected[[LINE_COLUMN, ERROR_COLUMN, *IMPORT_COLUMNS]].rename(
+                        columns={LINE_COLUMN: "Dòng", ERROR_COLUMN: "Lỗi"}).to_csv(
+                        report, header=report.tell() == 0, index=False)
+                    result['rejected'] += len(rejected)
+
+                self.progressChanged.emit(result['total'], total)
+        finally:
+            if report is not None:
+                report.close()
+
+        logging.info(f"Nhập sinh viên từ {file_path}: {result['inserted']} thêm mới, "
+                     f"{result['updated']} cập nhật, {result['unchanged']} không đổi, "
+                     f"{result['skipped']} đã tồn tại, {result['rejected']} bị từ chối")
+        if current_user_id and result['inserted']:
+            self.student_controller.db_manager.log_activity(
+                current_user_id, "ADD",
+                f"Nhập {result['inserted']} sinh viên từ file {file_name}",
+                "Student")
+        return result
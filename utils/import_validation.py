@@ -0,0 +1,222 @@
+"""
+Module kiểm tra dữ liệu nhập theo cột.
+
+Mỗi quy tắc kiểm tra cả một cột của khối dữ liệu bằng biểu thức chính quy đã
+biên dịch sẵn (utils.helpers) hoặc phân tích ngày hàng loạt của pandas, kết quả
+là ma trận lỗi: mỗi dòng của khối một dòng, mỗi quy tắc một cột (True là lỗi).
+File lớn được chia khối cho nhiều tiến trình kiểm tra song song.
+"""
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from utils.helpers import EMAIL_PATTERN, PHONE_PATTERN, STUDENT_ID_PATTERN
+
+# Định dạng ngày được chấp nhận (ngày được chuẩn hóa về định dạng đầu tiên)
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+GENDERS = ("Nam", "Nữ", "Khác")
+STATUSES = ("Đang học", "Tạm nghỉ", "Đã tốt nghiệp", "Đã thôi học")
+
+# Các quy tắc theo thứ tự ưu tiên của thông báo: (tên, thông báo)
+RULE_MISSING_ID = "missing_id"
+RULE_INVALID_ID = "invalid_id"
+RULE_DUPLICATE_ID = "duplicate_id"
+RULE_MISSING_NAME = "missing_name"
+RULE_INVALID_BIRTH_DATE = "invalid_birth_date"
+RULE_INVALID_GENDER = "invalid_gender"
+RULE_INVALID_EMAIL = "invalid_email"
+RULE_INVALID_PHONE = "invalid_phone"
+RULE_INVALID_ENROLLED_DATE = "invalid_enrolled_date"
+RULE_INVALID_STATUS = "invalid_status"
+RULES = (
+    (RULE_MISSING_ID, "Thiếu mã sinh viên"),
+    (RULE_INVALID_ID, "Mã sinh viên không hợp lệ"),
+    (RULE_DUPLICATE_ID, "Trùng mã sinh viên trong file"),
+    (RULE_MISSING_NAME, "Thiếu họ tên"),
+    (RULE_INVALID_BIRTH_DATE, "Ngày sinh không hợp lệ"),
+    (RULE_INVALID_GENDER, "Giới tính không hợp lệ"),
+    (RULE_INVALID_EMAIL, "Email không hợp lệ"),
+    (RULE_INVALID_PHONE, "Số điện thoại không hợp lệ"),
+    (RULE_INVALID_ENROLLED_DATE, "Ngày nhập học không hợp lệ"),
+    (RULE_INVALID_STATUS, "Trạng thái không hợp lệ"),
+)
+RULE_MESSAGES = dict(RULES)
+
+# Số dòng (ước lượng) từ đó việc kiểm tra được chia cho nhiều tiến trình
+PARALLEL_THRESHOLD = 50000
+# Số tiến trình kiểm tra tối đa
+MAX_WORKERS = 4
+
+
+def default_workers(estimated_rows):
+    """
+    Số tiến trình nên dùng để kiểm tra một file.
+
+    Args:
+        estimated_rows (int): Số dòng ước lượng của file
+
+    Returns:
+        int: 1 nếu file nhỏ hoặc máy chỉ có một nhân (kiểm tra ngay trong tiến trình hiện tại)
+    """
+    if estimated_rows < PARALLEL_THRESHOLD:
+        return 1
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def parse_dates(values):
+    """
+    Phân tích một cột ngày theo các định dạng trong DATE_FORMATS.
+
+    Args:
+        values (pandas.Series): Cột chuỗi ngày ("" là bỏ trống)
+
+    Returns:
+        tuple: (cột ngày dạng YYYY-MM-DD, giữ nguyên giá trị không hợp lệ;
+                mảng bool đánh dấu giá trị không trống nhưng không hợp lệ)
+    """
+    parsed = pd.to_datetime(values, format=DATE_FORMATS[0], errors="coerce")
+    for date_format in DATE_FORMATS[1:]:
+        retry = parsed.isna() & (values != "")
+        if not retry.any():
+            break
+        parsed[retry] = pd.to_datetime(values[retry], format=date_format, errors="coerce")
+    valid = parsed.notna()
+    normalized = values.copy()
+    normalized[valid] = parsed[valid].dt.strftime(DATE_FORMATS[0])
+    return normalized, (~valid & (values != "")).to_numpy()
+
+
+def _canonical(values, choices):
+    """Đưa các giá trị về đúng cách viết trong choices (không phân biệt hoa thường)."""
+    lookup = {choice.lower(): choice for choice in choices}
+    canonical = values.str.lower().map(lookup)
+    return canonical.fillna(values)
+
+
+def check_students(frame):
+    """
+    Kiểm tra một khối sinh viên đã chuẩn hóa theo từng cột. Ngày được đưa về
+    dạng YYYY-MM-DD, giới tính và trạng thái về đúng cách viết ngay trong frame.
+
+    Args:
+        frame (pandas.DataFrame): Khối đã chuẩn hóa (các cột của bảng sinh_vien, chuỗi);
+            ô trống ở các cột không bắt buộc là hợp lệ
+
+    Returns:
+        pandas.DataFrame: Ma trận lỗi (bool), mỗi quy tắc trong RULES một cột;
+                          cột RULE_DUPLICATE_ID do bên đọc file điền (cần biết các khối trước)
+    """
+    ids = frame["ma_sinh_vien"]
+    missing_id = (ids == "").to_numpy()
+    errors = {
+        RULE_MISSING_ID: missing_id,
+        RULE_INVALID_ID: ~missing_id & ~ids.str.match(STUDENT_ID_PATTERN).to_numpy(dtype=bool),
+        RULE_DUPLICATE_ID: np.zeros(len(frame), dtype=bool),
+        RULE_MISSING_NAME: (frame["ho_ten"] == "").to_numpy(),
+    }
+
+    frame["ngay_sinh"], errors[RULE_INVALID_BIRTH_DATE] = parse_dates(frame["ngay_sinh"])
+    frame["ngay_nhap_hoc"], errors[RULE_INVALID_ENROLLED_DATE] = parse_dates(frame["ngay_nhap_hoc"])
+
+    frame["gioi_tinh"] = _canonical(frame["gioi_tinh"], GENDERS)
+    errors[RULE_INVALID_GENDER] = ((frame["gioi_tinh"] != "")
+                                   & ~frame["gioi_tinh"].isin(GENDERS)).to_numpy()
+    frame["trang_thai"] = _canonical(frame["trang_thai"], STATUSES)
+    errors[RULE_INVALID_STATUS] = ((frame["trang_thai"] != "")
+                                   & ~frame["trang_thai"].isin(STATUSES)).to_numpy()
+
+    for rule, column, pattern in ((RULE_INVALID_EMAIL, "email", EMAIL_PATTERN),
+                                  (RULE_INVALID_PHONE, "so_dien_thoai", PHONE_PATTERN)):
+        values = frame[column]
+        errors[rule] = ((values != "") & ~values.str.match(pattern)).to_numpy(dtype=bool)
+
+    return pd.DataFrame({rule: errors[rule] for rule, _ in RULES}, index=frame.index)
+
+
+def error_reasons(matrix):
+    """
+    Ghép thông báo của các quy tắc bị vi phạm trên từng dòng.
+
+    Args:
+        matrix (pandas.DataFrame): Ma trận lỗi từ check_students
+
+    Returns:
+        numpy.ndarray: Chuỗi lý do của từng dòng ("" nếu hợp lệ), các lý do cách nhau bởi "; "
+    """
+    reasons = np.full(len(matrix), "", dtype=object)
+    for rule, message in RULES:
+        failed = matrix[rule].to_numpy()
+        if failed.any():
+            reasons[failed] = reasons[failed] + np.where(reasons[failed] == "", "", "; ") + message
+    return reasons
+
+
+def empty_summary():
+    """
+    Tạo bản tổng hợp kiểm tra rỗng (cộng dồn qua add_to_summary).
+
+    Returns:
+        dict: {'total', 'valid', 'invalid', 'by_rule' (thông báo -> số dòng), 'samples'}
+    """
+    return {'total': 0, 'valid': 0, 'invalid': 0,
+            'by_rule': {message: 0 for _, message in RULES}, 'samples': []}
+
+
+def add_to_summary(summary, matrix, lines, reasons, max_samples=20):
+    """
+    Cộng kết quả kiểm tra của một khối vào bản tổng hợp.
+
+    Args:
+        summary (dict): Bản tổng hợp từ empty_summary
+        matrix (pandas.DataFrame): Ma trận lỗi của khối
+        lines (numpy.ndarray): Số dòng trong file của từng dòng trong khối
+        reasons (numpy.ndarray): Lý do từ chối từ error_reasons
+        max_samples (int): Số dòng lỗi tối đa giữ lại làm ví dụ
+    """
+    invalid = reasons != ""
+    summary['total'] += len(matrix)
+    summary['invalid'] += int(invalid.sum())
+    summary['valid'] += int((~invalid).sum())
+    for rule, count in matrix.sum().items():
+        summary['by_rule'][RULE_MESSAGES[rule]] += int(count)
+    room = max_samples - len(summary['samples'])
+    if room > 0 and invalid.any():
+        summary['samples'].extend(zip(lines[invalid][:room].tolist(), reasons[invalid][:room].tolist()))
+
+
+def map_chunks(func, chunks, workers=1):
+    """
+    Áp dụng func cho từng khối và trả kết quả theo đúng thứ tự khối.
+    Với workers > 1, các khối được kiểm tra trên pool tiến trình; tối đa
+    2 * workers khối chờ cùng lúc nên bộ nhớ vẫn bị chặn trên.
+
+    Args:
+        func (callable): Hàm cấp module (pickle được), nhận một khối
+        chunks (iterable): Các khối dữ liệu
+        workers (int): Số tiến trình
+
+    Yields:
+        Kết quả func của từng khối
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    # spawn thay vì fork: tiến trình giao diện có nhiều luồng Qt đang chạy
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    logging.info(f"Kiểm tra dữ liệu nhập trên {workers} tiến trình")
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,5 +1,4 @@
 import logging
-from DB.db_manager import DatabaseManager
 from datetime import datetime
 
 def initialize_activity_data(db_manager):
@@ -62,15 +61,16 @@ def initialize_activity_data(db_manager):
         logging.error(f"Error initializing activity data: {e}")
         return False
 
-def initialize_all_data(db_path):
-    """Initialize all application data"""
+def initialize_all_data(db_manager):
+    """
+    Initialize all application data
+
+    Args:
+        db_manager (DatabaseManager): Shared database manager (not closed here)
+    """
     try:
-        db_manager = DatabaseManager(db_path)
         initialize_activity_data(db_manager)
         return True
     except Exception as e:
         logging.error(f"Error in data initialization: {str(e)}")
         return False
-    finally:
-        if 'db_manager' in locals() and db_manager:
-            db_manager.close()
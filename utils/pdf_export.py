@@ -0,0 +1,267 @@
+"""
+Module xuất bảng dữ liệu ra PDF theo từng trang.
+
+Thay vì dựng một Table reportlab chứa mọi dòng (chi phí dàn trang tăng theo bình
+phương số dòng), dữ liệu được chia thành các khối vừa một trang; mỗi trang là một
+bảng riêng có lặp lại tiêu đề cột, vẽ thẳng lên canvas rồi sang trang mới.
+
+PdfStreamWriter chạy việc vẽ trong một tiến trình riêng: luồng xuất đọc dữ liệu
+và gửi từng trang qua hàng đợi có giới hạn, tiến trình vẽ ghi thẳng vào file đích.
+Module không import Qt để tiến trình vẽ khởi động nhẹ.
+"""
+import logging
+import multiprocessing
+import queue
+from datetime import datetime
+
+from utils.error_handler import FileException
+
+FONT_NAME = "Helvetica"
+FONT_SIZE = 8
+HEADER_FONT_NAME = "Helvetica-Bold"
+ROW_HEIGHT = 14
+MARGIN = 36
+# Khoảng dành cho tiêu đề báo cáo (trang đầu) và số trang (chân trang)
+TITLE_HEIGHT = 40
+FOOTER_HEIGHT = 20
+# Số trang tối đa chờ vẽ trong hàng đợi (giới hạn bộ nhớ khi đọc nhanh hơn vẽ)
+PAGE_QUEUE_SIZE = 4
+# Chu kỳ (giây) kiểm tra tiến trình vẽ còn sống khi hàng đợi đầy
+QUEUE_POLL_INTERVAL = 0.5
+
+
+def page_size_for(headers):
+    """
+    Khổ giấy theo số cột: nhiều cột thì dùng A4 ngang.
+
+    Args:
+        headers (list): Tiêu đề các cột
+
+    Returns:
+        tuple: (rộng, cao) theo point
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    return landscape(A4) if len(headers) > 6 else A4
+
+
+def rows_per_page(headers):
+    """
+    Số dòng dữ liệu vừa một trang (trang đầu có thêm tiêu đề báo cáo nên dùng chung
+    số dòng của trang đầu cho mọi trang).
+
+    Args:
+        headers (list): Tiêu đề các cột
+
+    Returns:
+        int: Số dòng mỗi trang
+    """
+    height = page_size_for(headers)[1]
+    usable = height - 2 * MARGIN - TITLE_HEIGHT - FOOTER_HEIGHT
+    # Trừ một dòng cho tiêu đề cột
+    return max(1, int(usable // ROW_HEIGHT) - 1)
+
+
+class PdfPageRenderer:
+    """Vẽ bảng dữ liệu lên PDF, mỗi lần một trang."""
+
+    def __init__(self, file_path, headers, title=None):
+        """
+        Mở file PDF đích
+
+        Args:
+            file_path (str): File đích
+            headers (list): Tiêu đề các cột
+            title (str, optional): Tiêu đề báo cáo (in ở trang đầu)
+        """
+        from reportlab.lib import colors
+        from reportlab.pdfgen.canvas import Canvas
+        from reportlab.platypus import TableStyle
+
+        self.headers = [str(header) for header in headers]
+        self.title = title
+        self.page_width, self.page_height = page_size_for(headers)
+        self.canvas = Canvas(file_path, pagesize=(self.page_width, self.page_height))
+        if title:
+            self.canvas.setTitle(title)
+        self.col_width = (self.page_width - 2 * MARGIN) / max(1, len(self.headers))
+        # Cắt chữ theo độ rộng trung bình của ký tự để bảng không tràn cột
+        self.max_chars = max(3, int(self.col_width / (FONT_SIZE * 0.55)))
+        self.page_number = 0
+        self.style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('FONTNAME', (0, 0), (-1, 0), HEADER_FONT_NAME),
+            ('FONTNAME', (0, 1), (-1, -1), FONT_NAME),
+            ('FONTSIZE', (0, 0), (-1, -1), FONT_SIZE),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.whitesmoke]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ])
+
+    def _fit(self, value):
+        """Đưa giá trị về chuỗi vừa độ rộng cột."""
+        text = "" if value is None else str(value)
+        if len(text) > self.max_chars:
+            return text[:self.max_chars - 3] + "..."
+        return text
+
+    def draw_page(self, rows):
+        """
+        Vẽ một trang gồm tiêu đề cột và các dòng (tối đa rows_per_page dòng).
+
+        Args:
+            rows (list): Các dòng dữ liệu của trang
+        """
+        from reportlab.platypus import Table
+
+        self.page_number += 1
+        top = self.page_height - MARGIN
+        if self.page_number == 1 and self.title:
+            self.canvas.setFont(HEADER_FONT_NAME, 14)
+            self.canvas.drawString(MARGIN, top - 14, self.title)
+            self.canvas.setFont(FONT_NAME, FONT_SIZE)
+            self.canvas.drawString(MARGIN, top - 28,
+                                   f"Ngày xuất: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        top -= TITLE_HEIGHT
+
+        data = [self.headers] + [[self._fit(value) for value in row] for row in rows]
+        table = Table(data, colWidths=[self.col_width] * len(self.headers), rowHeights=ROW_HEIGHT)
+        table.setStyle(self.style)
+        _, height = table.wrapOn(self.canvas, self.page_width, self.page_height)
+        table.drawOn(self.canvas, MARGIN, top - height)
+
+        self.canvas.setFont(FONT_NAME, FONT_SIZE)
+        self.canvas.drawRightString(self.page_width - MARGIN, MARGIN / 2, f"Trang {self.page_number}")
+        self.canvas.showPage()
+
+    def save(self):
+        """Ghi và đóng file PDF."""
+        if self.page_number == 0:
+            self.draw_page([])
+        self.canvas.save()
+
+
+def _render_pages(file_path, headers, title, pages, results):
+    """
+    Hàm chạy trong tiến trình vẽ: nhận từng trang từ hàng đợi cho tới khi gặp None.
+
+    Args:
+        file_path (str): File đích
+        headers (list): Tiêu đề các cột
+        title (str): Tiêu đề báo cáo
+        pages (multiprocessing.Queue): Hàng đợi các trang (danh sách dòng)
+        results (multiprocessing.Queue): Nhận None khi xong hoặc thông báo lỗi
+    """
+    try:
+        renderer = PdfPageRenderer(file_path, headers, title)
+        while True:
+            rows = pages.get()
+            if rows is None:
+                break
+            renderer.draw_page(rows)
+        renderer.save()
+        results.put(None)
+    except Exception as e:
+        results.put(str(e))
+
+
+class PdfStreamWriter:
+    """
+    Ghi bảng dữ liệu ra PDF trên tiến trình riêng (cùng giao diện với các lớp ghi
+    trong utils.stream_export: write_rows, close, abort).
+    """
+
+    def __init__(self, file_path, headers, title=None):
+        """
+        Khởi động tiến trình vẽ
+
+        Args:
+            file_path (str): File đích
+            headers (list): Tiêu đề các cột
+            title (str, optional): Tiêu đề báo cáo
+        """
+        self.rows_per_page = rows_per_page(headers)
+        self._start(_render_pages, file_path, [str(header) for header in headers], title)
+
+    def _start(self, target, *args):
+        """
+        Tạo hàng đợi và khởi động tiến trình vẽ; dùng chung cho các lớp con vẽ nội dung khác.
+
+        Args:
+            target (callable): Hàm chạy trong tiến trình vẽ, nhận (*args, hàng đợi trang,
+                hàng đợi kết quả) và đưa None vào hàng đợi kết quả khi ghi xong
+            *args: Các tham số đầu của target
+        """
+        self._buffer = []
+        # spawn thay vì fork: tiến trình giao diện có nhiều luồng Qt đang chạy
+        context = multiprocessing.get_context("spawn")
+        self._pages = context.Queue(PAGE_QUEUE_SIZE)
+        self._results = context.Queue()
+        self._process = context.Process(target=target, args=(*args, self._pages, self._results),
+                                        daemon=True)
+        self._process.start()
+
+    def write_rows(self, rows):
+        """
+        Thêm các dòng; mỗi khi đủ một trang thì gửi sang tiến trình vẽ.
+
+        Args:
+            rows (list): Các dòng dữ liệu
+
+        Raises:
+            FileException: Khi tiến trình vẽ đã dừng vì lỗi
+        """
+        self._buffer.extend(["" if value is None else str(value) for value in row] for row in rows)
+        while len(self._buffer) >= self.rows_per_page:
+            self._send(self._buffer[:self.rows_per_page])
+            del self._buffer[:self.rows_per_page]
+
+    def _send(self, item):
+        """Gửi một trang (hoặc None để kết thúc); chờ khi hàng đợi đầy."""
+        while True:
+            try:
+                self._pages.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return
+            except queue.Full:
+                if not self._process.is_alive():
+                    raise FileException(f"Tiến trình tạo PDF đã dừng: {self._read_error()}")
+
+    def _read_error(self):
+        """Đọc thông báo lỗi của tiến trình vẽ đã dừng."""
+        try:
+            return self._results.get(timeout=QUEUE_POLL_INTERVAL) or "không rõ lỗi"
+        except queue.Empty:
+            return f"mã thoát {self._process.exitcode}"
+
+    def _wait_result(self):
+        """Chờ tiến trình vẽ báo kết quả: None nếu thành công, ngược lại là thông báo lỗi."""
+        while True:
+            try:
+                return self._results.get(timeout=QUEUE_POLL_INTERVAL)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    return self._read_error()
+
+    def close(self):
+        """
+        Gửi trang cuối, chờ tiến trình vẽ ghi xong file.
+
+        Raises:
+            FileException: Khi tạo PDF lỗi
+        """
+        if self._buffer:
+            self._send(self._buffer)
+            self._buffer = []
+        self._send(None)
+        error = self._wait_result()
+        self._process.join()
+        if error:
+            raise FileException(f"Lỗi khi tạo PDF: {error}")
+
+    def abort(self):
+        """Dừng tiến trình vẽ ngay (khi bị hủy hoặc lỗi); file dở dang do bên gọi xóa."""
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+        logging.info("Đã dừng tiến trình tạo PDF")
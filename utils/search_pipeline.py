@@ -0,0 +1,105 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from utils.background_loader import BackgroundLoader
+
+
+class SearchPipeline(QObject):
+    """
+    Đường ống tìm kiếm khi gõ phím: chống dội (debounce) đầu vào, chạy truy vấn
+    trên luồng nền, hủy truy vấn cũ khi có yêu cầu mới và bỏ qua kết quả
+    đã lỗi thời theo mã thế hệ.
+
+    Hàm tìm kiếm có dạng search_func(criteria, cancel_token) và chạy trên
+    luồng nền, vì vậy chỉ được dùng các truy vấn an toàn đa luồng
+    (DatabaseManager.read_query), không được chạm vào widget.
+    """
+    # Kết quả của yêu cầu mới nhất
+    resultsReady = pyqtSignal(object)
+    # Thông báo lỗi của yêu cầu mới nhất
+    searchFailed = pyqtSignal(str)
+    # True khi có truy vấn đang chạy
+    busyChanged = pyqtSignal(bool)
+
+    LOAD_KEY = "search"
+
+    def __init__(self, search_func, delay_ms=300, parent=None, timeout=None):
+        """
+        Khởi tạo đường ống tìm kiếm
+
+        Args:
+            search_func (callable): Hàm tìm kiếm search_func(criteria, cancel_token)
+            delay_ms (int): Thời gian chờ sau lần gõ phím cuối trước khi truy vấn
+            parent (QObject): Đối tượng cha
+            timeout (float, optional): Thời hạn (giây) của mỗi truy vấn; quá hạn thì
+                truy vấn bị dừng và searchFailed được phát
+        """
+        super().__init__(parent)
+        self.search_func = search_func
+        self.timeout = timeout
+        self.loader = BackgroundLoader(self)
+        self._pending_criteria = None
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(delay_ms)
+        self._debounce_timer.timeout.connect(self._start_pending)
+
+    @property
+    def is_busy(self):
+        """True nếu đang có truy vấn của yêu cầu mới nhất chạy."""
+        return self.loader.is_loading(self.LOAD_KEY)
+
+    def schedule(self, criteria):
+        """
+        Lên lịch tìm kiếm sau khoảng chờ; lần gọi sau sẽ thay thế lần gọi trước.
+
+        Args:
+            criteria: Điều kiện tìm kiếm truyền cho search_func
+        """
+        self._pending_criteria = criteria
+        self._debounce_timer.start()
+
+    def run_now(self, criteria):
+        """
+        Tìm kiếm ngay lập tức (ví dụ khi nhấn nút Tìm hoặc đổi bộ lọc).
+
+        Args:
+            criteria: Điều kiện tìm kiếm truyền cho search_func
+        """
+        self._debounce_timer.stop()
+        self._pending_criteria = criteria
+        self._start_pending()
+
+    def cancel(self):
+        """Hủy yêu cầu đang chờ và truy vấn đang chạy (nếu có)."""
+        self._debounce_timer.stop()
+        self._pending_criteria = None
+        if self.is_busy:
+            self.loader.cancel(self.LOAD_KEY)
+            self.busyChanged.emit(False)
+
+    def _start_pending(self):
+        """Bắt đầu truy vấn cho điều kiện đang chờ trên luồng nền."""
+        criteria = self._pending_criteria
+        self._pending_criteria = None
+
+        # Truy vấn cũ (nếu còn chạy) bị hủy ngay trong loader
+        was_busy = self.is_busy
+        self.loader.load(
+            self.LOAD_KEY, self.search_func, criteria,
+            on_result=self._on_results,
+            on_error=self._on_error,
+            cancellable=True,
+            timeout=self.timeout
+        )
+        if not was_busy:
+            self.busyChanged.emit(True)
+
+    def _on_results(self, results):
+        """Nhận kết quả của yêu cầu mới nhất."""
+        self.busyChanged.emit(False)
+        self.resultsReady.emit(results)
+
+    def _on_error(self, error):
+        """Nhận lỗi của yêu cầu mới nhất."""
+        self.busyChanged.emit(False)
+        self.searchFailed.emit(str(error))
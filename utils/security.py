@@ -2,9 +2,6 @@ import hashlib
 import os
 import base64
 import logging
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 def generate_salt(length=16):
     """
@@ -67,6 +64,7 @@ def generate_encryption_key():
         bytes: Khóa mã hóa
     """
     try:
+        from cryptography.fernet import Fernet
         return Fernet.generate_key()
     except Exception as e:
         logging.error(f"Lỗi khi tạo khóa mã hóa: {e}")
@@ -84,6 +82,7 @@ def encrypt_data(data, key):
         str: Dữ liệu đã mã hóa
     """
     try:
+        from cryptography.fernet import Fernet
         f = Fernet(key)
         encrypted_data = f.encrypt(data.encode('utf-8'))
         return base64.b64encode(encrypted_data).decode('utf-8')
@@ -103,6 +102,7 @@ def decrypt_data(encrypted_data, key):
         str: Dữ liệu đã giải mã
     """
     try:
+        from cryptography.fernet import Fernet
         f = Fernet(key)
         decrypted_data = f.decrypt(base64.b64decode(encrypted_data))
         return decrypted_data.decode('utf-8')
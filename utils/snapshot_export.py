@@ -0,0 +1,332 @@
+"""
+Module xuất ảnh chụp dữ liệu dạng cột (Parquet hoặc Arrow IPC/Feather) cho phân tích.
+
+Mỗi bảng (sinh_vien, khoa_hoc, ghi_danh, nhat_ky_hoat_dong) được ghi ra một file
+nén, cột có kiểu cố định (ngày là date32, thời gian là timestamp, số là int64/float64)
+và được chia thành các nhóm dòng (row group / record batch) khi ghi. Mọi bảng được
+đọc trong cùng một giao dịch nên ảnh chụp nhất quán. File manifest.json ghi thời
+điểm chụp và số dòng của từng bảng; load_snapshot đọc lại thành DataFrame.
+
+Cần thư viện pyarrow (không bắt buộc với phần còn lại của ứng dụng).
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from importlib.util import find_spec
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.error_handler import ConfigException
+
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+FORMAT_PARQUET = "parquet"
+FORMAT_FEATHER = "feather"
+FILE_EXTENSIONS = {FORMAT_PARQUET: ".parquet", FORMAT_FEATHER: ".feather"}
+MANIFEST_FILE = "manifest.json"
+# Số dòng mỗi nhóm dòng (cũng là số dòng đọc từ cơ sở dữ liệu mỗi lần)
+ROW_GROUP_SIZE = 65536
+COMPRESSION = "zstd"
+
+# Kiểu cột logic -> định dạng chuỗi trong SQLite (với cột ngày/thời gian)
+DATE_FORMAT = "%Y-%m-%d"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Bảng -> các cột và kiểu (string, int64, float64, date, timestamp)
+SNAPSHOT_TABLES = {
+    "sinh_vien": (
+        ("ma_sinh_vien", "string"), ("ho_ten", "string"), ("ngay_sinh", "date"),
+        ("gioi_tinh", "string"), ("email", "string"), ("so_dien_thoai", "string"),
+        ("dia_chi", "string"), ("ngay_nhap_hoc", "date"), ("trang_thai", "string"),
+        ("duong_dan_anh", "string"),
+    ),
+    "khoa_hoc": (
+        ("ma_khoa_hoc", "string"), ("ten_khoa_hoc", "string"), ("so_tin_chi", "int64"),
+        ("giang_vien", "string"), ("mo_ta", "string"), ("so_luong_toi_da", "int64"),
+    ),
+    "ghi_danh": (
+        ("ma_ghi_danh", "int64"), ("ma_sinh_vien", "string"), ("ma_khoa_hoc", "string"),
+        ("ngay_ghi_danh", "date"), ("diem", "float64"),
+    ),
+    "nhat_ky_hoat_dong": (
+        ("ma_nhat_ky", "int64"), ("ma_nguoi_dung", "int64"), ("loai_hoat_dong", "string"),
+        ("mo_ta_hoat_dong", "string"), ("loai_doi_tuong", "string"), ("ma_doi_tuong", "string"),
+        ("thoi_gian", "timestamp"),
+    ),
+}
+
+
+def require_pyarrow():
+    """
+    Kiểm tra pyarrow trước khi xuất/đọc ảnh chụp.
+
+    Raises:
+        ConfigException: Khi chưa cài pyarrow
+    """
+    if not HAS_PYARROW:
+        raise ConfigException("Xuất dữ liệu dạng cột cần thư viện pyarrow.\n\n"
+                              "Vui lòng cài đặt bằng lệnh:\npip install pyarrow")
+
+
+def _arrow_type(kind):
+    """Kiểu pyarrow của một kiểu cột logic."""
+    import pyarrow as pa
+    return {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("s"),
+    }[kind]
+
+
+def table_schema(table):
+    """
+    Schema pyarrow của một bảng trong SNAPSHOT_TABLES.
+
+    Args:
+        table (str): Tên bảng
+
+    Returns:
+        pyarrow.Schema: Schema của bảng
+    """
+    import pyarrow as pa
+    return pa.schema([(column, _arrow_type(kind)) for column, kind in SNAPSHOT_TABLES[table]])
+
+
+def _column_array(values, kind):
+    """
+    Chuyển một cột giá trị SQLite thành mảng pyarrow đúng kiểu. Giá trị không đúng
+    kiểu (SQLite không ép kiểu) hoặc ngày sai định dạng trở thành null.
+
+    Args:
+        values (list): Giá trị của cột
+        kind (str): Kiểu cột logic
+
+    Returns:
+        tuple: (pyarrow.Array, số giá trị bị chuyển thành null)
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if kind in ("date", "timestamp"):
+        text = pa.array([value if isinstance(value, str) else None for value in values], pa.string())
+        # Chỉ lấy phần ngày cho cột ngày (một số dòng cũ có thể kèm giờ)
+        if kind == "date":
+            text = pc.utf8_slice_codeunits(text, 0, 10)
+        parsed = pc.strptime(text, format=DATE_FORMAT if kind == "date" else TIMESTAMP_FORMAT,
+                             unit="s", error_is_null=True)
+        array = parsed.cast(_arrow_type(kind))
+    elif kind == "string":
+        array = pa.array([None if value is None else str(value) for value in values], pa.string())
+    else:
+        target = _arrow_type(kind)
+        try:
+            array = pa.array(values, target)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            numeric = (int if kind == "int64" else float)
+            array = pa.array([numeric(value) if isinstance(value, (int, float)) else None
+                              for value in values], target)
+    blank = sum(value is None or value == "" for value in values)
+    return array, max(0, array.null_count - blank)
+
+
+class _ParquetTableWriter:
+    """Ghi một bảng ra Parquet, mỗi lô là một row group."""
+
+    def __init__(self, file_path, schema):
+        import pyarrow.parquet as pq
+        self._writer = pq.ParquetWriter(file_path, schema, compression=COMPRESSION)
+
+    def write(self, table):
+        self._writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+
+    def close(self):
+        self._writer.close()
+
+
+class _FeatherTableWriter:
+    """Ghi một bảng ra Arrow IPC (Feather v2), mỗi lô là một record batch."""
+
+    def __init__(self, file_path, schema):
+        import pyarrow as pa
+        self._sink = pa.OSFile(file_path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, schema,
+                                       options=pa.ipc.IpcWriteOptions(compression=COMPRESSION))
+
+    def write(self, table):
+        self._writer.write_table(table, max_chunksize=ROW_GROUP_SIZE)
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+TABLE_WRITERS = {FORMAT_PARQUET: _ParquetTableWriter, FORMAT_FEATHER: _FeatherTableWriter}
+
+
+class SnapshotExporter(QObject):
+    """
+    Xuất ảnh chụp các bảng ra thư mục. run() chạy trên luồng nền (BackgroundLoader
+    với cancellable=True); tiến trình được báo qua progressChanged.
+    """
+    # (số dòng đã ghi, tổng số dòng của mọi bảng)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, db_manager, parent=None):
+        """
+        Khởi tạo bộ xuất ảnh chụp
+
+        Args:
+            db_manager (DatabaseManager): Quản lý cơ sở dữ liệu
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self.db_manager = db_manager
+
+    def run(self, directory, file_format=FORMAT_PARQUET, tables=None, cancel_token=None):
+        """
+        Ghi mỗi bảng ra một file trong thư mục, đọc mọi bảng trong cùng một giao dịch.
+        Các file đã ghi bị xóa nếu bị hủy hoặc lỗi.
+
+        Args:
+            directory (str): Thư mục đích (được tạo nếu chưa có)
+            file_format (str): FORMAT_PARQUET hoặc FORMAT_FEATHER
+            tables (iterable, optional): Các bảng cần xuất, mặc định mọi bảng trong SNAPSHOT_TABLES
+            cancel_token (CancellationToken, optional): Cờ hủy, kiểm tra giữa các lô
+
+        Returns:
+            dict: Nội dung manifest ({'created', 'format', 'tables': {bảng: {'file', 'rows'}}})
+
+        Raises:
+            ConfigException: Khi chưa cài pyarrow
+            QueryCancelledException: Khi bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        require_pyarrow()
+        import pyarrow as pa
+
+        tables = list(tables or SNAPSHOT_TABLES)
+        created_directory = not os.path.isdir(directory)
+        os.makedirs(directory, exist_ok=True)
+        manifest = {'created': datetime.now().strftime(TIMESTAMP_FORMAT), 'format': file_format,
+                    'tables': {}}
+        written_files = []
+        completed = False
+        try:
+            with self.db_manager.read_snapshot() as connection:
+                counts = {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                          for table in tables}
+                total = sum(counts.values())
+                done = 0
+                for table in tables:
+                    columns = SNAPSHOT_TABLES[table]
+                    schema = table_schema(table)
+                    file_name = table + FILE_EXTENSIONS[file_format]
+                    file_path = os.path.join(directory, file_name)
+                    written_files.append(file_path)
+                    writer = TABLE_WRITERS[file_format](file_path, schema)
+                    coerced = 0
+                    try:
+                        cursor = connection.execute(
+                            f"SELECT {', '.join(column for column, _ in columns)} FROM {table}")
+                        while True:
+                            if cancel_token is not None:
+                                cancel_token.raise_if_cancelled()
+                            rows = cursor.fetchmany(ROW_GROUP_SIZE)
+                            if not rows:
+                                break
+                            arrays = []
+                            for index, (_, kind) in enumerate(columns):
+                                array, nulls = _column_array([row[index] for row in rows], kind)
+                                arrays.append(array)
+                                coerced += nulls
+                            writer.write(pa.Table.from_arrays(arrays, schema=schema))
+                            done += len(rows)
+                            self.progressChanged.emit(done, total)
+                    finally:
+                        writer.close()
+                    if coerced:
+                        logging.warning(f"Ảnh chụp {table}: {coerced} giá trị sai kiểu được ghi là rỗng")
+                    manifest['tables'][table] = {'file': file_name, 'rows': counts[table]}
+
+            with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            completed = True
+        finally:
+            if not completed:
+                for file_path in written_files:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                if created_directory and not os.listdir(directory):
+                    os.rmdir(directory)
+
+        logging.info(f"Đã xuất ảnh chụp {len(tables)} bảng ({total} dòng) ra {directory}")
+        return manifest
+
+
+def read_manifest(directory):
+    """
+    Đọc manifest của một ảnh chụp.
+
+    Args:
+        directory (str): Thư mục ảnh chụp
+
+    Returns:
+        dict: Nội dung manifest.json
+
+    Raises:
+        FileNotFoundError: Khi thư mục không phải ảnh chụp
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_table(directory, table, columns=None):
+    """
+    Đọc một bảng của ảnh chụp thành pyarrow.Table (Feather được ánh xạ bộ nhớ).
+
+    Args:
+        directory (str): Thư mục ảnh chụp
+        table (str): Tên bảng
+        columns (list, optional): Chỉ đọc các cột này
+
+    Returns:
+        pyarrow.Table: Dữ liệu của bảng
+
+    Raises:
+        ConfigException: Khi chưa cài pyarrow
+        KeyError: Khi ảnh chụp không có bảng này
+    """
+    require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest = read_manifest(directory)
+    file_path = os.path.join(directory, manifest['tables'][table]['file'])
+    if manifest['format'] == FORMAT_FEATHER:
+        with pa.memory_map(file_path) as source:
+            data = pa.ipc.open_file(source).read_all()
+        return data.select(columns) if columns else data
+    return pq.read_table(file_path, columns=columns)
+
+
+def load_snapshot(directory, tables=None, columns=None):
+    """
+    Đọc ảnh chụp thành các DataFrame pandas (cột ngày/thời gian là datetime64).
+
+    Args:
+        directory (str): Thư mục ảnh chụp
+        tables (iterable, optional): Các bảng cần đọc, mặc định mọi bảng trong manifest
+        columns (dict, optional): Bảng -> danh sách cột cần đọc
+
+    Returns:
+        dict: Tên bảng -> pandas.DataFrame
+
+    Raises:
+        ConfigException: Khi chưa cài pyarrow
+    """
+    columns = columns or {}
+    tables = list(tables or read_manifest(directory)['tables'])
+    return {table: load_table(directory, table, columns.get(table)).to_pandas(date_as_object=False)
+            for table in tables}
@@ -0,0 +1,317 @@
+"""
+Module sao lưu và khôi phục cơ sở dữ liệu dưới dạng file SQL (logical dump).
+
+Bản sao gồm lược đồ (CREATE TABLE) và dữ liệu dạng các lệnh INSERT nhiều dòng,
+ghi lần lượt từng bảng theo lô; chỉ mục, trigger và view được ghi ở cuối. Giá trị
+được SQLite định dạng sẵn bằng hàm quote() nên số thực giữ đủ độ chính xác. File
+có thể nén gzip (đuôi .gz) và đọc được bằng công cụ sqlite3 thông thường.
+
+Khi khôi phục, các lệnh được chạy trong những giao dịch lớn trên một file tạm;
+CREATE INDEX/TRIGGER/VIEW được hoãn tới khi nạp xong dữ liệu (chỉ mục dựng một
+lần, trigger không chạy lại trên dữ liệu đã được tổng hợp sẵn trong bản sao),
+sau đó file tạm mới thay thế file đích.
+"""
+import gzip
+import io
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.error_handler import DatabaseException, FileException
+
+# Số dòng trong mỗi lệnh INSERT (cũng là số dòng đọc từ cơ sở dữ liệu mỗi lần)
+INSERT_BATCH_SIZE = 500
+# Mức nén gzip: mức thấp nhanh hơn nhiều mà file chỉ lớn hơn chút ít
+COMPRESS_LEVEL = 3
+# Các file phụ của cơ sở dữ liệu ở chế độ WAL
+WAL_SUFFIXES = ("-wal", "-shm")
+# Số dòng được nạp trong mỗi giao dịch khi khôi phục
+RESTORE_TRANSACTION_ROWS = 500000
+# Bộ nhớ đệm trang khi khôi phục (KiB), giúp chèn theo khóa chính không theo thứ tự
+RESTORE_CACHE_KIB = 65536
+# Khoảng (byte đọc từ file) giữa hai lần báo tiến trình khôi phục
+PROGRESS_STEP = 1 << 20
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Lệnh được hoãn tới cuối khi khôi phục
+DEFERRED_PATTERN = re.compile(
+    r"\s*CREATE\s+(?:UNIQUE\s+|TEMP\s+|TEMPORARY\s+)?(?:INDEX|TRIGGER|VIEW)\b", re.IGNORECASE)
+# Lệnh điều khiển giao dịch trong bản sao (bộ khôi phục tự quản lý giao dịch)
+TRANSACTION_PATTERN = re.compile(r"\s*(?:BEGIN|COMMIT|END|ROLLBACK)\b", re.IGNORECASE)
+
+
+def quote_identifier(name):
+    """Đặt tên bảng/cột trong dấu nháy kép của SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqlDumper(QObject):
+    """
+    Ghi toàn bộ cơ sở dữ liệu ra file SQL. run() chạy trên luồng nền
+    (BackgroundLoader với cancellable=True); tiến trình được báo qua progressChanged.
+    """
+    # (số dòng đã ghi, tổng số dòng)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, db_manager):
+        """
+        Khởi tạo bộ sao lưu
+
+        Args:
+            db_manager (DatabaseManager): Cơ sở dữ liệu cần sao lưu
+        """
+        super().__init__()
+        self.db_manager = db_manager
+
+    def run(self, file_path, compress=None, cancel_token=None):
+        """
+        Ghi lược đồ và dữ liệu của mọi bảng trong cùng một giao dịch đọc. File được
+        ghi ra file tạm rồi đổi tên, nên bị hủy hoặc lỗi thì không để lại file dở dang.
+
+        Giao dịch đọc (read_snapshot) được giữ suốt thời gian sao lưu. Ở chế độ WAL
+        (DatabaseManager bật khi mở kết nối) người dùng vẫn lưu thay đổi bình thường,
+        các thay đổi đó không có trong bản sao; nếu cơ sở dữ liệu không chuyển được
+        sang WAL thì mọi lệnh ghi bị chặn cho tới khi sao lưu xong.
+
+        Args:
+            file_path (str): File đích
+            compress (bool, optional): Nén gzip; mặc định nén khi file có đuôi .gz
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: {'tables': {tên bảng: số dòng}, 'rows': tổng số dòng, 'size': số byte của file}
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+            DatabaseException: Khi đọc cơ sở dữ liệu lỗi
+            FileException: Khi không ghi được file
+        """
+        if compress is None:
+            compress = file_path.lower().endswith(".gz")
+        temp_path = file_path + ".part"
+        counts = {}
+        completed = False
+        try:
+            if compress:
+                output = gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL)
+            else:
+                output = open(temp_path, "w", encoding="utf-8")
+            with output, self.db_manager.read_snapshot() as connection:
+                schema = connection.execute(
+                    "SELECT type, name, sql FROM sqlite_master "
+                    "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid").fetchall()
+                tables = [row[1] for row in schema if row[0] == "table"]
+                has_sequence = connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone()
+                if has_sequence:
+                    tables.append("sqlite_sequence")
+                totals = {table: connection.execute(
+                    f"SELECT COUNT(*) FROM {quote_identifier(table)}").fetchone()[0] for table in tables}
+                total = sum(totals.values())
+
+                output.write(f"-- Sao lưu cơ sở dữ liệu {os.path.basename(self.db_manager.db_path)}\n"
+                             f"-- Thời điểm: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, "
+                             f"SQLite {sqlite3.sqlite_version}\n"
+                             "PRAGMA foreign_keys=OFF;\nBEGIN TRANSACTION;\n")
+                for kind, _, sql in schema:
+                    if kind == "table":
+                        output.write(f"{sql};\n")
+
+                done = 0
+                for table in tables:
+                    if table == "sqlite_sequence":
+                        # Bảng do SQLite tự tạo cùng bảng AUTOINCREMENT đầu tiên
+                        output.write("DELETE FROM sqlite_sequence;\n")
+                    counts[table] = self._dump_table(connection, output, table, cancel_token,
+                                                     lambda rows: self.progressChanged.emit(done + rows, total))
+                    done += counts[table]
+
+                for kind, _, sql in schema:
+                    if kind != "table":
+                        output.write(f"{sql};\n")
+                output.write("COMMIT;\n")
+            os.replace(temp_path, file_path)
+            completed = True
+        except OSError as e:
+            raise FileException(f"Không thể ghi file sao lưu: {e}", cause=e) from e
+        except sqlite3.Error as e:
+            raise DatabaseException(f"Lỗi khi đọc dữ liệu để sao lưu: {e}", cause=e) from e
+        finally:
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        rows = sum(counts.values())
+        size = os.path.getsize(file_path)
+        logging.info(f"Đã sao lưu {len(counts)} bảng ({rows} dòng, {size} byte) ra {file_path}")
+        return {'tables': counts, 'rows': rows, 'size': size}
+
+    @staticmethod
+    def _dump_table(connection, output, table, cancel_token, on_progress):
+        """
+        Ghi dữ liệu một bảng thành các lệnh INSERT nhiều dòng.
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({quote_identifier(table)})")]
+        if not columns:
+            return 0
+        # SQLite tự định dạng giá trị (chuỗi, số thực, blob) thành literal SQL
+        values = " || ',' || ".join(f"quote({quote_identifier(column)})" for column in columns)
+        prefix = (f"INSERT INTO {quote_identifier(table)} "
+                  f"({', '.join(quote_identifier(column) for column in columns)}) VALUES\n")
+        cursor = connection.execute(f"SELECT {values} FROM {quote_identifier(table)}")
+        written = 0
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            rows = cursor.fetchmany(INSERT_BATCH_SIZE)
+            if not rows:
+                break
+            output.write(prefix + ",\n".join(f"({row[0]})" for row in rows) + ";\n")
+            written += len(rows)
+            on_progress(written)
+        return written
+
+
+class SqlRestorer(QObject):
+    """
+    Tạo lại cơ sở dữ liệu từ file SQL (của SqlDumper hoặc lệnh .dump của sqlite3).
+    run() chạy trên luồng nền; tiến trình (số byte đã đọc của file) được báo qua
+    progressChanged.
+    """
+    # (số byte đã đọc, kích thước file)
+    progressChanged = pyqtSignal(int, int)
+
+    def run(self, dump_path, db_path, overwrite=False, cancel_token=None):
+        """
+        Nạp bản sao vào một file cơ sở dữ liệu mới.
+
+        Args:
+            dump_path (str): File bản sao (.sql hoặc .sql.gz)
+            db_path (str): File cơ sở dữ liệu đích (không được đang mở bởi ứng dụng)
+            overwrite (bool): Cho phép thay thế file đích đã tồn tại
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: {'statements': số lệnh đã chạy, 'rows': số dòng đã nạp,
+                   'deferred': số lệnh CREATE INDEX/TRIGGER/VIEW chạy sau cùng}
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+            DatabaseException: Khi một lệnh trong bản sao lỗi
+            FileException: Khi không đọc được bản sao hoặc file đích đã tồn tại
+        """
+        if os.path.exists(db_path) and not overwrite:
+            raise FileException(f"File cơ sở dữ liệu đã tồn tại: {db_path}")
+        temp_path = db_path + ".restoring"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        statements = 0
+        deferred = []
+        connection = None
+        completed = False
+        try:
+            total = os.path.getsize(dump_path)
+            raw = open(dump_path, "rb")
+            compressed = raw.read(2) == GZIP_MAGIC
+            raw.seek(0)
+            source = io.TextIOWrapper(gzip.GzipFile(fileobj=raw) if compressed else raw,
+                                      encoding="utf-8")
+            # File tạm chưa ai dùng: tắt nhật ký và đồng bộ đĩa, lỗi thì xóa cả file
+            connection = sqlite3.connect(temp_path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=OFF")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute("PRAGMA foreign_keys=OFF")
+            connection.execute(f"PRAGMA cache_size=-{RESTORE_CACHE_KIB}")
+            connection.execute("BEGIN")
+            pending_rows = 0
+            reported = 0
+            with source:
+                for statement in self._statements(source):
+                    if TRANSACTION_PATTERN.match(statement):
+                        continue
+                    if DEFERRED_PATTERN.match(statement):
+                        deferred.append(statement)
+                        continue
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    changes = connection.total_changes
+                    self._execute(connection, statement)
+                    statements += 1
+                    pending_rows += connection.total_changes - changes
+                    if pending_rows >= RESTORE_TRANSACTION_ROWS:
+                        connection.execute("COMMIT")
+                        connection.execute("BEGIN")
+                        pending_rows = 0
+                    position = raw.tell()
+                    if position - reported >= PROGRESS_STEP:
+                        reported = position
+                        self.progressChanged.emit(position, total)
+            self.progressChanged.emit(total, total)
+            rows = connection.total_changes
+
+            # Chỉ mục được dựng một lần trên dữ liệu đầy đủ; trigger tạo sau cùng
+            # để không cộng lại vào các bảng tổng hợp đã có trong bản sao
+            for statement in deferred:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                self._execute(connection, statement)
+            connection.execute("COMMIT")
+            connection.close()
+            connection = None
+            # Nhật ký WAL cũ của file đích (nếu có) thuộc về dữ liệu cũ: để lại thì
+            # SQLite sẽ áp nó lên file mới khi mở
+            for suffix in WAL_SUFFIXES:
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            os.replace(temp_path, db_path)
+            completed = True
+        except OSError as e:
+            raise FileException(f"Không thể đọc file sao lưu: {e}", cause=e) from e
+        except UnicodeDecodeError as e:
+            raise FileException(f"File sao lưu không phải văn bản UTF-8: {e}", cause=e) from e
+        finally:
+            if connection is not None:
+                connection.close()
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logging.info(f"Đã khôi phục {rows} dòng ({statements + len(deferred)} lệnh) "
+                     f"từ {dump_path} vào {db_path}")
+        return {'statements': statements + len(deferred), 'rows': rows, 'deferred': len(deferred)}
+
+    @staticmethod
+    def _execute(connection, statement):
+        """Chạy một lệnh của bản sao; lỗi được báo kèm đầu lệnh để dễ tìm."""
+        try:
+            connection.execute(statement)
+        except sqlite3.Error as e:
+            raise DatabaseException(f"Lỗi khi chạy lệnh '{statement[:80]}...': {e}", cause=e) from e
+
+    @staticmethod
+    def _statements(source):
+        """
+        Tách file SQL thành từng lệnh hoàn chỉnh (chuỗi và thân trigger có thể
+        trải nhiều dòng). Dòng chú thích nằm ngoài lệnh bị bỏ qua.
+
+        Yields:
+            str: Một lệnh SQL
+        """
+        buffer = []
+        for line in source:
+            if not buffer and (not line.strip() or line.startswith("--")):
+                continue
+            buffer.append(line)
+            # Chỉ kiểm tra khi dòng kết thúc bằng ';' (có thể là cuối lệnh)
+            if line.rstrip().endswith(";"):
+                statement = "".join(buffer)
+                if sqlite3.complete_statement(statement):
+                    yield statement
+                    buffer = []
+        if buffer and "".join(buffer).strip():
+            raise FileException("File sao lưu bị cắt cụt: lệnh cuối cùng chưa hoàn chỉnh")
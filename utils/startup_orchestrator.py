@@ -0,0 +1,242 @@
+"""
+Module điều phối các bước khởi động ứng dụng theo thứ tự phụ thuộc
+"""
+import logging
+import time
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, QEventLoop, pyqtSignal
+from utils.background_task import BackgroundTask
+from utils.startup_profiler import startup_profiler
+
+
+class StartupTask:
+    """Một bước khởi động: tên, hàm thực hiện, các bước phụ thuộc và luồng chạy."""
+
+    def __init__(self, name, func, depends_on=(), main_thread=False, description=None):
+        """
+        Khởi tạo bước khởi động
+
+        Args:
+            name (str): Tên bước (duy nhất)
+            func (callable): Hàm không tham số thực hiện bước này, trả về kết quả của bước
+            depends_on (iterable): Tên các bước phải hoàn thành trước
+            main_thread (bool): True nếu bước phải chạy trên luồng giao diện
+                                (tạo widget, dùng kết nối chính của DatabaseManager...)
+            description (str, optional): Mô tả hiển thị trên màn hình chờ
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.main_thread = main_thread
+        self.description = description or name
+
+
+class StartupOrchestrator(QObject):
+    """
+    Chạy các bước khởi động theo thứ tự phụ thuộc.
+
+    Các bước độc lập chạy đồng thời: bước luồng nền chạy trên QThreadPool, bước
+    luồng giao diện chạy qua vòng lặp sự kiện (nên màn hình chờ vẫn được vẽ).
+    Thời gian từng bước được ghi vào startup_profiler. Khi một bước lỗi, không
+    bước mới nào được bắt đầu và lỗi được ném lại từ run_until().
+    """
+    # (tên bước, mô tả)
+    taskStarted = pyqtSignal(str, str)
+    # (tên bước, thời gian chạy ms)
+    taskFinished = pyqtSignal(str, float)
+    # (tên bước, ngoại lệ)
+    taskFailed = pyqtSignal(str, object)
+    # Tất cả các bước đã hoàn thành
+    allFinished = pyqtSignal()
+
+    def __init__(self, profiler=None, thread_pool=None, parent=None):
+        """
+        Khởi tạo bộ điều phối
+
+        Args:
+            profiler (StartupProfiler, optional): Profiler ghi thời gian, mặc định startup_profiler
+            thread_pool (QThreadPool, optional): Pool luồng, mặc định dùng pool toàn cục
+            parent (QObject): Đối tượng cha
+        """
+        super().__init__(parent)
+        self.profiler = profiler or startup_profiler
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._tasks = {}
+        self._results = {}
+        self._running = set()
+        self._done = set()
+        self._started = False
+        self._error = None
+        # mã thế hệ -> (bước, task nền); giữ task sống tới khi xong
+        self._workers = {}
+
+    def add_task(self, name, func, depends_on=(), main_thread=False, description=None):
+        """
+        Khai báo một bước khởi động
+
+        Args:
+            name (str): Tên bước (duy nhất)
+            func (callable): Hàm không tham số thực hiện bước này
+            depends_on (iterable): Tên các bước phải hoàn thành trước
+            main_thread (bool): Chạy trên luồng giao diện
+            description (str, optional): Mô tả hiển thị trên màn hình chờ
+
+        Raises:
+            ValueError: Khi tên bước bị trùng hoặc đã bắt đầu chạy
+        """
+        if self._started:
+            raise ValueError("Không thể thêm bước sau khi đã bắt đầu khởi động")
+        if name in self._tasks:
+            raise ValueError(f"Bước khởi động '{name}' đã tồn tại")
+        self._tasks[name] = StartupTask(name, func, depends_on, main_thread, description)
+
+    def result(self, name):
+        """
+        Lấy kết quả của một bước đã hoàn thành
+
+        Args:
+            name (str): Tên bước
+
+        Returns:
+            Kết quả của bước hoặc None nếu chưa hoàn thành
+        """
+        return self._results.get(name)
+
+    def is_done(self, names):
+        """
+        Kiểm tra các bước đã hoàn thành chưa
+
+        Args:
+            names (iterable): Tên các bước
+
+        Returns:
+            bool: True nếu tất cả đã hoàn thành
+        """
+        return set(names) <= self._done
+
+    def start(self):
+        """
+        Bắt đầu chạy các bước không còn phụ thuộc.
+
+        Raises:
+            ValueError: Khi có bước phụ thuộc vào bước không tồn tại
+        """
+        if self._started:
+            return
+        for task in self._tasks.values():
+            missing = [dep for dep in task.depends_on if dep not in self._tasks]
+            if missing:
+                raise ValueError(f"Bước '{task.name}' phụ thuộc bước không tồn tại: {missing}")
+        self._started = True
+        self._schedule_ready()
+
+    def run_until(self, names=None):
+        """
+        Chạy vòng lặp sự kiện cục bộ cho tới khi các bước cho trước hoàn thành.
+        Các bước khác vẫn tiếp tục chạy nền sau khi hàm trả về.
+
+        Args:
+            names (iterable, optional): Tên các bước cần chờ, mặc định là tất cả
+
+        Returns:
+            dict: Kết quả của các bước đã hoàn thành
+
+        Raises:
+            Exception: Ngoại lệ của bước đầu tiên bị lỗi
+        """
+        names = set(self._tasks if names is None else names)
+        self.start()
+        if not self.is_done(names) and self._error is None:
+            loop = QEventLoop()
+
+            def check(*_):
+                if self.is_done(names) or self._error is not None:
+                    loop.quit()
+
+            self.taskFinished.connect(check)
+            self.taskFailed.connect(check)
+            loop.exec()
+            self.taskFinished.disconnect(check)
+            self.taskFailed.disconnect(check)
+
+        if self._error is not None:
+            raise self._error[1]
+        return dict(self._results)
+
+    def _schedule_ready(self):
+        """Bắt đầu các bước đã đủ điều kiện."""
+        if self._error is not None:
+            return
+        for task in self._tasks.values():
+            if task.name in self._done or task.name in self._running:
+                continue
+            if not set(task.depends_on) <= self._done:
+                continue
+            self._running.add(task.name)
+            self.taskStarted.emit(task.name, task.description)
+            if task.main_thread:
+                # Chạy ở lượt tiếp theo của vòng lặp sự kiện để giao diện kịp vẽ
+                QTimer.singleShot(0, lambda t=task: self._run_main_thread(t))
+            else:
+                self._run_worker(task)
+        if self._done == set(self._tasks):
+            self.allFinished.emit()
+
+    def _timed_call(self, task):
+        """
+        Chạy hàm của bước và đo thời gian
+
+        Returns:
+            tuple: (kết quả, thời gian chạy ms)
+        """
+        start = time.perf_counter()
+        with self.profiler.phase(task.name):
+            result = task.func()
+        return result, (time.perf_counter() - start) * 1000
+
+    def _run_main_thread(self, task):
+        """Chạy bước trên luồng giao diện."""
+        if self._error is not None:
+            return
+        try:
+            outcome = self._timed_call(task)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._on_task_failed(task, e)
+        else:
+            self._on_task_finished(task, outcome)
+
+    def _run_worker(self, task):
+        """Chạy bước trên luồng nền."""
+        worker = BackgroundTask(self._timed_call, (task,), generation=len(self._workers) + 1)
+        worker.setAutoDelete(False)
+        worker.signals.finished.connect(self._on_worker_finished)
+        worker.signals.failed.connect(self._on_worker_failed)
+        self._workers[worker.generation] = (task, worker)
+        self.thread_pool.start(worker)
+
+    def _on_worker_finished(self, generation, outcome):
+        """Nhận kết quả của bước chạy nền."""
+        task, _ = self._workers.pop(generation)
+        self._on_task_finished(task, outcome)
+
+    def _on_worker_failed(self, generation, error):
+        """Nhận lỗi của bước chạy nền."""
+        task, _ = self._workers.pop(generation)
+        self._on_task_failed(task, error)
+
+    def _on_task_finished(self, task, outcome):
+        """Ghi nhận bước hoàn thành và bắt đầu các bước phụ thuộc vào nó."""
+        result, elapsed_ms = outcome
+        self._running.discard(task.name)
+        self._done.add(task.name)
+        self._results[task.name] = result
+        logging.info("Hoàn thành bước khởi động '%s' trong %.1f ms", task.name, elapsed_ms)
+        self.taskFinished.emit(task.name, elapsed_ms)
+        self._schedule_ready()
+
+    def _on_task_failed(self, task, error):
+        """Ghi nhận lỗi; các bước chưa bắt đầu sẽ không được chạy."""
+        self._running.discard(task.name)
+        if self._error is None:
+            self._error = (task.name, error)
+        logging.error("Bước khởi động '%s' thất bại: %s", task.name, error)
+        self.taskFailed.emit(task.name, error)
@@ -0,0 +1,132 @@
+"""
+Module đo thời gian các giai đoạn khởi động ứng dụng
+"""
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from utils.path_helper import PathHelper
+
+
+class StartupProfiler:
+    """
+    Ghi lại thời gian của từng giai đoạn khởi động (import, cấu hình, mở cơ sở
+    dữ liệu, kiểm tra toàn vẹn, theme, đăng nhập, cửa sổ chính...) và xuất báo cáo.
+
+    Mỗi giai đoạn được ghi với thời điểm bắt đầu (tính từ lúc tạo profiler),
+    thời lượng và luồng chạy, nên các giai đoạn chạy song song vẫn đọc được.
+    """
+
+    REPORT_FILE = "startup_profile.jsonl"
+
+    def __init__(self):
+        """Khởi tạo profiler; mốc thời gian 0 là lúc tạo đối tượng."""
+        self._origin = time.perf_counter()
+        self._last_mark = self._origin
+        self._phases = []
+        self._lock = threading.Lock()
+
+    def _record(self, name, start, end):
+        """Lưu một giai đoạn đã đo."""
+        with self._lock:
+            self._phases.append({
+                "phase": name,
+                "start_ms": round((start - self._origin) * 1000, 1),
+                "duration_ms": round((end - start) * 1000, 1),
+                "thread": threading.current_thread().name,
+            })
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Đo thời gian của một khối lệnh.
+
+        Args:
+            name (str): Tên giai đoạn
+
+        Ví dụ:
+            with startup_profiler.phase("db_open"):
+                db_manager = app_context.open()
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._record(name, start, end)
+            self._last_mark = end
+
+    def mark(self, name):
+        """
+        Ghi giai đoạn kéo dài từ mốc trước (mark hoặc phase gần nhất) tới hiện tại.
+
+        Args:
+            name (str): Tên giai đoạn
+        """
+        now = time.perf_counter()
+        self._record(name, self._last_mark, now)
+        self._last_mark = now
+
+    @property
+    def phases(self):
+        """Danh sách các giai đoạn đã ghi (bản sao)."""
+        with self._lock:
+            return list(self._phases)
+
+    def elapsed_ms(self):
+        """
+        Thời gian từ lúc tạo profiler tới hiện tại
+
+        Returns:
+            float: Số mili giây
+        """
+        return round((time.perf_counter() - self._origin) * 1000, 1)
+
+    def format_report(self):
+        """
+        Tạo báo cáo dạng bảng để ghi log
+
+        Returns:
+            str: Báo cáo thời gian khởi động
+        """
+        lines = [f"Thời gian khởi động: {self.elapsed_ms():.0f} ms"]
+        for item in self.phases:
+            lines.append(
+                f"  {item['phase']:<24} bắt đầu {item['start_ms']:>8.1f} ms"
+                f"  kéo dài {item['duration_ms']:>8.1f} ms  [{item['thread']}]"
+            )
+        return "\n".join(lines)
+
+    def write_report(self, path=None):
+        """
+        Ghi log báo cáo và nối thêm một dòng JSON vào file báo cáo để so sánh giữa các lần chạy.
+
+        Args:
+            path (str, optional): Đường dẫn file, mặc định logs/startup_profile.jsonl
+
+        Returns:
+            str: Đường dẫn file đã ghi hoặc None nếu có lỗi
+        """
+        logging.info(self.format_report())
+        if path is None:
+            path = os.path.join(PathHelper.get_app_root(), PathHelper.LOGS_DIR, self.REPORT_FILE)
+        record = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "total_ms": self.elapsed_ms(),
+            "phases": self.phases,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return path
+        except OSError as e:
+            logging.error(f"Không thể ghi báo cáo khởi động: {e}")
+            return None
+
+
+# Profiler dùng chung cho quá trình khởi động
+startup_profiler = StartupProfiler()
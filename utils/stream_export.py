@@ -0,0 +1,294 @@
+"""
+Module xuất dữ liệu theo luồng từ cơ sở dữ liệu.
+
+Dữ liệu được đọc theo từng lô từ con trỏ (DatabaseManager.iter_query) và ghi
+ngay ra file: CSV bằng module csv, Excel bằng openpyxl ở chế độ write_only,
+HTML được ghi dần từng dòng, PDF được vẽ theo trang trên tiến trình riêng
+(utils.pdf_export). Bộ nhớ dùng không phụ thuộc số dòng xuất. Con trỏ đọc mở
+suốt lúc xuất nhưng không chặn người dùng lưu thay đổi vì cơ sở dữ liệu chạy ở
+chế độ WAL.
+"""
+import csv
+import html
+import logging
+import os
+from datetime import datetime
+from importlib.util import find_spec
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from utils.pdf_export import PdfStreamWriter
+
+# Số dòng đọc từ cơ sở dữ liệu mỗi lô
+EXPORT_BATCH_SIZE = 1000
+
+HTML_STYLE = """
+<style>
+    table { border-collapse: collapse; width: 100%; font-family: Arial, sans-serif; font-size: 14px; }
+    th, td { border: 1px solid #dddddd; text-align: left; padding: 8px; }
+    th { background-color: #f2f2f2; font-weight: bold; }
+    tr:nth-child(even) { background-color: #f9f9f9; }
+    h1 { font-family: Arial, sans-serif; color: #333; }
+    .date { font-style: italic; color: #666; margin-bottom: 20px; }
+</style>
+"""
+
+
+class CsvStreamWriter:
+    """Ghi dữ liệu ra file CSV (UTF-8 có BOM để Excel đọc đúng tiếng Việt)."""
+
+    def __init__(self, file_path, headers, title=None):
+        self._file = open(file_path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def write_rows(self, rows):
+        self._writer.writerows(["" if value is None else value for value in row] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxStreamWriter:
+    """Ghi dữ liệu ra file Excel bằng openpyxl ở chế độ write_only (không giữ các ô trong bộ nhớ)."""
+
+    def __init__(self, file_path, headers, title=None):
+        from openpyxl import Workbook
+        self._file_path = file_path
+        self._workbook = Workbook(write_only=True)
+        # Tên sheet tối đa 31 ký tự
+        self._sheet = self._workbook.create_sheet((title or "Dữ liệu")[:31])
+        self._sheet.append(list(headers))
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._sheet.append(tuple(row))
+
+    def close(self):
+        self._workbook.save(self._file_path)
+
+
+class HtmlStreamWriter:
+    """Ghi dữ liệu ra bảng HTML, từng dòng một."""
+
+    def __init__(self, file_path, headers, title=None):
+        title = html.escape(title or "Báo cáo")
+        self._file = open(file_path, "w", encoding="utf-8")
+        self._file.write(
+            f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n"
+            f"{HTML_STYLE}</head>\n<body>\n<h1>{title}</h1>\n"
+            f"<p class=\"date\">Ngày xuất: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</p>\n"
+            "<table>\n<thead><tr>"
+            + "".join(f"<th>{html.escape(str(header))}</th>" for header in headers)
+            + "</tr></thead>\n<tbody>\n")
+
+    def write_rows(self, rows):
+        self._file.writelines(
+            "<tr>" + "".join(f"<td>{'' if value is None else html.escape(str(value))}</td>"
+                             for value in row) + "</tr>\n"
+            for row in rows)
+
+    def close(self):
+        self._file.write("</tbody>\n</table>\n</body>\n</html>\n")
+        self._file.close()
+
+
+# Định dạng -> (đuôi file, bộ lọc của hộp thoại lưu file, lớp ghi)
+EXPORT_FORMATS = {
+    "excel": (".xlsx", "Excel Files (*.xlsx)", XlsxStreamWriter),
+    "csv": (".csv", "CSV Files (*.csv)", CsvStreamWriter),
+    "html": (".html", "HTML Files (*.html)", HtmlStreamWriter),
+    "pdf": (".pdf", "PDF Files (*.pdf)", PdfStreamWriter),
+}
+
+
+def resolve_format(file_format):
+    """
+    Chọn định dạng xuất; thiếu openpyxl/reportlab thì Excel/PDF được thay bằng CSV.
+
+    Args:
+        file_format (str): Khóa trong EXPORT_FORMATS
+
+    Returns:
+        str: Định dạng sẽ dùng
+    """
+    if file_format == "excel" and find_spec("openpyxl") is None:
+        logging.warning("Thư viện openpyxl không khả dụng. Xuất sang CSV thay thế")
+        return "csv"
+    if file_format == "pdf" and find_spec("reportlab") is None:
+        logging.warning("Thư viện reportlab không khả dụng. Xuất sang CSV thay thế")
+        return "csv"
+    return file_format
+
+
+class StreamExporter(QObject):
+    """
+    Xuất dữ liệu theo lô ra file. run() chạy trên luồng nền (BackgroundLoader
+    với cancellable=True); tiến trình được báo qua progressChanged.
+    """
+    # (số dòng đã ghi, tổng số dòng; 0 nếu không rõ)
+    progressChanged = pyqtSignal(int, int)
+
+    def run(self, file_path, headers, rows_func, count_func=None, title=None,
+            file_format=None, cancel_token=None):
+        """
+        Ghi toàn bộ dữ liệu ra file. File dở dang bị xóa nếu bị hủy hoặc lỗi.
+
+        Args:
+            file_path (str): File đích
+            headers (list): Tiêu đề các cột
+            rows_func (callable): rows_func(cancel_token) trả về các lô dòng (ví dụ
+                StudentController.iter_students)
+            count_func (callable, optional): count_func(cancel_token) trả về tổng số dòng
+            title (str, optional): Tiêu đề (tên sheet Excel, tiêu đề HTML/PDF)
+            file_format (str, optional): Khóa trong EXPORT_FORMATS, mặc định theo đuôi file
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            int: Số dòng đã ghi
+
+        Raises:
+            QueryCancelledException: Khi bị hủy
+            DatabaseException: Khi truy vấn lỗi
+        """
+        if file_format is None:
+            extension = os.path.splitext(file_path)[1].lower()
+            file_format = next((name for name, (ext, _, _) in EXPORT_FORMATS.items()
+                                if ext == extension), "csv")
+        writer_class = EXPORT_FORMATS[file_format][2]
+        total = count_func(cancel_token) if count_func else 0
+
+        written = 0
+        completed = False
+        writer = writer_class(file_path, headers, title)
+        try:
+            for rows in rows_func(cancel_token):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                writer.write_rows(rows)
+                written += len(rows)
+                self.progressChanged.emit(written, total)
+            writer.close()
+            completed = True
+        finally:
+            if not completed:
+                try:
+                    # Lớp ghi chạy tiến trình riêng (PDF) được dừng ngay thay vì chờ ghi xong
+                    getattr(writer, "abort", writer.close)()
+                except Exception:
+                    pass
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+        logging.info(f"Đã xuất {written} dòng ra file: {file_path}")
+        return written
+
+
+class BackgroundExport(QObject):
+    """
+    Điều phối một lần xuất dữ liệu từ view: hỏi file đích, chạy StreamExporter
+    trên luồng nền, hiển thị hộp thoại tiến trình có nút Hủy và thông báo kết quả.
+    """
+
+    def __init__(self, loader, parent):
+        """
+        Khởi tạo bộ điều phối xuất dữ liệu
+
+        Args:
+            loader (BackgroundLoader): Bộ tải nền của view
+            parent (QWidget): View sở hữu (cha của các hộp thoại)
+        """
+        super().__init__(parent)
+        self.loader = loader
+        self.widget = parent
+        self.progress = None
+
+    def start(self, file_format, headers, rows_func, count_func=None, title=None,
+              default_filename=None):
+        """
+        Hỏi file đích rồi bắt đầu xuất trên luồng nền.
+
+        Args:
+            file_format (str): Khóa trong EXPORT_FORMATS ("excel", "csv", "html", "pdf")
+            headers (list): Tiêu đề các cột
+            rows_func (callable): Xem StreamExporter.run
+            count_func (callable, optional): Xem StreamExporter.run
+            title (str, optional): Tiêu đề báo cáo
+            default_filename (str, optional): Tên file mặc định (không cần đuôi)
+
+        Returns:
+            bool: True nếu đã bắt đầu xuất, False nếu người dùng hủy chọn file
+        """
+        if self.loader.is_loading("export"):
+            QMessageBox.information(self.widget, "Xuất dữ liệu", "Đang xuất dữ liệu, vui lòng chờ.")
+            return False
+
+        file_format = resolve_format(file_format)
+        extension, file_filter, _ = EXPORT_FORMATS[file_format]
+        if not default_filename:
+            default_filename = f"export_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        default_filename = os.path.splitext(default_filename)[0] + extension
+        file_path, _ = QFileDialog.getSaveFileName(
+            self.widget,
+            "Xuất dữ liệu",
+            os.path.join(os.path.expanduser("~"), "Documents", default_filename),
+            f"{file_filter};;All Files (*)"
+        )
+        if not file_path:
+            return False
+        if not file_path.lower().endswith(extension):
+            file_path += extension
+
+        # Không gán parent: bộ xuất sống cùng công việc nền và được giải phóng khi nó xong
+        exporter = StreamExporter()
+        self.progress = QProgressDialog("Đang xuất dữ liệu...", "Hủy", 0, 0, self.widget)
+        self.progress.setWindowTitle("Xuất dữ liệu")
+        self.progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress.setMinimumDuration(0)
+        self.progress.setAutoClose(False)
+        self.progress.setAutoReset(False)
+        exporter.progressChanged.connect(self.on_progress)
+        self.progress.canceled.connect(self.cancel)
+
+        self.loader.load("export", exporter.run, file_path, headers, rows_func, count_func,
+                         title, file_format, cancellable=True,
+                         on_result=lambda written, path=file_path: self.on_finished(path, written),
+                         on_error=self.on_failed)
+        return True
+
+    def on_progress(self, written, total):
+        """Cập nhật hộp thoại tiến trình."""
+        if self.progress is None:
+            return
+        if total:
+            self.progress.setMaximum(total)
+            self.progress.setValue(min(written, total))
+        self.progress.setLabelText(f"Đã xuất {written:,} dòng...")
+
+    def cancel(self):
+        """Dừng xuất dữ liệu; file dở dang bị xóa."""
+        self.loader.cancel("export")
+        self.finish()
+
+    def on_finished(self, file_path, written):
+        """Thông báo xuất thành công."""
+        self.finish()
+        QMessageBox.information(
+            self.widget,
+            "Thành công",
+            f"Đã xuất {written:,} dòng đến:\n{file_path}"
+        )
+
+    def on_failed(self, error):
+        """Thông báo lỗi khi xuất dữ liệu."""
+        self.finish()
+        logging.error(f"Lỗi khi xuất dữ liệu: {error}")
+        QMessageBox.warning(self.widget, "Lỗi", f"Không thể xuất dữ liệu: {error}")
+
+    def finish(self):
+        """Đóng hộp thoại tiến trình."""
+        if self.progress is not None:
+            self.progress.blockSignals(True)
+            self.progress.close()
+            self.progress.deleteLater()
+            self.progress = None
@@ -0,0 +1,295 @@
+"""
+Module lập báo cáo học kỳ: một file Excel nhiều sheet (tổng quan, top khóa học,
+phân phối điểm, kết quả sinh viên, hoạt động) có số liệu khớp nhau.
+
+Mọi truy vấn chạy trong cùng một giao dịch đọc (DatabaseManager.read_snapshot)
+nên các sheet phản ánh cùng một thời điểm. Giao dịch được giữ tới khi truy vấn
+xong sheet cuối; ở chế độ WAL (DatabaseManager bật khi mở kết nối) nó không chặn
+các lệnh ghi từ giao diện, còn ở chế độ nhật ký mặc định mọi lệnh ghi phải chờ
+tới khi lập xong báo cáo.
+
+Workbook được ghi bằng openpyxl ở chế độ write_only trên một luồng ghi riêng:
+trong lúc SQLite tính sheet tiếp theo (không giữ GIL), sheet trước đã được ghi ra
+file. Thời gian của từng sheet được ghi vào log để theo dõi hiệu năng.
+"""
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from importlib.util import find_spec
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.enrollment_trends import term_range
+from utils.error_handler import ConfigException, DatabaseException, FileException
+from utils.grade_analytics import PASS_MARK, SCHEME_CLASSIFICATION, get_bucket_scheme
+
+HAS_OPENPYXL = find_spec("openpyxl") is not None
+
+SHEET_OVERVIEW = "Tổng quan"
+SHEET_TOP_COURSES = "Top khóa học"
+SHEET_GRADES = "Phân phối điểm"
+SHEET_STUDENTS = "Kết quả sinh viên"
+SHEET_ACTIVITY = "Hoạt động"
+SHEETS = (SHEET_OVERVIEW, SHEET_TOP_COURSES, SHEET_GRADES, SHEET_STUDENTS, SHEET_ACTIVITY)
+
+# Số dòng kết quả sinh viên đọc và ghi mỗi lô
+STUDENT_BATCH_SIZE = 5000
+# Độ rộng cột (ký tự) của từng sheet
+COLUMN_WIDTHS = {
+    SHEET_OVERVIEW: (36, 24),
+    SHEET_TOP_COURSES: (14, 36, 24, 10, 12, 12, 12, 12),
+    SHEET_GRADES: (24, 12, 12),
+    SHEET_STUDENTS: (14, 30, 16, 12, 12, 12, 14, 12, 22),
+    SHEET_ACTIVITY: (24, 20, 12, 20, 20),
+}
+
+
+class TermReportBuilder(QObject):
+    """
+    Lập báo cáo học kỳ. run() chạy trên luồng nền (BackgroundLoader với
+    cancellable=True); progressChanged báo số sheet đã tính xong.
+    """
+    # (số sheet đã xong, tổng số sheet)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, db_manager):
+        """
+        Khởi tạo bộ lập báo cáo
+
+        Args:
+            db_manager (DatabaseManager): Cơ sở dữ liệu nguồn
+        """
+        super().__init__()
+        self.db_manager = db_manager
+
+    def run(self, file_path, term=None, top_limit=20, scheme="letter", pass_mark=PASS_MARK,
+            cancel_token=None):
+        """
+        Lập workbook báo cáo. File được ghi ra file tạm rồi đổi tên, nên bị hủy hoặc
+        lỗi thì không để lại file dở dang.
+
+        Args:
+            file_path (str): File .xlsx đích
+            term (str, optional): Học kỳ (ví dụ "2024-2025 HK1"); None là toàn bộ dữ liệu
+            top_limit (int): Số khóa học trong sheet top khóa học
+            scheme (str | GradeBucketScheme): Cách chia khoảng điểm của sheet phân phối điểm
+            pass_mark (float): Điểm tối thiểu để đạt
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: {'sheets': {tên sheet: số dòng}, 'timings': {tên sheet: giây},
+                   'elapsed': tổng số giây}
+
+        Raises:
+            ConfigException: Khi chưa cài openpyxl
+            ValueError: Khi tên học kỳ không hợp lệ
+            QueryCancelledException: Khi bị hủy
+            DatabaseException: Khi truy vấn lỗi
+            FileException: Khi không ghi được file
+        """
+        if not HAS_OPENPYXL:
+            raise ConfigException("Xuất báo cáo Excel cần thư viện openpyxl (pip install openpyxl)")
+        from openpyxl import Workbook
+
+        started = time.perf_counter()
+        period = term_range(term) if term else None
+        scheme = get_bucket_scheme(scheme)
+        sections = (
+            (SHEET_OVERVIEW, lambda c: self._overview(c, term, period, pass_mark)),
+            (SHEET_TOP_COURSES, lambda c: self._top_courses(c, period, top_limit, pass_mark)),
+            (SHEET_GRADES, lambda c: self._grade_distribution(c, period, scheme)),
+            (SHEET_STUDENTS, lambda c: self._student_results(c, period, pass_mark)),
+            (SHEET_ACTIVITY, lambda c: self._activity_summary(c, period)),
+        )
+
+        workbook = Workbook(write_only=True)
+        sheets = {name: self._create_sheet(workbook, name) for name in SHEETS}
+        counts = dict.fromkeys(SHEETS, 0)
+        timings = {}
+        temp_path = file_path + ".part"
+        completed = False
+        # Một luồng ghi: các sheet được ghi đúng thứ tự trong khi luồng này tiếp tục truy vấn
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="term-report-writer")
+        pending = []
+        try:
+            with self.db_manager.read_snapshot() as connection:
+                for index, (name, section) in enumerate(sections):
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    section_started = time.perf_counter()
+                    for rows in section(connection):
+                        if cancel_token is not None:
+                            cancel_token.raise_if_cancelled()
+                        counts[name] += len(rows)
+                        pending.append(writer.submit(self._append_rows, sheets[name], rows))
+                    # Không tính dòng tiêu đề
+                    counts[name] -= 1
+                    timings[name] = time.perf_counter() - section_started
+                    self.progressChanged.emit(index + 1, len(sections))
+            wait_started = time.perf_counter()
+            for future in pending:
+                future.result()
+            timings["Chờ luồng ghi"] = time.perf_counter() - wait_started
+            save_started = time.perf_counter()
+            workbook.save(temp_path)
+            timings["Ghi file"] = time.perf_counter() - save_started
+            os.replace(temp_path, file_path)
+            completed = True
+        except OSError as e:
+            raise FileException(f"Không thể ghi báo cáo học kỳ: {e}", cause=e) from e
+        except sqlite3.Error as e:
+            raise DatabaseException(f"Lỗi khi truy vấn dữ liệu báo cáo học kỳ: {e}", cause=e) from e
+        finally:
+            writer.shutdown(wait=True, cancel_futures=True)
+            if not completed:
+                self._discard(workbook)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Đã lập báo cáo học kỳ {term or 'toàn bộ'} trong {elapsed:.2f} giây: "
+                     + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+        return {'sheets': counts, 'timings': timings, 'elapsed': elapsed}
+
+    @staticmethod
+    def _create_sheet(workbook, name):
+        """Tạo sheet write_only và đặt độ rộng cột (phải đặt trước khi ghi dòng)."""
+        from openpyxl.utils import get_column_letter
+        sheet = workbook.create_sheet(name)
+        for index, width in enumerate(COLUMN_WIDTHS[name], start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        return sheet
+
+    @staticmethod
+    def _discard(workbook):
+        """Đóng các sheet chưa lưu (file tạm của openpyxl được xóa khi thoát ứng dụng)."""
+        for sheet in workbook.worksheets:
+            try:
+                sheet.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _append_rows(sheet, rows):
+        """Ghi các dòng vào sheet (chạy trên luồng ghi)."""
+        for row in rows:
+            sheet.append(row)
+
+    @staticmethod
+    def _period_filter(column, period):
+        """Điều kiện lọc theo khoảng ngày của học kỳ: (chuỗi SQL, tham số)."""
+        if period is None:
+            return "1 = 1", ()
+        return f"{column} >= ? AND {column} < ?", period
+
+    def _overview(self, connection, term, period, pass_mark):
+        """Sheet tổng quan: các chỉ số chính của học kỳ."""
+        where, params = self._period_filter("ngay_ghi_danh", period)
+        (enrollments, graded, students, courses, average, passed) = connection.execute(f"""
+            SELECT COUNT(*), COUNT(diem), COUNT(DISTINCT ma_sinh_vien), COUNT(DISTINCT ma_khoa_hoc),
+                   AVG(diem), SUM(diem >= ?)
+            FROM ghi_danh
+            WHERE {where}
+        """, (pass_mark, *params)).fetchone()
+        total_students = connection.execute("SELECT COUNT(*) FROM sinh_vien").fetchone()[0]
+        total_courses = connection.execute("SELECT COUNT(*) FROM khoa_hoc").fetchone()[0]
+        yield [
+            ("Chỉ số", "Giá trị"),
+            ("Học kỳ", term or "Toàn bộ"),
+            ("Thời điểm lập báo cáo", datetime.now().strftime("%d/%m/%Y %H:%M:%S")),
+            ("Tổng số sinh viên", total_students),
+            ("Số sinh viên có ghi danh", students),
+            ("Tổng số khóa học", total_courses),
+            ("Số khóa học có ghi danh", courses),
+            ("Số lượt ghi danh", enrollments),
+            ("Số lượt đã có điểm", graded),
+            ("Điểm trung bình", round(average, 2) if average is not None else ""),
+            (f"Tỷ lệ đạt (điểm >= {pass_mark:g}) (%)",
+             round((passed or 0) * 100 / graded, 2) if graded else ""),
+        ]
+
+    def _top_courses(self, connection, period, limit, pass_mark):
+        """Sheet top khóa học theo số lượt ghi danh."""
+        where, params = self._period_filter("g.ngay_ghi_danh", period)
+        rows = connection.execute(f"""
+            SELECT g.ma_khoa_hoc, k.ten_khoa_hoc, k.giang_vien, k.so_tin_chi,
+                   COUNT(*) AS so_ghi_danh, COUNT(g.diem), AVG(g.diem), SUM(g.diem >= ?)
+            FROM ghi_danh g
+            LEFT JOIN khoa_hoc k ON k.ma_khoa_hoc = g.ma_khoa_hoc
+            WHERE {where}
+            GROUP BY g.ma_khoa_hoc
+            ORDER BY so_ghi_danh DESC, g.ma_khoa_hoc
+            LIMIT ?
+        """, (pass_mark, *params, limit)).fetchall()
+        yield [("Mã khóa học", "Tên khóa học", "Giảng viên", "Số tín chỉ", "Số ghi danh",
+                "Số có điểm", "Điểm TB", "Tỷ lệ đạt (%)")] + [
+            (course_id, title or "", instructor or "", credits, enrolled, graded,
+             round(average, 2) if average is not None else "",
+             round((passed or 0) * 100 / graded, 2) if graded else "")
+            for course_id, title, instructor, credits, enrolled, graded, average, passed in rows]
+
+    def _grade_distribution(self, connection, period, scheme):
+        """Sheet phân phối điểm theo cách chia khoảng điểm (như GradeAnalytics)."""
+        where, params = self._period_filter("ngay_ghi_danh", period)
+        grades = np.fromiter(
+            (row[0] for row in connection.execute(
+                f"SELECT diem FROM ghi_danh WHERE diem IS NOT NULL AND {where}", params)),
+            dtype=np.float64)
+        ungraded = connection.execute(
+            f"SELECT COUNT(*) FROM ghi_danh WHERE diem IS NULL AND {where}", params).fetchone()[0]
+        counts = np.bincount(scheme.bucket_indices(grades), minlength=len(scheme.labels))
+        total = len(grades)
+        yield [("Khoảng điểm", "Số lượng", "Tỷ lệ (%)")] + [
+            (label, int(count), round(count * 100 / total, 2) if total else 0)
+            for label, count in zip(scheme.labels, counts)] + [
+            ("Chưa có điểm", ungraded, ""),
+            ("Tổng", total + ungraded, ""),
+        ]
+
+    def _student_results(self, connection, period, pass_mark):
+        """Sheet kết quả của từng sinh viên có ghi danh, đọc và ghi theo lô."""
+        where, params = self._period_filter("g.ngay_ghi_danh", period)
+        cursor = connection.execute(f"""
+            SELECT g.ma_sinh_vien, s.ho_ten, s.trang_thai, COUNT(*), COUNT(g.diem), AVG(g.diem),
+                   SUM(g.diem * k.so_tin_chi) / SUM(CASE WHEN g.diem IS NOT NULL THEN k.so_tin_chi END),
+                   SUM(CASE WHEN g.diem >= ? THEN k.so_tin_chi ELSE 0 END)
+            FROM ghi_danh g
+            LEFT JOIN sinh_vien s ON s.ma_sinh_vien = g.ma_sinh_vien
+            LEFT JOIN khoa_hoc k ON k.ma_khoa_hoc = g.ma_khoa_hoc
+            WHERE {where}
+            GROUP BY g.ma_sinh_vien
+            ORDER BY g.ma_sinh_vien
+        """, (pass_mark, *params))
+        labels = SCHEME_CLASSIFICATION.labels
+        yield [("Mã sinh viên", "Họ tên", "Trạng thái", "Số khóa học", "Số có điểm",
+                "Điểm TB", "Điểm TB (tín chỉ)", "Tín chỉ đạt", "Xếp loại")]
+        while True:
+            rows = cursor.fetchmany(STUDENT_BATCH_SIZE)
+            if not rows:
+                return
+            # Xếp loại theo điểm trung bình có trọng số tín chỉ, tính cho cả lô
+            weighted = np.array([np.nan if row[6] is None else row[6] for row in rows])
+            classes = SCHEME_CLASSIFICATION.bucket_indices(np.nan_to_num(weighted))
+            yield [
+                (student_id, name or "", status or "", enrolled, graded,
+                 round(average, 2) if average is not None else "",
+                 round(weighted_average, 2) if weighted_average is not None else "",
+                 earned or 0, labels[bucket] if weighted_average is not None else "")
+                for (student_id, name, status, enrolled, graded, average, weighted_average, earned),
+                bucket in zip(rows, classes)]
+
+    def _activity_summary(self, connection, period):
+        """Sheet tổng hợp nhật ký hoạt động theo loại hoạt động và đối tượng."""
+        where, params = self._period_filter("thoi_gian", period)
+        rows = connection.execute(f"""
+            SELECT loai_hoat_dong, COALESCE(loai_doi_tuong, ''), COUNT(*), MIN(thoi_gian), MAX(thoi_gian)
+            FROM nhat_ky_hoat_dong
+            WHERE {where}
+            GROUP BY 1, 2
+            ORDER BY 3 DESC
+        """, params).fetchall()
+        yield [("Loại hoạt động", "Đối tượng", "Số lần", "Lần đầu", "Lần cuối")] + [
+            tuple(row) for row in rows]
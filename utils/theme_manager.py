@@ -27,13 +27,37 @@ class ThemeManager(QObject):
                 logging.warning("Không thể đọc theme từ config, sử dụng light theme mặc định")
                 self.current_theme = "light"
     
-    def apply_theme(self, theme_name=None):
+    DEFAULT_STYLE_PATH = "resources/styles/styles.qss"
+    
+    def load_stylesheet(self, theme_name=None):
+        """
+        Đọc nội dung stylesheet của theme (không chạm vào QApplication,
+        nên có thể gọi từ luồng nền trong lúc khởi động)
+        
+        Args:
+            theme_name (str, optional): Tên theme, mặc định là theme hiện tại
+            
+        Returns:
+            str: Nội dung stylesheet hoặc None nếu không đọc được
+        """
+        theme_path = self.themes.get(theme_name or self.current_theme)
+        if not theme_path or not os.path.exists(theme_path):
+            theme_path = self.DEFAULT_STYLE_PATH
+        try:
+            with open(theme_path, "r", encoding="utf-8") as file:
+                return file.read()
+        except OSError as e:
+            logging.error(f"Lỗi khi đọc file stylesheet: {e}")
+            return None
+    
+    def apply_theme(self, theme_name=None, stylesheet=None):
         """
         Áp dụng theme cho ứng dụng
         
         Args:
             theme_name (str, optional): Tên của theme cần áp dụng. 
                                        Nếu không chỉ định, sẽ dùng theme hiện tại
+            stylesheet (str, optional): Nội dung stylesheet đã đọc sẵn bằng load_stylesheet()
         """
         if theme_name:
             self.current_theme = theme_name
@@ -43,13 +67,17 @@ class ThemeManager(QObject):
         if not theme_path or not os.path.exists(theme_path):
             logging.warning(f"Không tìm thấy file theme: {theme_path}, dùng stylesheet mặc định")
             # Load và áp dụng stylesheet mặc định
-            default_style_path = "resources/styles/styles.qss"
-            if os.path.exists(default_style_path):
-                self._apply_stylesheet(default_style_path)
+            if stylesheet is not None:
+                QApplication.instance().setStyleSheet(stylesheet)
+            elif os.path.exists(self.DEFAULT_STYLE_PATH):
+                self._apply_stylesheet(self.DEFAULT_STYLE_PATH)
             return
         
         # Load và áp dụng stylesheet
-        self._apply_stylesheet(theme_path)
+        if stylesheet is not None:
+            QApplication.instance().setStyleSheet(stylesheet)
+        else:
+            self._apply_stylesheet(theme_path)
         
         # Lưu theme vào config nếu có config manager
         if self.config_manager:
@@ -0,0 +1,246 @@
+"""
+Module in bảng điểm hàng loạt (ví dụ cả khóa tốt nghiệp).
+
+Kết quả học tập của các sinh viên được đọc bằng một truy vấn gộp
+(ReportController.iter_student_performance) và chia thành các lô; mỗi lô được vẽ
+bằng reportlab trên một pool tiến trình (utils.transcript_pdf). Có hai chế độ:
+
+- Mỗi sinh viên một file <mã sinh viên>.pdf trong thư mục đích.
+- Một file gộp: các phần (mỗi phần một nhóm sinh viên liên tiếp) được vẽ song song
+  vào thư mục <file>.parts rồi ghép theo thứ tự bằng pypdf. Không có pypdf thì cả
+  file được vẽ trên một tiến trình.
+
+File chỉ xuất hiện khi đã vẽ xong, nên chạy lại sau khi bị dừng sẽ bỏ qua các file
+(hoặc phần) đã có và tiếp tục từ chỗ dừng.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils.error_handler import FileException
+from utils.grade_analytics import PASS_MARK
+from utils.transcript_pdf import render_jobs
+
+HAS_PYPDF = find_spec("pypdf") is not None
+
+# Số sinh viên mỗi tác vụ gửi cho tiến trình vẽ (chế độ mỗi sinh viên một file)
+TASK_SIZE = 50
+# Số sinh viên mỗi phần của file gộp (cũng là đơn vị tiếp tục khi bị dừng)
+PART_SIZE = 200
+# Dưới số bảng điểm này thì vẽ ngay trên luồng hiện tại (không đáng khởi động pool)
+PARALLEL_THRESHOLD = 100
+# Số tiến trình vẽ tối đa
+MAX_WORKERS = 4
+# File ghi danh sách mã sinh viên của lần in gộp (để biết các phần có cùng lựa chọn)
+PARTS_STATE_FILE = "ids.json"
+
+
+def default_workers(count):
+    """
+    Số tiến trình vẽ nên dùng.
+
+    Args:
+        count (int): Số bảng điểm cần vẽ
+
+    Returns:
+        int: 1 nếu ít bảng điểm hoặc máy chỉ có một nhân
+    """
+    if count < PARALLEL_THRESHOLD:
+        return 1
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def transcript_file_name(student_id):
+    """Tên file bảng điểm của một sinh viên (ký tự không hợp lệ trong tên file được thay bằng _)."""
+    return re.sub(r"[^\w.-]", "_", student_id) + ".pdf"
+
+
+class TranscriptExporter(QObject):
+    """
+    In bảng điểm cho nhiều sinh viên. run() chạy trên luồng nền (BackgroundLoader
+    với cancellable=True); tiến trình được báo qua progressChanged.
+    """
+    # (số sinh viên đã xong, tổng số sinh viên)
+    progressChanged = pyqtSignal(int, int)
+
+    def __init__(self, report_controller):
+        """
+        Khởi tạo bộ in bảng điểm
+
+        Args:
+            report_controller (ReportController): Nguồn kết quả học tập
+        """
+        super().__init__()
+        self.report_controller = report_controller
+
+    def run(self, output, student_ids, merged=False, workers=None, pass_mark=PASS_MARK,
+            cancel_token=None):
+        """
+        In bảng điểm; các file (hoặc phần) đã vẽ xong ở lần chạy trước được giữ lại.
+
+        Args:
+            output (str): Thư mục đích (mỗi sinh viên một file) hoặc file PDF gộp
+            student_ids (iterable): Các mã sinh viên
+            merged (bool): Gộp tất cả vào một file
+            workers (int, optional): Số tiến trình vẽ, mặc định theo số bảng điểm và số nhân
+            pass_mark (float): Điểm tối thiểu để tích lũy tín chỉ
+            cancel_token (CancellationToken, optional): Cờ hủy
+
+        Returns:
+            dict: {'rendered': số bảng điểm đã vẽ, 'skipped': số đã có từ lần trước,
+                   'missing': số mã không tồn tại, 'output': thư mục hoặc file đích}
+
+        Raises:
+            QueryCancelledException: Khi bị hủy (các file đã vẽ xong được giữ lại)
+            DatabaseException: Khi truy vấn lỗi
+            FileException: Khi vẽ hoặc ghi file lỗi
+        """
+        ids = sorted(set(student_ids))
+        if merged:
+            directory = output + ".parts"
+            part_size = PART_SIZE if HAS_PYPDF else max(1, len(ids))
+            targets = {student_id: os.path.join(directory, f"part_{index // part_size:05d}.pdf")
+                       for index, student_id in enumerate(ids)}
+            self._prepare_parts(directory, ids)
+        else:
+            directory = output
+            os.makedirs(directory, exist_ok=True)
+            targets = {student_id: os.path.join(directory, transcript_file_name(student_id))
+                       for student_id in ids}
+
+        todo = [student_id for student_id in ids if not os.path.exists(targets[student_id])]
+        skipped = len(ids) - len(todo)
+        if skipped:
+            logging.info(f"Bỏ qua {skipped} bảng điểm đã in ở lần trước")
+        if workers is None:
+            workers = default_workers(len(todo))
+
+        rendered = 0
+        self.progressChanged.emit(skipped, len(ids))
+        tasks = self._tasks(todo, targets, merged, cancel_token)
+        try:
+            for count in self._map_tasks(tasks, pass_mark, workers, cancel_token):
+                rendered += count
+                self.progressChanged.emit(skipped + rendered, len(ids))
+        except OSError as e:
+            raise FileException(f"Không thể ghi bảng điểm: {e}", cause=e) from e
+
+        if merged:
+            self._merge_parts(directory, sorted(set(targets.values())), output)
+        missing = len(todo) - rendered
+        self.progressChanged.emit(len(ids), len(ids))
+        logging.info(f"Đã in {rendered} bảng điểm ra {output} (bỏ qua {skipped}, "
+                     f"không tìm thấy {missing} mã sinh viên)")
+        return {'rendered': rendered, 'skipped': skipped, 'missing': missing, 'output': output}
+
+    @staticmethod
+    def _prepare_parts(directory, ids):
+        """Tạo thư mục các phần; bỏ các phần cũ nếu lần trước in cho danh sách khác."""
+        state_path = os.path.join(directory, PARTS_STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                if json.load(f) == ids:
+                    return
+            shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+
+    def _tasks(self, todo, targets, merged, cancel_token):
+        """
+        Đọc kết quả học tập và chia thành các tác vụ vẽ.
+
+        Yields:
+            list: Các cặp (file đích, danh sách bảng điểm) của một tác vụ
+        """
+        if not todo:
+            return
+        performances = self.report_controller.iter_student_performance(todo, cancel_token)
+        if not merged:
+            jobs = []
+            for batch in performances:
+                for transcript in batch:
+                    jobs.append((targets[transcript['student']['ma_sinh_vien']], [transcript]))
+                    if len(jobs) >= TASK_SIZE:
+                        yield jobs
+                        jobs = []
+            if jobs:
+                yield jobs
+            return
+        # Kết quả theo thứ tự mã sinh viên nên mỗi phần là một đoạn liên tiếp
+        part, transcripts = None, []
+        for batch in performances:
+            for transcript in batch:
+                target = targets[transcript['student']['ma_sinh_vien']]
+                if target != part and transcripts:
+                    yield [(part, transcripts)]
+                    transcripts = []
+                part = target
+                transcripts.append(transcript)
+        if transcripts:
+            yield [(part, transcripts)]
+
+    @staticmethod
+    def _map_tasks(tasks, pass_mark, workers, cancel_token):
+        """
+        Vẽ các tác vụ trên pool tiến trình (tối đa 2 * workers tác vụ chờ cùng lúc).
+
+        Yields:
+            int: Số bảng điểm đã vẽ của từng tác vụ
+        """
+        if workers <= 1:
+            for jobs in tasks:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield render_jobs(jobs, pass_mark)
+            return
+
+        # spawn thay vì fork: tiến trình giao diện có nhiều luồng Qt đang chạy
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        logging.info(f"In bảng điểm trên {workers} tiến trình")
+        try:
+            pending = deque()
+            for jobs in tasks:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                pending.append(pool.submit(render_jobs, jobs, pass_mark))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _merge_parts(directory, parts, output):
+        """
+        Ghép các phần thành file gộp rồi xóa thư mục các phần.
+
+        Raises:
+            FileException: Khi ghép file lỗi
+        """
+        parts = [part for part in parts if os.path.exists(part)]
+        try:
+            if len(parts) == 1:
+                os.replace(parts[0], output)
+            elif parts:
+                from pypdf import PdfWriter
+                writer = PdfWriter()
+                for part in parts:
+                    writer.append(part)
+                temp_path = output + ".part"
+                with open(temp_path, "wb") as f:
+                    writer.write(f)
+                os.replace(temp_path, output)
+            shutil.rmtree(directory)
+        except Exception as e:
+            raise FileException(f"Không thể ghép file bảng điểm: {e}", cause=e) from e
@@ -0,0 +1,198 @@
+"""
+Module vẽ bảng điểm sinh viên ra PDF bằng reportlab.
+
+Dùng chung cho tiến trình giao diện và các tiến trình vẽ của TranscriptExporter
+(utils.transcript_export); module không import Qt để tiến trình vẽ khởi động nhẹ.
+"""
+import os
+from datetime import datetime
+
+from utils.pdf_export import FONT_NAME, FONT_SIZE, HEADER_FONT_NAME, MARGIN, ROW_HEIGHT
+
+TITLE = "BẢNG ĐIỂM SINH VIÊN"
+COURSE_HEADERS = ("STT", "Mã khóa học", "Tên khóa học", "Số tín chỉ", "Giảng viên", "Điểm")
+# Tỷ lệ độ rộng các cột của bảng khóa học
+COURSE_COLUMN_RATIOS = (0.06, 0.14, 0.36, 0.1, 0.24, 0.1)
+# Chiều cao phần thông tin sinh viên (trang đầu) và phần tổng kết (trang cuối)
+INFO_HEIGHT = 120
+SUMMARY_HEIGHT = 70
+
+
+def _text(value):
+    """Giá trị hiển thị của một ô (rỗng nếu không có)."""
+    return "" if value is None else str(value)
+
+
+class TranscriptRenderer:
+    """Vẽ nhiều bảng điểm vào một file PDF; mỗi bảng điểm bắt đầu ở trang mới."""
+
+    def __init__(self, file_path, pass_mark):
+        """
+        Mở file PDF đích
+
+        Args:
+            file_path (str): File đích
+            pass_mark (float): Điểm tối thiểu để tích lũy tín chỉ
+        """
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen.canvas import Canvas
+        from reportlab.platypus import TableStyle
+
+        self.pass_mark = pass_mark
+        self.page_width, self.page_height = A4
+        self.canvas = Canvas(file_path, pagesize=A4)
+        self.canvas.setTitle("Bảng điểm sinh viên")
+        self.col_widths = [(self.page_width - 2 * MARGIN) * ratio for ratio in COURSE_COLUMN_RATIOS]
+        self.printed_at = datetime.now().strftime("%d/%m/%Y %H:%M")
+        self.page_number = 0
+        usable = self.page_height - 2 * MARGIN
+        # Số dòng khóa học của trang đầu (có thông tin sinh viên) và các trang sau
+        self.first_page_rows = max(1, int((usable - INFO_HEIGHT) // ROW_HEIGHT) - 1)
+        self.next_page_rows = max(1, int(usable // ROW_HEIGHT) - 1)
+        self.style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('FONTNAME', (0, 0), (-1, 0), HEADER_FONT_NAME),
+            ('FONTNAME', (0, 1), (-1, -1), FONT_NAME),
+            ('FONTSIZE', (0, 0), (-1, -1), FONT_SIZE),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (3, 1), (3, -1), 'CENTER'),
+            ('ALIGN', (5, 1), (5, -1), 'CENTER'),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ])
+
+    def draw(self, transcript):
+        """
+        Vẽ bảng điểm của một sinh viên (nhiều trang nếu có nhiều khóa học).
+
+        Args:
+            transcript (dict): Một phần tử của ReportController.iter_student_performance
+        """
+        courses = transcript['course_details']
+        rows = [(index, course['course_id'], course['course_name'], _text(course['credits']),
+                 course['instructor'], _text(course['grade']))
+                for index, course in enumerate(courses, start=1)]
+        pages = [rows[:self.first_page_rows]]
+        for start in range(self.first_page_rows, len(rows), self.next_page_rows):
+            pages.append(rows[start:start + self.next_page_rows])
+
+        self.page_number = 0
+        for page_index, page_rows in enumerate(pages):
+            top = self.page_height - MARGIN
+            if page_index == 0:
+                top = self._draw_info(transcript['student'], top)
+            top = self._draw_table(page_rows, top)
+            if page_index == len(pages) - 1:
+                if top - SUMMARY_HEIGHT < MARGIN:
+                    self._finish_page(transcript['student'])
+                    top = self.page_height - MARGIN
+                self._draw_summary(transcript, top)
+            self._finish_page(transcript['student'])
+
+    def _draw_info(self, student, top):
+        """Vẽ tiêu đề và thông tin sinh viên, trả về vị trí dọc tiếp theo."""
+        self.canvas.setFont(HEADER_FONT_NAME, 14)
+        self.canvas.drawCentredString(self.page_width / 2, top - 14, TITLE)
+        self.canvas.setFont(FONT_NAME, 10)
+        lines = (
+            (f"Mã sinh viên: {student['ma_sinh_vien']}", f"Họ tên: {_text(student['ho_ten'])}"),
+            (f"Ngày sinh: {_text(student['ngay_sinh'])}", f"Giới tính: {_text(student['gioi_tinh'])}"),
+            (f"Ngày nhập học: {_text(student['ngay_nhap_hoc'])}",
+             f"Trạng thái: {_text(student['trang_thai'])}"),
+        )
+        y = top - 44
+        for left, right in lines:
+            self.canvas.drawString(MARGIN, y, left)
+            self.canvas.drawString(self.page_width / 2, y, right)
+            y -= 16
+        return top - INFO_HEIGHT
+
+    def _draw_table(self, rows, top):
+        """Vẽ bảng khóa học của một trang, trả về vị trí dọc bên dưới bảng."""
+        from reportlab.platypus import Table
+
+        if not rows:
+            self.canvas.setFont(FONT_NAME, 10)
+            self.canvas.drawString(MARGIN, top - 12, "Sinh viên chưa đăng ký khóa học nào.")
+            return top - 24
+        table = Table([COURSE_HEADERS] + rows, colWidths=self.col_widths, rowHeights=ROW_HEIGHT)
+        table.setStyle(self.style)
+        _, height = table.wrapOn(self.canvas, self.page_width, self.page_height)
+        table.drawOn(self.canvas, MARGIN, top - height)
+        return top - height - 10
+
+    def _draw_summary(self, transcript, top):
+        """Vẽ phần tổng kết kết quả học tập."""
+        courses = transcript['course_details']
+        graded = [course for course in courses if course['grade'] is not None]
+        credits = sum(course['credits'] or 0 for course in graded)
+        earned = sum(course['credits'] or 0 for course in graded if course['grade'] >= self.pass_mark)
+        weighted = (sum(course['grade'] * (course['credits'] or 0) for course in graded) / credits
+                    if credits else None)
+        self.canvas.setFont(FONT_NAME, 10)
+        lines = (
+            f"Số khóa học đã đăng ký: {transcript['courses_enrolled']}"
+            f"    Số khóa học đã có điểm: {transcript['courses_completed']}",
+            f"Điểm trung bình: {transcript['average_grade']:.2f}"
+            + (f"    Điểm trung bình theo tín chỉ: {weighted:.2f}" if weighted is not None else ""),
+            f"Số tín chỉ tích lũy (điểm >= {self.pass_mark:g}): {earned}",
+        )
+        y = top - 12
+        for line in lines:
+            self.canvas.drawString(MARGIN, y, line)
+            y -= 16
+
+    def _finish_page(self, student):
+        """Vẽ chân trang (số trang tính trong bảng điểm của sinh viên) và sang trang mới."""
+        self.page_number += 1
+        self.canvas.setFont(FONT_NAME, FONT_SIZE)
+        self.canvas.drawString(MARGIN, MARGIN / 2, f"{student['ma_sinh_vien']} - In ngày {self.printed_at}")
+        self.canvas.drawRightString(self.page_width - MARGIN, MARGIN / 2,
+                                    f"Trang {self.page_number}")
+        self.canvas.showPage()
+
+    def save(self):
+        """Ghi và đóng file PDF."""
+        self.canvas.save()
+
+
+def render_transcripts(file_path, transcripts, pass_mark):
+    """
+    Vẽ các bảng điểm vào một file. File được ghi ra file tạm rồi đổi tên, nên file
+    đích chỉ tồn tại khi đã vẽ xong (dùng để tiếp tục sau khi bị dừng).
+
+    Args:
+        file_path (str): File đích
+        transcripts (list): Các bảng điểm (xem TranscriptRenderer.draw)
+        pass_mark (float): Điểm tối thiểu để tích lũy tín chỉ
+    """
+    temp_path = file_path + ".part"
+    try:
+        renderer = TranscriptRenderer(temp_path, pass_mark)
+        for transcript in transcripts:
+            renderer.draw(transcript)
+        renderer.save()
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def render_jobs(jobs, pass_mark):
+    """
+    Hàm chạy trong tiến trình vẽ: vẽ một lô file bảng điểm.
+
+    Args:
+        jobs (list): Các cặp (file đích, danh sách bảng điểm)
+        pass_mark (float): Điểm tối thiểu để tích lũy tín chỉ
+
+    Returns:
+        int: Số bảng điểm đã vẽ
+    """
+    count = 0
+    for file_path, transcripts in jobs:
+        render_transcripts(file_path, transcripts, pass_mark)
+        count += len(transcripts)
+    return count
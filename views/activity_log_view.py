@@ -7,16 +7,20 @@ from PyQt6.QtGui import QColor, QIcon
 import logging
 import os
 from datetime import datetime, timedelta
-from utils.export_manager import ExportManager
+from utils.config_manager import DEFAULT_QUERY_TIMEOUT
+from utils.search_pipeline import SearchPipeline
 
 class ActivityLogView(QWidget):
     """
     Giao diện hiển thị nhật ký hoạt động của hệ thống.
     """
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, config_manager=None):
         super().__init__()
         self.setObjectName("activityLogView")
         self.db_manager = db_manager
+        # Thời hạn truy vấn nhật ký (mục "query_timeouts", khóa "activity_log")
+        self.query_timeout = (config_manager.get_query_timeout("activity_log")
+                              if config_manager is not None else DEFAULT_QUERY_TIMEOUT)
         self.init_ui()
     
     def init_ui(self):
@@ -81,13 +85,29 @@ class ActivityLogView(QWidget):
         filter_layout.addWidget(QLabel("Tìm kiếm:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Nhập từ khóa...")
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         filter_layout.addWidget(self.search_input)
         
+        # Tìm kiếm khi gõ phím: chạy nền, tự hủy truy vấn cũ khi có từ khóa mới
+        self.search_pipeline = SearchPipeline(self.query_activities, parent=self,
+                                              timeout=self.query_timeout)
+        self.search_pipeline.resultsReady.connect(self.show_activities)
+        self.search_pipeline.searchFailed.connect(self.on_search_failed)
+        self.search_pipeline.busyChanged.connect(self.on_search_busy_changed)
+        
         # Nút áp dụng
         self.apply_filter_button = QPushButton("Áp dụng")
         self.apply_filter_button.clicked.connect(self.load_activities)
         filter_layout.addWidget(self.apply_filter_button)
         
+        # Nút hủy truy vấn đang chạy
+        self.cancel_button = QPushButton("Hủy")
+        self.cancel_button.setToolTip("Dừng truy vấn nhật ký đang chạy")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.setCursor(Qt.CursorShape.ArrowCursor)
+        self.cancel_button.clicked.connect(self.cancel_search)
+        filter_layout.addWidget(self.cancel_button)
+        
         filter_box.setLayout(filter_layout)
         main_layout.addWidget(filter_box)
         
@@ -144,50 +164,79 @@ class ActivityLogView(QWidget):
     
     def load_activities(self):
         """Tải danh sách hoạt động dựa trên các bộ lọc."""
-        try:
-            # Hiển thị trạng thái đang tải
-            old_cursor = self.cursor()
-            self.setCursor(Qt.CursorShape.WaitCursor)
-            
-            # Chuẩn bị các điều kiện lọc
-            date_from = self.date_from.date().toString("yyyy-MM-dd 00:00:00")
-            date_to = self.date_to.date().toString("yyyy-MM-dd 23:59:59")
-            action_type = self.action_type_combo.currentData()
-            entity_type = self.entity_type_combo.currentData()
-            search_keyword = self.search_input.text().strip()
-            
-            conditions = ["timestamp BETWEEN ? AND ?"]
-            params = [date_from, date_to]
-            
-            if action_type:
-                conditions.append("action_type = ?")
-                params.append(action_type)
-            
-            if entity_type:
-                conditions.append("entity_type = ?")
-                params.append(entity_type)
-            
-            if search_keyword:
-                conditions.append("(action_description LIKE ? OR username LIKE ? OR entity_id LIKE ?)")
-                keyword = f"%{search_keyword}%"
-                params.extend([keyword, keyword, keyword])
-            
-            # Sử dụng phương thức get_activities cải tiến
-            activities = self.db_manager.get_activities(conditions, params)
-            
-            # Cập nhật giao diện
-            self.populate_table(activities)
-            
-            # Cập nhật số lượng bản ghi
-            self.record_count_label.setText(f"Số lượng bản ghi: {len(activities)}")
-            
-            # Khôi phục con trỏ
-            self.setCursor(old_cursor)
+        self.search_pipeline.run_now(self.build_activity_filters())
+    
+    def on_search_text_changed(self, _text):
+        """Lên lịch tải lại khi người dùng đang gõ từ khóa."""
+        self.search_pipeline.schedule(self.build_activity_filters())
+    
+    def build_activity_filters(self):
+        """
+        Đọc các bộ lọc trên giao diện thành điều kiện truy vấn.
+        
+        Returns:
+            tuple: (danh sách điều kiện WHERE, danh sách tham số)
+        """
+        date_from = self.date_from.date().toString("yyyy-MM-dd 00:00:00")
+        date_to = self.date_to.date().toString("yyyy-MM-dd 23:59:59")
+        action_type = self.action_type_combo.currentData()
+        entity_type = self.entity_type_combo.currentData()
+        search_keyword = self.search_input.text().strip()
+        
+        conditions = ["timestamp BETWEEN ? AND ?"]
+        params = [date_from, date_to]
+        
+        if action_type:
+            conditions.append("action_type = ?")
+            params.append(action_type)
+        
+        if entity_type:
+            conditions.append("entity_type = ?")
+            params.append(entity_type)
+        
+        if search_keyword:
+            conditions.append("(action_description LIKE ? OR username LIKE ? OR entity_id LIKE ?)")
+            keyword = f"%{search_keyword}%"
+            params.extend([keyword, keyword, keyword])
+        
+        return conditions, params
+    
+    def query_activities(self, activity_filters, cancel_token=None):
+        """
+        Truy vấn nhật ký hoạt động (chạy trên luồng nền).
+        
+        Args:
+            activity_filters (tuple): (điều kiện, tham số) từ build_activity_filters
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
             
-        except Exception as e:
-            logging.error(f"Lỗi khi tải nhật ký hoạt động: {e}")
-            QMessageBox.warning(self, "Lỗi", f"Không thể tải nhật ký hoạt động: {str(e)}")
-            self.setCursor(old_cursor)
+        Returns:
+            list: Danh sách các hoạt động
+        """
+        conditions, params = activity_filters
+        return self.db_manager.get_activities(conditions, params, cancel_token=cancel_token)
+    
+    def show_activities(self, activities):
+        """Hiển thị kết quả truy vấn mới nhất."""
+        self.populate_table(activities)
+        self.record_count_label.setText(f"Số lượng bản ghi: {len(activities)}")
+    
+    def on_search_failed(self, message):
+        """Thông báo lỗi tải nhật ký hoạt động."""
+        QMessageBox.warning(self, "Lỗi", f"Không thể tải nhật ký hoạt động: {message}")
+    
+    def cancel_search(self):
+        """Hủy truy vấn nhật ký đang chạy (nút Hủy), giữ nguyên kết quả đang hiển thị."""
+        if self.search_pipeline.is_busy:
+            self.search_pipeline.cancel()
+            self.record_count_label.setText("Đã hủy tải nhật ký hoạt động")
+    
+    def on_search_busy_changed(self, busy):
+        """Hiển thị con trỏ chờ và bật nút Hủy khi đang truy vấn."""
+        self.cancel_button.setEnabled(busy)
+        if busy:
+            self.setCursor(Qt.CursorShape.WaitCursor)
+        else:
+            self.unsetCursor()
     
     def populate_table(self, activities):
         """Điền dữ liệu hoạt động vào bảng."""
@@ -299,6 +348,9 @@ class ActivityLogView(QWidget):
                 row_data.append(item.text() if item else "")
             data.append(row_data)
         
+        # Import khi xuất để không nạp pandas/reportlab lúc mở view
+        from utils.export_manager import ExportManager
+        
         if action == export_excel_action:
             ExportManager.export_to_excel(
                 data, 
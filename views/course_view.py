@@ -5,23 +5,32 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QAction, QIcon
 from models.course import Course
+from utils.search_pipeline import SearchPipeline
+from utils.background_loader import BackgroundLoader
+from utils.change_bus import ChangeCollector, ChangeOperation, ENTITY_COURSE
 import logging
 
 class CourseView(QWidget):
     """
     Giao diện quản lý khóa học.
     """
-    def __init__(self, course_controller):
+    # Số thay đổi tối đa được cập nhật từng dòng; nhiều hơn thì tải lại toàn bộ
+    PATCH_LIMIT = 200
+
+    def __init__(self, course_controller, auto_load=True):
         """
         Khởi tạo giao diện quản lý khóa học.
         
         Args:
             course_controller (CourseController): Controller quản lý khóa học
+            auto_load (bool): Tải dữ liệu ngay khi khởi tạo; False để tải sau qua load_initial_data()
         """
         super().__init__()
         self.course_controller = course_controller
         self.selected_course = None
         self.init_ui()
+        if auto_load:
+            self.load_initial_data()
     
     def init_ui(self):
         """Thiết lập giao diện người dùng."""
@@ -90,8 +99,14 @@ class CourseView(QWidget):
         search_layout.addWidget(QLabel("Tìm kiếm:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Nhập mã, tên khóa học, giảng viên...")
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         search_layout.addWidget(self.search_input)
         
+        # Tìm kiếm khi gõ phím: chạy nền, tự hủy truy vấn cũ khi có từ khóa mới
+        self.search_pipeline = SearchPipeline(self.course_controller.find_courses, parent=self)
+        self.search_pipeline.resultsReady.connect(self.show_search_results)
+        self.search_pipeline.searchFailed.connect(self.on_search_failed)
+        
         self.search_button = QPushButton("Tìm")
         self.search_button.clicked.connect(self.search_courses)
         search_layout.addWidget(self.search_button)
@@ -171,16 +186,20 @@ class CourseView(QWidget):
         self.current_page = 1
         self.page_size = 20
         self.filtered_courses = []
-        
-        # Tải danh sách khóa học
+
+        # Khi controller báo có thay đổi, chỉ đọc lại và cập nhật các khóa học bị ảnh hưởng
+        self.loader = BackgroundLoader(self)
+        self._patch_count = 0
+        self.change_collector = ChangeCollector((ENTITY_COURSE,), parent=self)
+        self.change_collector.changesReady.connect(self.apply_changes)
+    
+    def load_initial_data(self):
+        """Tải dữ liệu ban đầu của view (MainWindow gọi khi tab được mở lần đầu)."""
         self.load_courses()
     
     def load_courses(self):
-        """Tải danh sách khóa học từ cơ sở dữ liệu và hiển thị lên bảng."""
-        courses = self.course_controller.get_all_courses()
-        self.filtered_courses = courses
-        self.pagination.update_total_items(len(courses))
-        self.populate_table_with_pagination()
+        """Tải danh sách khóa học (chạy nền) theo bộ lọc hiện tại và hiển thị lên bảng."""
+        self.search_pipeline.run_now(self.build_search_criteria())
     
     def populate_table(self, courses):
         """
@@ -193,12 +212,94 @@ class CourseView(QWidget):
         
         for row, course in enumerate(courses):
             self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(course.ma_khoa_hoc))
-            self.table.setItem(row, 1, QTableWidgetItem(course.ten_khoa_hoc))
-            self.table.setItem(row, 2, QTableWidgetItem(str(course.so_tin_chi)))
-            self.table.setItem(row, 3, QTableWidgetItem(course.giang_vien))
-            self.table.setItem(row, 4, QTableWidgetItem(course.mo_ta))
-            self.table.setItem(row, 5, QTableWidgetItem(str(course.so_luong_toi_da)))
+            self.set_course_row(row, course)
+    
+    def set_course_row(self, row, course):
+        """
+        Ghi thông tin một khóa học vào một dòng của bảng.
+
+        Args:
+            row (int): Chỉ số dòng
+            course (Course): Khóa học cần hiển thị
+        """
+        self.table.setItem(row, 0, QTableWidgetItem(course.ma_khoa_hoc))
+        self.table.setItem(row, 1, QTableWidgetItem(course.ten_khoa_hoc))
+        self.table.setItem(row, 2, QTableWidgetItem(str(course.so_tin_chi)))
+        self.table.setItem(row, 3, QTableWidgetItem(course.giang_vien))
+        self.table.setItem(row, 4, QTableWidgetItem(course.mo_ta))
+        self.table.setItem(row, 5, QTableWidgetItem(str(course.so_luong_toi_da)))
+    
+    def find_loaded_course(self, course_id):
+        """
+        Tìm khóa học trong danh sách đã tải (không truy vấn cơ sở dữ liệu).
+
+        Args:
+            course_id (str): Mã khóa học
+
+        Returns:
+            tuple: (vị trí trong filtered_courses hoặc -1, Course hoặc None)
+        """
+        for index, course in enumerate(self.filtered_courses):
+            if course.ma_khoa_hoc == course_id:
+                return index, course
+        return -1, None
+    
+    def apply_changes(self, events):
+        """
+        Cập nhật danh sách sau khi dữ liệu khóa học thay đổi.
+        Khóa học bị xóa được bỏ khỏi danh sách ngay; khóa học được thêm/sửa
+        được đọc lại bằng một truy vấn theo mã trên luồng nền.
+
+        Args:
+            events (list): Các ChangeEvent của bảng khoa_hoc
+        """
+        # Quá nhiều thay đổi hoặc thay đổi hàng loạt (key None): tải lại toàn bộ
+        if len(events) > self.PATCH_LIMIT or any(e.key is None for e in events):
+            self.load_courses()
+            return
+
+        deleted = {e.key for e in events if e.operation is ChangeOperation.DELETE}
+        changed = [e.key for e in events if e.operation is not ChangeOperation.DELETE]
+        if deleted:
+            self.filtered_courses = [c for c in self.filtered_courses
+                                     if c.ma_khoa_hoc not in deleted]
+            self.refresh_current_page()
+        if changed:
+            self._patch_count += 1
+            self.loader.load(f"patch-{self._patch_count}", self.course_controller.get_courses_by_ids,
+                             changed, on_result=lambda found, keys=changed: self.patch_courses(keys, found))
+    
+    def patch_courses(self, course_ids, found):
+        """
+        Cập nhật các khóa học vừa được đọc lại vào danh sách và bảng.
+
+        Args:
+            course_ids (list): Các mã khóa học đã yêu cầu
+            found (dict): Mã khóa học -> Course (thiếu nghĩa là đã bị xóa)
+        """
+        criteria = self.build_search_criteria()
+        for course_id in course_ids:
+            course = found.get(course_id)
+            index, _ = self.find_loaded_course(course_id)
+            matches = course is not None and self.course_controller.matches_filters(course, criteria)
+            if index >= 0 and matches:
+                self.filtered_courses[index] = course
+            elif index >= 0:
+                del self.filtered_courses[index]
+            elif matches:
+                # Chèn theo thứ tự mã khóa học như kết quả truy vấn
+                position = next((i for i, c in enumerate(self.filtered_courses)
+                                 if c.ma_khoa_hoc > course_id), len(self.filtered_courses))
+                self.filtered_courses.insert(position, course)
+            if (course is not None and self.selected_course is not None
+                    and self.selected_course.ma_khoa_hoc == course_id):
+                self.selected_course = course
+        self.refresh_current_page()
+    
+    def refresh_current_page(self):
+        """Vẽ lại trang hiện tại từ danh sách đã tải (không truy vấn cơ sở dữ liệu)."""
+        self.pagination.update_total_items(len(self.filtered_courses))
+        self.populate_table_with_pagination()
     
     def populate_table_with_pagination(self):
         """Hiển thị dữ liệu trên trang hiện tại."""
@@ -231,28 +332,46 @@ class CourseView(QWidget):
         Args:
             filters (dict): Dictionary chứa các bộ lọc.
         """
-        # Lấy tất cả khóa học
-        all_courses = self.course_controller.get_all_courses()
-        
-        # Áp dụng bộ lọc
-        filtered_courses = all_courses
-        
-        for field, value in filters.items():
-            if field == "credits" and value:
-                filtered_courses = [c for c in filtered_courses if c.credits == int(value)]
-            elif field == "search_text" and value:
-                search_text = value.lower()
-                filtered_courses = [c for c in filtered_courses if 
-                                  search_text in c.course_id.lower() or
-                                  search_text in c.course_name.lower() or
-                                  search_text in (c.instructor.lower() if c.instructor else "")]
-        
-        # Cập nhật dữ liệu hiển thị
-        self.filtered_courses = filtered_courses
-        self.pagination.update_total_items(len(filtered_courses))
+        self.search_pipeline.run_now(self.build_search_criteria(filters))
+    
+    def build_search_criteria(self, filters=None):
+        """
+        Kết hợp bộ lọc nhanh với từ khóa trong ô tìm kiếm.
+
+        Args:
+            filters (dict, optional): Bộ lọc nhanh, mặc định lấy bộ lọc hiện tại
+
+        Returns:
+            dict: Điều kiện tìm kiếm cho CourseController.find_courses
+        """
+        criteria = dict(self.quick_filter.current_filters if filters is None else filters)
+        keyword = self.search_input.text().strip()
+        if keyword:
+            criteria["search_text"] = keyword
+        else:
+            criteria.pop("search_text", None)
+        return criteria
+    
+    def on_search_text_changed(self, _text):
+        """Lên lịch tìm kiếm khi người dùng đang gõ."""
+        self.search_pipeline.schedule(self.build_search_criteria())
+    
+    def show_search_results(self, courses):
+        """
+        Hiển thị kết quả tìm kiếm mới nhất.
+
+        Args:
+            courses (list): Danh sách các đối tượng Course.
+        """
+        self.filtered_courses = courses
+        self.pagination.update_total_items(len(courses))
         self.current_page = 1  # Reset về trang đầu tiên
         self.populate_table_with_pagination()
     
+    def on_search_failed(self, message):
+        """Hiển thị lỗi tìm kiếm mà không chặn người dùng."""
+        self.total_courses_label.setText(f"Lỗi tìm kiếm: {message}")
+    
     def sort_table(self, column_index, order):
         """
         Sắp xếp bảng dữ liệu theo cột được chọn.
@@ -263,8 +382,8 @@ class CourseView(QWidget):
         """
         # Các trường tương ứng với cột trong bảng
         column_fields = [
-            "course_id", "course_name", "credits", 
-            "instructor", "description", "max_students"
+            "ma_khoa_hoc", "ten_khoa_hoc", "so_tin_chi",
+            "giang_vien", "mo_ta", "so_luong_toi_da"
         ]
         
         if 0 <= column_index < len(column_fields):
@@ -286,7 +405,7 @@ class CourseView(QWidget):
         selected_row = self.table.currentRow()
         if selected_row >= 0:
             course_id = self.table.item(selected_row, 0).text()
-            self.selected_course = self.course_controller.get_course_by_id(course_id)
+            _, self.selected_course = self.find_loaded_course(course_id)
             self.display_course(self.selected_course)
     
     def display_course(self, course):
@@ -299,12 +418,12 @@ class CourseView(QWidget):
         if not course:
             return
         
-        self.id_input.setText(course.course_id)
-        self.name_input.setText(course.course_name)
-        self.credits_input.setValue(course.credits)
-        self.instructor_input.setText(course.instructor)
-        self.description_input.setText(course.description)
-        self.max_students_input.setValue(course.max_students)
+        self.id_input.setText(course.ma_khoa_hoc)
+        self.name_input.setText(course.ten_khoa_hoc)
+        self.credits_input.setValue(course.so_tin_chi or 0)
+        self.instructor_input.setText(course.giang_vien)
+        self.description_input.setText(course.mo_ta)
+        self.max_students_input.setValue(course.so_luong_toi_da or 0)
     
     def get_form_data(self):
         """
@@ -321,12 +440,12 @@ class CourseView(QWidget):
         max_students = self.max_students_input.value()
         
         return Course(
-            course_id=course_id,
-            course_name=course_name,
-            credits=credits,
-            instructor=instructor,
-            description=description,
-            max_students=max_students
+            ma_khoa_hoc=course_id,
+            ten_khoa_hoc=course_name,
+            so_tin_chi=credits,
+            giang_vien=instructor,
+            mo_ta=description,
+            so_luong_toi_da=max_students
         )
     
     def add_course(self):
@@ -343,11 +462,10 @@ class CourseView(QWidget):
                 self, "Thành công", "Thêm khóa học thành công!"
             )
             self.clear_form()
-            self.load_courses()
         else:
             QMessageBox.warning(
                 self, "Lỗi", 
-                f"Không thể thêm khóa học. Mã số {course.course_id} có thể đã tồn tại."
+                f"Không thể thêm khóa học. Mã số {course.ma_khoa_hoc} có thể đã tồn tại."
             )
     
     def update_course(self):
@@ -370,7 +488,6 @@ class CourseView(QWidget):
                 self, "Thành công", "Cập nhật khóa học thành công!"
             )
             self.selected_course = course
-            self.load_courses()
         else:
             QMessageBox.warning(
                 self, "Lỗi", "Không thể cập nhật thông tin khóa học."
@@ -386,19 +503,18 @@ class CourseView(QWidget):
         
         reply = QMessageBox.question(
             self, "Xác nhận xóa", 
-            f"Bạn có chắc muốn xóa khóa học {self.selected_course.course_name}?",
+            f"Bạn có chắc muốn xóa khóa học {self.selected_course.ten_khoa_hoc}?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
             QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            success = self.course_controller.delete_course(self.selected_course.course_id)
+            success = self.course_controller.delete_course(self.selected_course.ma_khoa_hoc)
             if success:
                 QMessageBox.information(
                     self, "Thành công", "Xóa khóa học thành công!"
                 )
                 self.clear_form()
-                self.load_courses()
             else:
                 QMessageBox.warning(
                     self, "Lỗi", "Không thể xóa khóa học. Có thể có sinh viên đã đăng ký khóa học này."
@@ -416,18 +532,7 @@ class CourseView(QWidget):
     
     def search_courses(self):
         """Tìm kiếm khóa học theo từ khóa."""
-        keyword = self.search_input.text().strip()
-        
-        # Thêm từ khóa tìm kiếm vào bộ lọc nhanh
-        filters = self.quick_filter.current_filters.copy()
-        if keyword:
-            filters["search_text"] = keyword
-        else:
-            if "search_text" in filters:
-                del filters["search_text"]
-        
-        # Áp dụng bộ lọc
-        self.apply_quick_filters(filters)
+        self.search_pipeline.run_now(self.build_search_criteria())
     
     def validate_form_data(self):
         """
@@ -6,20 +6,19 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt6.QtCore import Qt, QSize, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QFont, QIcon, QColor, QPainter, QPen, QAction, QPixmap
 from widgets.empty_state_widget import EmptyStateWidget
+from utils.background_loader import BackgroundLoader
+from utils.change_bus import (ChangeCollector, ENTITY_ACTIVITY_LOG, ENTITY_COURSE,
+                              ENTITY_ENROLLMENT, ENTITY_STUDENT)
+from utils.data_watcher import DataChangeWatcher
+from utils.chart_renderer import (ChartSpec, CHART_BAR, CHART_LINE, CHART_PIE, DEFAULT_ENGINE,
+                                  ENGINE_MATPLOTLIB, HAS_MATPLOTLIB, chart_image_cache, draw_chart,
+                                  gender_distribution_spec, grade_distribution_spec,
+                                  histogram_spec, update_chart)
+from widgets.native_chart import NativeChartWidget
+import asyncio
 import logging
 import os
 
-try:
-    # Thử import matplotlib
-    import matplotlib
-    matplotlib.use('QtAgg')  # Sử dụng backend QtAgg (mới)
-    from matplotlib.figure import Figure
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    HAS_MATPLOTLIB = True
-except ImportError:
-    HAS_MATPLOTLIB = False
-    logging.warning("Không tìm thấy thư viện matplotlib. Vui lòng cài đặt để hiển thị biểu đồ.")
-
 
 class StatisticCard(QFrame):
     """
@@ -78,12 +77,20 @@ class StatisticCard(QFrame):
 
 class ChartWidget(QWidget):
     """
-    Widget hiển thị biểu đồ sử dụng Matplotlib
+    Widget hiển thị biểu đồ sử dụng Matplotlib.
+
+    Biểu đồ chỉ được vẽ lại khi dữ liệu đổi (so sánh fingerprint của ChartSpec).
+    Nếu bố cục không đổi thì chỉ cập nhật giá trị của các cột/điểm đã vẽ; nếu có
+    ảnh vẽ trước (chart_image_cache) đúng kích thước thì hiển thị ảnh đó thay vì vẽ.
     """
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(300)
         self.has_matplotlib = HAS_MATPLOTLIB
+        # Biểu đồ đang hiển thị và các đối tượng đã vẽ trên canvas
+        self._spec = None
+        self._artists = None
+        self._canvas_spec = None
         
         self.setup_ui()
     
@@ -92,10 +99,18 @@ class ChartWidget(QWidget):
         layout = QVBoxLayout(self)
         
         if self.has_matplotlib:
-            # Tạo figure và canvas
+            # matplotlib chỉ được import khi có biểu đồ dùng bộ vẽ này
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+            # Tạo figure và canvas; trang thứ hai hiển thị ảnh đã vẽ trước
             self.figure = Figure(figsize=(5, 4), dpi=100)
             self.canvas = FigureCanvas(self.figure)
-            layout.addWidget(self.canvas)
+            self.image_label = QLabel()
+            self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.pages = QStackedWidget()
+            self.pages.addWidget(self.canvas)
+            self.pages.addWidget(self.image_label)
+            layout.addWidget(self.pages)
         else:
             # Hiển thị thông báo nếu không có matplotlib
             message = QLabel("Cài đặt thư viện matplotlib để hiển thị biểu đồ.\npip install matplotlib")
@@ -103,6 +118,61 @@ class ChartWidget(QWidget):
             message.setStyleSheet("font-size: 14px; color: #757575;")
             layout.addWidget(message)
     
+    @property
+    def fingerprint(self):
+        """Fingerprint của biểu đồ đang hiển thị (None nếu chưa vẽ)."""
+        return self._spec.fingerprint if self._spec is not None else None
+    
+    def render_size(self):
+        """
+        Kích thước vùng vẽ, dùng làm khóa cho ảnh vẽ trước.
+        
+        Returns:
+            tuple: (rộng, cao, tỷ lệ điểm ảnh) hoặc None nếu không có matplotlib
+        """
+        if not self.has_matplotlib:
+            return None
+        size = self.pages.size()
+        return (size.width(), size.height(), self.devicePixelRatioF())
+    
+    def render_spec(self, spec):
+        """
+        Hiển thị biểu đồ theo mô tả, bỏ qua nếu dữ liệu không đổi.
+        
+        Args:
+            spec (ChartSpec): Mô tả biểu đồ
+        
+        Returns:
+            bool: True nếu biểu đồ được cập nhật
+        """
+        if not self.has_matplotlib:
+            return False
+        if self._spec is not None and self._spec.fingerprint == spec.fingerprint:
+            return False
+        self._spec = spec
+        
+        image = chart_image_cache.get(spec.fingerprint, self.render_size())
+        if image is not None:
+            self.image_label.setPixmap(QPixmap.fromImage(image))
+            self.pages.setCurrentIndex(1)
+        else:
+            self._draw_on_canvas(spec)
+        return True
+    
+    def _draw_on_canvas(self, spec):
+        """Vẽ lên canvas: cập nhật tại chỗ nếu được, ngược lại vẽ lại toàn bộ."""
+        if not update_chart(self._artists, self._canvas_spec, spec):
+            self._artists = draw_chart(self.figure, spec)
+        self._canvas_spec = spec
+        self.pages.setCurrentIndex(0)
+        self.canvas.draw_idle()
+    
+    def resizeEvent(self, event):
+        """Ảnh vẽ trước không còn đúng kích thước: vẽ lại trên canvas."""
+        super().resizeEvent(event)
+        if self.has_matplotlib and self._spec is not None and self.pages.currentIndex() == 1:
+            self._draw_on_canvas(self._spec)
+    
     def plot_bar(self, x_data, y_data, title, xlabel, ylabel, color='#2979ff'):
         """
         Vẽ biểu đồ cột
@@ -115,47 +185,7 @@ class ChartWidget(QWidget):
             ylabel: Nhãn trục y
             color: Màu sắc biểu đồ
         """
-        if not self.has_matplotlib:
-            return
-        
-        # Thêm sự kiểm tra khi không có dữ liệu
-        if not x_data or not y_data:
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Không có dữ liệu", 
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    fontsize=12, color='gray')
-            ax.axis('off')
-            self.canvas.draw()
-            return
-        
-        # Xóa biểu đồ cũ
-        self.figure.clear()
-        
-        # Tạo subplot
-        ax = self.figure.add_subplot(111)
-        
-        # Vẽ biểu đồ cột
-        bars = ax.bar(x_data, y_data, color=color, alpha=0.8)
-        
-        # Thêm nhãn giá trị trên mỗi cột
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height}',
-                    ha='center', va='bottom')
-        
-        # Thêm tiêu đề và nhãn
-        ax.set_title(title)
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        
-        # Hiển thị lưới
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Cập nhật canvas
-        self.canvas.draw()
+        self.render_spec(ChartSpec(CHART_BAR, x_data, y_data, title, xlabel, ylabel, color))
     
     def plot_pie(self, labels, sizes, title, colors=None):
         """
@@ -167,57 +197,7 @@ class ChartWidget(QWidget):
             title: Tiêu đề biểu đồ
             colors: Các màu sắc (tùy chọn)
         """
-        if not self.has_matplotlib:
-            return
-        
-        # Thêm sự kiểm tra khi không có dữ liệu
-        if not sizes or sum(sizes) == 0:
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Không có dữ liệu", 
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    fontsize=12, color='gray')
-            ax.axis('off')
-            self.canvas.draw()
-            return
-        
-        # Xóa biểu đồ cũ
-        self.figure.clear()
-        
-        # Tạo subplot
-        ax = self.figure.add_subplot(111)
-        
-        # Màu mặc định nếu không cung cấp
-        if not colors:
-            colors = ['#2979ff', '#00c853', '#ff6d00', '#d50000', '#6200ea', '#2962ff', '#00bfa5']
-        
-        # Vẽ biểu đồ tròn
-        pie_result = ax.pie(
-            sizes, labels=labels, autopct='%1.1f%%',
-            shadow=False, startangle=90, colors=colors
-        )
-        if len(pie_result) == 3:
-            wedges, texts, autotexts = pie_result
-        else:
-            wedges, texts = pie_result
-            autotexts = []
-        
-        # Thiết lập font cho văn bản
-        for text in texts:
-            text.set_fontsize(10)
-        for autotext in autotexts:
-            autotext.set_fontsize(8)
-            autotext.set_color('white')
-        
-        # Đặt tiêu đề
-        ax.set_title(title)
-        
-        # Đảm bảo biểu đồ là hình tròn
-        ax.axis('equal')
-        
-        # Cập nhật canvas
-        self.canvas.draw()
+        self.render_spec(ChartSpec(CHART_PIE, labels, sizes, title, colors=colors))
     
     def plot_line(self, x_data, y_data, title, xlabel, ylabel, color='#2979ff'):
         """
@@ -231,32 +211,23 @@ class ChartWidget(QWidget):
             ylabel: Nhãn trục y
             color: Màu sắc biểu đồ
         """
-        if not self.has_matplotlib:
-            return
-        
-        # Xóa biểu đồ cũ
-        self.figure.clear()
-        
-        # Tạo subplot
-        ax = self.figure.add_subplot(111)
-        
-        # Vẽ biểu đồ đường
-        line, = ax.plot(x_data, y_data, marker='o', linestyle='-', color=color)
-        
-        # Thêm tiêu đề và nhãn
-        ax.set_title(title)
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        
-        # Hiển thị lưới
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Đánh số các điểm dữ liệu
-        for i, (x, y) in enumerate(zip(x_data, y_data)):
-            ax.annotate(f"{y}", (x, y), textcoords="offset points", xytext=(0,10), ha='center')
+        self.render_spec(ChartSpec(CHART_LINE, x_data, y_data, title, xlabel, ylabel, color))
+    
+    def plot_histogram(self, samples, bins=10, value_range=None, title="", xlabel="", ylabel="",
+                       color='#2979ff'):
+        """
+        Vẽ biểu đồ tần suất
         
-        # Cập nhật canvas
-        self.canvas.draw()
+        Args:
+            samples: Các giá trị rời rạc
+            bins: Số khoảng chia
+            value_range: (nhỏ nhất, lớn nhất), mặc định theo dữ liệu
+            title: Tiêu đề biểu đồ
+            xlabel: Nhãn trục x
+            ylabel: Nhãn trục y
+            color: Màu sắc biểu đồ
+        """
+        self.render_spec(histogram_spec(samples, bins, value_range, title, xlabel, ylabel, color))
         
     # Thêm biểu đồ phân phối điểm số
     def plot_grade_distribution(self, grade_data, title="Phân phối điểm số"):
@@ -267,51 +238,7 @@ class ChartWidget(QWidget):
             grade_data (dict): Dict với key là khoảng điểm, value là số lượng
             title (str): Tiêu đề biểu đồ
         """
-        if not self.has_matplotlib:
-            return
-            
-        # Kiểm tra dữ liệu trống
-        if not grade_data:
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Không có dữ liệu điểm số", 
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    fontsize=12, color='gray')
-            ax.axis('off')
-            self.canvas.draw()
-            return
-            
-        # Xóa biểu đồ cũ
-        self.figure.clear()
-        
-        # Tạo subplot
-        ax = self.figure.add_subplot(111)
-        
-        # Chuẩn bị dữ liệu
-        categories = list(grade_data.keys())
-        values = list(grade_data.values())
-        colors = ['#d50000', '#ff6d00', '#ffeb3b', '#8bc34a', '#00c853']  # Màu từ đỏ đến xanh
-        
-        # Vẽ biểu đồ cột
-        bars = ax.bar(categories, values, color=colors)
-        
-        # Thêm nhãn giá trị trên mỗi cột
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'{height}', ha='center', va='bottom')
-        
-        # Thiết lập tiêu đề và nhãn
-        ax.set_title(title)
-        ax.set_xlabel("Khoảng điểm")
-        ax.set_ylabel("Số lượng sinh viên")
-        
-        # Hiển thị lưới
-        ax.grid(True, linestyle='--', alpha=0.7, axis='y')
-        
-        # Cập nhật canvas
-        self.canvas.draw()
+        self.render_spec(grade_distribution_spec(grade_data, title))
         
     # Thêm biểu đồ tỷ lệ giới tính
     def plot_gender_distribution(self, gender_data, title="Tỷ lệ giới tính"):
@@ -322,80 +249,76 @@ class ChartWidget(QWidget):
             gender_data (dict): Dict với key là giới tính, value là số lượng
             title (str): Tiêu đề biểu đồ
         """
-        if not self.has_matplotlib:
-            return
-            
-        # Kiểm tra dữ liệu trống
-        if not gender_data or sum(gender_data.values()) == 0:
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "Không có dữ liệu về giới tính", 
-                    horizontalalignment='center',
-                    verticalalignment='center',
-                    fontsize=12, color='gray')
-            ax.axis('off')
-            self.canvas.draw()
-            return
-            
-        # Xóa biểu đồ cũ
-        self.figure.clear()
-        
-        # Tạo subplot
-        ax = self.figure.add_subplot(111)
-        
-        # Chuẩn bị dữ liệu
-        labels = list(gender_data.keys())
-        sizes = list(gender_data.values())
-        colors = ['#2979ff', '#f06292', '#9c27b0']  # Nam, Nữ, Khác
-        
-        # Vẽ biểu đồ tròn
-        pie_result = ax.pie(
-            sizes, labels=labels, autopct='%1.1f%%',
-            shadow=False, startangle=90, colors=colors
-        )
-        if len(pie_result) == 3:
-            wedges, texts, autotexts = pie_result
-        else:
-            wedges, texts = pie_result
-            autotexts = []
-        
-        # Thiết lập font cho văn bản
-        for text in texts:
-            text.set_fontsize(10)
-        for autotext in autotexts:
-            autotext.set_fontsize(9)
-            autotext.set_color('white')
-        
-        # Thiết lập tiêu đề
-        ax.set_title(title)
-        
-        # Đảm bảo biểu đồ là hình tròn
-        ax.axis('equal')
-        
-        # Cập nhật canvas
-        self.canvas.draw()
+        self.render_spec(gender_distribution_spec(gender_data, title))
 
 
 class DashboardView(QWidget):
     """
     Giao diện trang tổng quan (Dashboard).
     """
-    def __init__(self, student_controller, course_controller, report_controller):
+    # Phần của dashboard -> {bảng nguồn: các cột ảnh hưởng}; thêm/xóa bản ghi luôn ảnh hưởng.
+    # Chỉ những phần có bảng nguồn thay đổi mới được tính lại.
+    SECTION_DEPENDENCIES = {
+        'stats': {ENTITY_STUDENT: (), ENTITY_COURSE: (), ENTITY_ENROLLMENT: ("diem",)},
+        'top_courses': {ENTITY_COURSE: ("ten_khoa_hoc",), ENTITY_ENROLLMENT: ("ma_khoa_hoc",)},
+        'recent_activities': {ENTITY_ACTIVITY_LOG: ()},
+        'status_stats': {ENTITY_STUDENT: ("trang_thai",)},
+        'credits_stats': {ENTITY_COURSE: ("so_tin_chi",)},
+        'grade_distribution': {ENTITY_ENROLLMENT: ("diem",)},
+        'gender_stats': {ENTITY_STUDENT: ("gioi_tinh",)},
+        'enrollment_trend': {ENTITY_ENROLLMENT: ("ngay_ghi_danh", "diem")},
+    }
+    # Phần dữ liệu -> biểu đồ hiển thị phần đó
+    CHART_SECTIONS = {
+        'top_courses': 'enrollment_chart',
+        'status_stats': 'student_status_chart',
+        'credits_stats': 'courses_chart',
+        'grade_distribution': 'grade_chart',
+        'gender_stats': 'gender_chart',
+        'enrollment_trend': 'trend_chart',
+    }
+    # Lựa chọn khoảng thời gian của biểu đồ xu hướng ghi danh
+    TREND_BUCKETS = (("12 tháng gần nhất", "month"), ("30 ngày gần nhất", "day"),
+                     ("12 tuần gần nhất", "week"), ("6 học kỳ gần nhất", "term"),
+                     ("48 giờ qua (theo dõi đăng ký)", "hour"))
+    # Thời gian gom các thay đổi liên tiếp trước khi tải lại (ms)
+    CHANGE_DELAY_MS = 500
+    # Chu kỳ kiểm tra thay đổi từ kết nối khác khi dashboard đang hiển thị (ms)
+    CHANGE_POLL_MS = 10000
+
+    def __init__(self, student_controller, course_controller, report_controller,
+                 config_manager=None):
         super().__init__()
         self.student_controller = student_controller
         self.course_controller = course_controller
         self.report_controller = report_controller
+        # Cấu hình chọn bộ vẽ cho từng biểu đồ (mục "charts")
+        self.config_manager = config_manager
+        # Khoảng thời gian của biểu đồ xu hướng ghi danh
+        self.trend_bucket = self.TREND_BUCKETS[0][1]
+        
+        # Các truy vấn thống kê chạy trên luồng nền
+        self.loader = BackgroundLoader(self)
         
         # Thiết lập giao diện
         self.init_ui()
         
-        # Tải dữ liệu ban đầu
-        self.load_data()
-        
-        # Thiết lập auto-refresh cho dashboard
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.load_data)
-        self.refresh_timer.start(60000)  # Refresh mỗi phút
+        # Các phần cần tính lại và các phần đang được tải
+        self._dirty_sections = set(self.SECTION_DEPENDENCIES)
+        self._loading_sections = set()
+        
+        # Thay đổi do ứng dụng này ghi được báo qua ChangeBus
+        self.change_collector = ChangeCollector(
+            (ENTITY_STUDENT, ENTITY_COURSE, ENTITY_ENROLLMENT, ENTITY_ACTIVITY_LOG),
+            self.CHANGE_DELAY_MS, parent=self)
+        self.change_collector.changesReady.connect(self.on_data_changed)
+        
+        # Thay đổi do kết nối khác ghi được phát hiện bằng data_version + bộ đếm ghi.
+        # Chỉ kiểm tra khi dashboard đang hiển thị (xem showEvent/hideEvent);
+        # dữ liệu ban đầu cũng được tải khi dashboard hiển thị lần đầu.
+        self.data_watcher = DataChangeWatcher(self.report_controller.db_manager,
+                                              self.CHANGE_POLL_MS, parent=self)
+        self.data_watcher.tablesChanged.connect(self.on_tables_changed)
     
     def init_ui(self):
         """Thiết lập giao diện trang tổng quan."""
@@ -449,7 +372,7 @@ class DashboardView(QWidget):
         # Bố trí hàng thứ ba với biểu đồ giới tính và thống kê khác
         row3_layout = QHBoxLayout()
         row3_layout.addWidget(self.create_gender_distribution_section())
-        # Có thể thêm các thành phần khác vào đây
+        row3_layout.addWidget(self.create_enrollment_trend_section())
         dashboard_layout.addLayout(row3_layout)
         
         # Thêm space để có thể cuộn xuống
@@ -554,13 +477,47 @@ class DashboardView(QWidget):
         
         return card
     
+    def chart_engine(self, name):
+        """
+        Bộ vẽ của một biểu đồ theo cấu hình: charts.<tên biểu đồ>, nếu không có thì
+        charts.engine, mặc định vẽ bằng QPainter.
+        
+        Args:
+            name (str): Tên biểu đồ (ví dụ "enrollment_chart")
+        
+        Returns:
+            str: ENGINE_NATIVE hoặc ENGINE_MATPLOTLIB
+        """
+        engine = DEFAULT_ENGINE
+        if self.config_manager is not None:
+            engine = self.config_manager.get('charts', 'engine', engine)
+            engine = self.config_manager.get('charts', name, engine)
+        if engine == ENGINE_MATPLOTLIB and not HAS_MATPLOTLIB:
+            logging.warning(f"Không tìm thấy matplotlib, biểu đồ {name} sẽ được vẽ bằng QPainter")
+            return DEFAULT_ENGINE
+        return engine
+    
+    def create_chart(self, name):
+        """
+        Tạo widget biểu đồ theo bộ vẽ đã cấu hình.
+        
+        Args:
+            name (str): Tên biểu đồ
+        
+        Returns:
+            QWidget: ChartWidget (matplotlib) hoặc NativeChartWidget (QPainter)
+        """
+        if self.chart_engine(name) == ENGINE_MATPLOTLIB:
+            return ChartWidget()
+        return NativeChartWidget()
+    
     def create_enrollment_chart_section(self):
         """Tạo khu vực biểu đồ đăng ký khóa học."""
         group_box = QGroupBox("Thống kê đăng ký khóa học")
         layout = QVBoxLayout(group_box)
         
         # Tạo chart widget
-        self.enrollment_chart = ChartWidget()
+        self.enrollment_chart = self.create_chart("enrollment_chart")
         layout.addWidget(self.enrollment_chart)
         
         return group_box
@@ -571,7 +528,7 @@ class DashboardView(QWidget):
         layout = QVBoxLayout(group_box)
         
         # Tạo chart widget
-        self.student_status_chart = ChartWidget()
+        self.student_status_chart = self.create_chart("student_status_chart")
         layout.addWidget(self.student_status_chart)
         
         return group_box
@@ -582,7 +539,7 @@ class DashboardView(QWidget):
         layout = QVBoxLayout(group_box)
         
         # Tạo chart widget
-        self.courses_chart = ChartWidget()
+        self.courses_chart = self.create_chart("courses_chart")
         layout.addWidget(self.courses_chart)
         
         return group_box
@@ -597,7 +554,7 @@ class DashboardView(QWidget):
         self.stacked_grade_widget = QStackedWidget()
         
         # Tạo chart widget
-        self.grade_chart = ChartWidget()
+        self.grade_chart = self.create_chart("grade_chart")
         self.stacked_grade_widget.addWidget(self.grade_chart)
         
         # Tạo empty state widget
@@ -623,7 +580,7 @@ class DashboardView(QWidget):
         self.stacked_gender_widget = QStackedWidget()
         
         # Tạo chart widget
-        self.gender_chart = ChartWidget()
+        self.gender_chart = self.create_chart("gender_chart")
         self.stacked_gender_widget.addWidget(self.gender_chart)
         
         # Tạo empty state widget
@@ -639,69 +596,201 @@ class DashboardView(QWidget):
         
         return group_box
     
+    def create_enrollment_trend_section(self):
+        """Tạo khu vực biểu đồ xu hướng ghi danh theo thời gian."""
+        group_box = QGroupBox("Xu hướng ghi danh")
+        layout = QVBoxLayout(group_box)
+        
+        # Chọn khoảng thời gian
+        self.trend_combo = QComboBox()
+        for text, bucket in self.TREND_BUCKETS:
+            self.trend_combo.addItem(text, bucket)
+        self.trend_combo.currentIndexChanged.connect(self.on_trend_bucket_changed)
+        layout.addWidget(self.trend_combo, 0, Qt.AlignmentFlag.AlignRight)
+        
+        # Tạo chart widget
+        self.trend_chart = self.create_chart("trend_chart")
+        layout.addWidget(self.trend_chart)
+        
+        return group_box
+    
+    def on_trend_bucket_changed(self):
+        """Tải lại biểu đồ xu hướng ghi danh theo khoảng thời gian mới."""
+        self.trend_bucket = self.trend_combo.currentData()
+        self._dirty_sections.add('enrollment_trend')
+        self.refresh_dirty_sections()
+    
+    def showEvent(self, event):
+        """Tiếp tục theo dõi thay đổi và tính lại các phần đã cũ khi dashboard hiển thị."""
+        super().showEvent(event)
+        self.data_watcher.start()
+        self.refresh_dirty_sections()
+    
+    def hideEvent(self, event):
+        """Tạm dừng theo dõi thay đổi khi dashboard bị ẩn."""
+        super().hideEvent(event)
+        self.data_watcher.stop()
+    
     def load_data(self):
-        """Tải dữ liệu thống kê và cập nhật giao diện với trạng thái trống nếu cần."""
+        """Tính lại toàn bộ dashboard (nút "Tải lại")."""
+        self._dirty_sections.update(self.SECTION_DEPENDENCIES)
+        self.refresh_dirty_sections()
+    
+    def mark_sections_dirty(self, table, event=None):
+        """
+        Đánh dấu các phần phụ thuộc vào bảng cho trước là cũ.
+
+        Args:
+            table (str): Tên bảng đã thay đổi
+            event (ChangeEvent, optional): Sự kiện thay đổi; None nghĩa là không rõ cột nào đổi
+        """
+        for section, dependencies in self.SECTION_DEPENDENCIES.items():
+            if table in dependencies and (event is None or event.touches(dependencies[table])):
+                self._dirty_sections.add(section)
+    
+    def on_data_changed(self, events):
+        """
+        Tính lại các phần bị ảnh hưởng bởi thay đổi do ứng dụng này ghi.
+
+        Args:
+            events (list): Các ChangeEvent đã gom
+        """
+        for event in events:
+            self.mark_sections_dirty(event.entity, event)
+        self.refresh_dirty_sections()
+    
+    def on_tables_changed(self, tables):
+        """
+        Tính lại các phần có bảng nguồn bị kết nối khác thay đổi.
+
+        Args:
+            tables (set): Tên các bảng đã thay đổi
+        """
+        for table in tables:
+            self.mark_sections_dirty(table)
+        self.refresh_dirty_sections()
+    
+    def refresh_dirty_sections(self):
+        """Tải lại (trên luồng nền) các phần đã cũ; không làm gì khi dashboard bị ẩn."""
+        if not self._dirty_sections or not self.isVisible():
+            return
+        # Lần tải mới thay thế lần đang chạy nên phải gồm cả các phần của lần đó
+        if self.loader.is_loading("dashboard"):
+            self._dirty_sections |= self._loading_sections
+        self._loading_sections = set(self._dirty_sections)
+        self._dirty_sections.clear()
+        self.loader.load("dashboard", self.fetch_dashboard_data, frozenset(self._loading_sections),
+                         self.chart_targets(self._loading_sections), self.trend_bucket,
+                         on_result=self.apply_dashboard_data,
+                         on_error=self.on_load_failed)
+    
+    def fetch_dashboard_data(self, sections=None, chart_targets=None, trend_bucket="month"):
+        """
+        Chạy các truy vấn thống kê của dashboard và vẽ trước các biểu đồ có dữ liệu
+        mới (trên luồng nền, không chạm vào widget).
+        
+        Args:
+            sections (iterable, optional): Các phần cần tính, mặc định tất cả
+            chart_targets (dict, optional): Kết quả của chart_targets
+            trend_bucket (str): Khoảng thời gian của biểu đồ xu hướng ghi danh
+        
+        Returns:
+            dict: Dữ liệu cho từng phần đã tính
+        """
+        # Các truy vấn độc lập chạy song song trên executor bất đồng bộ
+        data = asyncio.run(self.report_controller.aget_dashboard_data(
+            sections=sections, trend_bucket=trend_bucket))
+        if chart_targets:
+            self.prerender_charts(data, chart_targets)
+        return data
+    
+    def on_load_failed(self, error):
+        """Hiển thị lỗi tải dữ liệu dashboard."""
+        # Các phần chưa tải được sẽ được thử lại ở lần thay đổi tiếp theo
+        self._dirty_sections |= self._loading_sections
+        self._loading_sections = set()
+        QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu dashboard: {str(error)}")
+    
+    def apply_dashboard_data(self, data):
+        """
+        Cập nhật giao diện với trạng thái trống nếu cần.
+        
+        Args:
+            data (dict): Kết quả từ fetch_dashboard_data
+        """
+        self._loading_sections = set()
         try:
-            # Lấy thống kê cơ bản
-            stats = self.report_controller.get_student_course_statistics()
-            
-            # Cập nhật các card thống kê với animation
-            if hasattr(self.total_students_card, "value_label"):
-                self.animate_value(self.total_students_card.value_label, str(stats.get('total_students', 0)))
-            if hasattr(self.total_courses_card, "value_label"):
-                self.animate_value(self.total_courses_card.value_label, str(stats.get('total_courses', 0)))
-            if hasattr(self.total_enrollments_card, "value_label"):
-                self.animate_value(self.total_enrollments_card.value_label, str(stats.get('total_enrollments', 0)))
-            avg_grade = stats.get('average_grade', 0)
-            if hasattr(self.avg_grade_card, "value_label"):
-                self.animate_value(self.avg_grade_card.value_label, f"{avg_grade:.1f}")
-            
-            # Hiển thị thông báo hữu ích nếu có ít dữ liệu
-            if stats.get('total_students', 0) < 5:
-                self.info_label.setText("Thêm ít nhất 5 sinh viên để có thống kê chính xác hơn")
-                self.info_label.setStyleSheet("color: #ff6d00; font-style: italic;")
-            elif stats.get('total_courses', 0) < 3:
-                self.info_label.setText("Thêm khóa học để có thống kê đầy đủ hơn")
-                self.info_label.setStyleSheet("color: #ff6d00; font-style: italic;")
-            else:
-                self.info_label.setText("")
+            if 'stats' in data:
+                self.update_statistic_cards(data['stats'])
             
-            # Lấy khóa học có nhiều sinh viên đăng ký nhất
-            top_courses = self.report_controller.get_top_courses_by_enrollment(limit=1)
-            if top_courses:
-                course = top_courses[0]
-                if hasattr(self.max_enrollment_course_card, "value_label"):
-                    self.max_enrollment_course_card.value_label.setText(
-                        f"{course['course_name']} ({course['student_count']} SV)"
-                    )
-            else:
-                if hasattr(self.max_enrollment_course_card, "value_label"):
-                    self.max_enrollment_course_card.value_label.setText("Không có dữ liệu")
-            
-            # Lấy hoạt động gần đây
-            recent_activities = self.report_controller.get_recent_activities(1)
-            if recent_activities:
-                if hasattr(self.recent_activity_card, "value_label"):
-                    self.recent_activity_card.value_label.setText(recent_activities[0]['action_description'])
-            else:
-                if hasattr(self.recent_activity_card, "value_label"):
-                    self.recent_activity_card.value_label.setText("Không có hoạt động")
+            # Khóa học có nhiều sinh viên đăng ký nhất
+            if 'top_courses' in data:
+                top_courses = data['top_courses']
+                if top_courses:
+                    course = top_courses[0]
+                    if hasattr(self.max_enrollment_course_card, "value_label"):
+                        self.max_enrollment_course_card.value_label.setText(
+                            f"{course['course_name']} ({course['student_count']} SV)"
+                        )
+                else:
+                    if hasattr(self.max_enrollment_course_card, "value_label"):
+                        self.max_enrollment_course_card.value_label.setText("Không có dữ liệu")
+                self.update_enrollment_chart(top_courses)
             
-            # Vẽ các biểu đồ hiện có
-            self.update_enrollment_chart()
-            self.update_student_status_chart()
-            self.update_courses_chart()
+            # Hoạt động gần đây
+            if 'recent_activities' in data:
+                recent_activities = data['recent_activities']
+                if recent_activities:
+                    if hasattr(self.recent_activity_card, "value_label"):
+                        self.recent_activity_card.value_label.setText(recent_activities[0]['mo_ta_hoat_dong'])
+                else:
+                    if hasattr(self.recent_activity_card, "value_label"):
+                        self.recent_activity_card.value_label.setText("Không có hoạt động")
             
-            # Vẽ biểu đồ điểm số mới
-            self.update_grade_distribution_chart()
-            
-            # Vẽ biểu đồ giới tính mới
-            self.update_gender_distribution_chart()
+            # Chỉ vẽ lại các biểu đồ có dữ liệu mới
+            if 'status_stats' in data:
+                self.update_student_status_chart(data['status_stats'])
+            if 'credits_stats' in data:
+                self.update_courses_chart(data['credits_stats'])
+            if 'grade_distribution' in data:
+                self.update_grade_distribution_chart(data['grade_distribution'])
+            if 'gender_stats' in data:
+                self.update_gender_distribution_chart(data['gender_stats'])
+            if 'enrollment_trend' in data:
+                self.update_enrollment_trend_chart(data['enrollment_trend'])
             
         except Exception as e:
             logging.error(f"Lỗi khi tải dữ liệu dashboard: {str(e)}")
             QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu dashboard: {str(e)}")
     
+    def update_statistic_cards(self, stats):
+        """
+        Cập nhật các card thống kê tổng quan.
+
+        Args:
+            stats (dict): Kết quả từ get_student_course_statistics
+        """
+        # Cập nhật các card thống kê với animation
+        if hasattr(self.total_students_card, "value_label"):
+            self.animate_value(self.total_students_card.value_label, str(stats.get('total_students', 0)))
+        if hasattr(self.total_courses_card, "value_label"):
+            self.animate_value(self.total_courses_card.value_label, str(stats.get('total_courses', 0)))
+        if hasattr(self.total_enrollments_card, "value_label"):
+            self.animate_value(self.total_enrollments_card.value_label, str(stats.get('total_enrollments', 0)))
+        avg_grade = stats.get('average_grade', 0)
+        if hasattr(self.avg_grade_card, "value_label"):
+            self.animate_value(self.avg_grade_card.value_label, f"{avg_grade:.1f}")
+
+        # Hiển thị thông báo hữu ích nếu có ít dữ liệu
+        if stats.get('total_students', 0) < 5:
+            self.info_label.setText("Thêm ít nhất 5 sinh viên để có thống kê chính xác hơn")
+            self.info_label.setStyleSheet("color: #ff6d00; font-style: italic;")
+        elif stats.get('total_courses', 0) < 3:
+            self.info_label.setText("Thêm khóa học để có thống kê đầy đủ hơn")
+            self.info_label.setStyleSheet("color: #ff6d00; font-style: italic;")
+        else:
+            self.info_label.setText("")
+    
     def animate_value(self, label, new_value):
         """Tạo hiệu ứng animation khi thay đổi giá trị của label."""
         try:
@@ -720,71 +809,115 @@ class DashboardView(QWidget):
             logging.error(f"Lỗi khi tạo animation: {str(e)}")
             label.setText(new_value)
     
-    def update_enrollment_chart(self):
+    @staticmethod
+    def build_chart_spec(section, value):
+        """
+        Tạo mô tả biểu đồ cho một phần dữ liệu của dashboard (không chạm vào widget,
+        có thể gọi từ luồng nền).
+        
+        Args:
+            section (str): Tên phần dữ liệu (khóa của CHART_SECTIONS)
+            value: Dữ liệu của phần đó
+        
+        Returns:
+            ChartSpec: Mô tả biểu đồ hoặc None nếu không có dữ liệu để vẽ
+        """
+        if not value:
+            return None
+        if section == 'enrollment_trend':
+            # Theo giờ: bỏ phần năm của nhãn ("MM-DD HH:00")
+            hourly = 'grade_entries' in value[0]
+            return ChartSpec(CHART_LINE,
+                             [point['period'][5:] if hourly else point['period'] for point in value],
+                             [point['enrollments'] for point in value],
+                             "Số ghi danh theo thời gian",
+                             "Giờ" if hourly else "Thời gian", "Số ghi danh", "#6200ea")
+        if section == 'top_courses':
+            return ChartSpec(CHART_BAR,
+                             [course['course_name'] for course in value],
+                             [course['student_count'] for course in value],
+                             "Top 5 khóa học có nhiều sinh viên đăng ký nhất",
+                             "Khóa học", "Số lượng sinh viên", "#2979ff")
+        if section == 'status_stats':
+            return ChartSpec(CHART_PIE, value.keys(), value.values(), "Trạng thái sinh viên",
+                             colors=["#2979ff", "#00c853", "#ff6d00", "#d50000"])
+        if section == 'credits_stats':
+            return ChartSpec(CHART_BAR, [f"{credit} tín chỉ" for credit in value.keys()],
+                             value.values(), "Phân bố khóa học theo số tín chỉ",
+                             "Số tín chỉ", "Số lượng khóa học", "#00c853")
+        if sum(value.values()) == 0:
+            return None
+        if section == 'grade_distribution':
+            return grade_distribution_spec(value)
+        if section == 'gender_stats':
+            return gender_distribution_spec(value)
+        return None
+    
+    def chart_targets(self, sections):
+        """
+        Kích thước và fingerprint hiện tại của các biểu đồ thuộc các phần cho trước,
+        để luồng nền vẽ trước đúng kích thước và bỏ qua biểu đồ không đổi.
+        
+        Args:
+            sections (iterable): Các phần sắp được tải
+        
+        Returns:
+            dict: Phần -> (kích thước, fingerprint đang hiển thị)
+        """
+        targets = {}
+        for section in sections:
+            chart = getattr(self, self.CHART_SECTIONS.get(section, ""), None)
+            size = chart.render_size() if chart is not None else None
+            if size and size[0] > 0 and size[1] > 0:
+                targets[section] = (size, chart.fingerprint)
+        return targets
+    
+    def prerender_charts(self, data, chart_targets):
+        """
+        Vẽ trước (trên luồng nền) các biểu đồ có dữ liệu mới vào chart_image_cache.
+        
+        Args:
+            data (dict): Kết quả của aget_dashboard_data
+            chart_targets (dict): Kết quả của chart_targets
+        """
+        for section, (size, current_fingerprint) in chart_targets.items():
+            spec = self.build_chart_spec(section, data.get(section))
+            if spec is not None and spec.fingerprint != current_fingerprint:
+                chart_image_cache.prerender(spec, size)
+    
+    def update_enrollment_chart(self, top_courses):
         """Cập nhật biểu đồ đăng ký khóa học."""
         try:
-            top_courses = self.report_controller.get_top_courses_by_enrollment(limit=5)
-            
-            if top_courses:
-                course_names = [course['course_name'] for course in top_courses]
-                student_counts = [course['student_count'] for course in top_courses]
-                
-                self.enrollment_chart.plot_bar(
-                    course_names, 
-                    student_counts,
-                    "Top 5 khóa học có nhiều sinh viên đăng ký nhất",
-                    "Khóa học",
-                    "Số lượng sinh viên",
-                    "#2979ff"
-                )
+            spec = self.build_chart_spec('top_courses', top_courses)
+            if spec is not None:
+                self.enrollment_chart.render_spec(spec)
         except Exception as e:
             logging.error(f"Lỗi khi cập nhật biểu đồ đăng ký: {str(e)}")
     
-    def update_student_status_chart(self):
+    def update_student_status_chart(self, status_stats):
         """Cập nhật biểu đồ trạng thái sinh viên."""
         try:
-            status_stats = self.report_controller.get_student_status_statistics()
-            
-            if status_stats:
-                labels = list(status_stats.keys())
-                sizes = list(status_stats.values())
-                
-                self.student_status_chart.plot_pie(
-                    labels,
-                    sizes,
-                    "Trạng thái sinh viên",
-                    ["#2979ff", "#00c853", "#ff6d00", "#d50000"]
-                )
+            spec = self.build_chart_spec('status_stats', status_stats)
+            if spec is not None:
+                self.student_status_chart.render_spec(spec)
         except Exception as e:
             logging.error(f"Lỗi khi cập nhật biểu đồ trạng thái sinh viên: {str(e)}")
     
-    def update_courses_chart(self):
+    def update_courses_chart(self, credits_stats):
         """Cập nhật biểu đồ khóa học theo tín chỉ."""
         try:
-            credits_stats = self.report_controller.get_course_credits_statistics()
-            
-            if credits_stats:
-                credit_labels = [f"{credit} tín chỉ" for credit in credits_stats.keys()]
-                counts = list(credits_stats.values())
-                
-                self.courses_chart.plot_bar(
-                    credit_labels,
-                    counts,
-                    "Phân bố khóa học theo số tín chỉ",
-                    "Số tín chỉ",
-                    "Số lượng khóa học",
-                    "#00c853"
-                )
+            spec = self.build_chart_spec('credits_stats', credits_stats)
+            if spec is not None:
+                self.courses_chart.render_spec(spec)
         except Exception as e:
             logging.error(f"Lỗi khi cập nhật biểu đồ khóa học: {str(e)}")
     
-    def update_grade_distribution_chart(self):
+    def update_grade_distribution_chart(self, grade_distribution):
         """Cập nhật biểu đồ phân phối điểm số."""
         try:
-            grade_distribution = self.report_controller.get_grade_distribution()
-            
-            if grade_distribution and sum(grade_distribution.values()) > 0:
-                self.grade_chart.plot_grade_distribution(grade_distribution)
+            spec = self.build_chart_spec('grade_distribution', grade_distribution)
+            if spec is not None:
+                self.grade_chart.render_spec(spec)
                 self.stacked_grade_widget.setCurrentIndex(0)  # Hiển thị biểu đồ
             else:
                 self.stacked_grade_widget.setCurrentIndex(1)  # Hiển thị trạng thái trống
@@ -793,13 +926,12 @@ class DashboardView(QWidget):
             logging.error(f"Lỗi khi cập nhật biểu đồ phân phối điểm: {str(e)}")
             self.stacked_grade_widget.setCurrentIndex(1)  # Hiển thị trạng thái trống nếu có lỗi
     
-    def update_gender_distribution_chart(self):
+    def update_gender_distribution_chart(self, gender_stats):
         """Cập nhật biểu đồ tỷ lệ giới tính."""
         try:
-            gender_stats = self.report_controller.get_gender_statistics()
-            
-            if gender_stats and sum(gender_stats.values()) > 0:
-                self.gender_chart.plot_gender_distribution(gender_stats)
+            spec = self.build_chart_spec('gender_stats', gender_stats)
+            if spec is not None:
+                self.gender_chart.render_spec(spec)
                 self.stacked_gender_widget.setCurrentIndex(0)  # Hiển thị biểu đồ
             else:
                 self.stacked_gender_widget.setCurrentIndex(1)  # Hiển thị trạng thái trống
@@ -807,3 +939,14 @@ class DashboardView(QWidget):
         except Exception as e:
             logging.error(f"Lỗi khi cập nhật biểu đồ giới tính: {str(e)}")
             self.stacked_gender_widget.setCurrentIndex(1)  # Hiển thị trạng thái trống nếu có lỗi
+    
+    def update_enrollment_trend_chart(self, trend):
+        """Cập nhật biểu đồ xu hướng ghi danh."""
+        try:
+            spec = self.build_chart_spec('enrollment_trend', trend)
+            if spec is None:
+                spec = ChartSpec(CHART_LINE, (), (), "Số ghi danh theo thời gian",
+                                 empty_message="Chưa có dữ liệu ghi danh")
+            self.trend_chart.render_spec(spec)
+        except Exception as e:
+            logging.error(f"Lỗi khi cập nhật biểu đồ xu hướng ghi danh: {str(e)}")
@@ -2,17 +2,27 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                             QLabel, QLineEdit, QComboBox, QPushButton, 
                             QTableWidget, QTableWidgetItem, QHeaderView, 
                             QMessageBox, QGroupBox, QSplitter, QDateEdit,
-                            QDoubleSpinBox)
+                            QDoubleSpinBox, QMenu)
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QColor
 from datetime import datetime
 import logging
+from utils.search_pipeline import SearchPipeline
+from utils.background_loader import BackgroundLoader
+from utils.stream_export import BackgroundExport
+from utils.change_bus import (ChangeCollector, ChangeOperation, ENTITY_COURSE,
+                              ENTITY_ENROLLMENT, ENTITY_STUDENT)
+from widgets.load_state_widget import LoadStateWidget
 
 class EnrollmentView(QWidget):
     """
     Giao diện quản lý đăng ký khóa học.
     """
-    def __init__(self, student_controller, course_controller, db_manager):
+    # Số thay đổi tối đa được cập nhật từng dòng; nhiều hơn thì tải lại toàn bộ
+    PATCH_LIMIT = 200
+
+    def __init__(self, student_controller, course_controller, db_manager, auto_load=True,
+                 enrollment_controller=None):
         """
         Khởi tạo giao diện quản lý đăng ký khóa học.
         
@@ -20,13 +30,22 @@ class EnrollmentView(QWidget):
             student_controller (StudentController): Controller quản lý sinh viên
             course_controller (CourseController): Controller quản lý khóa học
             db_manager (DatabaseManager): Quản lý cơ sở dữ liệu
+            auto_load (bool): Tải dữ liệu ngay khi khởi tạo; False để tải sau qua load_initial_data()
+            enrollment_controller (EnrollmentController, optional): Controller ghi danh,
+                mặc định tạo mới trên db_manager
         """
         super().__init__()
         self.student_controller = student_controller
         self.course_controller = course_controller
         self.db_manager = db_manager
+        if enrollment_controller is None:
+            from controllers.enrollment_controller import EnrollmentController
+            enrollment_controller = EnrollmentController(db_manager)
+        self.enrollment_controller = enrollment_controller
         self.selected_enrollment = None
         self.init_ui()
+        if auto_load:
+            self.load_initial_data()
     
     def init_ui(self):
         """Thiết lập giao diện người dùng."""
@@ -94,8 +113,25 @@ class EnrollmentView(QWidget):
         search_layout.addWidget(QLabel("Tìm kiếm:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Nhập mã SV, tên SV, mã hoặc tên khóa học...")
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         search_layout.addWidget(self.search_input)
         
+        # Tìm kiếm khi gõ phím: chạy nền, tự hủy truy vấn cũ khi có từ khóa mới
+        self.search_pipeline = SearchPipeline(self.query_enrollments, parent=self)
+        self.search_pipeline.resultsReady.connect(self.show_search_results)
+        self.search_pipeline.searchFailed.connect(self.on_search_failed)
+        self.search_pipeline.busyChanged.connect(self.on_search_busy_changed)
+        
+        # Tải dữ liệu cho các combo box trên luồng nền
+        self.loader = BackgroundLoader(self)
+        self.exporter = BackgroundExport(self.loader, self)
+        
+        # Khi controller báo có thay đổi, chỉ cập nhật các dòng và mục combo bị ảnh hưởng
+        self._patch_count = 0
+        self.change_collector = ChangeCollector(
+            (ENTITY_ENROLLMENT, ENTITY_STUDENT, ENTITY_COURSE), parent=self)
+        self.change_collector.changesReady.connect(self.apply_changes)
+        
         self.search_button = QPushButton("Tìm")
         self.search_button.clicked.connect(self.search_enrollments)
         search_layout.addWidget(self.search_button)
@@ -104,6 +140,16 @@ class EnrollmentView(QWidget):
         self.refresh_button.clicked.connect(self.load_enrollments)
         search_layout.addWidget(self.refresh_button)
         
+        # Xuất toàn bộ đăng ký khớp từ khóa, đọc và ghi theo luồng trên luồng nền
+        self.export_button = QPushButton("Xuất dữ liệu")
+        export_menu = QMenu(self.export_button)
+        export_menu.addAction("Xuất ra Excel", lambda: self.export_enrollments("excel"))
+        export_menu.addAction("Xuất ra CSV", lambda: self.export_enrollments("csv"))
+        export_menu.addAction("Xuất ra HTML", lambda: self.export_enrollments("html"))
+        export_menu.addAction("Xuất ra PDF", lambda: self.export_enrollments("pdf"))
+        self.export_button.setMenu(export_menu)
+        search_layout.addWidget(self.export_button)
+        
         # Tạo bảng hiển thị danh sách đăng ký
         self.enrollment_table = QTableWidget()
         self.enrollment_table.setColumnCount(5)
@@ -129,47 +175,61 @@ class EnrollmentView(QWidget):
         main_layout.addLayout(button_layout)
         main_layout.addLayout(search_layout)
         main_layout.addWidget(QLabel("Danh sách đăng ký:"))
-        main_layout.addWidget(self.enrollment_table)
+        # Bảng được bọc trong widget trạng thái (đang tải / trống / lỗi)
+        self.table_state = LoadStateWidget(self.enrollment_table, empty_message="Không có đăng ký nào")
+        self.table_state.retryRequested.connect(self.load_enrollments)
+        main_layout.addWidget(self.table_state)
         # Thêm label tổng số đăng ký
         self.enrollment_count_label = QLabel("Tổng số đăng ký: 0")
         main_layout.addWidget(self.enrollment_count_label)
 
         self.setLayout(main_layout)
 
-        # Tải dữ liệu
+    def load_initial_data(self):
+        """Tải dữ liệu ban đầu của view (MainWindow gọi khi tab được mở lần đầu)."""
         self.load_students()
         self.load_courses()
         self.load_enrollments()
     
     def load_students(self):
-        """Tải danh sách sinh viên cho combo box."""
+        """Tải danh sách sinh viên cho combo box (chạy nền)."""
+        self.loader.load("students", self.student_controller.find_students,
+                         on_result=self.populate_student_combo, cancellable=True)
+    
+    def populate_student_combo(self, students):
+        """
+        Điền danh sách sinh viên vào combo box.
+
+        Args:
+            students (list): Danh sách các đối tượng Student.
+        """
         self.student_combo.clear()
-        students = self.student_controller.get_all_students()
         for student in students:
             display_text = f"{student.ma_sinh_vien} - {student.ho_ten}"
             # Lưu mã sinh viên vào userData
             self.student_combo.addItem(display_text, student.ma_sinh_vien)
     
     def load_courses(self):
-        """Tải danh sách khóa học cho combo box."""
+        """Tải danh sách khóa học cho combo box (chạy nền)."""
+        self.loader.load("courses", self.course_controller.find_courses,
+                         on_result=self.populate_course_combo, cancellable=True)
+    
+    def populate_course_combo(self, courses):
+        """
+        Điền danh sách khóa học vào combo box.
+
+        Args:
+            courses (list): Danh sách các đối tượng Course.
+        """
         self.course_combo.clear()
-        courses = self.course_controller.get_all_courses()
         for course in courses:
             display_text = f"{course.ma_khoa_hoc} - {course.ten_khoa_hoc}"
             # Lưu mã khóa học vào userData
             self.course_combo.addItem(display_text, course.ma_khoa_hoc)
     
     def load_enrollments(self):
-        """Tải danh sách đăng ký khóa học và hiển thị lên bảng."""
-        query = """
-        SELECT e.ma_ghi_danh, e.ma_sinh_vien, s.ho_ten, e.ma_khoa_hoc, c.ten_khoa_hoc, e.ngay_ghi_danh, e.diem
-        FROM ghi_danh e
-        JOIN sinh_vien s ON e.ma_sinh_vien = s.ma_sinh_vien
-        JOIN khoa_hoc c ON e.ma_khoa_hoc = c.ma_khoa_hoc
-        ORDER BY e.ma_sinh_vien, e.ma_khoa_hoc
-        """
-        enrollments = self.db_manager.execute_query(query)
-        self.populate_table(enrollments)
+        """Tải danh sách đăng ký khóa học (chạy nền) và hiển thị lên bảng."""
+        self.search_pipeline.run_now(self.search_input.text().strip())
     
     def populate_table(self, enrollments):
         """
@@ -182,17 +242,144 @@ class EnrollmentView(QWidget):
         
         for row, enrollment in enumerate(enrollments):
             self.enrollment_table.insertRow(row)
-            item_ma_ghi_danh = QTableWidgetItem(str(enrollment['ma_ghi_danh']))
-            self.enrollment_table.setItem(row, 0, item_ma_ghi_danh)
-            self.enrollment_table.setItem(row, 1, QTableWidgetItem(enrollment['ma_sinh_vien']))
-            self.enrollment_table.setItem(row, 2, QTableWidgetItem(enrollment['ma_khoa_hoc']))
-            self.enrollment_table.setItem(row, 3, QTableWidgetItem(enrollment['ngay_ghi_danh']))
-            # Hiển thị điểm nếu có
-            diem_text = str(enrollment['diem']) if enrollment['diem'] is not None else "Chưa có"
-            self.enrollment_table.setItem(row, 4, QTableWidgetItem(diem_text))
-            # Lưu ID đăng ký vào item để sử dụng sau này
-            if item_ma_ghi_danh is not None:
-                item_ma_ghi_danh.setData(Qt.ItemDataRole.UserRole, enrollment['ma_ghi_danh'])
+            self.set_enrollment_row(row, enrollment)
+    
+    def set_enrollment_row(self, row, enrollment):
+        """
+        Ghi một bản ghi đăng ký vào một dòng của bảng.
+
+        Args:
+            row (int): Chỉ số dòng
+            enrollment (dict): Bản ghi đăng ký
+        """
+        item_ma_ghi_danh = QTableWidgetItem(str(enrollment['ma_ghi_danh']))
+        # Lưu ID đăng ký vào item để sử dụng sau này
+        item_ma_ghi_danh.setData(Qt.ItemDataRole.UserRole, enrollment['ma_ghi_danh'])
+        self.enrollment_table.setItem(row, 0, item_ma_ghi_danh)
+        self.enrollment_table.setItem(row, 1, QTableWidgetItem(enrollment['ma_sinh_vien']))
+        self.enrollment_table.setItem(row, 2, QTableWidgetItem(enrollment['ma_khoa_hoc']))
+        self.enrollment_table.setItem(row, 3, QTableWidgetItem(enrollment['ngay_ghi_danh']))
+        # Hiển thị điểm nếu có
+        diem_text = str(enrollment['diem']) if enrollment['diem'] is not None else "Chưa có"
+        self.enrollment_table.setItem(row, 4, QTableWidgetItem(diem_text))
+    
+    def find_enrollment_row(self, enrollment_id):
+        """
+        Tìm dòng của một bản ghi đăng ký trong bảng.
+
+        Args:
+            enrollment_id (int): Mã ghi danh
+
+        Returns:
+            int: Chỉ số dòng hoặc -1 nếu không có
+        """
+        for row in range(self.enrollment_table.rowCount()):
+            item = self.enrollment_table.item(row, 0)
+            if item is not None and item.data(Qt.ItemDataRole.UserRole) == enrollment_id:
+                return row
+        return -1
+    
+    def apply_changes(self, events):
+        """
+        Cập nhật bảng và combo box sau khi dữ liệu thay đổi, chỉ đọc lại các bản ghi bị ảnh hưởng.
+
+        Args:
+            events (list): Các ChangeEvent của ghi_danh, sinh_vien và khoa_hoc
+        """
+        # Quá nhiều thay đổi hoặc thay đổi hàng loạt (key None): tải lại toàn bộ
+        if len(events) > self.PATCH_LIMIT or any(e.key is None for e in events):
+            self.load_initial_data()
+            return
+
+        for entity, column, combo, fetch, label in (
+                (ENTITY_STUDENT, 1, self.student_combo,
+                 self.student_controller.get_students_by_ids, lambda s: s.ho_ten),
+                (ENTITY_COURSE, 2, self.course_combo,
+                 self.course_controller.get_courses_by_ids, lambda c: c.ten_khoa_hoc)):
+            entity_events = [e for e in events if e.entity == entity]
+            deleted = {e.key for e in entity_events if e.operation is ChangeOperation.DELETE}
+            if deleted:
+                # Đăng ký của sinh viên/khóa học đã xóa không còn xuất hiện trong kết quả JOIN
+                self.remove_rows(lambda row: self.enrollment_table.item(row, column).text() in deleted)
+                for key in deleted:
+                    index = combo.findData(key)
+                    if index >= 0:
+                        combo.removeItem(index)
+            changed = [e.key for e in entity_events
+                       if e.operation is not ChangeOperation.DELETE
+                       and e.touches(("ma_sinh_vien", "ho_ten", "ma_khoa_hoc", "ten_khoa_hoc"))]
+            if changed:
+                self._patch_count += 1
+                self.loader.load(f"patch-{self._patch_count}", fetch, changed,
+                                 on_result=lambda found, c=combo, f=label: self.patch_combo(c, found, f))
+
+        enrollment_events = [e for e in events if e.entity == ENTITY_ENROLLMENT]
+        deleted = {e.key for e in enrollment_events if e.operation is ChangeOperation.DELETE}
+        if deleted:
+            self.remove_rows(lambda row: self.enrollment_table.item(row, 0).data(Qt.ItemDataRole.UserRole) in deleted)
+        changed = [e.key for e in enrollment_events if e.operation is not ChangeOperation.DELETE]
+        if changed:
+            self._patch_count += 1
+            self.loader.load(f"patch-{self._patch_count}", self.enrollment_controller.get_enrollments_by_ids,
+                             changed, on_result=lambda found, keys=changed: self.patch_enrollments(keys, found))
+    
+    def remove_rows(self, predicate):
+        """
+        Xóa các dòng thỏa điều kiện khỏi bảng.
+
+        Args:
+            predicate (callable): Hàm nhận chỉ số dòng, trả về True nếu cần xóa
+        """
+        for row in reversed(range(self.enrollment_table.rowCount())):
+            if predicate(row):
+                self.enrollment_table.removeRow(row)
+        self.update_enrollment_count()
+    
+    def patch_combo(self, combo, found, label):
+        """
+        Thêm hoặc đổi tên các mục của combo box sinh viên/khóa học.
+
+        Args:
+            combo (QComboBox): Combo box cần cập nhật
+            found (dict): Mã -> Student/Course vừa đọc lại
+            label (callable): Hàm lấy tên hiển thị từ đối tượng
+        """
+        for key, item in found.items():
+            display_text = f"{key} - {label(item)}"
+            index = combo.findData(key)
+            if index >= 0:
+                combo.setItemText(index, display_text)
+            else:
+                combo.addItem(display_text, key)
+    
+    def patch_enrollments(self, enrollment_ids, found):
+        """
+        Cập nhật các bản ghi đăng ký vừa được đọc lại vào bảng.
+
+        Args:
+            enrollment_ids (list): Các mã ghi danh đã yêu cầu
+            found (dict): Mã ghi danh -> bản ghi đăng ký (thiếu nghĩa là đã bị xóa)
+        """
+        keyword = self.search_input.text().strip()
+        for enrollment_id in enrollment_ids:
+            enrollment = found.get(enrollment_id)
+            row = self.find_enrollment_row(enrollment_id)
+            matches = (enrollment is not None
+                       and self.enrollment_controller.matches_keyword(enrollment, keyword))
+            if row >= 0 and matches:
+                self.set_enrollment_row(row, enrollment)
+            elif row >= 0:
+                self.enrollment_table.removeRow(row)
+            elif matches:
+                # Chèn theo thứ tự (mã sinh viên, mã khóa học) như kết quả truy vấn
+                sort_key = (enrollment['ma_sinh_vien'], enrollment['ma_khoa_hoc'])
+                position = next((r for r in range(self.enrollment_table.rowCount())
+                                 if (self.enrollment_table.item(r, 1).text(),
+                                     self.enrollment_table.item(r, 2).text()) > sort_key),
+                                self.enrollment_table.rowCount())
+                self.enrollment_table.insertRow(position)
+                self.set_enrollment_row(position, enrollment)
+        self.update_enrollment_count()
     
     def on_table_clicked(self):
         """Xử lý sự kiện khi người dùng chọn một dòng trong bảng."""
@@ -263,9 +450,7 @@ class EnrollmentView(QWidget):
         ma_khoa_hoc = self.course_combo.currentData()
         ngay_ghi_danh = self.enrollment_date.date().toString("yyyy-MM-dd")
         # Kiểm tra xem đã đăng ký chưa
-        query = "SELECT * FROM ghi_danh WHERE ma_sinh_vien = ? AND ma_khoa_hoc = ?"
-        result = self.db_manager.execute_query(query, (ma_sinh_vien, ma_khoa_hoc))
-        if result:
+        if self.enrollment_controller.is_enrolled(ma_sinh_vien, ma_khoa_hoc):
             QMessageBox.warning(self, "Lỗi", "Sinh viên này đã đăng ký khóa học này rồi!")
             return
         # Kiểm tra số lượng sinh viên đã đăng ký khóa học
@@ -275,15 +460,10 @@ class EnrollmentView(QWidget):
             QMessageBox.warning(self, "Lỗi", "Khóa học này đã đạt số lượng sinh viên tối đa!")
             return
         # Thêm đăng ký mới
-        query = """
-        INSERT INTO ghi_danh (ma_sinh_vien, ma_khoa_hoc, ngay_ghi_danh)
-        VALUES (?, ?, ?)
-        """
-        result = self.db_manager.execute_insert(query, (ma_sinh_vien, ma_khoa_hoc, ngay_ghi_danh))
+        result = self.enrollment_controller.enroll_student(ma_sinh_vien, ma_khoa_hoc, ngay_ghi_danh)
         if result is not None:
             QMessageBox.information(self, "Thành công", "Đăng ký khóa học thành công!")
             self.clear_form()
-            self.load_enrollments()
         else:
             QMessageBox.warning(self, "Lỗi", "Không thể đăng ký khóa học!")
     
@@ -296,11 +476,8 @@ class EnrollmentView(QWidget):
         diem = self.grade_input.value()
         if diem == 0 and self.grade_input.specialValueText() == "Chưa có điểm":
             diem = None
-        query = "UPDATE ghi_danh SET diem = ? WHERE ma_ghi_danh = ?"
-        rows_affected = self.db_manager.execute_update(query, (diem, self.selected_enrollment['ma_ghi_danh']))
-        if rows_affected > 0:
+        if self.enrollment_controller.update_grade(self.selected_enrollment['ma_ghi_danh'], diem):
             QMessageBox.information(self, "Thành công", "Đã cập nhật điểm số!")
-            self.load_enrollments()
         else:
             QMessageBox.warning(self, "Lỗi", "Không thể cập nhật điểm số!")
     
@@ -318,12 +495,9 @@ class EnrollmentView(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            query = "DELETE FROM ghi_danh WHERE ma_ghi_danh = ?"
-            rows_affected = self.db_manager.execute_delete(query, (self.selected_enrollment['ma_ghi_danh'],))
-            if rows_affected > 0:
+            if self.enrollment_controller.unenroll(self.selected_enrollment['ma_ghi_danh']):
                 QMessageBox.information(self, "Thành công", "Đã hủy đăng ký khóa học!")
                 self.clear_form()
-                self.load_enrollments()
             else:
                 QMessageBox.warning(self, "Lỗi", "Không thể hủy đăng ký khóa học!")
     
@@ -336,25 +510,63 @@ class EnrollmentView(QWidget):
         self.grade_input.setSpecialValueText("Chưa có điểm")
         self.selected_enrollment = None
     
+    def export_enrollments(self, file_format):
+        """
+        Xuất toàn bộ đăng ký khớp từ khóa tìm kiếm hiện tại.
+
+        Args:
+            file_format (str): "excel", "csv", "html" hoặc "pdf"
+        """
+        keyword = self.search_input.text().strip()
+        self.exporter.start(
+            file_format,
+            ["Mã đăng ký", "Mã SV", "Họ tên", "Mã khóa học", "Tên khóa học", "Ngày đăng ký", "Điểm"],
+            lambda cancel_token: self.enrollment_controller.iter_enrollments(keyword, cancel_token),
+            lambda cancel_token: self.enrollment_controller.count_enrollments(keyword, cancel_token),
+            title="Danh sách đăng ký",
+            default_filename="danh_sach_dang_ky"
+        )
+    
     def search_enrollments(self):
         """Tìm kiếm đăng ký theo từ khóa."""
-        keyword = self.search_input.text().strip()
-        if not keyword:
-            self.load_enrollments()
-            return
-        keyword = f"%{keyword}%"
-        query = """
-        SELECT e.ma_ghi_danh, e.ma_sinh_vien, s.ho_ten, e.ma_khoa_hoc, c.ten_khoa_hoc, e.ngay_ghi_danh, e.diem
-        FROM ghi_danh e
-        JOIN sinh_vien s ON e.ma_sinh_vien = s.ma_sinh_vien
-        JOIN khoa_hoc c ON e.ma_khoa_hoc = c.ma_khoa_hoc
-        WHERE e.ma_sinh_vien LIKE ? OR s.ho_ten LIKE ? OR e.ma_khoa_hoc LIKE ? OR c.ten_khoa_hoc LIKE ?
-        ORDER BY e.ma_sinh_vien, e.ma_khoa_hoc
+        self.search_pipeline.run_now(self.search_input.text().strip())
+    
+    def on_search_text_changed(self, text):
+        """Lên lịch tìm kiếm khi người dùng đang gõ."""
+        self.search_pipeline.schedule(text.strip())
+    
+    def query_enrollments(self, keyword, cancel_token=None):
+        """
+        Truy vấn danh sách đăng ký theo từ khóa (chạy trên luồng nền).
+
+        Args:
+            keyword (str): Từ khóa tìm kiếm, rỗng để lấy tất cả
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            list: Danh sách các bản ghi đăng ký
+        """
+        return self.enrollment_controller.find_enrollments(keyword, cancel_token)
+    
+    def show_search_results(self, enrollments):
+        """
+        Hiển thị kết quả tìm kiếm mới nhất.
+
+        Args:
+            enrollments (list): Danh sách các bản ghi đăng ký.
         """
-        enrollments = self.db_manager.execute_query(query, (keyword, keyword, keyword, keyword))
         self.populate_table(enrollments)
-        if not enrollments:
-            QMessageBox.information(self, "Kết quả tìm kiếm", "Không tìm thấy kết quả nào!")
+        self.update_enrollment_count()
+    
+    def on_search_failed(self, message):
+        """Hiển thị lỗi tìm kiếm mà không chặn người dùng."""
+        self.enrollment_count_label.setText("Tổng số đăng ký: 0")
+        self.table_state.show_error(message)
+    
+    def on_search_busy_changed(self, busy):
+        """Hiển thị trạng thái đang tải khi truy vấn chạy lâu."""
+        if busy:
+            self.table_state.show_loading()
     
     def populate_enrollment_table(self, enrollments):
         """
@@ -434,3 +646,7 @@ class EnrollmentView(QWidget):
         """Cập nhật tổng số đăng ký hiển thị."""
         count = self.enrollment_table.rowCount()
         self.enrollment_count_label.setText(f"Tổng số đăng ký: {count}")
+        if count:
+            self.table_state.show_content()
+        else:
+            self.table_state.show_empty()
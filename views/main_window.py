@@ -1,38 +1,58 @@
 import sys
 import os
 from PyQt6.QtWidgets import (QMainWindow, QTabWidget, QStatusBar,
-                             QMessageBox, QLabel, QToolBar)
+                             QMessageBox, QLabel, QToolBar, QWidget, QVBoxLayout,
+                             QFileDialog, QProgressDialog, QInputDialog)
 from PyQt6.QtGui import QIcon, QAction  # QAction moved here from QtWidgets
-from PyQt6.QtCore import QSize
-from DB.db_manager import DatabaseManager
-from controllers.student_controller import StudentController
-from controllers.course_controller import CourseController
-from controllers.report_controller import ReportController
-from controllers.user_controller import UserController
-from views.student_view import StudentView
-from views.course_view import CourseView
-from views.enrollment_view import EnrollmentView
-from views.report_view import ReportView
+from PyQt6.QtCore import QSize, QTimer, Qt
+from utils.app_context import AppContext
+from utils.background_loader import BackgroundLoader
 import logging
+from datetime import datetime
 
 class MainWindow(QMainWindow):
     """
     Cửa sổ chính của ứng dụng quản lý sinh viên.
+
+    Các view của tab chỉ được tạo khi tab được mở lần đầu và dữ liệu của chúng
+    được tải sau khi cửa sổ đã hiển thị, nên thời gian mở cửa sổ không phụ thuộc
+    vào kích thước cơ sở dữ liệu.
     """
-    def __init__(self, current_user=None):
+    # Thời gian rảnh (ms) trước khi tạo sẵn tab kế tiếp
+    PREFETCH_DELAY_MS = 1500
+
+    def __init__(self, current_user=None, app_context=None, prefetch_next_tab=True):
+        """
+        Khởi tạo cửa sổ chính.
+        
+        Args:
+            current_user (User, optional): Người dùng đã đăng nhập
+            app_context (AppContext, optional): Dịch vụ dùng chung; nếu không truyền,
+                cửa sổ tự tạo và tự đóng AppContext của riêng nó
+            prefetch_next_tab (bool): Tạo sẵn tab kế tiếp khi giao diện rảnh
+        """
         super().__init__()
         
         # Lưu thông tin người dùng đăng nhập
         self.current_user = current_user
-        
-        # Khởi tạo cơ sở dữ liệu
-        self.db_manager = DatabaseManager(None)
-        
-        # Khởi tạo controllers
-        self.student_controller = StudentController(self.db_manager)
-        self.course_controller = CourseController(self.db_manager)
-        self.report_controller = ReportController(self.db_manager)
-        self.user_controller = UserController(self.db_manager)
+        self.prefetch_next_tab = prefetch_next_tab
+        # vị trí tab -> (tên thuộc tính, hàm tạo view)
+        self._lazy_tabs = {}
+        # Các tab đã tạo view và đã bắt đầu tải dữ liệu
+        self._loaded_tabs = set()
+        
+        # Dùng chung cơ sở dữ liệu và controllers với phần còn lại của ứng dụng
+        self._owns_context = app_context is None
+        self.app_context = app_context or AppContext()
+        self.db_manager = self.app_context.db_manager
+        self.student_controller = self.app_context.student_controller
+        self.course_controller = self.app_context.course_controller
+        self.report_controller = self.app_context.report_controller
+        self.enrollment_controller = self.app_context.enrollment_controller
+        self.user_controller = self.app_context.user_controller
+        # Công việc nền của cửa sổ chính (xuất ảnh chụp, sao lưu và khôi phục dữ liệu)
+        self.loader = BackgroundLoader(self)
+        self.job_progress = None
         
         # Thiết lập giao diện
         self.init_ui()
@@ -51,16 +71,20 @@ class MainWindow(QMainWindow):
         # Tạo tabbed widget
         self.tab_widget = QTabWidget()
         
-        # Thêm các tab
-        self.student_view = StudentView(self.student_controller)
-        self.course_view = CourseView(self.course_controller)
-        self.enrollment_view = EnrollmentView(self.student_controller, self.course_controller, self.db_manager)
-        self.report_view = ReportView(self.report_controller)
+        # Thêm các tab (view được tạo khi tab được mở lần đầu)
+        self.add_lazy_tab("student_view", "Quản lý Sinh viên", self.create_student_view)
+        self.add_lazy_tab("course_view", "Quản lý Khóa học", self.create_course_view)
+        self.add_lazy_tab("enrollment_view", "Đăng ký Khóa học", self.create_enrollment_view)
+        self.add_lazy_tab("report_view", "Báo cáo & Thống kê", self.create_report_view)
+        
+        # Tạo sẵn tab kế tiếp khi giao diện rảnh
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(self.PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self.prefetch_next)
         
-        self.tab_widget.addTab(self.student_view, "Quản lý Sinh viên")
-        self.tab_widget.addTab(self.course_view, "Quản lý Khóa học")
-        self.tab_widget.addTab(self.enrollment_view, "Đăng ký Khóa học")
-        self.tab_widget.addTab(self.report_view, "Báo cáo & Thống kê")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        self.on_tab_changed(self.tab_widget.currentIndex())
         
         # Thiết lập widget trung tâm
         self.setCentralWidget(self.tab_widget)
@@ -81,6 +105,100 @@ class MainWindow(QMainWindow):
         
         logging.info("Đã khởi tạo giao diện người dùng")
     
+    # Các module view được import khi tab được mở lần đầu, tránh nạp thư viện
+    # nặng (matplotlib, pandas...) trước khi cửa sổ hiển thị
+    def create_student_view(self):
+        """Tạo view quản lý sinh viên."""
+        from views.student_view import StudentView
+        return StudentView(self.student_controller, auto_load=False)
+    
+    def create_course_view(self):
+        """Tạo view quản lý khóa học."""
+        from views.course_view import CourseView
+        return CourseView(self.course_controller, auto_load=False)
+    
+    def create_enrollment_view(self):
+        """Tạo view đăng ký khóa học."""
+        from views.enrollment_view import EnrollmentView
+        return EnrollmentView(self.student_controller, self.course_controller,
+                              self.db_manager, auto_load=False,
+                              enrollment_controller=self.enrollment_controller)
+    
+    def create_report_view(self):
+        """Tạo view báo cáo và thống kê."""
+        from views.report_view import ReportView
+        return ReportView(self.report_controller, auto_load=False,
+                          config_manager=self.app_context.config_manager)
+    
+    def add_lazy_tab(self, attr_name, title, factory):
+        """
+        Thêm tab với view được tạo trễ.
+        
+        Args:
+            attr_name (str): Tên thuộc tính của MainWindow giữ view (ví dụ "student_view")
+            title (str): Tiêu đề tab
+            factory (callable): Hàm tạo view, được gọi khi tab được mở lần đầu
+        """
+        placeholder = QWidget()
+        layout = QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        index = self.tab_widget.addTab(placeholder, title)
+        self._lazy_tabs[index] = (attr_name, factory)
+        setattr(self, attr_name, None)
+    
+    def ensure_tab_view(self, index):
+        """
+        Lấy view của tab, tạo mới nếu chưa có.
+        
+        Args:
+            index (int): Vị trí tab
+            
+        Returns:
+            QWidget: View của tab hoặc None nếu vị trí không hợp lệ
+        """
+        if index not in self._lazy_tabs:
+            return None
+        attr_name, factory = self._lazy_tabs[index]
+        view = getattr(self, attr_name)
+        if view is None:
+            view = factory()
+            self.tab_widget.widget(index).layout().addWidget(view)
+            setattr(self, attr_name, view)
+            logging.info(f"Đã tạo view cho tab '{self.tab_widget.tabText(index)}'")
+        return view
+    
+    def activate_tab(self, index):
+        """
+        Tạo view của tab (nếu cần) và lên lịch tải dữ liệu ban đầu một lần.
+        Việc tải chạy sau khi vòng lặp sự kiện xử lý xong (sau lần vẽ đầu tiên).
+        
+        Args:
+            index (int): Vị trí tab
+        """
+        view = self.ensure_tab_view(index)
+        if view is None or index in self._loaded_tabs:
+            return
+        self._loaded_tabs.add(index)
+        QTimer.singleShot(0, view.load_initial_data)
+    
+    def on_tab_changed(self, index):
+        """
+        Xử lý khi chuyển tab: tạo view và tải dữ liệu của tab khi mở lần đầu.
+        
+        Args:
+            index (int): Vị trí tab được chọn
+        """
+        self.activate_tab(index)
+        if self.prefetch_next_tab:
+            self._prefetch_timer.start()
+    
+    def prefetch_next(self):
+        """Tạo sẵn và tải trước tab kế tiếp tab hiện tại (nếu chưa tải)."""
+        next_index = self.tab_widget.currentIndex() + 1
+        if next_index < self.tab_widget.count() and next_index not in self._loaded_tabs:
+            logging.info(f"Tải trước tab '{self.tab_widget.tabText(next_index)}'")
+            self.activate_tab(next_index)
+    
     def create_menu(self):
         """Tạo thanh menu của ứng dụng."""
         # Get the menu bar - ensure it's created first
@@ -112,6 +230,18 @@ class MainWindow(QMainWindow):
         if system_menu is not None:
             system_menu.addAction(change_pwd_action)
         
+        # - Sao lưu / khôi phục dữ liệu dạng SQL
+        dump_action = QAction('&Sao lưu dữ liệu (SQL)...', self)
+        dump_action.setStatusTip('Sao lưu toàn bộ dữ liệu ra file SQL nén')
+        dump_action.triggered.connect(self.dump_database)
+        restore_action = QAction('&Khôi phục từ bản sao SQL...', self)
+        restore_action.setStatusTip('Tạo cơ sở dữ liệu mới từ file sao lưu SQL')
+        restore_action.triggered.connect(self.restore_database)
+        if system_menu is not None:
+            system_menu.addSeparator()
+            system_menu.addAction(dump_action)
+            system_menu.addAction(restore_action)
+        
         # Only add separator if the menu exists
         if system_menu is not None:
             system_menu.addSeparator()
@@ -182,6 +312,20 @@ class MainWindow(QMainWindow):
         if report_menu is not None:
             report_menu.addAction(stats_action)
         
+        # - Xuất ảnh chụp dữ liệu dạng cột cho phân tích
+        snapshot_action = QAction('Xuất ảnh chụp &phân tích...', self)
+        snapshot_action.setStatusTip('Xuất các bảng ra file Parquet để phân tích bằng pandas')
+        snapshot_action.triggered.connect(self.export_snapshot)
+        if report_menu is not None:
+            report_menu.addAction(snapshot_action)
+        
+        # - Báo cáo học kỳ nhiều sheet
+        term_report_action = QAction('Xuất báo cáo &học kỳ (Excel)...', self)
+        term_report_action.setStatusTip('Xuất báo cáo tổng hợp của một học kỳ ra một file Excel nhiều sheet')
+        term_report_action.triggered.connect(self.export_term_report)
+        if report_menu is not None:
+            report_menu.addAction(term_report_action)
+        
         # Menu Trợ giúp
         help_menu = menu_bar.addMenu('&Trợ giúp')
         
@@ -231,6 +375,175 @@ class MainWindow(QMainWindow):
         report_action.triggered.connect(lambda: self.tab_widget.setCurrentIndex(3))
         toolbar.addAction(report_action)
     
+    def export_snapshot(self):
+        """Xuất ảnh chụp các bảng ra thư mục dạng Parquet (chạy nền, có thể hủy)."""
+        from utils.snapshot_export import HAS_PYARROW, SnapshotExporter
+        if not HAS_PYARROW:
+            QMessageBox.warning(self, "Thiếu thư viện",
+                                "Xuất dữ liệu dạng cột cần thư viện pyarrow.\n\n"
+                                "Vui lòng cài đặt bằng lệnh:\npip install pyarrow")
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Chọn thư mục lưu ảnh chụp dữ liệu")
+        if not directory:
+            return
+        directory = os.path.join(directory, f"snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        def finished(manifest):
+            details = "\n".join(f"- {table}: {info['rows']:,} dòng"
+                                for table, info in manifest['tables'].items())
+            QMessageBox.information(self, "Thành công",
+                                    f"Đã xuất ảnh chụp dữ liệu đến:\n{directory}\n\n{details}")
+
+        self.start_job("Xuất ảnh chụp", "Đã xuất {done:,} dòng...", SnapshotExporter(self.db_manager),
+                       (directory,), finished)
+
+    def export_term_report(self):
+        """Xuất báo cáo học kỳ ra file Excel nhiều sheet (chạy nền, có thể hủy)."""
+        from utils.enrollment_trends import UNKNOWN_PERIOD
+        from utils.term_report import HAS_OPENPYXL, TermReportBuilder
+        if not HAS_OPENPYXL:
+            QMessageBox.warning(self, "Thiếu thư viện",
+                                "Xuất báo cáo Excel cần thư viện openpyxl.\n\n"
+                                "Vui lòng cài đặt bằng lệnh:\npip install openpyxl")
+            return
+        all_terms = "Toàn bộ dữ liệu"
+        terms = [row['term'] for row in self.report_controller.get_enrollment_statistics_by_term()
+                 if row['term'] != UNKNOWN_PERIOD]
+        term, ok = QInputDialog.getItem(self, "Báo cáo học kỳ", "Chọn học kỳ:",
+                                        terms + [all_terms], 0, False)
+        if not ok:
+            return
+        term = None if term == all_terms else term
+        default_name = f"bao_cao_{(term or 'toan_bo').replace(' ', '_')}.xlsx"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Xuất báo cáo học kỳ", os.path.join(os.path.expanduser("~"), "Documents", default_name),
+            "Excel Files (*.xlsx);;All Files (*)")
+        if not file_path:
+            return
+        if not file_path.lower().endswith(".xlsx"):
+            file_path += ".xlsx"
+
+        def finished(result):
+            details = "\n".join(f"- {name}: {rows:,} dòng" for name, rows in result['sheets'].items())
+            QMessageBox.information(self, "Thành công",
+                                    f"Đã xuất báo cáo {term or all_terms.lower()} "
+                                    f"({result['elapsed']:.1f} giây) đến:\n{file_path}\n\n{details}")
+
+        self.start_job("Xuất báo cáo học kỳ", "Đã lập {done} / {total} sheet...",
+                       TermReportBuilder(self.db_manager), (file_path, term), finished)
+
+    def dump_database(self):
+        """Sao lưu cơ sở dữ liệu ra file SQL nén (chạy nền, có thể hủy)."""
+        from utils.sql_exporter import SqlDumper
+        default_name = f"sinh_vien_{datetime.now().strftime('%Y%m%d_%H%M%S')}.sql.gz"
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Sao lưu dữ liệu", os.path.join(os.path.expanduser("~"), "Documents", default_name),
+            "SQL nén (*.sql.gz);;SQL (*.sql);;All Files (*)")
+        if not file_path:
+            return
+
+        def finished(result):
+            QMessageBox.information(self, "Thành công",
+                                    f"Đã sao lưu {result['rows']:,} dòng ({len(result['tables'])} bảng) "
+                                    f"đến:\n{file_path}\n\nKích thước: {result['size'] / 1048576:.1f} MB")
+
+        self.start_job("Sao lưu dữ liệu", "Đã ghi {done:,} dòng...", SqlDumper(self.db_manager),
+                       (file_path,), finished)
+
+    def restore_database(self):
+        """
+        Tạo file cơ sở dữ liệu mới từ bản sao SQL (chạy nền, có thể hủy).
+        Không khôi phục đè lên cơ sở dữ liệu đang mở.
+        """
+        from utils.sql_exporter import SqlRestorer
+        dump_path, _ = QFileDialog.getOpenFileName(
+            self, "Chọn bản sao lưu SQL", os.path.join(os.path.expanduser("~"), "Documents"),
+            "SQL (*.sql *.sql.gz *.gz);;All Files (*)")
+        if not dump_path:
+            return
+        name = os.path.basename(dump_path)
+        for extension in (".gz", ".sql"):
+            if name.lower().endswith(extension):
+                name = name[:-len(extension)]
+        db_path, _ = QFileDialog.getSaveFileName(
+            self, "Lưu cơ sở dữ liệu khôi phục",
+            os.path.join(os.path.dirname(dump_path), f"{name}.db"), "SQLite (*.db);;All Files (*)")
+        if not db_path:
+            return
+        if os.path.abspath(db_path) == os.path.abspath(self.db_manager.db_path):
+            QMessageBox.warning(self, "Lỗi", "Không thể khôi phục đè lên cơ sở dữ liệu đang mở.\n"
+                                "Vui lòng chọn một file khác.")
+            return
+
+        def finished(result):
+            QMessageBox.information(self, "Thành công",
+                                    f"Đã khôi phục {result['rows']:,} dòng vào:\n{db_path}")
+
+        # Hộp thoại lưu file đã hỏi xác nhận nếu file đích tồn tại
+        self.start_job("Khôi phục dữ liệu", "Đã đọc {done:,} / {total:,} byte...", SqlRestorer(),
+                       (dump_path, db_path, True), finished)
+
+    def start_job(self, title, label, worker, args, on_finished):
+        """
+        Chạy một công việc bảo trì dữ liệu trên luồng nền với hộp thoại tiến trình có nút Hủy.
+
+        Args:
+            title (str): Tiêu đề hộp thoại tiến trình
+            label (str): Mẫu nội dung tiến trình, dùng {done} và {total}
+            worker (QObject): Đối tượng có run(*args, cancel_token) và tín hiệu progressChanged
+            args (tuple): Tham số của worker.run
+            on_finished (callable): Nhận kết quả của worker.run khi thành công
+        """
+        if self.loader.is_loading("maintenance"):
+            QMessageBox.information(self, title, "Đang có một công việc chạy nền, vui lòng chờ.")
+            return
+        self.job_progress = QProgressDialog(f"{title}...", "Hủy", 0, 0, self)
+        self.job_progress.setWindowTitle(title)
+        self.job_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.job_progress.setMinimumDuration(0)
+        self.job_progress.setAutoClose(False)
+        self.job_progress.setAutoReset(False)
+        worker.progressChanged.connect(
+            lambda done, total: self.on_job_progress(label.format(done=done, total=total), done, total))
+        self.job_progress.canceled.connect(self.cancel_job)
+
+        def succeeded(result):
+            self.finish_job()
+            on_finished(result)
+
+        def failed(error):
+            self.finish_job()
+            logging.error(f"{title} thất bại: {error}")
+            QMessageBox.warning(self, "Lỗi", f"{title} thất bại: {error}")
+
+        # Không gán parent cho worker: nó sống cùng công việc nền và được giải phóng khi xong
+        self.loader.load("maintenance", worker.run, *args, cancellable=True,
+                         on_result=succeeded, on_error=failed)
+
+    def on_job_progress(self, text, done, total):
+        """Cập nhật hộp thoại tiến trình của công việc nền."""
+        if self.job_progress is None:
+            return
+        if total:
+            # QProgressDialog chỉ nhận số nguyên 32 bit (kích thước file có thể lớn hơn)
+            scale = max(1, total // 1000000)
+            self.job_progress.setMaximum(total // scale)
+            self.job_progress.setValue(min(done, total) // scale)
+        self.job_progress.setLabelText(text)
+
+    def cancel_job(self):
+        """Dừng công việc nền; file dở dang bị xóa."""
+        self.loader.cancel("maintenance")
+        self.finish_job()
+
+    def finish_job(self):
+        """Đóng hộp thoại tiến trình của công việc nền."""
+        if self.job_progress is not None:
+            self.job_progress.blockSignals(True)
+            self.job_progress.close()
+            self.job_progress.deleteLater()
+            self.job_progress = None
+
     def show_about(self):
         """Hiển thị hộp thoại giới thiệu về ứng dụng."""
         about_text = (
@@ -251,8 +564,10 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Đóng kết nối cơ sở dữ liệu trước khi thoát
-            self.db_manager.close()
+            # Chỉ đóng cơ sở dữ liệu nếu cửa sổ tự tạo AppContext;
+            # AppContext dùng chung do main.py đóng khi ứng dụng thoát
+            if self._owns_context:
+                self.app_context.close()
             logging.info("Ứng dụng đã đóng")
             event.accept()
         else:
@@ -1,36 +1,84 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, 
                             QLabel, QLineEdit, QComboBox, QPushButton, 
                             QTableWidget, QTableWidgetItem, QHeaderView, 
-                            QMessageBox, QGroupBox, QTabWidget, QTextBrowser,QApplication)
+                            QMessageBox, QGroupBox, QTabWidget, QTextBrowser, QMenu)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QColor
 import logging
+import importlib.util
+from utils.background_loader import BackgroundLoader
+from utils.change_bus import ChangeCollector, ENTITY_COURSE, ENTITY_ENROLLMENT, ENTITY_STUDENT
+from utils.config_manager import DEFAULT_QUERY_TIMEOUT
+from widgets.load_state_widget import LoadStateWidget
 
-# Check if matplotlib is available
-try:
-    import matplotlib
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-    from matplotlib.figure import Figure
-    HAS_MATPLOTLIB = True
-except ImportError:
-    HAS_MATPLOTLIB = False
+# Check if matplotlib is available (chỉ tìm module, matplotlib được import khi vẽ biểu đồ)
+HAS_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
 
 class ReportView(QWidget):
     """
     Giao diện hiển thị báo cáo và thống kê.
     """
-    def __init__(self, report_controller):
+    # Báo cáo của từng tab (theo thứ tự tab), trùng với khóa của BackgroundLoader
+    REPORT_TABS = ("overview", "top_courses", "grades", "grade_pivot", "student_results")
+    # Báo cáo -> {đối tượng: các cột ảnh hưởng}; thêm/xóa bản ghi luôn ảnh hưởng
+    REPORT_DEPENDENCIES = {
+        "overview": {ENTITY_STUDENT: (), ENTITY_COURSE: (), ENTITY_ENROLLMENT: ("diem",)},
+        "top_courses": {ENTITY_COURSE: ("ten_khoa_hoc",), ENTITY_ENROLLMENT: ("ma_khoa_hoc",)},
+        "grades": {ENTITY_ENROLLMENT: ("diem",)},
+        "grade_pivot": {
+            ENTITY_STUDENT: ("ngay_nhap_hoc",),
+            ENTITY_COURSE: ("ten_khoa_hoc", "giang_vien", "so_tin_chi"),
+            ENTITY_ENROLLMENT: ("ma_khoa_hoc", "ngay_ghi_danh", "diem"),
+        },
+        "student_results": {
+            ENTITY_STUDENT: ("ho_ten", "gioi_tinh", "ngay_sinh", "trang_thai"),
+            ENTITY_COURSE: ("ten_khoa_hoc", "so_tin_chi"),
+            ENTITY_ENROLLMENT: ("ma_khoa_hoc", "diem"),
+        },
+    }
+
+    # Lựa chọn của bảng chéo điểm: (nhãn, giá trị truyền cho get_grade_pivot)
+    PIVOT_GROUPS = (("Khóa học", "course"), ("Giảng viên", "instructor"),
+                    ("Số tín chỉ", "credits"), ("Học kỳ", "term"), ("Khóa tuyển sinh", "cohort"))
+    PIVOT_COLUMNS = (("Thang điểm chữ", ("bucket", "letter")),
+                     ("Thang điểm chi tiết", ("bucket", "detailed")),
+                     ("Xếp loại học lực", ("bucket", "classification")),
+                     ("Đạt / Không đạt", ("pass_fail", "letter")))
+    PIVOT_VALUES = (("Số lượng", "count"), ("Tỷ lệ % theo dòng", "percent"),
+                    ("Điểm trung bình", "mean"))
+
+    def __init__(self, report_controller, auto_load=True, config_manager=None):
         """
         Khởi tạo giao diện báo cáo và thống kê.
         
         Args:
             report_controller (ReportController): Controller quản lý báo cáo
+            auto_load (bool): Tải dữ liệu ngay khi khởi tạo; False để tải sau qua load_initial_data()
+            config_manager (ConfigManager, optional): Cấu hình thời hạn truy vấn (mục "query_timeouts")
         """
         super().__init__()
         self.setObjectName("reportView")
         self.report_controller = report_controller
+        self.config_manager = config_manager
+        # Mọi truy vấn báo cáo chạy trên luồng nền, có thể hủy và có thời hạn
+        self.loader = BackgroundLoader(self)
+        # Báo cáo đã từng tải và báo cáo có dữ liệu cũ cần tải lại
+        self._loaded_reports = set()
+        # Bảng chéo điểm chưa có dữ liệu: lập lần đầu khi tab được chọn
+        self._stale_reports = {"grade_pivot"}
+        self.loader.loadStarted.connect(self._loaded_reports.add)
+        for signal in (self.loader.loadStarted, self.loader.loadFinished,
+                       self.loader.loadFailed, self.loader.loadCancelled):
+            signal.connect(self.update_busy_bar)
+        self.loader.loadCancelled.connect(self.on_report_cancelled)
+        self.change_collector = ChangeCollector(
+            (ENTITY_STUDENT, ENTITY_COURSE, ENTITY_ENROLLMENT), parent=self)
+        self.change_collector.changesReady.connect(self.on_data_changed)
         self.init_ui()
+        self.tabs.currentChanged.connect(self.refresh_stale_reports)
+        self.tabs.currentChanged.connect(self.update_busy_bar)
+        if auto_load:
+            self.load_initial_data()
     
     def init_ui(self):
         """Thiết lập giao diện người dùng."""
@@ -54,16 +102,37 @@ class ReportView(QWidget):
         self.setup_grade_distribution_tab(grade_distribution_tab)
         self.tabs.addTab(grade_distribution_tab, "Phân phối điểm")
         
-        # Tab 4: Kết quả sinh viên
+        # Tab 4: Bảng chéo điểm
+        grade_pivot_tab = QWidget()
+        self.setup_grade_pivot_tab(grade_pivot_tab)
+        self.tabs.addTab(grade_pivot_tab, "Bảng chéo điểm")
+        
+        # Tab 5: Kết quả sinh viên
         student_results_tab = QWidget()
         self.setup_student_results_tab(student_results_tab)
         self.tabs.addTab(student_results_tab, "Kết quả sinh viên")
         
         main_layout.addWidget(self.tabs)
         
-        self.setLayout(main_layout)
+        # Thanh trạng thái khi báo cáo của tab đang mở còn đang tải: cho phép hủy
+        busy_layout = QHBoxLayout()
+        self.busy_label = QLabel("Đang tải báo cáo...")
+        busy_layout.addWidget(self.busy_label)
+        busy_layout.addStretch()
+        self.cancel_button = QPushButton("Hủy")
+        self.cancel_button.setToolTip("Dừng truy vấn báo cáo đang chạy")
+        self.cancel_button.clicked.connect(self.cancel_current_report)
+        busy_layout.addWidget(self.cancel_button)
+        self.busy_bar = QWidget()
+        self.busy_bar.setLayout(busy_layout)
+        self.busy_bar.setVisible(False)
+        main_layout.addWidget(self.busy_bar)
         
-        # Tải dữ liệu cho tab đầu tiên khi hiển thị
+        self.setLayout(main_layout)
+    
+    def load_initial_data(self):
+        """Tải dữ liệu ban đầu của view (MainWindow gọi khi tab được mở lần đầu)."""
+        # Chỉ tải tab đầu tiên, các tab khác tải khi được chọn
         self.load_overview_statistics()
     
     def setup_overview_tab(self, tab):
@@ -182,7 +251,9 @@ class ReportView(QWidget):
             "Loại điểm", "Số lượng"
         ])
         self.grades_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        layout.addWidget(self.grades_table)
+        self.grades_state = LoadStateWidget(self.grades_table, empty_message="Không có dữ liệu điểm")
+        self.grades_state.retryRequested.connect(self.load_grade_distribution)
+        layout.addWidget(self.grades_state)
         
         # Nút làm mới
         refresh_button = QPushButton("Làm mới dữ liệu")
@@ -191,6 +262,68 @@ class ReportView(QWidget):
         
         tab.setLayout(layout)
     
+    def setup_grade_pivot_tab(self, tab):
+        """
+        Thiết lập tab bảng chéo điểm (khóa học / giảng viên / số tín chỉ × khoảng điểm).
+
+        Args:
+            tab (QWidget): Widget tab cần thiết lập.
+        """
+        layout = QVBoxLayout()
+        
+        # Tiêu đề
+        title_label = QLabel("Bảng chéo điểm theo nhóm")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        font = QFont()
+        font.setBold(True)
+        font.setPointSize(14)
+        title_label.setFont(font)
+        layout.addWidget(title_label)
+        
+        # Các tùy chọn của bảng chéo
+        options_layout = QHBoxLayout()
+        self.pivot_group_combo = QComboBox()
+        self.pivot_columns_combo = QComboBox()
+        self.pivot_value_combo = QComboBox()
+        for label, combo, choices in (("Dòng:", self.pivot_group_combo, self.PIVOT_GROUPS),
+                                      ("Cột:", self.pivot_columns_combo, self.PIVOT_COLUMNS),
+                                      ("Giá trị:", self.pivot_value_combo, self.PIVOT_VALUES)):
+            options_layout.addWidget(QLabel(label))
+            for text, data in choices:
+                combo.addItem(text, data)
+            combo.currentIndexChanged.connect(self.load_grade_pivot)
+            options_layout.addWidget(combo)
+        options_layout.addStretch()
+        
+        refresh_button = QPushButton("Làm mới")
+        refresh_button.clicked.connect(self.load_grade_pivot)
+        options_layout.addWidget(refresh_button)
+        
+        self.pivot_export_button = QPushButton("Xuất dữ liệu")
+        export_menu = QMenu(self.pivot_export_button)
+        export_menu.addAction("Xuất ra Excel", lambda: self.export_grade_pivot("excel"))
+        export_menu.addAction("Xuất ra CSV", lambda: self.export_grade_pivot("csv"))
+        self.pivot_export_button.setMenu(export_menu)
+        self.pivot_export_button.setEnabled(False)
+        options_layout.addWidget(self.pivot_export_button)
+        layout.addLayout(options_layout)
+        
+        # Bảng chéo: bấm vào tiêu đề cột để sắp xếp, dòng tổng luôn ở cuối
+        self.pivot_table = QTableWidget()
+        self.pivot_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.pivot_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.pivot_table.horizontalHeader().setSortIndicatorShown(True)
+        self.pivot_table.horizontalHeader().sectionClicked.connect(self.sort_grade_pivot)
+        self.pivot_state = LoadStateWidget(self.pivot_table, empty_message="Không có dữ liệu điểm")
+        self.pivot_state.retryRequested.connect(self.load_grade_pivot)
+        layout.addWidget(self.pivot_state)
+        
+        # Bảng chéo hiện tại và cách sắp xếp (cột hiển thị, giảm dần)
+        self._grade_pivot = None
+        self._pivot_sort = (0, False)
+        
+        tab.setLayout(layout)
+    
     def setup_student_results_tab(self, tab):
         """
         Thiết lập tab kết quả học tập của sinh viên.
@@ -238,17 +371,75 @@ class ReportView(QWidget):
         
         tab.setLayout(layout)
     
+    def query_timeout(self, report):
+        """
+        Thời hạn truy vấn của một báo cáo theo cấu hình.
+
+        Args:
+            report (str): Khóa báo cáo (trong REPORT_TABS)
+
+        Returns:
+            float: Số giây tối đa, None nếu không giới hạn
+        """
+        if self.config_manager is None:
+            return DEFAULT_QUERY_TIMEOUT
+        return self.config_manager.get_query_timeout(report)
+
+    def load_report(self, report, func, *args, **kwargs):
+        """
+        Chạy truy vấn báo cáo trên luồng nền với cancel_token có thời hạn của báo cáo đó;
+        quá thời hạn thì truy vấn bị dừng và on_error nhận QueryTimeoutException.
+
+        Args:
+            report (str): Khóa báo cáo (trong REPORT_TABS)
+            func (callable): Hàm truy vấn nhận tham số cancel_token
+            *args: Tham số vị trí cho func
+            **kwargs: Tham số từ khóa cho func và on_result/on_error của BackgroundLoader.load
+        """
+        self.loader.load(report, func, *args, cancellable=True,
+                         timeout=self.query_timeout(report), **kwargs)
+
+    def cancel_current_report(self):
+        """Hủy truy vấn của báo cáo ở tab đang mở (nút Hủy)."""
+        self.loader.cancel(self.REPORT_TABS[self.tabs.currentIndex()])
+
+    def on_report_cancelled(self, report):
+        """
+        Cập nhật giao diện khi người dùng hủy một báo cáo.
+
+        Args:
+            report (str): Khóa báo cáo bị hủy
+        """
+        logging.info(f"Người dùng đã hủy báo cáo '{report}'")
+        if report == "grades":
+            self.grades_state.show_error("Đã hủy theo yêu cầu")
+        elif report == "grade_pivot":
+            self.pivot_state.show_error("Đã hủy theo yêu cầu")
+
+    def update_busy_bar(self, *_):
+        """Hiện nút Hủy khi báo cáo của tab đang mở còn đang tải."""
+        self.busy_bar.setVisible(self.loader.is_loading(self.REPORT_TABS[self.tabs.currentIndex()]))
+
     def load_overview_statistics(self):
-        """Tải thống kê tổng quan từ controller và hiển thị."""
-        stats = self.report_controller.get_student_course_statistics()
-        
+        """Tải thống kê tổng quan (chạy nền) và hiển thị."""
+        self.load_report("overview", self.report_controller.get_student_course_statistics,
+                         on_result=self.show_overview_statistics,
+                         on_error=lambda e: self.show_load_error("thống kê tổng quan", e))
+    
+    def show_overview_statistics(self, stats):
+        """
+        Hiển thị thống kê tổng quan.
+
+        Args:
+            stats (dict): Kết quả từ get_student_course_statistics
+        """
         self.total_students_label.setText(str(stats['total_students']))
         self.total_courses_label.setText(str(stats['total_courses']))
         self.total_enrollments_label.setText(str(stats['total_enrollments']))
         self.avg_grade_label.setText(f"{stats['average_grade']} / 10")
     
     def load_top_courses(self):
-        """Tải danh sách các khóa học được đăng ký nhiều nhất."""
+        """Tải danh sách các khóa học được đăng ký nhiều nhất (chạy nền)."""
         # Xác định số lượng khóa học cần hiển thị
         limit_text = self.limit_combo.currentText()
         if limit_text == "Tất cả":
@@ -256,9 +447,17 @@ class ReportView(QWidget):
         else:
             limit = int(limit_text)
         
-        top_courses = self.report_controller.get_top_courses_by_enrollment(limit)
-        
-        # Hiển thị dữ liệu trong bảng
+        self.load_report("top_courses", self.report_controller.get_top_courses_by_enrollment, limit,
+                         on_result=self.show_top_courses,
+                         on_error=lambda e: self.show_load_error("top khóa học", e))
+    
+    def show_top_courses(self, top_courses):
+        """
+        Hiển thị danh sách khóa học được đăng ký nhiều nhất.
+
+        Args:
+            top_courses (list): Kết quả từ get_top_courses_by_enrollment
+        """
         self.top_courses_table.setRowCount(0)
         for row, course in enumerate(top_courses):
             self.top_courses_table.insertRow(row)
@@ -267,127 +466,295 @@ class ReportView(QWidget):
             self.top_courses_table.setItem(row, 2, QTableWidgetItem(str(course['student_count'])))
     
     def load_grade_distribution(self):
-        """Tải phân phối điểm số và hiển thị trong bảng."""
-        try:
-            # Hiển thị trạng thái đang tải
-            old_cursor = self.cursor()
-            self.setCursor(Qt.CursorShape.WaitCursor)
-            self.grades_table.setRowCount(0)
-            
-            # Thêm thông báo tải
-            loading_row = self.grades_table.rowCount()
-            self.grades_table.insertRow(loading_row)
-            loading_item = QTableWidgetItem("Đang tải dữ liệu...")
-            self.grades_table.setItem(loading_row, 0, loading_item)
-            QApplication.processEvents()
-            
-            # Tải dữ liệu
-            grade_distribution = self.report_controller.get_grade_distribution()
-            
-            # Xóa thông báo tải
-            self.grades_table.setRowCount(0)
-            
-            if not grade_distribution:
-                # Hiển thị thông báo nếu không có dữ liệu
-                self.grades_table.insertRow(0)
-                self.grades_table.setItem(0, 0, QTableWidgetItem("Không có dữ liệu điểm"))
-                self.grades_table.setSpan(0, 0, 1, 2)
-                self.setCursor(old_cursor)
-                return
-                
-            row = 0
-            for grade_range, count in grade_distribution.items():
-                self.grades_table.insertRow(row)
-                self.grades_table.setItem(row, 0, QTableWidgetItem(str(grade_range)))
-                self.grades_table.setItem(row, 1, QTableWidgetItem(str(count)))
-                row += 1
-                
-            # Thêm mã màu cho các dòng trong bảng điểm
-            for row in range(self.grades_table.rowCount()):
-                grade_range = self.grades_table.item(row, 0).text()
-                if "A" in grade_range:
-                    self.grades_table.item(row, 0).setBackground(QColor(120, 230, 120)) # Xanh lá
-                    self.grades_table.item(row, 1).setBackground(QColor(120, 230, 120))
-                elif "B" in grade_range:
-                    self.grades_table.item(row, 0).setBackground(QColor(170, 240, 170)) # Xanh lá nhạt
-                    self.grades_table.item(row, 1).setBackground(QColor(170, 240, 170))
-                elif "C" in grade_range:
-                    self.grades_table.item(row, 0).setBackground(QColor(255, 255, 150)) # Vàng nhạt
-                    self.grades_table.item(row, 1).setBackground(QColor(255, 255, 150))
-                elif "D" in grade_range:
-                    self.grades_table.item(row, 0).setBackground(QColor(255, 200, 150)) # Cam nhạt
-                    self.grades_table.item(row, 1).setBackground(QColor(255, 200, 150))
-                elif "F" in grade_range:
-                    self.grades_table.item(row, 0).setBackground(QColor(255, 180, 180)) # Đỏ nhạt
-                    self.grades_table.item(row, 1).setBackground(QColor(255, 180, 180))
+        """Tải phân phối điểm số (chạy nền) và hiển thị trong bảng."""
+        self.grades_state.show_loading()
+        self.load_report("grades", self.report_controller.get_grade_distribution,
+                         on_result=self.show_grade_distribution,
+                         on_error=lambda e: self.grades_state.show_error(str(e)))
+    
+    def show_grade_distribution(self, grade_distribution):
+        """
+        Hiển thị phân phối điểm số trong bảng.
+
+        Args:
+            grade_distribution (dict): Khoảng điểm -> số lượng
+        """
+        self.grades_table.setRowCount(0)
+        if not grade_distribution:
+            self.grades_state.show_empty()
+            return
+        
+        row = 0
+        for grade_range, count in grade_distribution.items():
+            self.grades_table.insertRow(row)
+            self.grades_table.setItem(row, 0, QTableWidgetItem(str(grade_range)))
+            self.grades_table.setItem(row, 1, QTableWidgetItem(str(count)))
+            row += 1
             
-            # Khôi phục con trỏ
-            self.setCursor(old_cursor)
-                        
-        except Exception as e:
-            self.setCursor(old_cursor)  # Đảm bảo khôi phục con trỏ trong mọi trường hợp
-            logging.error(f"Lỗi khi tải phân phối điểm: {e}")
-            QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu phân phối điểm: {str(e)}")
+        # Thêm mã màu cho các dòng trong bảng điểm
+        for row in range(self.grades_table.rowCount()):
+            grade_range = self.grades_table.item(row, 0).text()
+            if "A" in grade_range:
+                self.grades_table.item(row, 0).setBackground(QColor(120, 230, 120)) # Xanh lá
+                self.grades_table.item(row, 1).setBackground(QColor(120, 230, 120))
+            elif "B" in grade_range:
+                self.grades_table.item(row, 0).setBackground(QColor(170, 240, 170)) # Xanh lá nhạt
+                self.grades_table.item(row, 1).setBackground(QColor(170, 240, 170))
+            elif "C" in grade_range:
+                self.grades_table.item(row, 0).setBackground(QColor(255, 255, 150)) # Vàng nhạt
+                self.grades_table.item(row, 1).setBackground(QColor(255, 255, 150))
+            elif "D" in grade_range:
+                self.grades_table.item(row, 0).setBackground(QColor(255, 200, 150)) # Cam nhạt
+                self.grades_table.item(row, 1).setBackground(QColor(255, 200, 150))
+            elif "F" in grade_range:
+                self.grades_table.item(row, 0).setBackground(QColor(255, 180, 180)) # Đỏ nhạt
+                self.grades_table.item(row, 1).setBackground(QColor(255, 180, 180))
+        
+        self.grades_state.show_content()
+    
+    def load_grade_pivot(self):
+        """Lập bảng chéo điểm theo các tùy chọn đang chọn (chạy nền)."""
+        columns, scheme = self.pivot_columns_combo.currentData()
+        value = self.pivot_value_combo.currentData()
+        self.pivot_state.show_loading()
+        self.load_report("grade_pivot", self.report_controller.get_grade_pivot,
+                         self.pivot_group_combo.currentData(), columns, value, scheme,
+                         include_ungraded=(value == "count"),
+                         on_result=self.show_grade_pivot,
+                         on_error=lambda e: self.pivot_state.show_error(str(e)))
+    
+    def show_grade_pivot(self, pivot):
+        """
+        Hiển thị bảng chéo điểm (giữ cách sắp xếp đang chọn nếu còn hợp lệ).
+
+        Args:
+            pivot (PivotTable): Kết quả từ get_grade_pivot, None nếu lỗi
+        """
+        self._grade_pivot = pivot
+        self.pivot_export_button.setEnabled(bool(pivot))
+        if pivot is None:
+            self.pivot_state.show_error("Không thể lập bảng chéo điểm")
+            return
+        if not pivot:
+            self.pivot_table.setRowCount(0)
+            self.pivot_state.show_empty()
+            return
+        column, descending = self._pivot_sort
+        if column >= len(pivot.headers()):
+            column, descending = 0, False
+        self.sort_grade_pivot(column, descending)
+        self.pivot_state.show_content()
+    
+    def _pivot_sort_key(self, column):
+        """Chuyển cột hiển thị của bảng chéo thành tham số sắp xếp của PivotTable.sorted."""
+        from utils.grade_analytics import SORT_KEY, SORT_TITLE, SORT_TOTAL
+        pivot = self._grade_pivot
+        value_start = 2 if pivot.titles is not None else 1
+        if column == 0:
+            return SORT_KEY
+        if column < value_start:
+            return SORT_TITLE
+        if column == value_start + len(pivot.column_labels):
+            return SORT_TOTAL
+        return column - value_start
+    
+    def sort_grade_pivot(self, column, descending=None):
+        """
+        Sắp xếp bảng chéo theo một cột; bấm lại cùng cột để đổi chiều sắp xếp.
+
+        Args:
+            column (int): Cột hiển thị
+            descending (bool, optional): Chiều sắp xếp; None để tự chọn theo lần bấm
+        """
+        if not self._grade_pivot:
+            return
+        if descending is None:
+            previous_column, previous_descending = self._pivot_sort
+            # Cột giá trị sắp giảm dần trước, cột khóa/tên sắp tăng dần trước
+            descending = (not previous_descending if column == previous_column
+                          else self._pivot_sort_key(column) not in ("key", "title"))
+        self._pivot_sort = (column, descending)
+        self._grade_pivot = self._grade_pivot.sorted(self._pivot_sort_key(column), descending)
+        self.fill_grade_pivot_table(self._grade_pivot)
+        self.pivot_table.horizontalHeader().setSortIndicator(
+            column, Qt.SortOrder.DescendingOrder if descending else Qt.SortOrder.AscendingOrder)
+    
+    def fill_grade_pivot_table(self, pivot):
+        """
+        Đổ bảng chéo vào bảng hiển thị, dòng tổng in đậm ở cuối.
+
+        Args:
+            pivot (PivotTable): Bảng chéo đã sắp xếp
+        """
+        headers = pivot.headers()
+        rows = pivot.to_rows()
+        bold = QFont()
+        bold.setBold(True)
+        text_columns = 2 if pivot.titles is not None else 1
+        number_alignment = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        
+        self.pivot_table.setUpdatesEnabled(False)
+        try:
+            self.pivot_table.clearContents()
+            self.pivot_table.setColumnCount(len(headers))
+            self.pivot_table.setHorizontalHeaderLabels(headers)
+            self.pivot_table.setRowCount(len(rows))
+            for row_index, row in enumerate(rows):
+                is_total = row_index == len(rows) - 1
+                for column_index, value in enumerate(row):
+                    item = QTableWidgetItem(str(value))
+                    if column_index >= text_columns:
+                        item.setTextAlignment(number_alignment)
+                    if is_total or column_index == len(row) - 1:
+                        item.setFont(bold)
+                    self.pivot_table.setItem(row_index, column_index, item)
+        finally:
+            self.pivot_table.setUpdatesEnabled(True)
+        self.pivot_table.resizeColumnsToContents()
+    
+    def export_grade_pivot(self, file_format):
+        """
+        Xuất bảng chéo điểm đang hiển thị (đúng thứ tự sắp xếp, kèm dòng tổng).
+
+        Args:
+            file_format (str): "excel" hoặc "csv"
+        """
+        if not self._grade_pivot:
+            return
+        # Import khi xuất để không nạp pandas/reportlab lúc mở view
+        from utils.export_manager import ExportManager
+        
+        headers = self._grade_pivot.headers()
+        rows = self._grade_pivot.to_rows()
+        filename = f"bang_cheo_diem_{self._grade_pivot.group}"
+        if file_format == "excel":
+            ExportManager.export_to_excel(rows, headers, parent=self,
+                                          default_filename=f"{filename}.xlsx")
+        else:
+            ExportManager.export_to_csv(rows, headers, parent=self,
+                                        default_filename=f"{filename}.csv")
     
     def load_student_results(self):
-        """Tải kết quả học tập của sinh viên và hiển thị."""
+        """Tải kết quả học tập của sinh viên (chạy nền) và hiển thị."""
         student_id = self.student_id_input.text().strip()
         if not student_id:
             QMessageBox.warning(self, "Lỗi", "Vui lòng nhập mã sinh viên!")
             return
         
-        # Lấy thông tin sinh viên
-        student = None
-        try:
-            # Giả định có một hàm get_student_by_id trong report_controller
-            # Nhưng nếu không có, chúng ta có thể tìm cách khác để lấy thông tin sinh viên
-            student_performance = self.report_controller.get_student_performance(student_id)
-            
-            if student_performance['courses_enrolled'] == 0:
-                QMessageBox.warning(self, "Thông báo", f"Không tìm thấy thông tin sinh viên có mã {student_id} hoặc sinh viên chưa đăng ký khóa học nào!")
-                self.student_info.setText("")
-                self.results_table.setRowCount(0)
-                return
-            
-            # Hiển thị thông tin sinh viên
-            student_query = """
-            SELECT * FROM students WHERE student_id = ?
-            """
-            student_result = self.report_controller.db_manager.execute_query(student_query, (student_id,))
-            
-            if student_result:
-                student = student_result[0]
-                student_info = f"""
-                <h2>Thông tin sinh viên</h2>
-                <p><b>Mã số:</b> {student['student_id']}</p>
-                <p><b>Họ tên:</b> {student['ho_ten']}</p>
-                <p><b>Giới tính:</b> {student['gender']}</p>
-                <p><b>Ngày sinh:</b> {student['date_of_birth']}</p>
-                <p><b>Trạng thái:</b> {student['status']}</p>
-                <hr>
-                <h3>Thông tin học tập</h3>
-                <p><b>Số khóa học đã đăng ký:</b> {student_performance['courses_enrolled']}</p>
-                <p><b>Số khóa học đã có điểm:</b> {student_performance['courses_completed']}</p>
-                <p><b>Điểm trung bình:</b> {student_performance['average_grade']}</p>
-                """
-                self.student_info.setHtml(student_info)
-            else:
-                self.student_info.setText(f"Không tìm thấy thông tin sinh viên có mã {student_id}")
-            
-            # Hiển thị kết quả học tập
+        self.load_report("student_results", self.fetch_student_results, student_id,
+                         on_result=self.show_student_results,
+                         on_error=lambda e: self.show_load_error("kết quả học tập", e))
+    
+    def fetch_student_results(self, student_id, cancel_token=None):
+        """
+        Lấy kết quả học tập và thông tin sinh viên (chạy trên luồng nền).
+
+        Args:
+            student_id (str): Mã sinh viên
+            cancel_token (CancellationToken, optional): Cờ hủy truy vấn
+
+        Returns:
+            tuple: (mã sinh viên, kết quả học tập, bản ghi sinh viên hoặc None)
+        """
+        student_performance = self.report_controller.get_student_performance(student_id, cancel_token)
+        student_query = """
+        SELECT * FROM sinh_vien WHERE ma_sinh_vien = ?
+        """
+        student_result = self.report_controller.db_manager.execute_query(student_query, (student_id,),
+                                                                         cancel_token)
+        return student_id, student_performance, (student_result[0] if student_result else None)
+    
+    def show_student_results(self, results):
+        """
+        Hiển thị kết quả học tập của sinh viên.
+
+        Args:
+            results (tuple): Kết quả từ fetch_student_results
+        """
+        student_id, student_performance, student = results
+        
+        if student_performance['courses_enrolled'] == 0:
+            QMessageBox.warning(self, "Thông báo", f"Không tìm thấy thông tin sinh viên có mã {student_id} hoặc sinh viên chưa đăng ký khóa học nào!")
+            self.student_info.setText("")
             self.results_table.setRowCount(0)
-            for row, course in enumerate(student_performance['course_details']):
-                self.results_table.insertRow(row)
-                self.results_table.setItem(row, 0, QTableWidgetItem(course['course_id']))
-                self.results_table.setItem(row, 1, QTableWidgetItem(course['course_name']))
-                self.results_table.setItem(row, 2, QTableWidgetItem(str(course['credits'])))
-                
-                grade_text = str(course['grade']) if course['grade'] is not None else "Chưa có"
-                self.results_table.setItem(row, 3, QTableWidgetItem(grade_text))
+            return
+        
+        # Hiển thị thông tin sinh viên
+        if student:
+            student_info = f"""
+            <h2>Thông tin sinh viên</h2>
+            <p><b>Mã số:</b> {student['ma_sinh_vien']}</p>
+            <p><b>Họ tên:</b> {student['ho_ten']}</p>
+            <p><b>Giới tính:</b> {student['gioi_tinh']}</p>
+            <p><b>Ngày sinh:</b> {student['ngay_sinh']}</p>
+            <p><b>Trạng thái:</b> {student['trang_thai']}</p>
+            <hr>
+            <h3>Thông tin học tập</h3>
+            <p><b>Số khóa học đã đăng ký:</b> {student_performance['courses_enrolled']}</p>
+            <p><b>Số khóa học đã có điểm:</b> {student_performance['courses_completed']}</p>
+            <p><b>Điểm trung bình:</b> {student_performance['average_grade']}</p>
+            """
+            self.student_info.setHtml(student_info)
+        else:
+            self.student_info.setText(f"Không tìm thấy thông tin sinh viên có mã {student_id}")
+        
+        # Hiển thị kết quả học tập
+        self.results_table.setRowCount(0)
+        for row, course in enumerate(student_performance['course_details']):
+            self.results_table.insertRow(row)
+            self.results_table.setItem(row, 0, QTableWidgetItem(course['course_id']))
+            self.results_table.setItem(row, 1, QTableWidgetItem(course['course_name']))
+            self.results_table.setItem(row, 2, QTableWidgetItem(str(course['credits'])))
             
-        except Exception as e:
-            logging.error(f"Lỗi khi tải kết quả học tập: {e}")
-            QMessageBox.warning(self, "Lỗi", f"Không thể tải kết quả học tập: {e}")
+            grade_text = str(course['grade']) if course['grade'] is not None else "Chưa có"
+            self.results_table.setItem(row, 3, QTableWidgetItem(grade_text))
+    
+    def on_data_changed(self, events):
+        """
+        Đánh dấu các báo cáo đã tải có dữ liệu bị ảnh hưởng bởi thay đổi là cũ.
+
+        Args:
+            events (list): Các ChangeEvent đã gom
+        """
+        for report in self._loaded_reports:
+            dependencies = self.REPORT_DEPENDENCIES.get(report, {})
+            if any(e.entity in dependencies and e.touches(dependencies[e.entity]) for e in events):
+                self._stale_reports.add(report)
+        self.refresh_stale_reports()
+    
+    def refresh_stale_reports(self, *_):
+        """Tải lại báo cáo của tab đang mở nếu dữ liệu đã cũ; các tab khác tải lại khi được chọn."""
+        if not self.isVisible():
+            return
+        report = self.REPORT_TABS[self.tabs.currentIndex()]
+        if report not in self._stale_reports:
+            return
+        self._stale_reports.discard(report)
+        if report == "overview":
+            self.load_overview_statistics()
+        elif report == "top_courses":
+            self.load_top_courses()
+        elif report == "grades":
+            self.load_grade_distribution()
+        elif report == "grade_pivot":
+            self.load_grade_pivot()
+        elif report == "student_results" and self.student_id_input.text().strip():
+            self.load_student_results()
+    
+    def showEvent(self, event):
+        """Tải lại báo cáo cũ khi view được hiển thị lại."""
+        super().showEvent(event)
+        self.refresh_stale_reports()
+    
+    def show_load_error(self, report_name, error):
+        """
+        Thông báo lỗi khi tải một báo cáo.
+
+        Args:
+            report_name (str): Tên báo cáo
+            error (Exception): Lỗi xảy ra
+        """
+        QMessageBox.warning(self, "Lỗi", f"Không thể tải {report_name}: {error}")
 
     def load_data(self):
         """Tải dữ liệu thống kê."""
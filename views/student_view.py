@@ -2,24 +2,37 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                             QLabel, QLineEdit, QComboBox, QPushButton, 
                             QTableWidget, QTableWidgetItem, QHeaderView, 
                             QMessageBox, QGroupBox, QSplitter, QDateEdit,
-                            QFileDialog, QFrame, QMenu, QScrollArea, QSizePolicy)  # Thêm QSizePolicy
+                            QFileDialog, QFrame, QMenu, QScrollArea, QSizePolicy,
+                            QProgressDialog)
 from PyQt6.QtCore import Qt, QDate, QSize
 from PyQt6.QtGui import QIcon, QPixmap, QColor, QAction
 from models.student import Student
 import logging
 import os
 from widgets.photo_frame import PhotoFrame
+from utils.search_pipeline import SearchPipeline
+from utils.background_loader import BackgroundLoader
+from utils.stream_export import BackgroundExport
+from utils.change_bus import ChangeCollector, ChangeOperation, ENTITY_STUDENT
+from widgets.load_state_widget import LoadStateWidget
 
 class StudentView(QWidget):
     """
     Giao diện quản lý sinh viên.
     """
-    def __init__(self, student_controller, current_user_id=None):
+    # Số thay đổi tối đa được cập nhật từng dòng; nhiều hơn thì tải lại toàn bộ
+    PATCH_LIMIT = 200
+
+    def __init__(self, student_controller, current_user_id=None, auto_load=True):
         super().__init__()
         self.student_controller = student_controller
         self.current_user_id = current_user_id
         self.selected_student = None
+        self.import_progress = None
+        self.print_progress = None
         self.init_ui()
+        if auto_load:
+            self.load_initial_data()
 
     def init_ui(self):
         """Thiết lập giao diện người dùng hiện đại."""
@@ -182,8 +195,15 @@ class StudentView(QWidget):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Nhập mã, tên, email,...")
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         search_layout.addWidget(self.search_input)
         
+        # Tìm kiếm khi gõ phím: chạy nền, tự hủy truy vấn cũ khi có từ khóa mới
+        self.search_pipeline = SearchPipeline(self.student_controller.find_students, parent=self)
+        self.search_pipeline.resultsReady.connect(self.show_search_results)
+        self.search_pipeline.searchFailed.connect(self.on_search_failed)
+        self.search_pipeline.busyChanged.connect(self.on_search_busy_changed)
+        
         self.search_button = QPushButton("Tìm")
         self.search_button.setIcon(QIcon("resources/icons/search.png") if os.path.exists("resources/icons/search.png") else QIcon())
         self.search_button.clicked.connect(self.search_students)
@@ -244,7 +264,10 @@ class StudentView(QWidget):
 
         # Thêm chức năng sắp xếp khi click vào header
         
-        table_layout.addWidget(self.table)
+        # Bảng được bọc trong widget trạng thái (đang tải / trống / lỗi)
+        self.table_state = LoadStateWidget(self.table, empty_message="Không tìm thấy sinh viên nào")
+        self.table_state.retryRequested.connect(self.load_students)
+        table_layout.addWidget(self.table_state)
         
         # Hiển thị tổng số sinh viên và phân trang
         footer_layout = QHBoxLayout()
@@ -278,16 +301,21 @@ class StudentView(QWidget):
         self.current_page = 1
         self.page_size = 20
         self.filtered_students = []
-        
-        # Tải danh sách sinh viên
+
+        # Khi controller báo có thay đổi, chỉ đọc lại và cập nhật các sinh viên bị ảnh hưởng
+        self.loader = BackgroundLoader(self)
+        self.exporter = BackgroundExport(self.loader, self)
+        self._patch_count = 0
+        self.change_collector = ChangeCollector((ENTITY_STUDENT,), parent=self)
+        self.change_collector.changesReady.connect(self.apply_changes)
+    
+    def load_initial_data(self):
+        """Tải dữ liệu ban đầu của view (MainWindow gọi khi tab được mở lần đầu)."""
         self.load_students()
     
     def load_students(self):
-        """Tải danh sách sinh viên từ cơ sở dữ liệu và hiển thị lên bảng."""
-        students = self.student_controller.get_all_students()
-        self.filtered_students = students
-        self.pagination.update_total_items(len(students))
-        self.populate_table_with_pagination()
+        """Tải danh sách sinh viên (chạy nền) theo bộ lọc hiện tại và hiển thị lên bảng."""
+        self.search_pipeline.run_now(self.build_search_criteria())
     
     def populate_table_with_pagination(self):
         """Hiển thị dữ liệu trên trang hiện tại."""
@@ -323,37 +351,7 @@ class StudentView(QWidget):
         self.table.setRowCount(len(students))
 
         for row, student in enumerate(students):
-            # Tạo các item trong bảng
-            id_item = QTableWidgetItem(student.ma_sinh_vien)
-            name_item = QTableWidgetItem(student.ho_ten)
-            dob_item = QTableWidgetItem(student.ngay_sinh)
-            gender_item = QTableWidgetItem(student.gioi_tinh)
-            email_item = QTableWidgetItem(student.email)
-            phone_item = QTableWidgetItem(student.so_dien_thoai)
-            address_item = QTableWidgetItem(student.dia_chi)
-            enrolled_date_item = QTableWidgetItem(student.ngay_nhap_hoc)
-            status_item = QTableWidgetItem(student.trang_thai)
-
-            # Thiết lập các item vào bảng
-            self.table.setItem(row, 0, id_item)
-            self.table.setItem(row, 1, name_item)
-            self.table.setItem(row, 2, dob_item)
-            self.table.setItem(row, 3, gender_item)
-            self.table.setItem(row, 4, email_item)
-            self.table.setItem(row, 5, phone_item)
-            self.table.setItem(row, 6, address_item)
-            self.table.setItem(row, 7, enrolled_date_item)
-            self.table.setItem(row, 8, status_item)
-
-            # Thiết lập màu nền dựa trên trạng thái sinh viên
-            if student.trang_thai == "Đang học":
-                status_item.setBackground(QColor(200, 255, 200))  # Xanh lá nhạt
-            elif student.trang_thai == "Tạm nghỉ":
-                status_item.setBackground(QColor(255, 255, 200))  # Vàng nhạt
-            elif student.trang_thai == "Đã tốt nghiệp":
-                status_item.setBackground(QColor(200, 200, 255))  # Xanh dương nhạt
-            elif student.trang_thai == "Đã thôi học":
-                status_item.setBackground(QColor(255, 200, 200))  # Đỏ nhạt
+            self.set_student_row(row, student)
 
         # Khôi phục tính năng cập nhật giao diện và vị trí cuộn
         self.table.setSortingEnabled(True)
@@ -362,12 +360,136 @@ class StudentView(QWidget):
         # Cập nhật nhãn tổng số sinh viên
         self.total_students_label.setText(f"Tổng số: {len(students)} sinh viên")
 
-        # Align text to the left in all columns
-        for row in range(len(students)):
-            for col in range(9):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+    def set_student_row(self, row, student):
+        """
+        Ghi thông tin một sinh viên vào một dòng của bảng.
+
+        Args:
+            row (int): Chỉ số dòng
+            student (Student): Sinh viên cần hiển thị
+        """
+        values = (
+            student.ma_sinh_vien, student.ho_ten, student.ngay_sinh, student.gioi_tinh,
+            student.email, student.so_dien_thoai, student.dia_chi, student.ngay_nhap_hoc,
+            student.trang_thai
+        )
+        for col, value in enumerate(values):
+            item = QTableWidgetItem(value or "")
+            item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, col, item)
+
+        # Thiết lập màu nền dựa trên trạng thái sinh viên
+        status_item = self.table.item(row, 8)
+        if student.trang_thai == "Đang học":
+            status_item.setBackground(QColor(200, 255, 200))  # Xanh lá nhạt
+        elif student.trang_thai == "Tạm nghỉ":
+            status_item.setBackground(QColor(255, 255, 200))  # Vàng nhạt
+        elif student.trang_thai == "Đã tốt nghiệp":
+            status_item.setBackground(QColor(200, 200, 255))  # Xanh dương nhạt
+        elif student.trang_thai == "Đã thôi học":
+            status_item.setBackground(QColor(255, 200, 200))  # Đỏ nhạt
+
+    def find_table_row(self, student_id):
+        """
+        Tìm dòng đang hiển thị sinh viên trên trang hiện tại.
+
+        Args:
+            student_id (str): Mã sinh viên
+
+        Returns:
+            int: Chỉ số dòng hoặc -1 nếu sinh viên không nằm trên trang hiện tại
+        """
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item is not None and item.text() == student_id:
+                return row
+        return -1
+
+    def find_loaded_student(self, student_id):
+        """
+        Tìm sinh viên trong danh sách đã tải (không truy vấn cơ sở dữ liệu).
+
+        Args:
+            student_id (str): Mã sinh viên
+
+        Returns:
+            tuple: (vị trí trong filtered_students hoặc -1, Student hoặc None)
+        """
+        for index, student in enumerate(self.filtered_students):
+            if student.ma_sinh_vien == student_id:
+                return index, student
+        return -1, None
+
+    def apply_changes(self, events):
+        """
+        Cập nhật danh sách sau khi dữ liệu sinh viên thay đổi.
+        Sinh viên bị xóa được bỏ khỏi danh sách ngay; sinh viên được thêm/sửa
+        được đọc lại bằng một truy vấn theo mã trên luồng nền.
+
+        Args:
+            events (list): Các ChangeEvent của bảng sinh_vien
+        """
+        # Quá nhiều thay đổi hoặc thay đổi hàng loạt (key None): tải lại toàn bộ
+        if len(events) > self.PATCH_LIMIT or any(e.key is None for e in events):
+            self.load_students()
+            return
+
+        deleted = {e.key for e in events if e.operation is ChangeOperation.DELETE}
+        changed = [e.key for e in events if e.operation is not ChangeOperation.DELETE]
+        if deleted:
+            self.filtered_students = [s for s in self.filtered_students
+                                      if s.ma_sinh_vien not in deleted]
+            self.refresh_current_page()
+        if changed:
+            self._patch_count += 1
+            self.loader.load(f"patch-{self._patch_count}", self.student_controller.get_students_by_ids,
+                             changed, on_result=lambda found, keys=changed: self.patch_students(keys, found))
+
+    def patch_students(self, student_ids, found):
+        """
+        Cập nhật các sinh viên vừa được đọc lại vào danh sách và bảng.
+
+        Args:
+            student_ids (list): Các mã sinh viên đã yêu cầu
+            found (dict): Mã sinh viên -> Student (thiếu nghĩa là đã bị xóa)
+        """
+        criteria = self.build_search_criteria()
+        rows_moved = False
+        for student_id in student_ids:
+            student = found.get(student_id)
+            index, _ = self.find_loaded_student(student_id)
+            matches = student is not None and self.student_controller.matches_filters(student, criteria)
+
+            if index >= 0 and matches:
+                # Sửa tại chỗ: chỉ ghi lại dòng đang hiển thị (nếu có)
+                self.filtered_students[index] = student
+                row = self.find_table_row(student_id)
+                if row >= 0:
+                    self.table.setSortingEnabled(False)
+                    self.set_student_row(row, student)
+                    self.table.setSortingEnabled(True)
+            elif index >= 0:
+                del self.filtered_students[index]
+                rows_moved = True
+            elif matches:
+                # Chèn theo thứ tự mã sinh viên như kết quả truy vấn
+                position = next((i for i, s in enumerate(self.filtered_students)
+                                 if s.ma_sinh_vien > student_id), len(self.filtered_students))
+                self.filtered_students.insert(position, student)
+                rows_moved = True
+
+            if (student is not None and self.selected_student is not None
+                    and self.selected_student.ma_sinh_vien == student_id):
+                self.selected_student = student
+
+        if rows_moved:
+            self.refresh_current_page()
+
+    def refresh_current_page(self):
+        """Vẽ lại trang hiện tại từ danh sách đã tải (không truy vấn cơ sở dữ liệu)."""
+        self.pagination.update_total_items(len(self.filtered_students))
+        self.populate_table_with_pagination()
+        self.table_state.show_result(self.filtered_students)
 
     def change_page(self, page):
         """Xử lý khi thay đổi trang."""
@@ -387,29 +509,52 @@ class StudentView(QWidget):
         Args:
             filters (dict): Dictionary chứa các bộ lọc.
         """
-        # Lấy tất cả sinh viên
-        all_students = self.student_controller.get_all_students()
-        
-        # Áp dụng bộ lọc
-        filtered_students = all_students
-        
-        for field, value in filters.items():
-            if field == "status" and value:
-                filtered_students = [s for s in filtered_students if s.status == value]
-            elif field == "gender" and value:
-                filtered_students = [s for s in filtered_students if s.gender == value]
-            elif field == "search_text" and value:
-                search_text = value.lower()
-                filtered_students = [s for s in filtered_students if 
-                                    search_text in s.student_id.lower() or
-                                    search_text in s.ho_ten.lower() or
-                                    search_text in s.email.lower()]
-        
-        # Cập nhật dữ liệu hiển thị
-        self.filtered_students = filtered_students
-        self.pagination.update_total_items(len(filtered_students))
+        self.search_pipeline.run_now(self.build_search_criteria(filters))
+
+    def build_search_criteria(self, filters=None):
+        """
+        Kết hợp bộ lọc nhanh với từ khóa trong ô tìm kiếm.
+
+        Args:
+            filters (dict, optional): Bộ lọc nhanh, mặc định lấy bộ lọc hiện tại
+
+        Returns:
+            dict: Điều kiện tìm kiếm cho StudentController.find_students
+        """
+        criteria = dict(self.quick_filter.current_filters if filters is None else filters)
+        keyword = self.search_input.text().strip()
+        if keyword:
+            criteria["search_text"] = keyword
+        else:
+            criteria.pop("search_text", None)
+        return criteria
+
+    def on_search_text_changed(self, _text):
+        """Lên lịch tìm kiếm khi người dùng đang gõ."""
+        self.search_pipeline.schedule(self.build_search_criteria())
+
+    def show_search_results(self, students):
+        """
+        Hiển thị kết quả tìm kiếm mới nhất.
+
+        Args:
+            students (list): Danh sách các đối tượng Student.
+        """
+        self.filtered_students = students
+        self.pagination.update_total_items(len(students))
         self.current_page = 1  # Reset về trang đầu tiên
         self.populate_table_with_pagination()
+        self.table_state.show_result(students)
+
+    def on_search_failed(self, message):
+        """Hiển thị lỗi tìm kiếm mà không chặn người dùng."""
+        self.total_students_label.setText("Tổng số: 0 sinh viên")
+        self.table_state.show_error(message)
+
+    def on_search_busy_changed(self, busy):
+        """Hiển thị trạng thái đang tải khi truy vấn chạy lâu."""
+        if busy:
+            self.table_state.show_loading()
 
     def sort_table(self, column_index, order):
         """
@@ -443,6 +588,8 @@ class StudentView(QWidget):
         """Xử lý sự kiện khi người dùng chọn một dòng trong bảng."""
         selected_row = self.table.currentRow()
         if selected_row >= 0:
+            student_id = self.table.item(selected_row, 0).text()
+            _, self.selected_student = self.find_loaded_student(student_id)
             self.display_student(self.selected_student)
     
     def display_student(self, student):
@@ -562,7 +709,6 @@ class StudentView(QWidget):
                 self, "Thành công", "Thêm sinh viên thành công!"
             )
             self.clear_form()
-            self.load_students()
         else:
             QMessageBox.warning(
                 self, "Lỗi", 
@@ -601,7 +747,6 @@ class StudentView(QWidget):
                 self, "Thành công", "Cập nhật sinh viên thành công!"
             )
             self.selected_student = student
-            self.load_students()
         else:
             QMessageBox.warning(
                 self, "Lỗi", "Không thể cập nhật thông tin sinh viên."
@@ -632,7 +777,6 @@ class StudentView(QWidget):
                     self, "Thành công", "Xóa sinh viên thành công!"
                 )
                 self.clear_form()
-                self.load_students()
             else:
                 QMessageBox.warning(
                     self, "Lỗi", "Không thể xóa sinh viên."
@@ -654,30 +798,7 @@ class StudentView(QWidget):
     
     def search_students(self):
         """Tìm kiếm sinh viên theo từ khóa."""
-        keyword = self.search_input.text().strip()
-        
-        # Thêm từ khóa tìm kiếm vào bộ lọc nhanh
-        filters = self.quick_filter.current_filters.copy()
-        if keyword:
-            filters["search_text"] = keyword
-        else:
-            if "search_text" in filters:
-                del filters["search_text"]
-        
-        # Áp dụng bộ lọc
-        self.apply_quick_filters(filters)
-        
-        if not keyword:
-            self.load_students()
-            return
-        
-        students = self.student_controller.search_students(keyword)
-        self.populate_table(students)
-        
-        if not students:
-            QMessageBox.information(
-                self, "Kết quả tìm kiếm", "Không tìm thấy sinh viên nào!"
-            )
+        self.search_pipeline.run_now(self.build_search_criteria())
     
     def show_advanced_search(self):
         """Hiển thị giao diện tìm kiếm nâng cao."""
@@ -694,64 +815,203 @@ class StudentView(QWidget):
                 )
     
     def export_data(self):
-        """Xuất dữ liệu sinh viên ra các định dạng."""
-        from utils.export_manager import ExportManager
-
-        # Lấy dữ liệu từ bảng hiện tại
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-        if rows == 0:
-            QMessageBox.warning(self, "Cảnh báo", "Không có dữ liệu để xuất!")
-            return
-
-        # Lấy header là text
-        headers = []
-        for col in range(cols):
-            header_item = self.table.horizontalHeaderItem(col)
-            headers.append(header_item.text() if header_item else f"Cột {col+1}")
-
-        # Lấy dữ liệu, loại bỏ dòng trống
-        data = []
-        for row in range(rows):
-            row_data = []
-            is_empty = True
-            for col in range(cols):
-                item = self.table.item(row, col)
-                value = item.text().strip() if item else ""
-                if value:
-                    is_empty = False
-                row_data.append(value)
-            if not is_empty:
-                data.append(row_data)
+        """
+        Xuất toàn bộ sinh viên khớp bộ lọc hiện tại (không chỉ trang đang xem).
+        Dữ liệu được đọc và ghi theo luồng trên luồng nền; PDF được vẽ theo trang
+        trên tiến trình riêng.
+        """
+        headers = [self.table.horizontalHeaderItem(col).text()
+                   for col in range(self.table.columnCount())]
 
         # Hiển thị menu xuất dữ liệu
         export_menu = QMenu(self)
-        export_excel_action = export_menu.addAction("Xuất ra Excel")
-        export_pdf_action = export_menu.addAction("Xuất ra PDF")
+        formats = {
+            export_menu.addAction("Xuất ra Excel"): "excel",
+            export_menu.addAction("Xuất ra CSV"): "csv",
+            export_menu.addAction("Xuất ra HTML"): "html",
+            export_menu.addAction("Xuất ra PDF"): "pdf",
+        }
+        export_menu.addSeparator()
+        transcript_actions = {
+            export_menu.addAction("In bảng điểm PDF (mỗi sinh viên một file)"): False,
+            export_menu.addAction("In bảng điểm PDF (gộp một file)"): True,
+        }
+        id_card_action = export_menu.addAction("In thẻ sinh viên (PDF)")
 
         action = export_menu.exec(self.export_button.mapToGlobal(
             self.export_button.rect().bottomRight()
         ))
 
-        if action == export_excel_action:
-            ExportManager.export_to_excel(
-                data,
-                headers,
-                parent=self,
-                default_filename="danh_sach_sinh_vien.xlsx"
-            )
-        elif action == export_pdf_action:
-            ExportManager.export_to_pdf(
-                data,
+        if action in formats:
+            filters = self.build_search_criteria()
+            self.exporter.start(
+                formats[action],
                 headers,
+                lambda cancel_token: self.student_controller.iter_students(filters, cancel_token),
+                lambda cancel_token: self.student_controller.count_students(filters, cancel_token),
                 title="Danh sách sinh viên",
-                parent=self,
-                default_filename="danh_sach_sinh_vien.pdf"
+                default_filename="danh_sach_sinh_vien"
             )
-    
+        elif action in transcript_actions:
+            self.print_transcripts(transcript_actions[action])
+        elif action == id_card_action:
+            self.print_id_cards()
+
+    def selected_student_ids(self):
+        """
+        Mã các sinh viên đang được chọn trên bảng.
+
+        Returns:
+            list: Các mã sinh viên (rỗng nếu không chọn dòng nào)
+        """
+        return [self.table.item(index.row(), 0).text()
+                for index in self.table.selectionModel().selectedRows()
+                if self.table.item(index.row(), 0) is not None]
+
+    def print_transcripts(self, merged):
+        """
+        In bảng điểm cho các sinh viên đang chọn, hoặc mọi sinh viên khớp bộ lọc nếu
+        không chọn dòng nào. Chạy nền; in lại vào cùng đích sẽ tiếp tục từ chỗ dừng.
+
+        Args:
+            merged (bool): Gộp tất cả bảng điểm vào một file PDF
+        """
+        from controllers.report_controller import ReportController
+        from utils.transcript_export import TranscriptExporter
+
+        if merged:
+            output, _ = QFileDialog.getSaveFileName(
+                self, "Lưu bảng điểm", "bang_diem.pdf", "PDF Files (*.pdf)")
+            if output and not output.lower().endswith(".pdf"):
+                output += ".pdf"
+        else:
+            output = QFileDialog.getExistingDirectory(self, "Chọn thư mục lưu bảng điểm")
+        if not output:
+            return
+
+        student_ids = self.selected_student_ids()
+        if not student_ids:
+            # Đọc danh sách mã trên luồng nền, cùng lúc với việc in
+            filters = self.build_search_criteria()
+            student_ids = (row[0] for batch in self.student_controller.iter_students(filters)
+                           for row in batch)
+
+        def finished(result):
+            message = f"Đã in {result['rendered']:,} bảng điểm ra:\n{result['output']}"
+            if result['skipped']:
+                message += f"\nĐã có từ lần in trước: {result['skipped']:,}"
+            if result['missing']:
+                message += f"\nKhông tìm thấy sinh viên: {result['missing']:,}"
+            QMessageBox.information(self, "In bảng điểm", message)
+
+        self.start_print("In bảng điểm", "Đã in {done:,}/{total:,} bảng điểm...",
+                         TranscriptExporter(ReportController(self.student_controller.db_manager)),
+                         (output, student_ids), {'merged': merged}, finished,
+                         "Đã dừng in bảng điểm. In lại vào cùng vị trí để tiếp tục.")
+
+    def print_id_cards(self):
+        """
+        In thẻ sinh viên (PDF) cho các sinh viên đang chọn, hoặc mọi sinh viên khớp bộ
+        lọc nếu không chọn dòng nào.
+        """
+        from utils.id_card_export import IdCardExporter
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Lưu thẻ sinh viên", "the_sinh_vien.pdf", "PDF Files (*.pdf)")
+        if not file_path:
+            return
+        if not file_path.lower().endswith(".pdf"):
+            file_path += ".pdf"
+
+        student_ids = self.selected_student_ids() or None
+        filters = None if student_ids else self.build_search_criteria()
+
+        def finished(result):
+            if not result['cards']:
+                QMessageBox.warning(self, "In thẻ sinh viên", "Không có sinh viên nào để in thẻ!")
+                return
+            message = (f"Đã in {result['cards']:,} thẻ ({result['pages']:,} trang) ra:\n"
+                       f"{result['output']}")
+            if result['no_photo']:
+                message += f"\nSinh viên chưa có ảnh: {result['no_photo']:,}"
+            if result['failed']:
+                message += f"\nKhông đọc được ảnh (in khung trống): {result['failed']:,}"
+            QMessageBox.information(self, "In thẻ sinh viên", message)
+
+        self.start_print("In thẻ sinh viên", "Đã xếp {done:,}/{total:,} thẻ...",
+                         IdCardExporter(self.student_controller),
+                         (file_path, student_ids, filters), {}, finished,
+                         "Đã dừng in thẻ sinh viên. Ảnh đã thu nhỏ được giữ lại cho lần in sau.")
+
+    def start_print(self, title, label, worker, args, kwargs, on_finished, cancel_message):
+        """
+        Chạy một công việc in trên luồng nền với hộp thoại tiến trình có nút Hủy.
+
+        Args:
+            title (str): Tiêu đề hộp thoại tiến trình
+            label (str): Mẫu nội dung tiến trình, dùng {done} và {total}
+            worker (QObject): Đối tượng có run(*args, cancel_token) và tín hiệu progressChanged
+            args (tuple): Tham số vị trí của worker.run
+            kwargs (dict): Tham số từ khóa của worker.run
+            on_finished (callable): Nhận kết quả của worker.run khi thành công
+            cancel_message (str): Thông báo khi người dùng hủy
+        """
+        if self.loader.is_loading("print"):
+            QMessageBox.information(self, title, "Đang có một công việc in chạy nền, vui lòng chờ.")
+            return
+        self.print_progress = QProgressDialog(f"{title}...", "Hủy", 0, 0, self)
+        self.print_progress.setWindowTitle(title)
+        self.print_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.print_progress.setMinimumDuration(0)
+        self.print_progress.setAutoClose(False)
+        self.print_progress.setAutoReset(False)
+        worker.progressChanged.connect(
+            lambda done, total: self.on_print_progress(label.format(done=done, total=total), done, total))
+        self.print_progress.canceled.connect(lambda: self.cancel_print(title, cancel_message))
+        self.export_button.setEnabled(False)
+
+        def succeeded(result):
+            self.finish_print()
+            on_finished(result)
+
+        def failed(error):
+            self.finish_print()
+            QMessageBox.critical(self, "Lỗi", f"{title} thất bại: {str(error)}")
+
+        # Không gán parent cho worker: nó sống cùng công việc nền và được giải phóng khi xong
+        self.loader.load("print", worker.run, *args, cancellable=True, **kwargs,
+                         on_result=succeeded, on_error=failed)
+
+    def on_print_progress(self, text, done, total):
+        """Cập nhật hộp thoại tiến trình của công việc in."""
+        if self.print_progress is None:
+            return
+        if total:
+            self.print_progress.setMaximum(total)
+            self.print_progress.setValue(min(done, total))
+        self.print_progress.setLabelText(text)
+
+    def cancel_print(self, title, message):
+        """Dừng công việc in; các phần đã xong được giữ lại để lần sau tiếp tục."""
+        self.loader.cancel("print")
+        self.finish_print()
+        QMessageBox.information(self, title, message)
+
+    def finish_print(self):
+        """Đóng hộp thoại tiến trình của công việc in."""
+        self.export_button.setEnabled(True)
+        if self.print_progress is not None:
+            self.print_progress.blockSignals(True)
+            self.print_progress.close()
+            self.print_progress.deleteLater()
+            self.print_progress = None
+
     def import_data(self):
-        """Nhập dữ liệu sinh viên từ file Excel/CSV."""
-        from utils.import_manager import ImportManager  # Đảm bảo đã có ImportManager
+        """
+        Nhập dữ liệu sinh viên từ file Excel/CSV (chạy nền, đọc và ghi theo từng khối).
+        File được kiểm tra trước (không ghi gì), người dùng xem tổng hợp lỗi rồi mới nhập.
+        """
+        from utils.import_manager import StudentImporter
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Chọn file dữ liệu để nhập",
@@ -760,21 +1020,121 @@ class StudentView(QWidget):
         )
         if not file_path:
             return
-        try:
-            imported_students = ImportManager.import_students(file_path)
-            if not imported_students:
-                QMessageBox.warning(self, "Lỗi", "Không có dữ liệu hợp lệ để nhập!")
-                return
-            count = 0
-            for student in imported_students:
-                # Thêm từng sinh viên, bỏ qua nếu mã đã tồn tại
-                success = self.student_controller.add_student(student)
-                if success:
-                    count += 1
-            QMessageBox.information(self, "Nhập dữ liệu", f"Đã nhập thành công {count} sinh viên.")
-            self.load_students()
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi", f"Lỗi khi nhập dữ liệu: {str(e)}")
+
+        # Không gán parent: bộ nhập sống cùng công việc nền và được giải phóng khi nó xong
+        importer = StudentImporter(self.student_controller)
+        self.import_progress = QProgressDialog("Đang kiểm tra dữ liệu...", "Hủy", 0, 0, self)
+        self.import_progress.setWindowTitle("Nhập dữ liệu")
+        self.import_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.setAutoClose(False)
+        self.import_progress.setAutoReset(False)
+        importer.progressChanged.connect(self.on_import_progress)
+        self.import_progress.canceled.connect(self.cancel_import)
+        self.import_button.setEnabled(False)
+
+        self.loader.load("import_check", importer.dry_run, file_path, cancellable=True,
+                         on_result=lambda summary, i=importer, f=file_path:
+                             self.on_import_checked(i, f, summary),
+                         on_error=self.on_import_failed)
+
+    def on_import_checked(self, importer, file_path, summary):
+        """
+        Hiển thị tổng hợp kiểm tra và hỏi người dùng có tiếp tục nhập không.
+
+        Args:
+            importer (StudentImporter): Bộ nhập đã dùng để kiểm tra
+            file_path (str): File đang nhập
+            summary (dict): Kết quả StudentImporter.dry_run
+        """
+        if not summary['valid']:
+            self.finish_import()
+            QMessageBox.warning(self, "Lỗi", "Không có dữ liệu hợp lệ để nhập!")
+            return
+
+        message = (f"Tổng số dòng: {summary['total']:,}\n"
+                   f"Hợp lệ: {summary['valid']:,}\n"
+                   f"Bị từ chối: {summary['invalid']:,}")
+        failed_rules = [(rule, count) for rule, count in summary['by_rule'].items() if count]
+        if failed_rules:
+            message += "\n\n" + "\n".join(f"- {rule}: {count:,} dòng" for rule, count in failed_rules)
+            message += "\n\nVí dụ:\n" + "\n".join(
+                f"Dòng {line}: {reason}" for line, reason in summary['samples'][:5])
+        message += ("\n\nTiếp tục nhập các dòng hợp lệ?\n"
+                    "\"Cập nhật\" ghi đè sinh viên đã tồn tại bằng dữ liệu trong file "
+                    "(ô trống giữ nguyên), \"Chỉ thêm mới\" bỏ qua các mã đã tồn tại.")
+
+        self.import_progress.hide()
+        box = QMessageBox(QMessageBox.Icon.Question, "Kết quả kiểm tra", message,
+                          QMessageBox.StandardButton.NoButton, self)
+        merge_button = box.addButton("Cập nhật", QMessageBox.ButtonRole.AcceptRole)
+        insert_button = box.addButton("Chỉ thêm mới", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton("Hủy", QMessageBox.ButtonRole.RejectRole)
+        box.setDefaultButton(insert_button)
+        box.exec()
+        if box.clickedButton() not in (merge_button, insert_button):
+            self.finish_import()
+            return
+
+        self.import_progress.setLabelText("Đang nhập dữ liệu sinh viên...")
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        self.loader.load("import", importer.run, file_path,
+                         current_user_id=self.current_user_id,
+                         merge=box.clickedButton() == merge_button, cancellable=True,
+                         on_result=self.on_import_finished,
+                         on_error=self.on_import_failed)
+
+    def on_import_progress(self, processed, total):
+        """Cập nhật hộp thoại tiến trình nhập dữ liệu."""
+        if self.import_progress is None:
+            return
+        if total:
+            self.import_progress.setMaximum(total)
+            self.import_progress.setValue(processed)
+        self.import_progress.setLabelText(f"Đã xử lý {processed:,} dòng...")
+
+    def cancel_import(self):
+        """Dừng kiểm tra hoặc nhập dữ liệu; các khối đã ghi vẫn được giữ lại."""
+        if self.loader.is_loading("import_check"):
+            self.loader.cancel("import_check")
+            self.finish_import()
+            return
+        self.loader.cancel("import")
+        self.finish_import()
+        QMessageBox.information(self, "Nhập dữ liệu",
+                                "Đã dừng nhập dữ liệu. Các dòng đã xử lý trước đó vẫn được lưu.")
+
+    def on_import_finished(self, result):
+        """Thông báo kết quả nhập dữ liệu."""
+        self.finish_import()
+        if not result['total']:
+            QMessageBox.warning(self, "Lỗi", "Không có dữ liệu hợp lệ để nhập!")
+            return
+        message = f"Đã thêm mới {result['inserted']} sinh viên.\n"
+        if result['updated'] or result['unchanged']:
+            message += (f"Đã cập nhật: {result['updated']}\n"
+                        f"Không thay đổi: {result['unchanged']}\n")
+        if result['skipped']:
+            message += f"Đã tồn tại (bỏ qua): {result['skipped']}\n"
+        message += f"Bị từ chối: {result['rejected']}"
+        if result['error_report']:
+            message += f"\n\nChi tiết các dòng bị từ chối: {result['error_report']}"
+        QMessageBox.information(self, "Nhập dữ liệu", message)
+
+    def on_import_failed(self, error):
+        """Thông báo lỗi khi nhập dữ liệu."""
+        self.finish_import()
+        QMessageBox.critical(self, "Lỗi", f"Lỗi khi nhập dữ liệu: {str(error)}")
+
+    def finish_import(self):
+        """Đóng hộp thoại tiến trình nhập dữ liệu."""
+        self.import_button.setEnabled(True)
+        if self.import_progress is not None:
+            self.import_progress.blockSignals(True)
+            self.import_progress.close()
+            self.import_progress.deleteLater()
+            self.import_progress = None
     
     def validate_form_data(self):
         """
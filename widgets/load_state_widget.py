@@ -0,0 +1,122 @@
+from PyQt6.QtWidgets import QStackedWidget, QWidget, QVBoxLayout, QLabel, QProgressBar
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from widgets.empty_state_widget import EmptyStateWidget
+
+
+class LoadStateWidget(QStackedWidget):
+    """
+    Bọc một widget nội dung với các trạng thái: đang tải, trống và lỗi.
+    Dùng cùng BackgroundLoader để giao diện không bị treo khi truy vấn.
+    """
+    # Phát ra khi người dùng bấm "Thử lại" ở trạng thái lỗi
+    retryRequested = pyqtSignal()
+
+    CONTENT, LOADING, EMPTY, ERROR = range(4)
+
+    def __init__(self, content_widget, empty_message="Không có dữ liệu",
+                 loading_message="Đang tải dữ liệu...", loading_delay_ms=200, parent=None):
+        """
+        Khởi tạo widget trạng thái tải
+
+        Args:
+            content_widget (QWidget): Widget hiển thị dữ liệu
+            empty_message (str): Thông báo khi không có dữ liệu
+            loading_message (str): Thông báo khi đang tải
+            loading_delay_ms (int): Chỉ hiện trạng thái tải nếu tải lâu hơn khoảng này,
+                                    tránh nhấp nháy khi truy vấn nhanh
+            parent (QWidget): Widget cha
+        """
+        super().__init__(parent)
+        self.setObjectName("loadStateWidget")
+        self.content_widget = content_widget
+        self.addWidget(content_widget)
+
+        # Trang đang tải
+        loading_page = QWidget()
+        loading_layout = QVBoxLayout(loading_page)
+        loading_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loading_label = QLabel(loading_message)
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loading_label.setStyleSheet("font-size: 14px; color: #757575;")
+        loading_layout.addWidget(self.loading_label)
+        progress = QProgressBar()
+        progress.setRange(0, 0)  # Thanh tiến trình không xác định
+        progress.setMaximumWidth(240)
+        loading_layout.addWidget(progress, 0, Qt.AlignmentFlag.AlignCenter)
+        self.addWidget(loading_page)
+
+        # Trang trống
+        self.empty_message = empty_message
+        self.empty_page = EmptyStateWidget(message=empty_message, action_text=None)
+        self.addWidget(self.empty_page)
+
+        # Trang lỗi (tạo lại mỗi lần để cập nhật thông báo)
+        self.error_page = QWidget()
+        self.addWidget(self.error_page)
+
+        self._loading_timer = QTimer(self)
+        self._loading_timer.setSingleShot(True)
+        self._loading_timer.setInterval(loading_delay_ms)
+        self._loading_timer.timeout.connect(lambda: self.setCurrentIndex(self.LOADING))
+
+    def show_loading(self):
+        """Chuyển sang trạng thái đang tải (sau khoảng trễ)."""
+        if not self._loading_timer.isActive() and self.currentIndex() != self.LOADING:
+            self._loading_timer.start()
+
+    def show_content(self):
+        """Hiển thị widget nội dung."""
+        self._loading_timer.stop()
+        self.setCurrentIndex(self.CONTENT)
+
+    def show_empty(self, message=None):
+        """
+        Hiển thị trạng thái không có dữ liệu
+
+        Args:
+            message (str, optional): Thông báo thay cho thông báo mặc định
+        """
+        self._loading_timer.stop()
+        message = message or self.empty_message
+        if message != self.empty_page.message:
+            self._replace_page(self.EMPTY, EmptyStateWidget(message=message, action_text=None))
+        self.setCurrentIndex(self.EMPTY)
+
+    def show_error(self, message):
+        """
+        Hiển thị trạng thái lỗi kèm nút thử lại
+
+        Args:
+            message (str): Thông báo lỗi
+        """
+        self._loading_timer.stop()
+        error_page = EmptyStateWidget(
+            message=f"Không thể tải dữ liệu:\n{message}",
+            action_text="Thử lại"
+        )
+        error_page.actionTriggered.connect(self.retryRequested.emit)
+        self._replace_page(self.ERROR, error_page)
+        self.setCurrentIndex(self.ERROR)
+
+    def show_result(self, items):
+        """
+        Hiển thị nội dung hoặc trạng thái trống tùy theo kết quả
+
+        Args:
+            items: Kết quả tải (list, dict, ...); rỗng thì hiển thị trạng thái trống
+        """
+        if items:
+            self.show_content()
+        else:
+            self.show_empty()
+
+    def _replace_page(self, index, widget):
+        """Thay trang tại vị trí index bằng widget mới."""
+        old = self.widget(index)
+        self.insertWidget(index, widget)
+        self.removeWidget(old)
+        old.deleteLater()
+        if index == self.EMPTY:
+            self.empty_page = widget
+        elif index == self.ERROR:
+            self.error_page = widget
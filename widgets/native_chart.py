@@ -0,0 +1,347 @@
+import math
+from PyQt6.QtWidgets import QWidget, QToolTip
+from PyQt6.QtCore import Qt, QRectF, QPointF, QSize, QVariantAnimation, QEasingCurve
+from PyQt6.QtGui import QPainter, QPainterPath, QColor, QPen, QFont, QFontMetrics
+from utils.chart_renderer import (ChartSpec, CHART_BAR, CHART_HISTOGRAM, CHART_LINE, CHART_PIE,
+                                  DEFAULT_COLORS, MAX_ANNOTATED_POINTS, gender_distribution_spec,
+                                  grade_distribution_spec, histogram_spec)
+
+
+class NativeChartWidget(QWidget):
+    """
+    Biểu đồ vẽ trực tiếp bằng QPainter (cột, tròn, đường, tần suất), không cần
+    matplotlib. Cùng API với ChartWidget (render_spec, plot_bar, plot_pie...).
+
+    Di chuột lên cột/phần/điểm để xem giá trị. Khi dữ liệu đổi, biểu đồ chuyển
+    dần từ giá trị cũ sang giá trị mới.
+    """
+    ANIMATION_MS = 300
+    MARGIN_LEFT = 48
+    MARGIN_RIGHT = 16
+    MARGIN_TOP = 36
+    MARGIN_BOTTOM = 52
+    GRID_STEPS = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(300)
+        self.setMouseTracking(True)
+        self._spec = None
+        # Giá trị đang hiển thị (thay đổi trong lúc chuyển động)
+        self._from_values = ()
+        self._values = ()
+        # Vùng di chuột: (QRectF hoặc QPainterPath, nội dung tooltip), tính lại mỗi lần vẽ
+        self._hit_regions = []
+        self._hover_index = None
+
+        self._animation = QVariantAnimation(self)
+        self._animation.setDuration(self.ANIMATION_MS)
+        self._animation.setStartValue(0.0)
+        self._animation.setEndValue(1.0)
+        self._animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self._animation.valueChanged.connect(self._on_animation_step)
+
+    def sizeHint(self):
+        """Kích thước mong muốn (để chia đều chỗ với các biểu đồ matplotlib cùng hàng)."""
+        return QSize(500, 300)
+
+    @property
+    def fingerprint(self):
+        """Fingerprint của biểu đồ đang hiển thị (None nếu chưa vẽ)."""
+        return self._spec.fingerprint if self._spec is not None else None
+
+    def render_size(self):
+        """Không cần vẽ trước: vẽ bằng QPainter chỉ mất vài ms."""
+        return None
+
+    def render_spec(self, spec, animate=True):
+        """
+        Hiển thị biểu đồ theo mô tả, bỏ qua nếu dữ liệu không đổi.
+
+        Args:
+            spec (ChartSpec): Mô tả biểu đồ
+            animate (bool): Chuyển dần từ giá trị cũ sang giá trị mới
+
+        Returns:
+            bool: True nếu biểu đồ được cập nhật
+        """
+        if self._spec is not None and self._spec.fingerprint == spec.fingerprint:
+            return False
+        same_layout = self._spec is not None and self._spec.layout_key() == spec.layout_key()
+        # Cùng bố cục: chuyển từ giá trị đang hiển thị; bố cục mới: cột mọc lên từ 0
+        self._from_values = self._values if same_layout else tuple(0 for _ in spec.values)
+        self._spec = spec
+        self._hover_index = None
+        self._animation.stop()
+        if animate and not spec.is_empty and self.isVisible():
+            self._values = self._from_values
+            self._animation.start()
+        else:
+            self._values = spec.values
+        self.update()
+        return True
+
+    def _on_animation_step(self, progress):
+        """Nội suy giá trị hiển thị theo tiến độ chuyển động."""
+        self._values = tuple(old + (new - old) * progress
+                             for old, new in zip(self._from_values, self._spec.values))
+        self.update()
+
+    # ----- API giống ChartWidget -----
+
+    def plot_bar(self, x_data, y_data, title, xlabel, ylabel, color='#2979ff'):
+        """Vẽ biểu đồ cột."""
+        self.render_spec(ChartSpec(CHART_BAR, x_data, y_data, title, xlabel, ylabel, color))
+
+    def plot_pie(self, labels, sizes, title, colors=None):
+        """Vẽ biểu đồ tròn."""
+        self.render_spec(ChartSpec(CHART_PIE, labels, sizes, title, colors=colors))
+
+    def plot_line(self, x_data, y_data, title, xlabel, ylabel, color='#2979ff'):
+        """Vẽ biểu đồ đường."""
+        self.render_spec(ChartSpec(CHART_LINE, x_data, y_data, title, xlabel, ylabel, color))
+
+    def plot_histogram(self, samples, bins=10, value_range=None, title="", xlabel="", ylabel="",
+                       color='#2979ff'):
+        """Vẽ biểu đồ tần suất từ các giá trị rời rạc (xem histogram_spec)."""
+        self.render_spec(histogram_spec(samples, bins, value_range, title, xlabel, ylabel, color))
+
+    def plot_grade_distribution(self, grade_data, title="Phân phối điểm số"):
+        """Vẽ biểu đồ phân phối điểm số."""
+        self.render_spec(grade_distribution_spec(grade_data, title))
+
+    def plot_gender_distribution(self, gender_data, title="Tỷ lệ giới tính"):
+        """Vẽ biểu đồ tỷ lệ giới tính."""
+        self.render_spec(gender_distribution_spec(gender_data, title))
+
+    # ----- Vẽ -----
+
+    def _color(self, index):
+        """Màu của phần tử thứ index theo mô tả (một màu hoặc danh sách màu)."""
+        colors = self._spec.colors
+        if isinstance(colors, str):
+            return QColor(colors)
+        colors = colors or (DEFAULT_COLORS if self._spec.kind == CHART_PIE else DEFAULT_COLORS[:1])
+        return QColor(colors[index % len(colors)])
+
+    @staticmethod
+    def _format_value(value):
+        """Hiển thị số nguyên không có phần thập phân."""
+        return f"{value:g}" if isinstance(value, float) else str(value)
+
+    def paintEvent(self, event):
+        """Vẽ biểu đồ"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), self.palette().base())
+        self._hit_regions = []
+        spec = self._spec
+        if spec is None:
+            return
+        rect = QRectF(self.rect())
+
+        title_font = QFont(self.font())
+        title_font.setPointSize(title_font.pointSize() + 2)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        painter.setPen(self.palette().text().color())
+        painter.drawText(rect.adjusted(8, 6, -8, 0), Qt.AlignmentFlag.AlignHCenter, spec.title)
+        painter.setFont(self.font())
+
+        if spec.is_empty:
+            painter.setPen(QColor("gray"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, spec.empty_message)
+        elif spec.kind == CHART_PIE:
+            self._paint_pie(painter, rect)
+        else:
+            self._paint_axes_chart(painter, rect)
+        painter.end()
+
+    def _plot_area(self, rect):
+        """Vùng vẽ dữ liệu bên trong các trục."""
+        return rect.adjusted(self.MARGIN_LEFT, self.MARGIN_TOP, -self.MARGIN_RIGHT, -self.MARGIN_BOTTOM)
+
+    @classmethod
+    def _axis_max(cls, values):
+        """Giá trị lớn nhất của trục y: bội của một bước lưới tròn (1, 2, 2.5, 5 x 10^n)."""
+        peak = max(max(values), 0) * 1.1 or 1
+        step = peak / cls.GRID_STEPS
+        magnitude = 10 ** math.floor(math.log10(step))
+        for multiple in (1, 2, 2.5, 5, 10):
+            if multiple * magnitude >= step:
+                return multiple * magnitude * cls.GRID_STEPS
+        return peak
+
+    def _paint_axes_chart(self, painter, rect):
+        """Vẽ lưới, trục và dữ liệu của biểu đồ cột, đường, tần suất."""
+        spec = self._spec
+        area = self._plot_area(rect)
+        if area.width() <= 0 or area.height() <= 0:
+            return
+        axis_max = self._axis_max(spec.values)
+        metrics = QFontMetrics(self.font())
+        text_color = self.palette().text().color()
+
+        # Lưới và nhãn trục y
+        grid_pen = QPen(QColor("#e0e0e0"), 1, Qt.PenStyle.DashLine)
+        for step in range(self.GRID_STEPS + 1):
+            value = axis_max * step / self.GRID_STEPS
+            y = area.bottom() - area.height() * step / self.GRID_STEPS
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(area.left(), y), QPointF(area.right(), y))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                             self._format_value(round(value, 2)))
+        painter.setPen(QPen(text_color, 1))
+        painter.drawLine(area.bottomLeft(), area.bottomRight())
+
+        # Nhãn trục x của từng phần tử và tên trục
+        slot = area.width() / len(spec.labels)
+        # Chuỗi dài (ví dụ theo ngày, theo giờ): chỉ ghi nhãn cách quãng để không chồng nhau
+        label_step = 1
+        if spec.kind == CHART_LINE and len(spec.labels) > MAX_ANNOTATED_POINTS:
+            widest = max(metrics.horizontalAdvance(str(label)) for label in spec.labels) + 8
+            label_step = max(1, math.ceil(widest / slot))
+        for index in range(0, len(spec.labels), label_step):
+            label_rect = QRectF(area.left() + slot * (index + 0.5 - label_step / 2),
+                                area.bottom() + 4, slot * label_step, 18)
+            text = metrics.elidedText(str(spec.labels[index]), Qt.TextElideMode.ElideRight,
+                                      int(slot * label_step) - 2)
+            painter.drawText(label_rect, Qt.AlignmentFlag.AlignHCenter, text)
+        painter.drawText(QRectF(area.left(), rect.bottom() - 24, area.width(), 20),
+                         Qt.AlignmentFlag.AlignHCenter, spec.xlabel)
+        if spec.ylabel:
+            painter.save()
+            painter.translate(12, area.center().y())
+            painter.rotate(-90)
+            painter.drawText(QRectF(-area.height() / 2, -10, area.height(), 20),
+                             Qt.AlignmentFlag.AlignCenter, spec.ylabel)
+            painter.restore()
+
+        if spec.kind == CHART_LINE:
+            self._paint_line(painter, area, slot, axis_max)
+        else:
+            self._paint_bars(painter, area, slot, axis_max)
+
+    def _paint_bars(self, painter, area, slot, axis_max):
+        """Vẽ các cột (cột của biểu đồ tần suất nằm liền nhau)."""
+        spec = self._spec
+        gap = 1 if spec.kind == CHART_HISTOGRAM else slot * 0.2
+        for index, (label, value) in enumerate(zip(spec.labels, self._values)):
+            height = area.height() * max(value, 0) / axis_max
+            bar = QRectF(area.left() + slot * index + gap / 2, area.bottom() - height,
+                         slot - gap, height)
+            color = self._color(index)
+            if index != self._hover_index:
+                color.setAlphaF(0.8)
+            painter.fillRect(bar, color)
+            painter.setPen(self.palette().text().color())
+            painter.drawText(QRectF(bar.left() - gap / 2, bar.top() - 18, slot, 16),
+                             Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignBottom,
+                             self._format_value(round(value, 1)))
+            self._hit_regions.append((bar, f"{label}: {self._format_value(spec.values[index])}"))
+
+    def _paint_line(self, painter, area, slot, axis_max):
+        """Vẽ đường nối các điểm và giá trị tại mỗi điểm."""
+        spec = self._spec
+        points = [QPointF(area.left() + slot * (index + 0.5),
+                          area.bottom() - area.height() * value / axis_max)
+                  for index, value in enumerate(self._values)]
+        color = self._color(0)
+        painter.setPen(QPen(color, 2))
+        path = QPainterPath(points[0])
+        for point in points[1:]:
+            path.lineTo(point)
+        painter.drawPath(path)
+        painter.setBrush(color)
+        # Nhiều điểm thì chỉ xem giá trị qua tooltip
+        show_values = len(points) <= MAX_ANNOTATED_POINTS
+        for index, point in enumerate(points):
+            radius = 6 if index == self._hover_index else 4
+            painter.setPen(QPen(color, 1))
+            painter.drawEllipse(point, radius, radius)
+            if show_values:
+                painter.setPen(self.palette().text().color())
+                painter.drawText(QRectF(point.x() - slot / 2, point.y() - 24, slot, 16),
+                                 Qt.AlignmentFlag.AlignHCenter,
+                                 self._format_value(round(self._values[index], 1)))
+            hit = QRectF(point.x() - 8, point.y() - 8, 16, 16)
+            self._hit_regions.append((hit, f"{spec.labels[index]}: {self._format_value(spec.values[index])}"))
+
+    def _paint_pie(self, painter, rect):
+        """Vẽ biểu đồ tròn với phần trăm trên mỗi phần và chú thích bên phải."""
+        spec = self._spec
+        area = rect.adjusted(12, self.MARGIN_TOP, -12, -12)
+        legend_width = min(160.0, area.width() * 0.35)
+        diameter = min(area.width() - legend_width, area.height())
+        if diameter <= 0:
+            return
+        pie_rect = QRectF(area.left() + (area.width() - legend_width - diameter) / 2,
+                          area.top() + (area.height() - diameter) / 2, diameter, diameter)
+        total = sum(self._values) or 1
+        real_total = sum(spec.values) or 1
+        # Bắt đầu từ góc 90 độ, ngược chiều kim đồng hồ như matplotlib
+        angle = 90.0
+        for index, (label, value) in enumerate(zip(spec.labels, self._values)):
+            span = 360.0 * value / total
+            path = QPainterPath(pie_rect.center())
+            path.arcTo(pie_rect, angle, span)
+            path.closeSubpath()
+            color = self._color(index)
+            painter.setPen(QPen(self.palette().base().color(), 1))
+            painter.setBrush(color.lighter(115) if index == self._hover_index else color)
+            painter.drawPath(path)
+            percent = 100.0 * spec.values[index] / real_total
+            if span >= 12:
+                # Phần trăm ở giữa phần, cách tâm 0.6 bán kính
+                middle = QPainterPath(pie_rect.center())
+                middle.arcMoveTo(pie_rect.adjusted(diameter * 0.2, diameter * 0.2,
+                                                   -diameter * 0.2, -diameter * 0.2),
+                                 angle + span / 2)
+                center = middle.currentPosition()
+                painter.setPen(QColor("white"))
+                painter.drawText(QRectF(center.x() - 30, center.y() - 10, 60, 20),
+                                 Qt.AlignmentFlag.AlignCenter, f"{percent:.1f}%")
+            self._hit_regions.append((path, f"{label}: {self._format_value(spec.values[index])} "
+                                            f"({percent:.1f}%)"))
+            angle += span
+
+        # Chú thích
+        painter.setPen(self.palette().text().color())
+        legend_left = pie_rect.right() + 16
+        top = pie_rect.center().y() - len(spec.labels) * 11
+        for index, label in enumerate(spec.labels):
+            y = top + index * 22
+            painter.fillRect(QRectF(legend_left, y + 3, 12, 12), self._color(index))
+            painter.drawText(QRectF(legend_left + 18, y, legend_width - 18, 18),
+                             Qt.AlignmentFlag.AlignVCenter, str(label))
+
+    # ----- Tooltip -----
+
+    def _region_at(self, position):
+        """Chỉ số vùng dữ liệu chứa điểm position (None nếu không có)."""
+        for index, (region, _) in enumerate(self._hit_regions):
+            if region.contains(QPointF(position)):
+                return index
+        return None
+
+    def mouseMoveEvent(self, event):
+        """Hiển thị tooltip và làm nổi phần tử dưới con trỏ."""
+        position = event.position()
+        index = self._region_at(position)
+        if index != self._hover_index:
+            self._hover_index = index
+            self.update()
+        if index is None:
+            QToolTip.hideText()
+        else:
+            QToolTip.showText(event.globalPosition().toPoint(), self._hit_regions[index][1], self)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        """Bỏ làm nổi khi con trỏ rời biểu đồ."""
+        if self._hover_index is not None:
+            self._hover_index = None
+            self.update()
+        super().leaveEvent(event)
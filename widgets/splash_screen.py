@@ -0,0 +1,59 @@
+from PyQt6.QtWidgets import QSplashScreen
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap, QPainter, QColor, QFont
+
+
+class SplashScreen(QSplashScreen):
+    """
+    Màn hình chờ trong lúc khởi động, hiển thị bước đang chạy của StartupOrchestrator.
+    Hình nền được vẽ bằng QPainter nên không cần file ảnh.
+    """
+
+    def __init__(self, title="Hệ thống Quản lý Sinh viên", width=460, height=240):
+        """
+        Khởi tạo màn hình chờ
+
+        Args:
+            title (str): Tiêu đề hiển thị
+            width (int): Chiều rộng
+            height (int): Chiều cao
+        """
+        super().__init__(self._create_pixmap(title, width, height))
+        self._message_color = QColor("#ffffff")
+
+    @staticmethod
+    def _create_pixmap(title, width, height):
+        """Vẽ hình nền của màn hình chờ."""
+        pixmap = QPixmap(width, height)
+        pixmap.fill(QColor("#2979ff"))
+        painter = QPainter(pixmap)
+        painter.setPen(QColor("#ffffff"))
+        font = QFont()
+        font.setPointSize(18)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(pixmap.rect().adjusted(20, 0, -20, -40),
+                         Qt.AlignmentFlag.AlignCenter, title)
+        painter.end()
+        return pixmap
+
+    def attach(self, orchestrator):
+        """
+        Hiển thị mô tả của mỗi bước khi bước đó bắt đầu
+
+        Args:
+            orchestrator (StartupOrchestrator): Bộ điều phối khởi động
+        """
+        orchestrator.taskStarted.connect(self.show_step)
+
+    def show_step(self, _name, description):
+        """
+        Hiển thị bước khởi động đang chạy
+
+        Args:
+            _name (str): Tên bước
+            description (str): Mô tả bước
+        """
+        self.showMessage(f"{description}...",
+                         Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
+                         self._message_color)